@@ -9,6 +9,7 @@ from .control_manager import ControlManagerAgent
 from .data_manager import DataManagerAgent
 from .analyze_manager import AnalyzeManagerAgent
 from .agent_coordinator import AgentCoordinator
+from .ai_dispatcher import AIDispatcher
 
 __all__ = [
     "OrchestratorAgent",
@@ -17,6 +18,7 @@ __all__ = [
     "DataManagerAgent",
     "AnalyzeManagerAgent",
     "AgentCoordinator",
+    "AIDispatcher",
 ]
 
 
@@ -0,0 +1,284 @@
+"""
+Реестр действий агентов: схемы параметров, проверка и исправление плана
+"""
+
+import re
+import sys
+import os
+import difflib
+import inspect
+import logging
+import typing
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+from .base_agent import BaseAgent
+
+# Добавляем путь к корню проекта для импорта
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+PLAN_REPAIRS = metrics.counter(
+    "coordinator_plan_repairs_total", "Исправления плана по реестру действий (action/agent/param/coerce/rejected)", ["kind"]
+)
+
+# Публичные методы агентов, которые не вызываются из плана
+INTERNAL_ACTIONS = frozenset({"invalidate_cache", "classify_todo_lines", "add_write_listener", "notify_write"})
+
+# Минимальная похожесть имени параметра для исправления опечатки модели (difflib)
+NAME_MATCH_CUTOFF = 0.8
+
+CAMEL_CASE_PATTERN = re.compile(r"(?<=[a-z0-9])([A-Z])")
+SEPARATOR_PATTERN = re.compile(r"[\s\-]+")
+INTEGER_PATTERN = re.compile(r"^#?([+-]?\d+)$")
+TRUE_VALUES = frozenset({"true", "1", "yes", "да"})
+FALSE_VALUES = frozenset({"false", "0", "no", "нет"})
+# Значение не удалось привести к типу параметра
+_MISSING = object()
+
+
+class ActionValidationError(ValueError):
+    """Шаг плана не соответствует схеме действия"""
+
+
+def normalize_name(name: Any) -> str:
+    """getProject, get-project, " Get_Project " -> get_project"""
+    text = CAMEL_CASE_PATTERN.sub(r"_\1", str(name).strip())
+    return SEPARATOR_PATTERN.sub("_", text).lower()
+
+
+def singular_key(name: str) -> str:
+    """get_tasks_by_board_name -> get_task_by_board_name: имя без множественного числа слов"""
+    return "_".join(
+        token[:-1] if len(token) > 3 and token.endswith("s") else token
+        for token in name.split("_")
+    )
+
+
+def _coercible_type(annotation: Any) -> Optional[type]:
+    """Тип для приведения значения из плана (Optional[int] -> int) или None"""
+    if typing.get_origin(annotation) is typing.Union:
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        if len(args) != 1:
+            return None
+        annotation = args[0]
+    origin = typing.get_origin(annotation) or annotation
+    if origin in (int, float, str, bool, list, dict):
+        return origin
+    return None
+
+
+@dataclass(frozen=True)
+class ParamSpec:
+    """Параметр действия; kind=None - значение передается без приведения"""
+    name: str
+    kind: Optional[type]
+    required: bool
+
+
+@dataclass(frozen=True)
+class ActionSpec:
+    """Схема действия агента, построенная по сигнатуре метода"""
+    agent: str
+    name: str
+    params: Dict[str, ParamSpec]
+    func: Optional[Callable[..., Any]] = None
+
+    @classmethod
+    def from_callable(cls, agent: str, name: str, func: Callable[..., Any]) -> "ActionSpec":
+        params = {}
+        for param in inspect.signature(func).parameters.values():
+            # **kwargs и *args из плана не заполняются, как и раньше
+            if param.name == "self" or param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD):
+                continue
+            params[param.name] = ParamSpec(
+                name=param.name,
+                kind=_coercible_type(param.annotation),
+                required=param.default is param.empty
+            )
+        return cls(agent=agent, name=name, params=params, func=func)
+
+    def bind(self, params: Mapping[str, Any]) -> Dict[str, Any]:
+        """
+        Аргументы вызова из параметров шага
+
+        Лишние параметры (контекст, entities) отбрасываются, значения
+        приводятся к типам из аннотаций.
+
+        Raises:
+            ActionValidationError: не хватает обязательного параметра или значение не приводится к типу
+        """
+        kwargs = {
+            name: self._coerce(spec, params[name])
+            for name, spec in self.params.items()
+            if name in params
+        }
+        missing = [name for name, spec in self.params.items() if spec.required and name not in kwargs]
+        if missing:
+            raise ActionValidationError(
+                f"{self.agent}.{self.name}: не указаны параметры {', '.join(missing)}"
+            )
+        return kwargs
+
+    def _coerce(self, spec: ParamSpec, value: Any) -> Any:
+        kind = spec.kind
+        if value is None or kind is None:
+            return value
+        # bool - подкласс int, но True вместо ID задачи - ошибка модели
+        if isinstance(value, kind) and not (kind is not bool and isinstance(value, bool)):
+            return value
+
+        coerced = _MISSING
+        if kind is int:
+            if isinstance(value, str) and INTEGER_PATTERN.match(value.strip()):
+                coerced = int(INTEGER_PATTERN.match(value.strip()).group(1))
+            elif isinstance(value, float) and value.is_integer():
+                coerced = int(value)
+        elif kind is float:
+            if isinstance(value, int) and not isinstance(value, bool):
+                coerced = float(value)
+            elif isinstance(value, str):
+                try:
+                    coerced = float(value.strip().replace(",", "."))
+                except ValueError:
+                    pass
+        elif kind is str:
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                coerced = str(value)
+        elif kind is bool:
+            if isinstance(value, str) and value.strip().lower() in TRUE_VALUES | FALSE_VALUES:
+                coerced = value.strip().lower() in TRUE_VALUES
+        elif kind is list:
+            if not isinstance(value, dict):
+                coerced = [value]
+
+        if coerced is _MISSING:
+            raise ActionValidationError(
+                f"{self.agent}.{self.name}: параметр {spec.name}={value!r}, ожидается {kind.__name__}"
+            )
+        PLAN_REPAIRS.inc(kind="coerce")
+        return coerced
+
+
+class ActionRegistry:
+    """
+    Действия, доступные шагам плана, по агентам
+
+    Строится один раз по классам агентов: публичные методы, кроме методов
+    BaseAgent (process, call_api, ...) и INTERNAL_ACTIONS. План проверяется
+    до выполнения: написание имен действий и опечатки в параметрах
+    исправляются по реестру, а неизвестное действие отклоняет план без
+    обращения к модели.
+    """
+
+    def __init__(self, agent_classes: Mapping[str, type]):
+        self._actions: Dict[str, Dict[str, ActionSpec]] = {
+            agent: {
+                name: ActionSpec.from_callable(agent, name, func)
+                for name, func in inspect.getmembers(agent_class, inspect.isfunction)
+                if not name.startswith("_") and not hasattr(BaseAgent, name) and name not in INTERNAL_ACTIONS
+            }
+            for agent, agent_class in agent_classes.items()
+        }
+
+    def get(self, agent: str, action: str) -> Optional[ActionSpec]:
+        """Схема действия или None, если действия нет в реестре"""
+        return self._actions.get(agent, {}).get(action)
+
+    def actions(self, agent: str) -> List[str]:
+        """Имена действий агента"""
+        return sorted(self._actions.get(agent, {}))
+
+    def spec_for(self, spec: ActionSpec, method: Callable[..., Any]) -> ActionSpec:
+        """Схема для вызова: метод, подмененный на экземпляре, проверяется по своей сигнатуре"""
+        if getattr(method, "__func__", None) is spec.func:
+            return spec
+        return ActionSpec.from_callable(spec.agent, spec.name, method)
+
+    def repair_plan(self, plan: List[Dict[str, Any]]) -> List[str]:
+        """
+        Исправить шаги плана на месте
+
+        Returns:
+            Ошибки шагов, которые исправить не удалось (пусто - план можно выполнять)
+        """
+        errors = []
+        for i, step in enumerate(plan):
+            error = self._repair_step(step)
+            if error:
+                PLAN_REPAIRS.inc(kind="rejected")
+                errors.append(f"Шаг {i + 1}: {error}")
+        return errors
+
+    def _repair_step(self, step: Dict[str, Any]) -> Optional[str]:
+        if not isinstance(step, dict):
+            return "шаг должен быть объектом"
+        agent = str(step.get("agent") or "").strip()
+        action = str(step.get("action") or "")
+        # "ADM.get_project" в поле action
+        if "." in action:
+            prefix, action = action.rsplit(".", 1)
+            agent = agent or prefix.strip()
+        if agent not in self._actions and agent.upper() in self._actions:
+            agent = agent.upper()
+        if agent not in self._actions:
+            return f"неизвестный агент {agent or '(не указан)'}"
+
+        resolved = self._resolve_action(agent, action)
+        if resolved is None:
+            return f"неизвестное действие {agent}.{action}"
+        if resolved != (step.get("agent"), step.get("action")):
+            kind = "agent" if resolved[0] != agent else "action"
+            PLAN_REPAIRS.inc(kind=kind)
+            logger.warning(
+                f"Шаг {step.get('agent')}.{step.get('action')} исправлен на {resolved[0]}.{resolved[1]}"
+            )
+            step["agent"], step["action"] = resolved
+
+        params = step.get("params")
+        if params is None:
+            params = step["params"] = {}
+        if not isinstance(params, dict):
+            return f"параметры {resolved[0]}.{resolved[1]} должны быть объектом"
+        self._repair_params(self._actions[resolved[0]][resolved[1]], params)
+        return None
+
+    def _resolve_action(self, agent: str, action: str) -> Optional[Tuple[str, str]]:
+        """
+        (агент, действие) из реестра для имени из плана или None
+
+        Исправляются только регистр, разделители и единственное/множественное
+        число слов. Похожие по написанию имена не подставляются: read_project
+        или delete_project не должны превратиться в create_project/get_project.
+        """
+        actions = self._actions[agent]
+        if action in actions:
+            return agent, action
+        name = normalize_name(action)
+        if name in actions:
+            return agent, name
+        # Действие указано не тому агенту: переносим, если оно есть ровно у одного
+        owners = [other for other, other_actions in self._actions.items() if name in other_actions]
+        if len(owners) == 1:
+            return owners[0], name
+        key = singular_key(name)
+        matches = [candidate for candidate in actions if singular_key(candidate) == key]
+        if len(matches) == 1:
+            return agent, matches[0]
+        return None
+
+    def _repair_params(self, spec: ActionSpec, params: Dict[str, Any]) -> None:
+        """Переименовать параметры с опечатками (projectId -> project_id) на месте"""
+        for key in list(params):
+            if key in spec.params:
+                continue
+            free = [name for name in spec.params if name not in params]
+            name = normalize_name(key)
+            target = name if name in free else next(
+                iter(difflib.get_close_matches(name, free, n=1, cutoff=NAME_MATCH_CUTOFF)), None
+            )
+            if target is not None:
+                PLAN_REPAIRS.inc(kind="param")
+                logger.debug(f"Параметр {key} шага {spec.agent}.{spec.name} исправлен на {target}")
+                params[target] = params.pop(key)
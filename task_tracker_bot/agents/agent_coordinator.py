@@ -2,20 +2,116 @@
 Agent Coordinator - координатор всех агентов системы
 """
 
+import re
 import time
+import asyncio
+import functools
 import logging
+import threading
+import contextvars
 import sys
 import os
-from typing import Dict, Any, Optional
-from .orchestrator import OrchestratorAgent
+from datetime import date, timedelta
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, Any, List, Optional, Set
+from .orchestrator import OrchestratorAgent, ProgressCallback
 from .task_manager import TaskManagerAgent
 from .control_manager import ControlManagerAgent
 from .data_manager import DataManagerAgent
 from .analyze_manager import AnalyzeManagerAgent
+from .intent_router import IntentRouter
+from .action_registry import ActionRegistry, ActionValidationError
+from .circuit_breaker import CircuitOpenError, io_net_breaker
+from .cassette import io_net_cassette
+from .request_cache import RequestCache, current_request_cache, prefetch, run_in_request_scope
 
 # Добавляем путь к корню проекта для импорта
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 from database import Database
+from config import Config
+from services.container import ServiceContainer, container
+from utils.metrics import metrics
+
+# Ссылка на значение из контекста в параметрах шага: "$project_id"
+CONTEXT_REF_PATTERN = re.compile(r"^\$(\w+)$")
+
+# Признаки в сообщении для упреждающей загрузки данных, пока думает оркестратор
+PREFETCH_PROJECT_ID_PATTERN = re.compile(r"\b\d{4,5}\b")
+PREFETCH_NEW_PROJECT_PATTERN = re.compile(r"id\+|(?:созда|заведи|нов)\w*\s+(?:\w+\s+)?проект", re.IGNORECASE)
+PREFETCH_DATE_PATTERN = re.compile(r"\b(сегодня|послезавтра|завтра)\b", re.IGNORECASE)
+PREFETCH_DAY_OFFSETS = {"сегодня": 0, "завтра": 1, "послезавтра": 2}
+
+# Интенты, результат которых проверяет ACM
+VALIDATED_INTENTS = ("create_project", "close_task", "update_task")
+
+# Параметры, по которым шаги ссылаются на одну сущность
+ENTITY_KEYS = ("project_id", "task_id", "board_name", "column_id")
+# Действия только для чтения; остальные действия изменяют сущности
+READ_ACTION_PREFIXES = ("get_", "list_", "find_", "analyze_")
+
+PLAN_LENGTH = metrics.histogram(
+    "coordinator_plan_steps", "Число шагов в плане", ["source"], buckets=(0, 1, 2, 3, 5, 8, 13)
+)
+STEP_LATENCY = metrics.histogram(
+    "coordinator_step_latency_seconds", "Время выполнения шага плана", ["step", "status"]
+)
+REQUEST_CACHE = metrics.counter(
+    "coordinator_request_cache_total", "Чтения ADM через кэш запроса", ["result"]
+)
+REQUEST_LATENCY = metrics.histogram(
+    "coordinator_request_latency_seconds", "Полное время обработки сообщения", ["status"]
+)
+
+# Ответ, когда io.net недоступен, а запрос не разобран правилами
+DEGRADED_MESSAGE = (
+    "⚠️ AI-сервис временно недоступен, попробуйте через минуту.\n\n"
+    "Сейчас работают типовые запросы:\n"
+    "• список дел: «на завтра:» и нумерованные пункты\n"
+    "• «закрой задачу #12»\n"
+    "• «покажи задачи на завтра»\n"
+    "• «добавь ссылку Figma к проекту 5005 https://...»\n\n"
+    "Остальные действия доступны через /menu"
+)
+
+# Действия шагов плана: строится один раз при импорте по классам агентов
+action_registry = ActionRegistry({
+    "ADM": DataManagerAgent,
+    "ATM": TaskManagerAgent,
+    "ACM": ControlManagerAgent,
+    "AAM": AnalyzeManagerAgent
+})
+
+
+class LazyAgents(dict):
+    """
+    Словарь агентов, создаваемых при первом обращении
+
+    Разбор запроса правилами обходится без оркестратора, а простые планы -
+    без ACM и AAM, поэтому агенты не создаются заранее. Явно записанный
+    агент (agents["ADM"] = ...) заменяет фабрику.
+    """
+
+    def __init__(self, factories: Dict[str, Callable[[], Any]]):
+        super().__init__()
+        self._factories = factories
+        # RLock: фабрики ATM/ACM/AAM обращаются к ADM
+        self._lock = threading.RLock()
+
+    def __missing__(self, name: str) -> Any:
+        factory = self._factories.get(name)
+        if factory is None:
+            raise KeyError(name)
+        with self._lock:
+            if not dict.__contains__(self, name):
+                dict.__setitem__(self, name, factory())
+            return dict.__getitem__(self, name)
+
+    def __contains__(self, name: object) -> bool:
+        return dict.__contains__(self, name) or name in self._factories
+
+    def created(self) -> List[str]:
+        """Имена уже созданных агентов"""
+        return list(self.keys())
 
 
 class AgentCoordinator:
@@ -23,7 +119,7 @@ class AgentCoordinator:
     
     def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None, db: Optional[Database] = None):
         """
-        Инициализация координатора и всех агентов
+        Инициализация координатора (агенты создаются при первом обращении)
         
         Args:
             api_key: API ключ io.net
@@ -32,28 +128,62 @@ class AgentCoordinator:
         """
         self.logger = logging.getLogger(self.__class__.__name__)
         
-        # Инициализация БД
-        self.db = db or Database()
-        
-        # Инициализация ADM (Data Manager) - первый, так как другие зависят от него
-        self.adm = DataManagerAgent(api_key=api_key, model=model, db=self.db)
-        
-        # Инициализация остальных агентов
-        self.orchestrator = OrchestratorAgent(api_key=api_key, model=model)
-        self.atm = TaskManagerAgent(api_key=api_key, model=model, data_manager=self.adm)
-        self.acm = ControlManagerAgent(api_key=api_key, model=model, data_manager=self.adm)
-        self.aam = AnalyzeManagerAgent(api_key=api_key, model=model, data_manager=self.adm)
-        
-        # Словарь агентов для удобного доступа
-        self.agents = {
-            "ADM": self.adm,
-            "ATM": self.atm,
-            "ACM": self.acm,
-            "AAM": self.aam,
-            "Orchestrator": self.orchestrator
-        }
+        # Репозитории и сервисы: общий контейнер процесса или отдельный для своей БД
+        self.services = container if db is None else ServiceContainer(db)
+        self.db = self.services.db
         
-        self.logger.info("AgentCoordinator инициализирован со всеми агентами")
+        # Разбор типовых запросов по правилам, до обращения к оркестратору.
+        # Роутер создается всегда: при недоступном io.net он остается единственным путем
+        self.intent_router = IntentRouter(
+            name_resolver=self.services.name_resolver, task_repo=self.services.task_repo
+        )
+        self.action_registry = action_registry
+        
+        # Агенты создаются при первом обращении; ADM общий для ATM/ACM/AAM
+        self.agents = LazyAgents({
+            "ADM": lambda: DataManagerAgent(api_key=api_key, model=model, services=self.services),
+            "ATM": lambda: TaskManagerAgent(api_key=api_key, model=model, data_manager=self.adm),
+            "ACM": lambda: ControlManagerAgent(api_key=api_key, model=model, data_manager=self.adm),
+            "AAM": lambda: AnalyzeManagerAgent(api_key=api_key, model=model, data_manager=self.adm),
+            "Orchestrator": lambda: OrchestratorAgent(
+                api_key=api_key, model=model, db=self.db, plan_validator=self.action_registry.repair_plan
+            )
+        })
+        
+        # Пул для параллельного выполнения независимых шагов плана
+        self._step_executor = ThreadPoolExecutor(
+            max_workers=Config.PLAN_MAX_PARALLEL_STEPS,
+            thread_name_prefix="plan-step"
+        )
+        # Упреждающие чтения идут в своем пуле, чтобы не занимать потоки шагов планов;
+        # число ожидающих чтений ограничено, лишние при нагрузке пропускаются
+        self._prefetch_executor = ThreadPoolExecutor(
+            max_workers=Config.PREFETCH_MAX_WORKERS,
+            thread_name_prefix="prefetch"
+        )
+        self._prefetch_slots = threading.BoundedSemaphore(Config.PREFETCH_MAX_PENDING)
+        
+        self.logger.info("AgentCoordinator инициализирован (агенты создаются по требованию)")
+    
+    @property
+    def adm(self) -> DataManagerAgent:
+        return self.agents["ADM"]
+    
+    @property
+    def atm(self) -> TaskManagerAgent:
+        return self.agents["ATM"]
+    
+    @property
+    def acm(self) -> ControlManagerAgent:
+        return self.agents["ACM"]
+    
+    @property
+    def aam(self) -> AnalyzeManagerAgent:
+        return self.agents["AAM"]
+    
+    @property
+    def orchestrator(self) -> OrchestratorAgent:
+        return self.agents["Orchestrator"]
     
     def process_user_message(
         self,
@@ -74,278 +204,720 @@ class AgentCoordinator:
         """
         overall_start_time = time.time()
         try:
-            self.logger.info(
-                f"Обработка сообщения пользователя: workspace_id={workspace_id}, "
-                f"user_id={user_id}, message='{user_message[:100]}...'"
-            )
-            
-            # Проверка наличия дат в запросе
-            date_keywords = ["сегодня", "завтра", "послезавтра", "вчера"]
-            has_date = any(keyword in user_message.lower() for keyword in date_keywords)
-            if has_date:
-                self.logger.debug(f"Обнаружены ключевые слова дат в запросе: {user_message}")
+            self._log_incoming_message(user_message, workspace_id, user_id)
+            io_net_cassette.record_message(user_message)
             
             # Шаг 1: Оркестратор анализирует запрос и составляет план
+            # (параллельно данные, которые вероятно понадобятся плану, читаются в кэш запроса)
+            request_cache = RequestCache()
             analysis_start_time = time.time()
-            analysis_result = self.orchestrator.analyze_request(user_message)
+            analysis_result = self._route_fast_path(user_message, workspace_id)
+            if analysis_result is None:
+                prefetches = self._speculative_prefetch(user_message, workspace_id, user_id, request_cache)
+                try:
+                    analysis_result = self.orchestrator.analyze_request(user_message)
+                finally:
+                    self._cancel_prefetch(prefetches)
             analysis_time = (time.time() - analysis_start_time) * 1000
             self.logger.info(f"Анализ запроса выполнен за {analysis_time:.2f}ms")
             
-            # Извлечение плана из результата
-            if isinstance(analysis_result, dict):
-                plan = analysis_result.get("plan", [])
-                intent = analysis_result.get("intent", "unknown")
-                entities = analysis_result.get("entities", {})
-                
-                # Логирование результата анализа для отладки
-                self.logger.debug(f"Результат анализа: intent={intent}, plan_length={len(plan) if plan else 0}")
-                if not plan:
-                    self.logger.warning(f"План пуст! Результат анализа: {str(analysis_result)[:500]}")
-                
-                # Логирование извлеченных дат из entities
-                if "date" in entities or "default_date" in entities:
-                    extracted_date = entities.get("date") or entities.get("default_date")
-                    self.logger.info(f"Извлечена дата из запроса: {extracted_date}")
-            else:
-                # Если результат не JSON, пытаемся создать простой план
-                plan = []
-                intent = "unknown"
-                entities = {}
-                self.logger.warning(f"Оркестратор вернул не-JSON результат: {type(analysis_result)}. Содержимое: {str(analysis_result)[:500]}")
-            
-            if not plan:
-                return {
-                    "status": "error",
-                    "message": "Не удалось составить план выполнения. Попробуйте переформулировать запрос.",
-                    "raw_response": str(analysis_result)
-                }
+            return run_in_request_scope(
+                request_cache, self._execute_analysis,
+                analysis_result, analysis_time, workspace_id, user_id, overall_start_time
+            )
+        except CircuitOpenError as e:
+            return self._degraded_response(e)
+        except Exception as e:
+            self.logger.error(f"Критическая ошибка при обработке сообщения: {e}", exc_info=True)
+            return {
+                "status": "error",
+                "message": f"Произошла ошибка при обработке запроса: {str(e)}"
+            }
+    
+    async def process_user_message_async(
+        self,
+        user_message: str,
+        workspace_id: int,
+        user_id: Optional[int] = None,
+        executor: Optional[Executor] = None,
+        on_progress: Optional[ProgressCallback] = None
+    ) -> Dict[str, Any]:
+        """
+        Асинхронный вариант process_user_message для обработчиков Telegram
+        
+        Анализ запроса идет через асинхронный клиент, а шаги плана
+        (синхронные методы агентов и БД) выполняются в отдельном потоке,
+        поэтому event loop бота не блокируется. Если передан on_progress,
+        ответ модели читается потоком и этапы анализа сообщаются по ходу.
+        
+        Args:
+            user_message: Сообщение пользователя
+            workspace_id: ID пространства
+            user_id: ID пользователя (опционально)
+            executor: Пул потоков для шагов плана (по умолчанию пул asyncio)
+            on_progress: Вызывается с текстом текущего этапа обработки
             
-            # Шаг 2: Выполнение плана
-            execution_results = []
-            context = {"workspace_id": workspace_id, "user_id": user_id, "entities": entities}
+        Returns:
+            Результат обработки с ответом для пользователя
+        """
+        overall_start_time = time.time()
+        try:
+            self._log_incoming_message(user_message, workspace_id, user_id)
+            io_net_cassette.record_message(user_message)
             
-            for step in plan:
-                agent_name = step.get("agent", "")
-                action = step.get("action", "")
-                params = step.get("params", {})
-                
-                # Добавление контекста к параметрам (только workspace_id и user_id)
-                # Остальные параметры передаются только если указаны в плане
-                if "workspace_id" not in params:
-                    params["workspace_id"] = context.get("workspace_id")
-                if "user_id" not in params and context.get("user_id"):
-                    params["user_id"] = context.get("user_id")
-                # entities передаются только если нужны
-                if "entities" in context and "entities" not in params:
-                    params["entities"] = context.get("entities")
-                
-                step_start_time = time.time()
-                self.logger.info(f"Выполнение шага: {agent_name}.{action}")
-                
+            request_cache = RequestCache()
+            analysis_start_time = time.time()
+            analysis_result = self._route_fast_path(user_message, workspace_id)
+            if analysis_result is None:
+                prefetches = self._speculative_prefetch(user_message, workspace_id, user_id, request_cache)
                 try:
-                    if agent_name not in self.agents:
-                        step_time = (time.time() - step_start_time) * 1000
-                        execution_results.append({
-                            "step": step,
-                            "status": "error",
-                            "message": f"Агент {agent_name} не найден",
-                            "execution_time_ms": step_time,
-                            "agent_name": agent_name,
-                            "action": action
-                        })
-                        continue
-                    
-                    agent = self.agents[agent_name]
-                    
-                    # Выполнение действия
-                    if hasattr(agent, action):
-                        method = getattr(agent, action)
-                        # Получаем сигнатуру метода и фильтруем параметры
-                        import inspect
-                        sig = inspect.signature(method)
-                        method_params = {k: v for k, v in params.items() if k in sig.parameters}
-                        result = method(**method_params)
+                    if on_progress is not None and Config.IO_NET_STREAMING:
+                        analysis_result = await self.orchestrator.analyze_request_stream(user_message, on_progress)
                     else:
-                        # Если метод не найден, используем process
-                        result = agent.process(f"Выполни действие: {action}", params)
-                    
-                    step_time = (time.time() - step_start_time) * 1000
-                    self.logger.info(
-                        f"Шаг {agent_name}.{action} выполнен за {step_time:.2f}ms"
-                    )
-                    
-                    # Логирование результатов создания задач
-                    if action == "create_todo_batch" and isinstance(result, dict):
-                        data = result.get("data", {})
-                        personal_tasks = data.get("personal_tasks_created", [])
-                        work_tasks = data.get("work_tasks_created", [])
-                        errors = data.get("errors", [])
-                        
-                        self.logger.info(
-                            f"Создано задач через {agent_name}.{action}: "
-                            f"личных={len(personal_tasks)}, рабочих={len(work_tasks)}, ошибок={len(errors)}"
-                        )
-                        
-                        # Логирование деталей созданных задач
-                        if personal_tasks:
-                            for task in personal_tasks[:5]:  # Логируем первые 5
-                                self.logger.debug(
-                                    f"Создана личная задача: id={task.get('id')}, "
-                                    f"title='{task.get('title')}', date={task.get('date')}"
-                                )
-                        
-                        if work_tasks:
-                            for task in work_tasks[:5]:  # Логируем первые 5
-                                self.logger.debug(
-                                    f"Создана рабочая задача: id={task.get('id')}, "
-                                    f"title='{task.get('title')}', project_id={task.get('project_id')}, "
-                                    f"date={task.get('date')}"
-                                )
-                    
-                    execution_results.append({
-                        "step": step,
-                        "status": "success",
-                        "result": result,
-                        "execution_time_ms": step_time,
-                        "agent_name": agent_name,
-                        "action": action
-                    })
-                    
-                    # Обновление контекста для следующих шагов
-                    if isinstance(result, dict) and "data" in result:
-                        context.update(result["data"])
-                    
-                except Exception as e:
-                    step_time = (time.time() - step_start_time) * 1000
-                    self.logger.error(
-                        f"Ошибка при выполнении шага {agent_name}.{action} "
-                        f"(время: {step_time:.2f}ms): {e}"
-                    )
-                    execution_results.append({
-                        "step": step,
-                        "status": "error",
-                        "message": str(e),
-                        "execution_time_ms": step_time,
-                        "agent_name": agent_name,
-                        "action": action
-                    })
-                    # Прерываем выполнение при критической ошибке
-                    break
-            
-            # Шаг 3: Проверка корректности через ACM (если были изменения)
-            validation_result = None
-            if intent in ["create_project", "close_task", "update_task"]:
-                validation_start_time = time.time()
-                try:
-                    # Определяем entity_id из результатов выполнения
-                    entity_id = None
-                    for result in execution_results:
-                        if result.get("status") == "success":
-                            result_data = result.get("result", {})
-                            if isinstance(result_data, dict):
-                                data = result_data.get("data", {})
-                                entity_id = data.get("id") or data.get("project_id") or data.get("task_id")
-                                if entity_id:
-                                    break
-                    
-                    if entity_id:
-                        validation_result = self.acm.validate_changes(
-                            operation_type=intent,
-                            entity_id=str(entity_id),
-                            context=context
-                        )
-                    validation_time = (time.time() - validation_start_time) * 1000
-                    self.logger.info(f"Валидация выполнена за {validation_time:.2f}ms")
-                except Exception as e:
-                    validation_time = (time.time() - validation_start_time) * 1000
-                    self.logger.warning(f"Ошибка при валидации (время: {validation_time:.2f}ms): {e}")
-            
-            # Шаг 4: Формирование ответа пользователю
-            success_count = sum(1 for r in execution_results if r.get("status") == "success")
-            error_count = sum(1 for r in execution_results if r.get("status") == "error")
-            
-            # Извлечение сообщений из результатов
-            messages = []
-            created_tasks_summary = {"personal": 0, "work": 0}
+                        analysis_result = await self.orchestrator.analyze_request_async(user_message)
+                finally:
+                    self._cancel_prefetch(prefetches)
+            analysis_time = (time.time() - analysis_start_time) * 1000
+            self.logger.info(f"Анализ запроса выполнен за {analysis_time:.2f}ms")
             
-            for result in execution_results:
-                if result.get("status") == "success":
-                    result_data = result.get("result", {})
-                    if isinstance(result_data, dict):
-                        msg = result_data.get("message", "")
-                        if msg:
-                            messages.append(msg)
-                        
-                        # Подсчет созданных задач
-                        data = result_data.get("data", {})
-                        if "personal_tasks_created" in data:
-                            created_tasks_summary["personal"] += len(data["personal_tasks_created"])
-                        if "work_tasks_created" in data:
-                            created_tasks_summary["work"] += len(data["work_tasks_created"])
+            if on_progress is not None and isinstance(analysis_result, dict) and analysis_result.get("plan"):
+                await on_progress("⚙️ Выполняю план...")
             
-            # Логирование итогового количества созданных задач
-            if created_tasks_summary["personal"] > 0 or created_tasks_summary["work"] > 0:
-                self.logger.info(
-                    f"Итого создано задач: личных={created_tasks_summary['personal']}, "
-                    f"рабочих={created_tasks_summary['work']}"
+            return await asyncio.get_running_loop().run_in_executor(
+                executor,
+                functools.partial(
+                    run_in_request_scope, request_cache, self._execute_analysis,
+                    analysis_result, analysis_time, workspace_id, user_id, overall_start_time
                 )
+            )
+        except CircuitOpenError as e:
+            return self._degraded_response(e)
+        except Exception as e:
+            self.logger.error(f"Критическая ошибка при обработке сообщения: {e}", exc_info=True)
+            return {
+                "status": "error",
+                "message": f"Произошла ошибка при обработке запроса: {str(e)}"
+            }
+    
+    def _route_fast_path(self, user_message: str, workspace_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        План по правилам IntentRouter или None, если нужен оркестратор
+        
+        При разомкнутой цепи io.net правила применяются, даже если
+        быстрый путь выключен в конфигурации.
+        """
+        if not Config.INTENT_FAST_PATH and not io_net_breaker.is_open():
+            return None
+        return self.intent_router.route(user_message, workspace_id=workspace_id)
+    
+    def _degraded_response(self, error: CircuitOpenError) -> Dict[str, Any]:
+        """Ответ в деградированном режиме: io.net недоступен"""
+        self.logger.warning(f"Деградированный режим, запрос не отправлен в API: {error}")
+        return {
+            "status": "error",
+            "degraded": True,
+            "message": DEGRADED_MESSAGE
+        }
+    
+    def get_fast_path_stats(self) -> Dict[str, Any]:
+        """Статистика покрытия запросов быстрым путем"""
+        return {"enabled": Config.INTENT_FAST_PATH, **self.intent_router.get_stats()}
+    
+    def get_circuit_stats(self) -> Dict[str, Any]:
+        """Состояние размыкателя цепи io.net"""
+        return io_net_breaker.get_stats()
+    
+    def _speculative_prefetch(
+        self,
+        user_message: str,
+        workspace_id: int,
+        user_id: Optional[int],
+        request_cache: RequestCache
+    ) -> List[Future]:
+        """
+        Запустить чтения ADM, которые вероятно понадобятся плану
+        
+        Признаки берутся из текста сообщения (номера проектов, названия
+        досок, слова-даты). Загрузка идет в отдельном небольшом пуле, пока
+        оркестратор составляет план; ошибки не влияют на обработку запроса.
+        Если пул уже занят PREFETCH_MAX_PENDING чтениями, остальные чтения
+        не ставятся - план прочитает эти данные сам.
+        """
+        if not Config.SPECULATIVE_PREFETCH:
+            return []
+        
+        adm = self.adm
+        project_ids = list(dict.fromkeys(PREFETCH_PROJECT_ID_PATTERN.findall(user_message)))
+        calls = [(self._prefetch_board_tasks, {
+            "user_message": user_message, "workspace_id": workspace_id, "project_ids": project_ids
+        })]
+        for project_id in project_ids:
+            calls.append((adm.get_project, {"project_id": project_id}))
+            calls.append((adm.get_project_boards, {"project_id": project_id}))
+        if PREFETCH_NEW_PROJECT_PATTERN.search(user_message):
+            calls.append((adm.get_next_project_id, {"workspace_id": workspace_id}))
+        if user_id is not None:
+            for word in dict.fromkeys(w.lower() for w in PREFETCH_DATE_PATTERN.findall(user_message)):
+                target_date = date.today() + timedelta(days=PREFETCH_DAY_OFFSETS[word])
+                calls.append((adm.get_personal_tasks_by_date, {
+                    "user_id": user_id, "target_date": target_date.isoformat()
+                }))
+        
+        slots = self._prefetch_slots
+        futures: List[Future] = []
+        for func, kwargs in calls:
+            if not slots.acquire(blocking=False):
+                break
+            future = self._prefetch_executor.submit(prefetch, request_cache, func, **kwargs)
+            # Слот освобождается и после выполнения, и после отмены
+            future.add_done_callback(lambda _: slots.release())
+            futures.append(future)
+        skipped = len(calls) - len(futures)
+        self.logger.debug(
+            f"Упреждающая загрузка: {len(futures)} чтений"
+            + (f", пропущено при занятом пуле: {skipped}" if skipped else "")
+        )
+        return futures
+    
+    def _cancel_prefetch(self, futures: List[Future]) -> None:
+        """План известен - отменить упреждающие чтения, которые еще не начались"""
+        cancelled = sum(1 for future in futures if future.cancel())
+        if cancelled:
+            self.logger.debug(f"Отменено упреждающих чтений: {cancelled}")
+    
+    def _prefetch_board_tasks(self, user_message: str, workspace_id: int, project_ids: List[str]) -> None:
+        """Доски пространства и задачи доски, названной в сообщении (с опечатками и в любом падеже)"""
+        self.adm.get_workspace_boards(workspace_id)
+        match = self.adm.name_resolver.find_in_text(workspace_id, user_message, "board")
+        if match is not None:
+            for project_id in project_ids:
+                self.adm.get_tasks_by_board_name(board_name=match.entry.name, project_id=project_id)
+    
+    def _record_request_cache_stats(self) -> Optional[Dict[str, int]]:
+        """Статистика кэша текущего запроса (и учет в метриках)"""
+        request_cache = current_request_cache()
+        if request_cache is None:
+            return None
+        stats = request_cache.get_stats()
+        for result, key in (("hit", "hits"), ("miss", "misses"), ("prefetch", "prefetched"), ("prefetch_hit", "prefetch_hits")):
+            if stats[key]:
+                REQUEST_CACHE.inc(stats[key], result=result)
+        return stats
+    
+    def _validation_entity_id(self, intent: str, execution_results: List[Dict[str, Any]]) -> Optional[str]:
+        """ID сущности для проверки ACM или None, если интент не проверяется"""
+        if intent not in VALIDATED_INTENTS:
+            return None
+        for result in execution_results:
+            if result.get("status") == "success":
+                result_data = result.get("result", {})
+                if isinstance(result_data, dict):
+                    data = result_data.get("data", {})
+                    entity_id = data.get("id") or data.get("project_id") or data.get("task_id")
+                    if entity_id:
+                        return str(entity_id)
+        return None
+    
+    def run_validation(
+        self,
+        operation_type: str,
+        entity_id: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Проверить изменения через ACM
+        
+        Returns:
+            Результат ACM.validate_changes или None при ошибке проверки
+        """
+        validation_start_time = time.time()
+        try:
+            result = self.acm.validate_changes(
+                operation_type=operation_type,
+                entity_id=entity_id,
+                context=context
+            )
+            validation_time = (time.time() - validation_start_time) * 1000
+            self.logger.info(f"Валидация выполнена за {validation_time:.2f}ms")
+            return result
+        except Exception as e:
+            validation_time = (time.time() - validation_start_time) * 1000
+            self.logger.warning(f"Ошибка при валидации (время: {validation_time:.2f}ms): {e}")
+            return None
+    
+    def run_deferred_validation(self, pending: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Выполнить проверку, отложенную до отправки ответа (pending_validation из ответа)"""
+        return self.run_validation(pending["operation_type"], pending["entity_id"], pending.get("context"))
+    
+    def _log_incoming_message(self, user_message: str, workspace_id: int, user_id: Optional[int]) -> None:
+        """Логирование входящего сообщения"""
+        self.logger.info(
+            f"Обработка сообщения пользователя: workspace_id={workspace_id}, "
+            f"user_id={user_id}, message='{user_message[:100]}...'"
+        )
+        
+        # Проверка наличия дат в запросе
+        date_keywords = ["сегодня", "завтра", "послезавтра", "вчера"]
+        has_date = any(keyword in user_message.lower() for keyword in date_keywords)
+        if has_date:
+            self.logger.debug(f"Обнаружены ключевые слова дат в запросе: {user_message}")
+    
+    def _execute_analysis(
+        self,
+        analysis_result: Any,
+        analysis_time: float,
+        workspace_id: int,
+        user_id: Optional[int],
+        overall_start_time: float
+    ) -> Dict[str, Any]:
+        """
+        Выполнить план из результата анализа, провалидировать и собрать ответ
+        
+        Args:
+            analysis_result: Результат OrchestratorAgent.analyze_request
+            analysis_time: Время анализа в мс
+            workspace_id: ID пространства
+            user_id: ID пользователя
+            overall_start_time: Время начала обработки сообщения
             
-            # Формирование итогового сообщения
-            if error_count == 0:
-                status = "success"
-                message = "\n".join(messages) if messages else "Операция выполнена успешно"
-            else:
-                status = "partial_success" if success_count > 0 else "error"
-                error_messages = [
-                    r.get("message", "Неизвестная ошибка")
-                    for r in execution_results
-                    if r.get("status") == "error"
-                ]
-                message = "Выполнено с ошибками:\n" + "\n".join(error_messages)
+        Returns:
+            Результат обработки с ответом для пользователя
+        """
+        # Извлечение плана из результата
+        if isinstance(analysis_result, dict):
+            plan = analysis_result.get("plan", [])
+            intent = analysis_result.get("intent", "unknown")
+            entities = analysis_result.get("entities", {})
             
-            overall_time = (time.time() - overall_start_time) * 1000
+            # Логирование результата анализа для отладки
+            self.logger.debug(f"Результат анализа: intent={intent}, plan_length={len(plan) if plan else 0}")
+            if not plan:
+                self.logger.warning(f"План пуст! Результат анализа: {str(analysis_result)[:500]}")
             
-            # Вычисляем общее время выполнения шагов
-            total_steps_time = sum(
-                r.get("execution_time_ms", 0) for r in execution_results
+            # Логирование извлеченных дат из entities
+            if "date" in entities or "default_date" in entities:
+                extracted_date = entities.get("date") or entities.get("default_date")
+                self.logger.info(f"Извлечена дата из запроса: {extracted_date}")
+        else:
+            # Если результат не JSON, пытаемся создать простой план
+            plan = []
+            intent = "unknown"
+            entities = {}
+            self.logger.warning(f"Оркестратор вернул не-JSON результат: {type(analysis_result)}. Содержимое: {str(analysis_result)[:500]}")
+        
+        fast_path = bool(analysis_result.get("fast_path")) if isinstance(analysis_result, dict) else False
+        PLAN_LENGTH.observe(len(plan or []), source="fast_path" if fast_path else "orchestrator")
+        
+        if not plan:
+            return {
+                "status": "error",
+                "message": "Не удалось составить план выполнения. Попробуйте переформулировать запрос.",
+                "raw_response": str(analysis_result)
+            }
+        
+        # Проверка плана по реестру действий: опечатки исправляются на месте,
+        # неизвестное действие отклоняет план до выполнения первого шага
+        plan_errors = self.action_registry.repair_plan(plan)
+        if plan_errors:
+            self.logger.warning(f"План отклонен: {'; '.join(plan_errors)}")
+            return {
+                "status": "error",
+                "message": "Не удалось выполнить план:\n" + "\n".join(plan_errors),
+                "intent": intent,
+                "raw_response": str(analysis_result)
+            }
+        
+        # Шаг 2: Выполнение плана (независимые шаги - параллельно)
+        context = {"workspace_id": workspace_id, "user_id": user_id, "entities": entities}
+        steps_start_time = time.time()
+        execution_results = self._execute_plan(plan, context)
+        steps_wall_time = (time.time() - steps_start_time) * 1000
+        
+        # Шаг 3: Проверка корректности через ACM (если были изменения).
+        # По умолчанию проверка откладывается до отправки ответа: вызывающий
+        # код выполняет pending_validation через run_deferred_validation
+        validation_result = None
+        pending_validation = None
+        entity_id = self._validation_entity_id(intent, execution_results)
+        if entity_id:
+            if intent in Config.ACM_SYNC_VALIDATION_INTENTS:
+                validation_result = self.run_validation(intent, entity_id, context)
+            else:
+                pending_validation = {"operation_type": intent, "entity_id": entity_id, "context": context}
+        
+        # Шаг 4: Формирование ответа пользователю
+        success_count = sum(1 for r in execution_results if r.get("status") == "success")
+        error_count = sum(1 for r in execution_results if r.get("status") == "error")
+        
+        # Извлечение сообщений из результатов
+        messages = []
+        created_tasks_summary = {"personal": 0, "work": 0}
+        
+        for result in execution_results:
+            if result.get("status") == "success":
+                result_data = result.get("result", {})
+                if isinstance(result_data, dict):
+                    msg = result_data.get("message", "")
+                    if msg:
+                        messages.append(msg)
+                    
+                    # Подсчет созданных задач
+                    data = result_data.get("data", {})
+                    if "personal_tasks_created" in data:
+                        created_tasks_summary["personal"] += len(data["personal_tasks_created"])
+                    if "work_tasks_created" in data:
+                        created_tasks_summary["work"] += len(data["work_tasks_created"])
+        
+        # Логирование итогового количества созданных задач
+        if created_tasks_summary["personal"] > 0 or created_tasks_summary["work"] > 0:
+            self.logger.info(
+                f"Итого создано задач: личных={created_tasks_summary['personal']}, "
+                f"рабочих={created_tasks_summary['work']}"
             )
+        
+        # Формирование итогового сообщения
+        if error_count == 0:
+            status = "success"
+            message = "\n".join(messages) if messages else "Операция выполнена успешно"
+        else:
+            status = "partial_success" if success_count > 0 else "error"
+            error_messages = [
+                r.get("message", "Неизвестная ошибка")
+                for r in execution_results
+                if r.get("status") == "error"
+            ]
+            message = "Выполнено с ошибками:\n" + "\n".join(error_messages)
+        
+        overall_time = (time.time() - overall_start_time) * 1000
+        REQUEST_LATENCY.observe(overall_time / 1000, status=status)
+        
+        # Вычисляем общее время выполнения шагов
+        total_steps_time = sum(
+            r.get("execution_time_ms", 0) for r in execution_results
+        )
+        
+        self.logger.info(
+            f"Обработка сообщения завершена за {overall_time:.2f}ms "
+            f"(анализ: {analysis_time:.2f}ms, шаги: {total_steps_time:.2f}ms, "
+            f"по часам: {steps_wall_time:.2f}ms)"
+        )
+        
+        response = {
+            "status": status,
+            "message": message,
+            "intent": intent,
+            "execution_results": execution_results,
+            "validation": validation_result,
+            "pending_validation": pending_validation,
+            "metrics": {
+                "total_time_ms": overall_time,
+                "analysis_time_ms": analysis_time,
+                "steps_time_ms": total_steps_time,
+                "steps_wall_time_ms": steps_wall_time,
+                "steps_count": len(execution_results),
+                "fast_path": fast_path,
+                "request_cache": self._record_request_cache_stats()
+            }
+        }
+        
+        # Добавление данных из последнего успешного результата
+        for result in reversed(execution_results):
+            if result.get("status") == "success":
+                result_data = result.get("result", {})
+                if isinstance(result_data, dict) and "data" in result_data:
+                    response["data"] = result_data["data"]
+                    break
+        
+        return response
+    
+    def _plan_dependencies(self, plan: List[Dict[str, Any]]) -> List[Set[int]]:
+        """
+        Построить зависимости шагов плана
+        
+        Зависимости выводятся из шагов:
+        - шаг читает ключ контекста ("$project_id" в params) - ждет все предыдущие шаги;
+        - шаг ACM (проверка) - ждет все предыдущие шаги;
+        - шаг ссылается на ту же сущность (project_id, task_id, ...), что и
+          предыдущий шаг, и хотя бы один из них изменяет ее (не get_*/list_*) -
+          ждет этот шаг, чтобы записи одной сущности шли в порядке плана.
+        К выведенным зависимостям добавляются явные из поля "depends_on"
+        (индексы шагов с 0 или их "id").
+        
+        Returns:
+            Список множеств индексов шагов, от которых зависит каждый шаг
+        """
+        ids = {step.get("id"): i for i, step in enumerate(plan) if step.get("id") is not None}
+        dependencies: List[Set[int]] = []
+        
+        for i, step in enumerate(plan):
+            params = step.get("params") or {}
+            deps: Set[int] = set()
             
-            self.logger.info(
-                f"Обработка сообщения завершена за {overall_time:.2f}ms "
-                f"(анализ: {analysis_time:.2f}ms, шаги: {total_steps_time:.2f}ms)"
+            if "depends_on" in step:
+                raw = step.get("depends_on") or []
+                if not isinstance(raw, list):
+                    raw = [raw]
+                for ref in raw:
+                    index = ids.get(ref, ref)
+                    if isinstance(index, int) and 0 <= index < i:
+                        deps.add(index)
+                    else:
+                        self.logger.warning(f"Шаг {i}: некорректная зависимость {ref!r} проигнорирована")
+            
+            reads_context = any(
+                isinstance(value, str) and CONTEXT_REF_PATTERN.match(value)
+                for value in params.values()
             )
+            if reads_context or step.get("agent") == "ACM":
+                dependencies.append(set(range(i)))
+                continue
             
-            response = {
-                "status": status,
-                "message": message,
-                "intent": intent,
-                "execution_results": execution_results,
-                "validation": validation_result,
-                "metrics": {
-                    "total_time_ms": overall_time,
-                    "analysis_time_ms": analysis_time,
-                    "steps_time_ms": total_steps_time,
-                    "steps_count": len(execution_results)
+            writes = self._is_write_step(step)
+            for j in range(i):
+                earlier = plan[j]
+                if not writes and not self._is_write_step(earlier):
+                    continue
+                earlier_params = earlier.get("params") or {}
+                if any(
+                    key in params and key in earlier_params and params[key] == earlier_params[key]
+                    for key in ENTITY_KEYS
+                ):
+                    deps.add(j)
+            dependencies.append(deps)
+        
+        return dependencies
+    
+    @staticmethod
+    def _is_write_step(step: Dict[str, Any]) -> bool:
+        """Шаг изменяет данные (действие не из READ_ACTION_PREFIXES)"""
+        return not str(step.get("action", "")).startswith(READ_ACTION_PREFIXES)
+    
+    def _execute_plan(self, plan: List[Dict[str, Any]], context: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Выполнить шаги плана с учетом зависимостей
+        
+        Шаг запускается, когда все его зависимости успешно выполнены.
+        После ошибки шага новые шаги не запускаются (уже запущенные
+        завершаются), как и при последовательном выполнении. Данные шагов
+        попадают в контекст в порядке плана, а не завершения: шаги, задающие
+        один ключ, дают одинаковый контекст при каждом запуске.
+        
+        Returns:
+            execution_results в порядке шагов плана
+        """
+        dependencies = self._plan_dependencies(plan)
+        pending = list(range(len(plan)))
+        running: Dict[Future, int] = {}
+        completed: Set[int] = set()
+        results: Dict[int, Dict[str, Any]] = {}
+        merged = 0  # Данные шагов с меньшим индексом уже в контексте
+        stopped = False
+        
+        try:
+            while pending or running:
+                if not stopped:
+                    ready = [i for i in pending if dependencies[i] <= completed]
+                    for i in ready:
+                        pending.remove(i)
+                        params = self._prepare_step_params(plan[i], context)
+                        # Шаг видит кэш запроса: контекст копируется в поток пула
+                        running[self._step_executor.submit(
+                            contextvars.copy_context().run, self._run_step, plan[i], params
+                        )] = i
+                
+                if not running:
+                    if pending and not stopped:
+                        self.logger.error(f"Циклические зависимости в плане, шаги {pending} не выполнены")
+                        for i in pending:
+                            step = plan[i]
+                            results[i] = {
+                                "step": step,
+                                "status": "error",
+                                "message": "Шаг не выполнен: циклические зависимости в плане",
+                                "execution_time_ms": 0,
+                                "agent_name": step.get("agent", ""),
+                                "action": step.get("action", "")
+                            }
+                    break
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i = running.pop(future)
+                    entry = future.result()
+                    fatal = entry.pop("fatal", False)
+                    results[i] = entry
+                    STEP_LATENCY.observe(
+                        entry["execution_time_ms"] / 1000,
+                        step=f"{entry['agent_name']}.{entry['action']}",
+                        status=entry["status"]
+                    )
+                    if entry["status"] == "success":
+                        completed.add(i)
+                    elif fatal:
+                        # Прерываем выполнение при критической ошибке
+                        stopped = True
+                
+                # Обновление контекста для следующих шагов - по порядку плана
+                while merged in results:
+                    if not self._merge_step_data(results[merged], context):
+                        completed.discard(merged)
+                        stopped = True
+                    merged += 1
+        finally:
+            # При исключении не начатые шаги не остаются в пуле
+            for future in running:
+                future.cancel()
+        
+        return [results[i] for i in sorted(results)]
+    
+    def _merge_step_data(self, entry: Dict[str, Any], context: Dict[str, Any]) -> bool:
+        """
+        Добавить данные успешного шага в контекст
+        
+        Списки и прочие данные не словарем в контекст не попадают. Ошибка
+        при слиянии отмечает только этот шаг (как ошибка выполнения шага).
+        
+        Returns:
+            False, если шаг переведен в ошибку
+        """
+        if entry["status"] != "success":
+            return True
+        try:
+            result = entry["result"]
+            if isinstance(result, dict) and isinstance(result.get("data"), dict):
+                context.update(result["data"])
+            return True
+        except Exception as e:
+            self.logger.error(f"Ошибка обновления контекста шагом {entry['agent_name']}.{entry['action']}: {e}")
+            entry.pop("result", None)
+            entry.update(status="error", message=str(e))
+            return False
+    
+    def _prepare_step_params(self, step: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+        """Дополнить параметры шага контекстом и подставить ссылки "$ключ" """
+        params = step.get("params", {})
+        
+        for key, value in params.items():
+            if isinstance(value, str):
+                match = CONTEXT_REF_PATTERN.match(value)
+                if match and match.group(1) in context:
+                    params[key] = context[match.group(1)]
+        
+        # Добавление контекста к параметрам (только workspace_id и user_id)
+        # Остальные параметры передаются только если указаны в плане
+        if "workspace_id" not in params:
+            params["workspace_id"] = context.get("workspace_id")
+        if "user_id" not in params and context.get("user_id"):
+            params["user_id"] = context.get("user_id")
+        # entities передаются только если нужны
+        if "entities" in context and "entities" not in params:
+            params["entities"] = context.get("entities")
+        return params
+    
+    def _run_step(self, step: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Выполнить один шаг плана (вызывается в пуле потоков)
+        
+        Returns:
+            Запись execution_results; "fatal" = True для ошибок, прерывающих план
+        """
+        agent_name = step.get("agent", "")
+        action = step.get("action", "")
+        
+        step_start_time = time.time()
+        self.logger.info(f"Выполнение шага: {agent_name}.{action}")
+        
+        try:
+            if agent_name not in self.agents:
+                step_time = (time.time() - step_start_time) * 1000
+                return {
+                    "step": step,
+                    "status": "error",
+                    "message": f"Агент {agent_name} не найден",
+                    "execution_time_ms": step_time,
+                    "agent_name": agent_name,
+                    "action": action
                 }
-            }
             
-            # Добавление данных из последнего успешного результата
-            for result in reversed(execution_results):
-                if result.get("status") == "success":
-                    result_data = result.get("result", {})
-                    if isinstance(result_data, dict) and "data" in result_data:
-                        response["data"] = result_data["data"]
-                        break
+            agent = self.agents[agent_name]
             
-            return response
+            # Выполнение действия по схеме из реестра (план уже проверен repair_plan)
+            spec = self.action_registry.get(agent_name, action)
+            if spec is None:
+                raise ActionValidationError(f"Неизвестное действие {agent_name}.{action}")
+            method = getattr(agent, action)
+            result = method(**self.action_registry.spec_for(spec, method).bind(params))
             
+            step_time = (time.time() - step_start_time) * 1000
+            self.logger.info(
+                f"Шаг {agent_name}.{action} выполнен за {step_time:.2f}ms"
+            )
+            
+            # Логирование результатов создания задач
+            if action == "create_todo_batch" and isinstance(result, dict):
+                data = result.get("data", {})
+                personal_tasks = data.get("personal_tasks_created", [])
+                work_tasks = data.get("work_tasks_created", [])
+                errors = data.get("errors", [])
+                
+                self.logger.info(
+                    f"Создано задач через {agent_name}.{action}: "
+                    f"личных={len(personal_tasks)}, рабочих={len(work_tasks)}, ошибок={len(errors)}"
+                )
+                
+                # Логирование деталей созданных задач
+                if personal_tasks:
+                    for task in personal_tasks[:5]:  # Логируем первые 5
+                        self.logger.debug(
+                            f"Создана личная задача: id={task.get('id')}, "
+                            f"title='{task.get('title')}', date={task.get('date')}"
+                        )
+                
+                if work_tasks:
+                    for task in work_tasks[:5]:  # Логируем первые 5
+                        self.logger.debug(
+                            f"Создана рабочая задача: id={task.get('id')}, "
+                            f"title='{task.get('title')}', project_id={task.get('project_id')}, "
+                            f"date={task.get('date')}"
+                        )
+            
+            return {
+                "step": step,
+                "status": "success",
+                "result": result,
+                "execution_time_ms": step_time,
+                "agent_name": agent_name,
+                "action": action
+            }
+        
         except Exception as e:
-            self.logger.error(f"Критическая ошибка при обработке сообщения: {e}", exc_info=True)
+            step_time = (time.time() - step_start_time) * 1000
+            self.logger.error(
+                f"Ошибка при выполнении шага {agent_name}.{action} "
+                f"(время: {step_time:.2f}ms): {e}"
+            )
             return {
+                "step": step,
                 "status": "error",
-                "message": f"Произошла ошибка при обработке запроса: {str(e)}"
+                "message": str(e),
+                "execution_time_ms": step_time,
+                "agent_name": agent_name,
+                "action": action,
+                "fatal": True
             }
     
+    def format_validation_warnings(self, validation: Optional[Dict[str, Any]]) -> str:
+        """Блок предупреждений ACM для ответа (пустая строка, если предупреждений нет)"""
+        if not validation or not isinstance(validation, dict):
+            return ""
+        warnings = validation.get("warnings", [])
+        if not warnings:
+            return ""
+        formatted = "\n\n⚠️ Предупреждения:"
+        for warning in warnings:
+            formatted += f"\n• {warning}"
+        return formatted
+    
     def format_response_for_telegram(self, response: Dict[str, Any]) -> str:
         """
         Форматирует ответ для отправки в Telegram
@@ -398,13 +970,7 @@ class AgentCoordinator:
                     formatted += f"\nНазвание: {data['name']}"
         
         # Добавление предупреждений из валидации
-        validation = response.get("validation")
-        if validation and isinstance(validation, dict):
-            warnings = validation.get("warnings", [])
-            if warnings:
-                formatted += "\n\n⚠️ Предупреждения:"
-                for warning in warnings:
-                    formatted += f"\n• {warning}"
+        formatted += self.format_validation_warnings(response.get("validation"))
         
         return formatted
 
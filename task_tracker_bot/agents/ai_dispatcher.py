@@ -0,0 +1,124 @@
+"""
+Диспетчер AI-запросов: ограничение параллелизма и очередь
+"""
+
+import asyncio
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Set
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+PositionCallback = Callable[[int], Awaitable[None]]
+
+
+class UserBusyError(Exception):
+    """У пользователя уже есть запрос в обработке"""
+
+
+class AIDispatcher:
+    """
+    Выполняет AI-запросы с глобальным лимитом и не более одного на пользователя
+    
+    Запросы сверх лимита ждут в FIFO-очереди; при продвижении очереди
+    ожидающим сообщается их новая позиция. Синхронная часть обработки
+    (шаги плана, БД) выполняется в отдельном пуле потоков executor,
+    чтобы не занимать общий пул asyncio.
+    """
+    
+    def __init__(self, max_concurrency: Optional[int] = None, max_workers: Optional[int] = None):
+        self.max_concurrency = max_concurrency or Config.AI_MAX_CONCURRENCY
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or Config.AI_WORKER_THREADS,
+            thread_name_prefix="ai-worker"
+        )
+        self._running = 0
+        self._users: Set[int] = set()
+        self._waiters: Deque[Dict[str, Any]] = deque()
+    
+    def is_busy(self, user_id: int) -> bool:
+        """Есть ли у пользователя запрос в работе или в очереди"""
+        return user_id in self._users
+    
+    async def run(
+        self,
+        user_id: int,
+        job: Callable[[], Awaitable[Any]],
+        on_position: Optional[PositionCallback] = None
+    ) -> Any:
+        """
+        Выполнить job, дождавшись свободного слота
+        
+        Args:
+            user_id: ID пользователя
+            job: Фабрика корутины обработки запроса
+            on_position: Вызывается с позицией в очереди (1 - следующий)
+        
+        Raises:
+            UserBusyError: Если у пользователя уже есть запрос
+        """
+        if user_id in self._users:
+            raise UserBusyError("Предыдущий запрос еще обрабатывается")
+        self._users.add(user_id)
+        
+        try:
+            if self._running >= self.max_concurrency or self._waiters:
+                waiter = {
+                    "future": asyncio.get_running_loop().create_future(),
+                    "on_position": on_position
+                }
+                self._waiters.append(waiter)
+                logger.info(f"AI-запрос user_id={user_id} в очереди, позиция {len(self._waiters)}")
+                await self._notify(waiter, len(self._waiters))
+                try:
+                    await waiter["future"]
+                except asyncio.CancelledError:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+                    elif waiter["future"].done():
+                        # Слот уже был передан этому запросу - возвращаем его
+                        self._release()
+                    raise
+            else:
+                self._running += 1
+            
+            try:
+                return await job()
+            finally:
+                self._release()
+        finally:
+            self._users.discard(user_id)
+    
+    def _release(self) -> None:
+        """Освободить слот: передать его первому в очереди"""
+        if self._waiters:
+            # Слот переходит ожидающему без уменьшения счетчика
+            self._waiters.popleft()["future"].set_result(None)
+            for position, waiter in enumerate(self._waiters, 1):
+                asyncio.get_running_loop().create_task(self._notify(waiter, position))
+        else:
+            self._running -= 1
+    
+    @staticmethod
+    async def _notify(waiter: Dict[str, Any], position: int) -> None:
+        """Сообщить позицию в очереди (ошибки отображения не влияют на очередь)"""
+        if waiter["on_position"] is None:
+            return
+        try:
+            await waiter["on_position"](position)
+        except Exception as e:
+            logger.debug(f"Не удалось обновить позицию в очереди: {e}")
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Текущая загрузка диспетчера"""
+        return {
+            "running": self._running,
+            "queued": len(self._waiters),
+            "max_concurrency": self.max_concurrency
+        }
+    
+    def shutdown(self) -> None:
+        """Остановить пул потоков"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -2,8 +2,22 @@
 AAM (Agent Analyze Manager) - аналитика, отчеты, бизнес-анализ
 """
 
-from typing import Dict, Any, Optional
+import re
+import time
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from .base_agent import BaseAgent
+from config import Config
+
+# Ключевые слова запроса -> метрика (проверяются по порядку)
+QUERY_METRICS = (
+    ("bottlenecks", re.compile(r"узк|горлышк|застр|тормоз|bottleneck", re.IGNORECASE)),
+    ("employee_efficiency", re.compile(r"эффективн|сотрудник|исполнител|кто\s+сколько", re.IGNORECASE)),
+    ("tasks_in_progress", re.compile(r"в\s+работе|wip|незаверш", re.IGNORECASE)),
+)
+
+# Наибольшее число кэшированных метрик (ключ включает параметры из плана, например отдел)
+MAX_CACHE_ENTRIES = 256
 
 
 class AnalyzeManagerAgent(BaseAgent):
@@ -18,6 +32,13 @@ class AnalyzeManagerAgent(BaseAgent):
         """
         super().__init__(api_key, model)
         self.data_manager = data_manager
+        self.cache_ttl = Config.ANALYTICS_CACHE_TTL
+        # (workspace_id, метрика, параметры) -> (результат, время расчета)
+        self._cache: Dict[Tuple, Tuple[Any, float]] = {}
+        self._cache_lock = threading.Lock()
+        # Записи через ADM сбрасывают метрики пространства до истечения TTL
+        if data_manager is not None and hasattr(data_manager, "add_write_listener"):
+            data_manager.add_write_listener(self.invalidate_cache)
     
     def get_system_prompt(self) -> str:
         return """Ты Agent Analyze Manager (AAM) системы PMAssist.
@@ -45,6 +66,10 @@ class AnalyzeManagerAgent(BaseAgent):
         """
         Анализирует запрос пользователя и возвращает метрики/отчет
         
+        Метрика выбирается по ключевым словам запроса и считается в БД,
+        без обращения к модели. Если метрика не распознана, возвращается
+        сводка по всем трем.
+        
         Args:
             query: Запрос пользователя
             workspace_id: ID пространства
@@ -56,54 +81,133 @@ class AnalyzeManagerAgent(BaseAgent):
         if not self.data_manager:
             raise ValueError("DataManager не установлен")
         
-        prompt = f"""Проанализируй следующий запрос пользователя и предоставь метрики:
-
-Запрос: {query}
-Пространство: {workspace_id}
-
-Используй данные из БД через ADM для получения актуальной информации.
-Форматируй ответ в удобном для пользователя виде."""
-        
-        result = self.process(prompt, context)
-        
-        # Здесь можно добавить дополнительную обработку результата
-        # Например, форматирование для графиков, вычисление метрик и т.д.
+        handlers = {
+            "tasks_in_progress": self.get_tasks_in_progress,
+            "employee_efficiency": self.get_employee_efficiency,
+            "bottlenecks": self.find_bottlenecks,
+        }
+        for metric, pattern in QUERY_METRICS:
+            if pattern.search(query or ""):
+                return handlers[metric](workspace_id)
         
-        return result
+        parts = [handler(workspace_id) for handler in handlers.values()]
+        return {
+            "status": "success",
+            "metric": "overview",
+            "message": "\n\n".join(part["message"] for part in parts),
+            "metrics": {part["metric"]: part for part in parts}
+        }
     
     def get_tasks_in_progress(self, workspace_id: int) -> Dict[str, Any]:
-        """Получает количество задач в работе"""
+        """Получает количество задач в работе (WIP по колонкам)"""
         if not self.data_manager:
             raise ValueError("DataManager не установлен")
         
-        # Реальная логика получения задач через ADM
+        columns = self._cached(
+            workspace_id, "wip", lambda: self.data_manager.analytics_repo.get_wip_by_column(workspace_id)
+        )
+        in_progress = sum(column["in_progress"] for column in columns)
+        lines = [f"Задач в работе: {in_progress}"]
+        lines += [
+            f"• {column['board_name']} / {column['column_name']}: {column['open_tasks']}"
+            for column in columns if column["open_tasks"]
+        ]
         return {
+            "status": "success",
             "metric": "tasks_in_progress",
-            "value": 0,
-            "message": "Задач в работе: 0"
+            "value": in_progress,
+            "by_column": columns,
+            "message": "\n".join(lines)
         }
     
     def get_employee_efficiency(self, workspace_id: int, department: Optional[str] = None) -> Dict[str, Any]:
-        """Получает метрики эффективности сотрудников"""
+        """
+        Получает метрики эффективности сотрудников
+        
+        Args:
+            workspace_id: ID пространства
+            department: Название доски отдела (None - все доски)
+        """
         if not self.data_manager:
             raise ValueError("DataManager не установлен")
         
-        # Реальная логика получения метрик через ADM
+        rows = self._cached(
+            workspace_id, "efficiency",
+            lambda: self.data_manager.analytics_repo.get_assignee_completion(workspace_id, department),
+            department
+        )
+        data = [
+            {**row, "completion_rate": round(row["completed"] / row["assigned"], 2) if row["assigned"] else 0.0}
+            for row in rows
+        ]
+        if data:
+            lines = ["Эффективность исполнителей:"]
+            for row in data:
+                line = f"• {row['user_id']}: выполнено {row['completed']} из {row['assigned']} ({row['completion_rate']:.0%})"
+                if row["avg_cycle_hours"] is not None:
+                    line += f", в среднем {row['avg_cycle_hours']:.1f} ч"
+                lines.append(line)
+            message = "\n".join(lines)
+        else:
+            message = "Нет назначенных задач для расчета эффективности"
         return {
+            "status": "success",
             "metric": "employee_efficiency",
-            "data": [],
-            "message": "Метрики эффективности сотрудников"
+            "data": data,
+            "message": message
         }
     
-    def find_bottlenecks(self, workspace_id: int) -> Dict[str, Any]:
-        """Находит узкие места в процессах"""
+    def find_bottlenecks(self, workspace_id: int, limit: int = 3) -> Dict[str, Any]:
+        """Находит узкие места: колонки с самым большим средним возрастом задач"""
         if not self.data_manager:
             raise ValueError("DataManager не установлен")
         
-        # Реальная логика анализа узких мест через ADM
+        bottlenecks = self._cached(
+            workspace_id, "bottlenecks",
+            lambda: self.data_manager.analytics_repo.get_column_age(workspace_id, limit),
+            limit
+        )
+        if bottlenecks:
+            lines = ["Узкие места (средний возраст задач):"]
+            lines += [
+                f"• {row['board_name']} / {row['column_name']}: {row['avg_age_days']:.1f} дн., задач {row['open_tasks']}"
+                for row in bottlenecks
+            ]
+            message = "\n".join(lines)
+        else:
+            message = "Незавершенных задач нет, узких мест не найдено"
         return {
+            "status": "success",
             "metric": "bottlenecks",
-            "bottlenecks": [],
-            "message": "Анализ узких мест"
+            "bottlenecks": bottlenecks,
+            "message": message
         }
-
+    
+    def invalidate_cache(self, workspace_id: Optional[int] = None) -> None:
+        """Сбросить метрики пространства (или все, если workspace_id не указан)"""
+        with self._cache_lock:
+            if workspace_id is None:
+                self._cache.clear()
+            else:
+                for key in [key for key in self._cache if key[0] == workspace_id]:
+                    del self._cache[key]
+    
+    def _cached(self, workspace_id: int, metric: str, compute: Callable[[], List[Dict[str, Any]]], *params) -> Any:
+        """Результат запроса метрики из кэша или из БД (на Config.ANALYTICS_CACHE_TTL секунд)"""
+        key = (workspace_id, metric) + params
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                if time.time() - entry[1] <= self.cache_ttl:
+                    return entry[0]
+                del self._cache[key]
+        value = compute()
+        now = time.time()
+        with self._cache_lock:
+            for expired in [k for k, (_, at) in self._cache.items() if now - at > self.cache_ttl]:
+                del self._cache[expired]
+            # Словарь хранит порядок вставки: вытесняются самые старые метрики
+            while len(self._cache) >= MAX_CACHE_ENTRIES:
+                del self._cache[next(iter(self._cache))]
+            self._cache[key] = (value, now)
+        return value
@@ -5,12 +5,47 @@
 import os
 import json
 import time
+import hashlib
+import asyncio
+import httpx
 import requests
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
 from abc import ABC, abstractmethod
-from functools import wraps
+from functools import lru_cache, wraps
 from config import Config
+from .llm_client import get_session, get_async_client, backoff_delay
+from .single_flight import SingleFlight
+from .prompt_registry import PromptSection, prompt_registry
+from .circuit_breaker import io_net_breaker
+from .cassette import io_net_cassette, response_content
+from .model_router import model_router
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+API_LATENCY = metrics.histogram(
+    "agent_api_latency_seconds", "Время успешного вызова io.net API", ["agent", "mode"]
+)
+API_CALLS = metrics.counter(
+    "agent_api_calls_total", "Вызовы io.net API по итогу (success/error)", ["agent", "outcome"]
+)
+API_RETRIES = metrics.counter("agent_api_retries_total", "Повторные попытки вызова io.net API", ["agent"])
+API_TOKENS = metrics.counter("agent_tokens_total", "Токены по данным usage ответов API", ["agent", "kind"])
+
+
+@lru_cache(maxsize=1)
+def _load_api_key_file() -> Optional[str]:
+    """API ключ из файла tg_aitt_service/io_net_api_key.txt (None, если файла нет)"""
+    key_path = os.path.join(os.path.dirname(__file__), "..", "tg_aitt_service", "io_net_api_key.txt")
+    try:
+        if os.path.exists(key_path):
+            with open(key_path, "r") as f:
+                logger.info("API ключ загружен из файла")
+                return f.read().strip()
+    except Exception as e:
+        logger.warning(f"Не удалось загрузить API ключ из файла: {e}")
+    return None
 
 
 class BaseAgent(ABC):
@@ -22,127 +57,200 @@ class BaseAgent(ABC):
         
         Args:
             api_key: API ключ io.net (если None, берется из Config или файла)
-            model: Модель для использования (если None, берется из Config)
+            model: Модель для использования (если None - по маршрутам model_router)
         """
         self.logger = logging.getLogger(self.__class__.__name__)
         
         # Загрузка API ключа
         self.api_key = api_key or Config.IO_NET_API_KEY
         if not self.api_key:
-            # Попытка загрузить из файла tg_aitt_service
-            try:
-                key_path = os.path.join(os.path.dirname(__file__), "..", "tg_aitt_service", "io_net_api_key.txt")
-                if os.path.exists(key_path):
-                    with open(key_path, "r") as f:
-                        self.api_key = f.read().strip()
-                        self.logger.info("API ключ загружен из файла")
-            except Exception as e:
-                self.logger.warning(f"Не удалось загрузить API ключ из файла: {e}")
+            # Попытка загрузить из файла tg_aitt_service (читается один раз на процесс)
+            self.api_key = _load_api_key_file()
         
         if not self.api_key:
             raise ValueError("IO_NET_API_KEY не найден. Установите переменную окружения IO_NET_API_KEY или создайте task_tracker_bot/tg_aitt_service/io_net_api_key.txt")
         
         self.model = model or Config.IO_NET_MODEL
+        # Явно заданная модель не переключается маршрутами уровней
+        self._pinned_model = model is not None
         self.api_url = Config.IO_NET_API_URL
         self.temperature = Config.IO_NET_TEMPERATURE
         self.max_tokens = Config.IO_NET_MAX_TOKENS
         self.timeout = Config.IO_NET_TIMEOUT
         self.retry_count = Config.IO_NET_RETRY_COUNT
         self.retry_delay = Config.IO_NET_RETRY_DELAY
+        
+        # Одинаковые одновременные запросы к модели выполняются один раз
+        self._inflight = SingleFlight()
     
     @abstractmethod
     def get_system_prompt(self) -> str:
         """Возвращает системный промпт для агента"""
         pass
     
-    def call_api_with_retry(self, user_prompt: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    def get_prompt_sections(self) -> List[PromptSection]:
+        """
+        Секции системного промпта для PromptRegistry
+        
+        По умолчанию весь промпт - одна обязательная секция. Агенты с длинными
+        промптами переопределяют метод, помечая редко нужные секции intent.
+        """
+        return [PromptSection("main", self.get_system_prompt())]
+    
+    def _select_model(self, intent: Optional[str] = None) -> str:
+        """Модель для вызова с предполагаемым intent"""
+        if self._pinned_model:
+            return self.model
+        return model_router.select(self.__class__.__name__, intent, default=self.model)
+    
+    def _escalation_model(self, model: str) -> Optional[str]:
+        """Модель для повтора неудачного ответа model (None - повторять негде)"""
+        if self._pinned_model:
+            return None
+        return model_router.escalation_for(model)
+    
+    def _headers(self) -> Dict[str, str]:
+        """Заголовки запроса к io.net API"""
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+    
+    def _build_payload(
+        self,
+        user_prompt: str,
+        context: Optional[Dict[str, Any]] = None,
+        intent: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Тело запроса chat/completions (промпт и лимит ответа зависят от intent)"""
+        messages: List[Dict[str, str]] = [
+            {"role": "system", "content": prompt_registry.system_prompt(self, intent)},
+            {"role": "user", "content": user_prompt}
+        ]
+        
+        if context:
+            messages.append({
+                "role": "assistant",
+                "content": json.dumps(context, ensure_ascii=False)
+            })
+        
+        return {
+            "model": self._select_model(intent),
+            "messages": messages,
+            "temperature": self.temperature,
+            "max_tokens": prompt_registry.max_tokens(intent, self.max_tokens)
+        }
+    
+    def _track_usage(self, response: Dict[str, Any], intent: Optional[str] = None) -> None:
+        """Учесть расход токенов и предупредить об обрезанном по лимиту ответе"""
+        usage = response.get("usage")
+        if usage:
+            prompt_registry.record_usage(self.__class__.__name__, usage, intent)
+            for kind in ("prompt", "completion"):
+                API_TOKENS.inc(int(usage.get(f"{kind}_tokens") or 0), agent=self.__class__.__name__, kind=kind)
+        for choice in response.get("choices") or []:
+            if choice.get("finish_reason") == "length":
+                self.logger.warning(
+                    f"Ответ {self.__class__.__name__} обрезан по max_tokens (intent={intent})"
+                )
+    
+    def _can_retry(self, attempt: int) -> bool:
+        """Есть ли смысл в следующей попытке (не последняя и цепь не разомкнута)"""
+        return attempt < self.retry_count - 1 and not io_net_breaker.is_open()
+    
+    def call_api_with_retry(
+        self,
+        user_prompt: str,
+        context: Optional[Dict[str, Any]] = None,
+        intent: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Вызов io.net AI API с retry логикой и экспоненциальной задержкой
         
         Args:
             user_prompt: Промпт пользователя
             context: Контекст для агента (опционально)
+            intent: Предполагаемый intent запроса (выбор секций промпта и лимита)
         
         Returns:
             Ответ от API
         
         Raises:
+            CircuitOpenError: Если API признан недоступным (цепь разомкнута)
+            CassetteMissError: Если в режиме replay ответа нет в кассете
             Exception: Если все попытки retry не удались
         """
-        messages = [
-            {"role": "system", "content": self.get_system_prompt()},
-            {"role": "user", "content": user_prompt}
-        ]
-        
-        if context:
-            messages.append({
-                "role": "assistant",
-                "content": json.dumps(context, ensure_ascii=False)
-            })
-        
+        payload = self._build_payload(user_prompt, context, intent)
+        replayed = self._replay(payload, intent)
+        if replayed is not None:
+            return replayed
         last_exception = None
         
         for attempt in range(self.retry_count):
+            io_net_breaker.check()
+            if attempt:
+                API_RETRIES.inc(agent=self.__class__.__name__)
             try:
                 start_time = time.time()
-                response = requests.post(
+                response = get_session().post(
                     self.api_url,
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": self.model,
-                        "messages": messages,
-                        "temperature": self.temperature,
-                        "max_tokens": self.max_tokens
-                    },
+                    headers=self._headers(),
+                    json=payload,
                     timeout=self.timeout
                 )
                 response.raise_for_status()
+                io_net_breaker.record_success(time.time() - start_time)
+                self._observe_success("sync", time.time() - start_time, payload["model"])
                 elapsed_time = (time.time() - start_time) * 1000
                 self.logger.info(f"API вызов успешен за {elapsed_time:.2f}ms (попытка {attempt + 1})")
-                return response.json()
+                data = response.json()
+                self._track_usage(data, intent)
+                io_net_cassette.record(self.__class__.__name__, payload, data)
+                return data
             
             except requests.exceptions.Timeout as e:
                 last_exception = e
+                io_net_breaker.record_failure()
                 elapsed_time = (time.time() - start_time) * 1000
                 self.logger.warning(
                     f"Таймаут при вызове io.net API (попытка {attempt + 1}/{self.retry_count}), "
                     f"время: {elapsed_time:.2f}ms"
                 )
-                if attempt < self.retry_count - 1:
-                    delay = self.retry_delay * (2 ** attempt)  # Экспоненциальная задержка
+                if self._can_retry(attempt):
+                    delay = backoff_delay(self.retry_delay, attempt)  # Экспоненциальная задержка
                     self.logger.info(f"Повтор через {delay:.2f} секунд...")
                     time.sleep(delay)
             
             except requests.exceptions.HTTPError as e:
                 last_exception = e
-                status_code = e.response.status_code if e.response else None
+                status_code = e.response.status_code if e.response is not None else None
                 self.logger.warning(
                     f"HTTP ошибка при вызове io.net API: {status_code} "
                     f"(попытка {attempt + 1}/{self.retry_count})"
                 )
-                # Retry только для 5xx ошибок
-                if status_code and 500 <= status_code < 600:
-                    if attempt < self.retry_count - 1:
-                        delay = self.retry_delay * (2 ** attempt)
+                # Retry только для 5xx ошибок и 429
+                if status_code and (500 <= status_code < 600 or status_code == 429):
+                    io_net_breaker.record_failure()
+                    if self._can_retry(attempt):
+                        delay = backoff_delay(self.retry_delay, attempt)
                         self.logger.info(f"Повтор через {delay:.2f} секунд...")
                         time.sleep(delay)
                     else:
                         break
                 else:
-                    # Для других HTTP ошибок не делаем retry
+                    # Для других HTTP ошибок не делаем retry (API при этом доступен)
+                    io_net_breaker.record_success(time.time() - start_time)
                     break
             
             except (requests.exceptions.ConnectionError, requests.exceptions.RequestException) as e:
                 last_exception = e
+                io_net_breaker.record_failure()
                 self.logger.warning(
                     f"Ошибка соединения при вызове io.net API: {str(e)} "
                     f"(попытка {attempt + 1}/{self.retry_count})"
                 )
-                if attempt < self.retry_count - 1:
-                    delay = self.retry_delay * (2 ** attempt)
+                if self._can_retry(attempt):
+                    delay = backoff_delay(self.retry_delay, attempt)
                     self.logger.info(f"Повтор через {delay:.2f} секунд...")
                     time.sleep(delay)
         
@@ -150,96 +258,481 @@ class BaseAgent(ABC):
         if isinstance(last_exception, requests.exceptions.Timeout):
             error_msg = f"Таймаут при вызове io.net API после {self.retry_count} попыток. Попробуйте позже."
         elif isinstance(last_exception, requests.exceptions.HTTPError):
-            status_code = last_exception.response.status_code if last_exception.response else None
+            status_code = last_exception.response.status_code if last_exception.response is not None else None
             error_msg = f"Ошибка API io.net: {status_code} после {self.retry_count} попыток."
         else:
             error_msg = f"Ошибка при вызове io.net API после {self.retry_count} попыток: {str(last_exception)}"
         
         self.logger.error(error_msg)
+        self._observe_failure(payload["model"])
+        raise Exception(error_msg)
+    
+    async def call_api_with_retry_async(
+        self,
+        user_prompt: str,
+        context: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        intent: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Асинхронный вызов io.net AI API через общий пул соединений
+        
+        Не блокирует event loop: задержки между попытками - asyncio.sleep.
+        
+        Args:
+            user_prompt: Промпт пользователя
+            context: Контекст для агента (опционально)
+            timeout: Таймаут одной попытки в секундах (по умолчанию IO_NET_TIMEOUT)
+            intent: Предполагаемый intent запроса
+        
+        Returns:
+            Ответ от API
+        
+        Raises:
+            CircuitOpenError: Если API признан недоступным (цепь разомкнута)
+            CassetteMissError: Если в режиме replay ответа нет в кассете
+            Exception: Если все попытки retry не удались
+        """
+        payload = self._build_payload(user_prompt, context, intent)
+        replayed = self._replay(payload, intent)
+        if replayed is not None:
+            return replayed
+        client = get_async_client()
+        request_timeout = httpx.Timeout(timeout or self.timeout, connect=Config.IO_NET_CONNECT_TIMEOUT)
+        last_exception = None
+        
+        for attempt in range(self.retry_count):
+            io_net_breaker.check()
+            if attempt:
+                API_RETRIES.inc(agent=self.__class__.__name__)
+            start_time = time.time()
+            retry = True
+            try:
+                response = await client.post(
+                    self.api_url,
+                    headers=self._headers(),
+                    json=payload,
+                    timeout=request_timeout
+                )
+                response.raise_for_status()
+                io_net_breaker.record_success(time.time() - start_time)
+                self._observe_success("async", time.time() - start_time, payload["model"])
+                elapsed_time = (time.time() - start_time) * 1000
+                self.logger.info(f"API вызов (async) успешен за {elapsed_time:.2f}ms (попытка {attempt + 1})")
+                data = response.json()
+                self._track_usage(data, intent)
+                io_net_cassette.record(self.__class__.__name__, payload, data)
+                return data
+            
+            except httpx.TimeoutException as e:
+                last_exception = e
+                elapsed_time = (time.time() - start_time) * 1000
+                self.logger.warning(
+                    f"Таймаут при вызове io.net API (попытка {attempt + 1}/{self.retry_count}), "
+                    f"время: {elapsed_time:.2f}ms"
+                )
+            
+            except httpx.HTTPStatusError as e:
+                last_exception = e
+                status_code = e.response.status_code
+                self.logger.warning(
+                    f"HTTP ошибка при вызове io.net API: {status_code} "
+                    f"(попытка {attempt + 1}/{self.retry_count})"
+                )
+                # Retry только для 5xx ошибок и 429
+                retry = status_code >= 500 or status_code == 429
+            
+            except httpx.HTTPError as e:
+                last_exception = e
+                self.logger.warning(
+                    f"Ошибка соединения при вызове io.net API: {str(e)} "
+                    f"(попытка {attempt + 1}/{self.retry_count})"
+                )
+            
+            if not retry:
+                # API ответил ошибкой запроса - сам сервис доступен
+                io_net_breaker.record_success(time.time() - start_time)
+                break
+            io_net_breaker.record_failure()
+            if self._can_retry(attempt):
+                delay = backoff_delay(self.retry_delay, attempt)
+                self.logger.info(f"Повтор через {delay:.2f} секунд...")
+                await asyncio.sleep(delay)
+        
+        # Все попытки исчерпаны
+        if isinstance(last_exception, httpx.TimeoutException):
+            error_msg = f"Таймаут при вызове io.net API после {self.retry_count} попыток. Попробуйте позже."
+        elif isinstance(last_exception, httpx.HTTPStatusError):
+            error_msg = f"Ошибка API io.net: {last_exception.response.status_code} после {self.retry_count} попыток."
+        else:
+            error_msg = f"Ошибка при вызове io.net API после {self.retry_count} попыток: {str(last_exception)}"
+        
+        self.logger.error(error_msg)
+        self._observe_failure(payload["model"])
         raise Exception(error_msg)
     
-    def call_api(self, user_prompt: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    def call_api(
+        self,
+        user_prompt: str,
+        context: Optional[Dict[str, Any]] = None,
+        intent: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Вызов io.net AI API с retry логикой
         
         Args:
             user_prompt: Промпт пользователя
             context: Контекст для агента (опционально)
+            intent: Предполагаемый intent запроса
         
         Returns:
             Ответ от API
         """
-        return self.call_api_with_retry(user_prompt, context)
+        return self.call_api_with_retry(user_prompt, context, intent)
     
-    def process(self, prompt: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    async def call_api_async(
+        self,
+        user_prompt: str,
+        context: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        intent: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Асинхронный вариант call_api"""
+        return await self.call_api_with_retry_async(user_prompt, context, timeout, intent)
+    
+    async def stream_api_async(
+        self,
+        user_prompt: str,
+        context: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        intent: Optional[str] = None
+    ) -> AsyncIterator[Tuple[str, str]]:
+        """
+        Потоковый вызов io.net AI API (Server-Sent Events)
+        
+        Повторы выполняются только до получения первого фрагмента: после этого
+        часть ответа уже отдана вызывающему коду.
+        
+        Args:
+            user_prompt: Промпт пользователя
+            context: Контекст для агента (опционально)
+            timeout: Таймаут ожидания очередного фрагмента в секундах
+            intent: Предполагаемый intent запроса
+        
+        Yields:
+            ("content", текст) - фрагмент ответа,
+            ("reasoning", текст) - фрагмент рассуждений модели
+        """
+        payload = self._build_payload(user_prompt, context, intent)
+        payload["stream"] = True
+        payload["stream_options"] = {"include_usage": True}
+        replayed = self._replay(payload, intent)
+        if replayed is not None:
+            # Записанный ответ отдается одним фрагментом
+            text = response_content(replayed)
+            if text["reasoning"]:
+                yield "reasoning", text["reasoning"]
+            if text["content"]:
+                yield "content", text["content"]
+            return
+        client = get_async_client()
+        request_timeout = httpx.Timeout(timeout or self.timeout, connect=Config.IO_NET_CONNECT_TIMEOUT)
+        last_exception = None
+        
+        for attempt in range(self.retry_count):
+            io_net_breaker.check()
+            if attempt:
+                API_RETRIES.inc(agent=self.__class__.__name__)
+            start_time = time.time()
+            received = False
+            retry = True
+            # Собранный ответ для записи в кассету
+            content_parts: List[str] = []
+            reasoning_parts: List[str] = []
+            finish_reason = None
+            usage = None
+            try:
+                async with client.stream(
+                    "POST",
+                    self.api_url,
+                    headers=self._headers(),
+                    json=payload,
+                    timeout=request_timeout
+                ) as response:
+                    response.raise_for_status()
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue  # Пустые строки-разделители и комментарии SSE
+                        data = line[5:].strip()
+                        if data == "[DONE]":
+                            break
+                        try:
+                            event = json.loads(data)
+                        except json.JSONDecodeError:
+                            self.logger.debug(f"Пропущен некорректный фрагмент потока: {data[:100]}")
+                            continue
+                        # Последнее событие потока содержит usage и finish_reason
+                        self._track_usage(event, intent)
+                        usage = event.get("usage") or usage
+                        choices = event.get("choices") or [{}]
+                        finish_reason = choices[0].get("finish_reason") or finish_reason
+                        delta = choices[0].get("delta") or {}
+                        if not received and (delta.get("reasoning_content") or delta.get("content")):
+                            # Для цепи важна задержка до первого фрагмента, а не длина ответа
+                            received = True
+                            io_net_breaker.record_success(time.time() - start_time)
+                            elapsed_time = (time.time() - start_time) * 1000
+                            self.logger.info(f"Первый фрагмент потока получен за {elapsed_time:.2f}ms")
+                        if delta.get("reasoning_content"):
+                            reasoning_parts.append(delta["reasoning_content"])
+                            yield "reasoning", delta["reasoning_content"]
+                        if delta.get("content"):
+                            content_parts.append(delta["content"])
+                            yield "content", delta["content"]
+                if not received:
+                    io_net_breaker.record_success(time.time() - start_time)
+                io_net_cassette.record(self.__class__.__name__, payload, {
+                    "choices": [{
+                        "message": {
+                            "role": "assistant",
+                            "content": "".join(content_parts),
+                            "reasoning_content": "".join(reasoning_parts)
+                        },
+                        "finish_reason": finish_reason
+                    }],
+                    "usage": usage
+                })
+                self._observe_success("stream", time.time() - start_time, payload["model"])
+                elapsed_time = (time.time() - start_time) * 1000
+                self.logger.info(f"Потоковый вызов API завершен за {elapsed_time:.2f}ms (попытка {attempt + 1})")
+                return
+            
+            except httpx.HTTPStatusError as e:
+                last_exception = e
+                status_code = e.response.status_code
+                self.logger.warning(
+                    f"HTTP ошибка при потоковом вызове io.net API: {status_code} "
+                    f"(попытка {attempt + 1}/{self.retry_count})"
+                )
+                retry = status_code >= 500 or status_code == 429
+            
+            except httpx.HTTPError as e:
+                last_exception = e
+                self.logger.warning(
+                    f"Ошибка потокового вызова io.net API: {str(e)} "
+                    f"(попытка {attempt + 1}/{self.retry_count})"
+                )
+            
+            if received:
+                break
+            if not retry:
+                io_net_breaker.record_success(time.time() - start_time)
+                break
+            io_net_breaker.record_failure()
+            if self._can_retry(attempt):
+                delay = backoff_delay(self.retry_delay, attempt)
+                self.logger.info(f"Повтор через {delay:.2f} секунд...")
+                await asyncio.sleep(delay)
+        
+        if isinstance(last_exception, httpx.TimeoutException):
+            error_msg = "Таймаут при потоковом вызове io.net API. Попробуйте позже."
+        elif isinstance(last_exception, httpx.HTTPStatusError):
+            error_msg = f"Ошибка API io.net: {last_exception.response.status_code}"
+        else:
+            error_msg = f"Ошибка при потоковом вызове io.net API: {str(last_exception)}"
+        
+        self.logger.error(error_msg)
+        self._observe_failure(payload["model"])
+        raise Exception(error_msg)
+    
+    def _observe_success(self, mode: str, seconds: float, model: str) -> None:
+        """Учесть успешный вызов API в метриках и статистике задержек модели"""
+        API_LATENCY.observe(seconds, agent=self.__class__.__name__, mode=mode)
+        API_CALLS.inc(agent=self.__class__.__name__, outcome="success")
+        model_router.record(self.__class__.__name__, model, seconds)
+    
+    def _observe_failure(self, model: str) -> None:
+        """Учесть вызов API, не удавшийся после всех попыток"""
+        API_CALLS.inc(agent=self.__class__.__name__, outcome="error")
+        model_router.record(self.__class__.__name__, model, None)
+    
+    def _replay(self, payload: Dict[str, Any], intent: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Ответ из кассеты в режиме replay (None - нужен реальный вызов API)"""
+        replayed = io_net_cassette.replay(payload)
+        if replayed is not None:
+            self.logger.info("Ответ API воспроизведен из кассеты")
+            self._track_usage(replayed, intent)
+        return replayed
+    
+    def _parse_response(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Извлечь JSON-результат из ответа chat/completions
+        
+        Args:
+            response: Ответ API
+        
+        Returns:
+            Распарсенный JSON или {"response": текст}, если JSON не найден
+        """
+        # Извлечение ответа из структуры io.net API
+        if "choices" in response and len(response["choices"]) > 0:
+            return self._parse_content(response["choices"][0]["message"]["content"])
+        
+        raise Exception("Неожиданный формат ответа от API")
+    
+    def _parse_content(self, content: str) -> Dict[str, Any]:
+        """
+        Извлечь JSON-результат из текста ответа модели
+        
+        Args:
+            content: Текст ответа
+        
+        Returns:
+            Распарсенный JSON или {"response": текст}, если JSON не найден
+        """
+        # Проверка на пустой ответ
+        if not content or not content.strip():
+            self.logger.error(f"{self.__class__.__name__} получил пустой ответ от API")
+            raise Exception("API вернул пустой ответ")
+        
+        # Логирование raw ответа для отладки
+        self.logger.debug(f"{self.__class__.__name__} получил ответ от API (первые 500 символов): {content[:500]}")
+        
+        # Попытка извлечь JSON из markdown блоков (```json ... ```)
+        json_content = content.strip()
+        if "```json" in json_content:
+            start = json_content.find("```json") + 7
+            end = json_content.find("```", start)
+            if end != -1:
+                json_content = json_content[start:end].strip()
+                self.logger.debug(f"Извлечен JSON из markdown блока")
+        elif "```" in json_content:
+            # Попытка извлечь JSON из обычного markdown блока
+            start = json_content.find("```") + 3
+            end = json_content.find("```", start)
+            if end != -1:
+                json_content = json_content[start:end].strip()
+                self.logger.debug(f"Извлечен JSON из markdown блока (без json тега)")
+        
+        # Попытка распарсить JSON
+        try:
+            result = json.loads(json_content)
+            self.logger.debug(f"{self.__class__.__name__} успешно распарсил JSON")
+        except json.JSONDecodeError as e:
+            self.logger.warning(f"{self.__class__.__name__} не удалось распарсить JSON: {e}. Raw content: {json_content[:500]}")
+            # Попытка найти JSON в тексте
+            import re
+            json_match = re.search(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', json_content, re.DOTALL)
+            if json_match:
+                try:
+                    result = json.loads(json_match.group())
+                    self.logger.info(f"{self.__class__.__name__} успешно распарсил JSON из текста")
+                except:
+                    result = {"response": content}
+            else:
+                result = {"response": content}
+        
+        return result
+    
+    def _request_key(
+        self,
+        model: str,
+        prompt: str,
+        context: Optional[Dict[str, Any]] = None,
+        intent: Optional[str] = None
+    ) -> str:
+        """Ключ запроса к модели для объединения одинаковых вызовов"""
+        source = json.dumps([model, prompt, context, intent], ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(source.encode("utf-8")).hexdigest()
+    
+    def process(
+        self,
+        prompt: str,
+        context: Optional[Dict[str, Any]] = None,
+        intent: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Обработка запроса агентом с измерением времени выполнения
         
+        Одинаковый запрос, пришедший пока такой же уже выполняется,
+        ждет его результата вместо повторного вызова модели.
+        
         Args:
             prompt: Промпт для обработки
             context: Контекст (опционально)
+            intent: Предполагаемый intent запроса (выбор секций промпта и лимита)
         
         Returns:
             Результат обработки
         """
+        model = self._select_model(intent)
+        return self._inflight.do(
+            self._request_key(model, prompt, context, intent),
+            lambda: self._process(model, prompt, context, intent)
+        )
+    
+    def _process(
+        self,
+        model: str,
+        prompt: str,
+        context: Optional[Dict[str, Any]] = None,
+        intent: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Вызов модели и разбор ответа (без объединения запросов)"""
         start_time = time.time()
         try:
-            response = self.call_api(prompt, context)
-            
-            # Извлечение ответа из структуры io.net API
-            if "choices" in response and len(response["choices"]) > 0:
-                content = response["choices"][0]["message"]["content"]
-                
-                # Проверка на пустой ответ
-                if not content or not content.strip():
-                    self.logger.error(f"{self.__class__.__name__} получил пустой ответ от API")
-                    raise Exception("API вернул пустой ответ")
-                
-                # Логирование raw ответа для отладки
-                self.logger.debug(f"{self.__class__.__name__} получил ответ от API (первые 500 символов): {content[:500]}")
-                
-                # Попытка извлечь JSON из markdown блоков (```json ... ```)
-                json_content = content.strip()
-                if "```json" in json_content:
-                    start = json_content.find("```json") + 7
-                    end = json_content.find("```", start)
-                    if end != -1:
-                        json_content = json_content[start:end].strip()
-                        self.logger.debug(f"Извлечен JSON из markdown блока")
-                elif "```" in json_content:
-                    # Попытка извлечь JSON из обычного markdown блока
-                    start = json_content.find("```") + 3
-                    end = json_content.find("```", start)
-                    if end != -1:
-                        json_content = json_content[start:end].strip()
-                        self.logger.debug(f"Извлечен JSON из markdown блока (без json тега)")
-                
-                # Попытка распарсить JSON
-                try:
-                    result = json.loads(json_content)
-                    self.logger.debug(f"{self.__class__.__name__} успешно распарсил JSON")
-                except json.JSONDecodeError as e:
-                    self.logger.warning(f"{self.__class__.__name__} не удалось распарсить JSON: {e}. Raw content: {json_content[:500]}")
-                    # Попытка найти JSON в тексте
-                    import re
-                    json_match = re.search(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', json_content, re.DOTALL)
-                    if json_match:
-                        try:
-                            result = json.loads(json_match.group())
-                            self.logger.info(f"{self.__class__.__name__} успешно распарсил JSON из текста")
-                        except:
-                            result = {"response": content}
-                    else:
-                        result = {"response": content}
-                
-                elapsed_time = (time.time() - start_time) * 1000
-                self.logger.info(f"{self.__class__.__name__}.process() выполнен за {elapsed_time:.2f}ms")
-                return result
-            
-            raise Exception("Неожиданный формат ответа от API")
+            with model_router.forced(model):
+                result = self._parse_response(self.call_api(prompt, context, intent))
+            elapsed_time = (time.time() - start_time) * 1000
+            self.logger.info(f"{self.__class__.__name__}.process() выполнен за {elapsed_time:.2f}ms")
+            return result
         except Exception as e:
             elapsed_time = (time.time() - start_time) * 1000
             self.logger.error(f"{self.__class__.__name__}.process() завершился с ошибкой за {elapsed_time:.2f}ms: {e}")
             raise
-
-
+    
+    async def process_async(
+        self,
+        prompt: str,
+        context: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        intent: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Асинхронная обработка запроса (не блокирует event loop)
+        
+        Args:
+            prompt: Промпт для обработки
+            context: Контекст (опционально)
+            timeout: Таймаут одной попытки в секундах
+            intent: Предполагаемый intent запроса
+        
+        Returns:
+            Результат обработки
+        """
+        model = self._select_model(intent)
+        return await self._inflight.do_async(
+            self._request_key(model, prompt, context, intent),
+            lambda: self._process_async(model, prompt, context, timeout, intent)
+        )
+    
+    async def _process_async(
+        self,
+        model: str,
+        prompt: str,
+        context: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        intent: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Асинхронный вызов модели и разбор ответа (без объединения запросов)"""
+        start_time = time.time()
+        try:
+            with model_router.forced(model):
+                result = self._parse_response(await self.call_api_async(prompt, context, timeout, intent))
+            elapsed_time = (time.time() - start_time) * 1000
+            self.logger.info(f"{self.__class__.__name__}.process_async() выполнен за {elapsed_time:.2f}ms")
+            return result
+        except Exception as e:
+            elapsed_time = (time.time() - start_time) * 1000
+            self.logger.error(f"{self.__class__.__name__}.process_async() завершился с ошибкой за {elapsed_time:.2f}ms: {e}")
+            raise
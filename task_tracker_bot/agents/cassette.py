@@ -0,0 +1,179 @@
+"""
+Запись и воспроизведение обращений к io.net API (кассеты)
+"""
+
+import os
+import json
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Поля запроса, которые не влияют на ответ модели
+VOLATILE_PAYLOAD_KEYS = ("stream", "stream_options")
+
+
+class CassetteMissError(Exception):
+    """В режиме replay для запроса нет записанного ответа"""
+
+
+def payload_key(payload: Dict[str, Any]) -> str:
+    """Ключ запроса: хэш тела без полей, не влияющих на ответ"""
+    stable = {key: value for key, value in payload.items() if key not in VOLATILE_PAYLOAD_KEYS}
+    raw = json.dumps(stable, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def response_content(response: Dict[str, Any]) -> Dict[str, str]:
+    """Текст ответа и рассуждений модели из ответа API"""
+    message = (response.get("choices") or [{}])[0].get("message") or {}
+    return {
+        "content": message.get("content") or "",
+        "reasoning": message.get("reasoning_content") or ""
+    }
+
+
+class Cassette:
+    """
+    Кассета с парами запрос/ответ io.net API в файле JSON Lines
+
+    mode:
+        off - кассета не используется;
+        record - успешные ответы API дописываются в файл вместе с исходными
+                 сообщениями пользователей (корпус для бенчмарка);
+        replay - ответы берутся только из файла, без сети; запрос без записи
+                 завершается CassetteMissError.
+
+    Потоковые ответы записываются в обычном формате: при воспроизведении
+    потоковый вызов получает текст записанного ответа одним фрагментом.
+    """
+
+    OFF = "off"
+    RECORD = "record"
+    REPLAY = "replay"
+
+    def __init__(self, path: str, mode: str = OFF):
+        self._lock = threading.Lock()
+        self.configure(path, mode)
+
+    def configure(self, path: str, mode: str) -> None:
+        """Сменить файл и режим кассеты (например, из скрипта бенчмарка)"""
+        if mode not in (self.OFF, self.RECORD, self.REPLAY):
+            raise ValueError(f"Неизвестный режим кассеты: {mode}")
+        with self._lock:
+            self.path = path
+            self.mode = mode
+            self._responses: Dict[str, Dict[str, Any]] = {}
+            self._messages: List[str] = []
+            self._replayed = 0
+            self._recorded = 0
+            self._misses = 0
+            if mode != self.OFF:
+                self._load()
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != self.OFF
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Пропущена поврежденная запись кассеты {self.path}")
+                    continue
+                if entry.get("type") == "message":
+                    self._messages.append(entry["text"])
+                elif entry.get("type") == "interaction":
+                    self._responses[entry["key"]] = entry["response"]
+        logger.info(
+            f"Кассета {self.path}: {len(self._responses)} ответов, "
+            f"{len(self._messages)} сообщений (режим {self.mode})"
+        )
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def replay(self, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Записанный ответ на запрос в режиме replay, иначе None
+
+        Raises:
+            CassetteMissError: Если в режиме replay запрос не записан
+        """
+        if self.mode != self.REPLAY:
+            return None
+        key = payload_key(payload)
+        with self._lock:
+            response = self._responses.get(key)
+            if response is None:
+                self._misses += 1
+            else:
+                self._replayed += 1
+        if response is None:
+            raise CassetteMissError(f"Нет записи для запроса {key[:12]} в кассете {self.path}")
+        return response
+
+    def record(self, agent_name: str, payload: Dict[str, Any], response: Dict[str, Any]) -> None:
+        """Записать успешный ответ API (только в режиме record)"""
+        if self.mode != self.RECORD:
+            return
+        key = payload_key(payload)
+        with self._lock:
+            if key in self._responses:
+                return
+            self._responses[key] = response
+            self._recorded += 1
+            self._append({
+                "type": "interaction",
+                "key": key,
+                "agent": agent_name,
+                "request": payload,
+                "response": response
+            })
+
+    def record_message(self, text: str) -> None:
+        """Записать исходное сообщение пользователя в корпус (только в режиме record)"""
+        if self.mode != self.RECORD:
+            return
+        with self._lock:
+            self._messages.append(text)
+            self._append({"type": "message", "text": text})
+
+    def lookup(self, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Записанный ответ на запрос независимо от режима (для stub-сервера)"""
+        with self._lock:
+            return self._responses.get(payload_key(payload))
+
+    def messages(self) -> List[str]:
+        """Записанные сообщения пользователей в порядке записи"""
+        with self._lock:
+            return list(self._messages)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Режим кассеты и счетчики воспроизведения/записи"""
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "responses": len(self._responses),
+                "messages": len(self._messages),
+                "replayed": self._replayed,
+                "recorded": self._recorded,
+                "misses": self._misses
+            }
+
+
+# Общая кассета для всех агентов
+io_net_cassette = Cassette(Config.IO_NET_CASSETTE_PATH, Config.IO_NET_CASSETTE_MODE)
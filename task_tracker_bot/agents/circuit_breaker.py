@@ -0,0 +1,186 @@
+"""
+Circuit breaker для вызовов io.net API
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+from config import Config
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """API считается недоступным: вызов отклонен без обращения к нему"""
+
+
+class CircuitBreaker:
+    """
+    Размыкатель цепи по доле ошибок и медленных ответов в скользящем окне
+
+    closed - вызовы идут как обычно, результаты пишутся в окно последних
+    window вызовов. Когда в окне не меньше min_calls вызовов и доля ошибок
+    или медленных ответов достигает порога, цепь размыкается (open): вызовы
+    сразу отклоняются. Через open_seconds цепь переходит в half_open и
+    пропускает один пробный вызов: успех замыкает цепь, ошибка снова
+    размыкает ее.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        window: Optional[int] = None,
+        min_calls: Optional[int] = None,
+        failure_rate: Optional[float] = None,
+        slow_call_seconds: Optional[float] = None,
+        slow_rate: Optional[float] = None,
+        open_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.window = window or Config.CIRCUIT_WINDOW
+        self.min_calls = min_calls or Config.CIRCUIT_MIN_CALLS
+        self.failure_rate = failure_rate or Config.CIRCUIT_FAILURE_RATE
+        self.slow_call_seconds = slow_call_seconds or Config.CIRCUIT_SLOW_CALL_SECONDS
+        self.slow_rate = slow_rate or Config.CIRCUIT_SLOW_RATE
+        self.open_seconds = open_seconds or Config.CIRCUIT_OPEN_SECONDS
+        self._clock = clock
+        self._lock = threading.Lock()
+        # (успех, медленный) для последних вызовов
+        self._calls: Deque[Tuple[bool, bool]] = deque(maxlen=self.window)
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started_at = 0.0
+        self._times_opened = 0
+        self._rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.open_seconds:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+            logger.info(f"Цепь {self.name}: half_open, пробный вызов")
+        return self._state
+
+    def is_open(self) -> bool:
+        """API считается недоступным (без учета пробного вызова)"""
+        with self._lock:
+            return self._current_state() == self.OPEN
+
+    def allow_request(self) -> bool:
+        """Можно ли выполнить вызов; в half_open пропускается один пробный"""
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            # Пробный вызов, так и не учтенный (например, отмененный), не блокирует цепь навсегда
+            probe_lost = self._clock() - self._probe_started_at >= self.open_seconds
+            if state == self.HALF_OPEN and (not self._probe_in_flight or probe_lost):
+                self._probe_in_flight = True
+                self._probe_started_at = self._clock()
+                return True
+            self._rejected += 1
+            return False
+
+    def check(self) -> None:
+        """allow_request с исключением CircuitOpenError при отказе"""
+        if not self.allow_request():
+            raise CircuitOpenError(f"{self.name} временно недоступен (цепь разомкнута)")
+
+    def record_success(self, duration: float) -> None:
+        """Учесть успешный вызов длительностью duration секунд"""
+        slow = duration >= self.slow_call_seconds
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                if slow:
+                    self._open("медленный пробный вызов")
+                else:
+                    self._state = self.CLOSED
+                    self._calls.clear()
+                    logger.warning(f"Цепь {self.name} замкнута: API снова отвечает")
+                return
+            self._calls.append((True, slow))
+            self._evaluate()
+
+    def record_failure(self) -> None:
+        """Учесть неудачный вызов (таймаут, 5xx, 429, ошибка соединения)"""
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._open("ошибка пробного вызова")
+                return
+            self._calls.append((False, False))
+            self._evaluate()
+
+    def _evaluate(self) -> None:
+        if self._state != self.CLOSED or len(self._calls) < self.min_calls:
+            return
+        failures = sum(1 for ok, _ in self._calls if not ok) / len(self._calls)
+        slow = sum(1 for _, is_slow in self._calls if is_slow) / len(self._calls)
+        if failures >= self.failure_rate:
+            self._open(f"доля ошибок {failures:.0%}")
+        elif slow >= self.slow_rate:
+            self._open(f"доля медленных ответов {slow:.0%}")
+
+    def _open(self, reason: str) -> None:
+        self._state = self.OPEN
+        self._opened_at = self._clock()
+        self._probe_in_flight = False
+        self._times_opened += 1
+        self._calls.clear()
+        logger.warning(f"Цепь {self.name} разомкнута на {self.open_seconds}s: {reason}")
+
+    def reset(self) -> None:
+        """Замкнуть цепь и очистить статистику"""
+        with self._lock:
+            self._state = self.CLOSED
+            self._calls.clear()
+            self._probe_in_flight = False
+            self._times_opened = 0
+            self._rejected = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Состояние цепи и показатели текущего окна"""
+        with self._lock:
+            state = self._current_state()
+            total = len(self._calls)
+            failures = sum(1 for ok, _ in self._calls if not ok)
+            slow = sum(1 for _, is_slow in self._calls if is_slow)
+            return {
+                "state": state,
+                "window_calls": total,
+                "failure_rate_percent": round(failures / total * 100, 2) if total else 0,
+                "slow_rate_percent": round(slow / total * 100, 2) if total else 0,
+                "times_opened": self._times_opened,
+                "rejected": self._rejected
+            }
+
+
+# Общий размыкатель: все агенты обращаются к одному API
+io_net_breaker = CircuitBreaker("io.net")
+
+
+def _collect_breaker_metrics():
+    """Состояние размыкателя для реестра метрик"""
+    stats = io_net_breaker.get_stats()
+    labels = {"name": io_net_breaker.name}
+    yield "circuit_breaker_open", "gauge", "Цепь разомкнута (1) или нет (0)", [
+        ("circuit_breaker_open", labels, int(stats["state"] == CircuitBreaker.OPEN))
+    ]
+    yield "circuit_breaker_rejected_total", "counter", "Вызовы, отклоненные разомкнутой цепью", [
+        ("circuit_breaker_rejected_total", labels, stats["rejected"])
+    ]
+
+
+metrics.register_collector(_collect_breaker_metrics)
@@ -4,21 +4,13 @@ ADM (Agent Data Manager) - работа с базой данных через с
 
 import sys
 import os
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Callable, Optional, List
 from .base_agent import BaseAgent
+from .request_cache import invalidates_request_cache, request_cached
 
 # Добавляем путь к корню проекта для импорта
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
-from services.project_service import ProjectService
-from services.task_service import TaskService
-from services.board_service import BoardService
-from services.statistics_service import StatisticsService
-from repositories.custom_field_repository import CustomFieldRepository
-from repositories.project_repository import ProjectRepository
-from repositories.task_repository import TaskRepository
-from repositories.board_repository import BoardRepository
-from repositories.column_repository import ColumnRepository
-from repositories.personal_task_repository import PersonalTaskRepository
+from services.container import ServiceContainer, container
 from database import Database
 
 
@@ -26,50 +18,47 @@ class DataManagerAgent(BaseAgent):
     """Agent Data Manager - единственная точка доступа к БД через сервисы"""
     
     def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None, 
-                 db: Optional[Database] = None):
+                 db: Optional[Database] = None, services: Optional[ServiceContainer] = None):
         """
         Args:
             api_key: API ключ io.net
             model: Модель для использования
             db: Экземпляр Database для работы с БД
+            services: Контейнер репозиториев и сервисов (по умолчанию общий контейнер
+                процесса, для отдельной db - собственный)
         """
         super().__init__(api_key, model)
-        self.db = db or Database()
+        if services is None:
+            services = container if db is None else ServiceContainer(db)
+        self.services = services
+        self.db = services.db
         
-        # Инициализация репозиториев
-        self.project_repo = ProjectRepository(self.db)
-        self.task_repo = TaskRepository(self.db)
-        self.board_repo = BoardRepository(self.db)
-        self.column_repo = ColumnRepository(self.db)
-        self.field_repo = CustomFieldRepository(self.db)
-        self.personal_task_repo = PersonalTaskRepository(self.db)
+        # Репозитории и сервисы из контейнера (общие с обработчиками)
+        self.project_repo = services.project_repo
+        self.task_repo = services.task_repo
+        self.board_repo = services.board_repo
+        self.column_repo = services.column_repo
+        self.field_repo = services.field_repo
+        self.personal_task_repo = services.personal_task_repo
+        self.analytics_repo = services.analytics_repo
+        self.name_resolver = services.name_resolver
         
-        # Инициализация сервисов
-        self.project_service = ProjectService(
-            self.project_repo, self.board_repo, self.column_repo, self.task_repo
-        )
-        self.task_service = TaskService(self.task_repo, self.column_repo)
-        self.board_service = BoardService(self.board_repo, self.column_repo)
-        self.stats_service = StatisticsService(
-            self.task_repo, self.project_repo, self.board_repo, None, self.column_repo
-        )
-        
-        # Инициализация TodoService для работы с туду-листом
-        from services.todo_service import TodoService
-        from utils.date_parser import DateParser
-        from utils.task_classifier import TaskClassifier
-        
-        date_parser = DateParser()
-        task_classifier = TaskClassifier(self.project_repo)
-        self.todo_service = TodoService(
-            self.personal_task_repo,
-            self.task_repo,
-            self.project_repo,
-            self.column_repo,
-            self.board_repo,
-            date_parser,
-            task_classifier
-        )
+        self.project_service = services.project_service
+        self.task_service = services.task_service
+        self.board_service = services.board_service
+        self.stats_service = services.stats_service
+        self.todo_service = services.todo_service
+        # Вызываются после каждой записи с workspace_id (None - пространство неизвестно)
+        self._write_listeners: List[Callable[[Optional[int]], None]] = []
+    
+    def add_write_listener(self, listener: Callable[[Optional[int]], None]) -> None:
+        """Подписаться на записи ADM (сброс производных кэшей, например метрик AAM)"""
+        self._write_listeners.append(listener)
+    
+    def notify_write(self, workspace_id: Optional[int] = None) -> None:
+        """Сообщить слушателям о записи в пространство workspace_id"""
+        for listener in self._write_listeners:
+            listener(workspace_id)
     
     def get_system_prompt(self) -> str:
         return """Ты Agent Data Manager (ADM) системы PMAssist.
@@ -106,6 +95,7 @@ class DataManagerAgent(BaseAgent):
 
 Все операции выполняются через сервисы, не напрямую с БД."""
     
+    @request_cached
     def get_next_project_id(self, workspace_id: int) -> Dict[str, Any]:
         """
         Получить следующий свободный ID проекта
@@ -142,6 +132,7 @@ class DataManagerAgent(BaseAgent):
                 "message": f"Ошибка при получении следующего ID проекта: {str(e)}"
             }
     
+    @invalidates_request_cache
     def create_project(self, project_id: str, workspace_id: int, name: str) -> Dict[str, Any]:
         """
         Создать проект через ProjectService
@@ -181,6 +172,7 @@ class DataManagerAgent(BaseAgent):
                 "message": f"Ошибка при создании проекта: {str(e)}"
             }
     
+    @invalidates_request_cache
     def add_project_link(self, project_id: str, link_type: str, url: str, 
                         workspace_id: Optional[int] = None) -> Dict[str, Any]:
         """
@@ -235,7 +227,7 @@ class DataManagerAgent(BaseAgent):
             
             return {
                 "status": "success",
-                "message": f"Ссылка {link_type} добавлена к проекту {project_id}",
+                "message": f"Ссылка {link_type} добавлена к проекту {project_id} «{project.name}»",
                 "data": {
                     "project_id": project_id,
                     "link_type": link_type,
@@ -250,6 +242,7 @@ class DataManagerAgent(BaseAgent):
                 "message": f"Ошибка при добавлении ссылки: {str(e)}"
             }
     
+    @request_cached
     def get_project(self, project_id: str) -> Optional[Dict[str, Any]]:
         """
         Получить проект
@@ -274,6 +267,7 @@ class DataManagerAgent(BaseAgent):
             self.logger.error(f"Ошибка при получении проекта: {e}")
             return None
     
+    @request_cached
     def get_task(self, task_id: int) -> Optional[Dict[str, Any]]:
         """
         Получить задачу
@@ -309,6 +303,7 @@ class DataManagerAgent(BaseAgent):
             self.logger.error(f"Ошибка при получении задачи: {e}")
             return None
     
+    @invalidates_request_cache
     def update_task(self, task_id: int, status: Optional[str] = None, 
                    **kwargs) -> Dict[str, Any]:
         """
@@ -370,12 +365,13 @@ class DataManagerAgent(BaseAgent):
                 "message": f"Ошибка при обновлении задачи: {str(e)}"
             }
     
+    @request_cached
     def get_tasks_by_board_name(self, board_name: str, project_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Получить задачи по названию доски
         
         Args:
-            board_name: Название доски
+            board_name: Название доски (допускаются опечатки и падежи: "подготовки")
             project_id: ID проекта (опционально, для фильтрации)
             
         Returns:
@@ -386,18 +382,20 @@ class DataManagerAgent(BaseAgent):
             
             # Если указан project_id, получить задачи проекта
             if project_id:
-                project_tasks = self.task_service.list_tasks_by_project(project_id)
-                for task in project_tasks:
-                    column = self.column_repo.get_by_id(task.column_id)
-                    if column:
-                        board = self.board_repo.get_by_id(column.board_id)
-                        if board and board.name.lower() == board_name.lower():
-                            tasks.append({
-                                "id": task.id,
-                                "title": task.title,
-                                "board_name": board.name,
-                                "column_id": task.column_id
-                            })
+                project = self.project_service.get_project(project_id)
+                board = self.name_resolver.resolve_board(project.workspace_id, board_name) if project else None
+                if board is None:
+                    return []
+                # Колонки доски берутся из индекса названий, без запроса на каждую задачу
+                column_ids = set(self.name_resolver.column_ids(project.workspace_id, board.entry.id))
+                for task in self.task_service.list_tasks_by_project(project_id):
+                    if task.column_id in column_ids:
+                        tasks.append({
+                            "id": task.id,
+                            "title": task.title,
+                            "board_name": board.entry.name,
+                            "column_id": task.column_id
+                        })
             else:
                 # Получить все задачи со всех досок с таким именем
                 # Это требует workspace_id, поэтому лучше использовать project_id
@@ -408,6 +406,7 @@ class DataManagerAgent(BaseAgent):
             self.logger.error(f"Ошибка при получении задач по доске: {e}")
             return []
     
+    @request_cached
     def get_project_boards(self, project_id: str) -> List[Dict[str, Any]]:
         """
         Получить доски проекта
@@ -437,6 +436,34 @@ class DataManagerAgent(BaseAgent):
             self.logger.error(f"Ошибка при получении досок проекта: {e}")
             return []
     
+    @request_cached
+    def get_workspace_boards(self, workspace_id: int) -> List[Dict[str, Any]]:
+        """
+        Получить доски пространства с колонками
+        
+        Args:
+            workspace_id: ID пространства
+            
+        Returns:
+            Список досок с колонками
+        """
+        try:
+            return [
+                {
+                    "id": board.id,
+                    "name": board.name,
+                    "columns": [
+                        {"id": column.id, "name": column.name}
+                        for column in self.board_service.list_columns(board.id)
+                    ]
+                }
+                for board in self.board_service.list_boards(workspace_id)
+            ]
+        except Exception as e:
+            self.logger.error(f"Ошибка при получении досок пространства: {e}")
+            return []
+    
+    @request_cached
     def get_task_links(self, task_id: int) -> List[Dict[str, Any]]:
         """
         Получить ссылки задачи
@@ -488,6 +515,7 @@ class DataManagerAgent(BaseAgent):
             self.logger.error(f"Ошибка при получении ссылок задачи: {e}")
             return []
     
+    @invalidates_request_cache
     def create_personal_task(
         self,
         user_id: int,
@@ -542,6 +570,7 @@ class DataManagerAgent(BaseAgent):
                 "message": f"Ошибка при создании личной задачи: {str(e)}"
             }
     
+    @request_cached
     def get_personal_tasks_by_date(
         self,
         user_id: int,
@@ -553,6 +582,7 @@ class DataManagerAgent(BaseAgent):
         Returns:
             {
                 "status": "success",
+                "message": "Задачи на ...",
                 "data": [PersonalTask, ...]
             }
         """
@@ -564,8 +594,20 @@ class DataManagerAgent(BaseAgent):
             
             tasks = self.personal_task_repo.get_by_date(user_id, target_date)
             
+            date_str = target_date.strftime("%d.%m.%Y")
+            if tasks:
+                lines = [
+                    f"{'✅' if task.completed else '⬜'} "
+                    f"{task.time_display + ' ' if task.time_display else ''}{task.title}"
+                    for task in tasks
+                ]
+                message = f"Задачи на {date_str}:\n" + "\n".join(lines)
+            else:
+                message = f"На {date_str} задач нет"
+            
             return {
                 "status": "success",
+                "message": message,
                 "data": tasks
             }
         except Exception as e:
@@ -574,6 +616,7 @@ class DataManagerAgent(BaseAgent):
                 "message": f"Ошибка при получении задач: {str(e)}"
             }
     
+    @invalidates_request_cache
     def mark_personal_task_completed(
         self,
         task_id: int,
@@ -606,12 +649,14 @@ class DataManagerAgent(BaseAgent):
                 "message": f"Ошибка при отметке задачи: {str(e)}"
             }
     
+    @invalidates_request_cache
     def create_todo_batch(
         self,
         workspace_id: int,
         user_id: int,
         tasks: List[Dict[str, Any]],
-        default_date=None
+        default_date=None,
+        refine_classification=None
     ) -> Dict[str, Any]:
         """
         Создать пакет задач через TodoService
@@ -621,6 +666,7 @@ class DataManagerAgent(BaseAgent):
             user_id: ID пользователя
             tasks: Список задач из entities.tasks
             default_date: Дата по умолчанию
+            refine_classification: Уточнение неоднозначных строк (см. TodoService)
         
         Returns:
             Результат создания пакета задач
@@ -642,7 +688,8 @@ class DataManagerAgent(BaseAgent):
                 tasks_text=tasks_text,
                 workspace_id=workspace_id,
                 user_id=user_id,
-                default_date=default_date
+                default_date=default_date,
+                refine_classification=refine_classification
             )
             
             return {
@@ -656,6 +703,7 @@ class DataManagerAgent(BaseAgent):
                 "message": f"Ошибка при создании пакета задач: {str(e)}"
             }
     
+    @invalidates_request_cache
     def create_task(
         self,
         column_id: int,
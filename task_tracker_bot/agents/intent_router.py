@@ -0,0 +1,272 @@
+"""
+Intent Router - детерминированный разбор типовых запросов без LLM
+"""
+
+import re
+import logging
+import threading
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+from utils.date_parser import DateParser
+from utils.task_classifier import TaskClassifier
+from services.name_resolver import NameResolver
+from utils.name_index import WRITE_MIN_SCORE
+from repositories.task_repository import TaskRepository
+
+logger = logging.getLogger(__name__)
+
+# Дата в запросе: относительная или DD.MM[.YYYY]
+DATE_TOKEN = r"(?:сегодня|завтра|послезавтра|вчера|\d{1,2}\.\d{1,2}(?:\.\d{4})?)"
+
+# Заголовок списка задач: "на завтра:", "добавь задачи на 03.12:", "туду на сегодня"
+TODO_HEADER_PATTERN = re.compile(
+    r"^(?:(?:добавь|добавить|запиши|создай)\s+)?"
+    r"(?:(?:задачи|дела|туду|список)\s+)?"
+    rf"(?:на\s+(?P<date>{DATE_TOKEN}))?\s*:?$",
+    re.IGNORECASE
+)
+
+# Пункт нумерованного списка: "1. текст", "2) текст"
+TODO_ITEM_PATTERN = re.compile(r"^\s*\d+[.)]\s+(?P<text>.+)$")
+
+# "закрой задачу #42", "заверши задачу №7"
+CLOSE_TASK_PATTERN = re.compile(
+    r"^(?:закрой|закрыть|заверши|завершить)\s+задачу\s+[#№]?\s*(?P<task_id>\d+)\s*[.!]?$",
+    re.IGNORECASE
+)
+
+# "покажи задачи на завтра", "какие дела на 03.12?"
+SHOW_TASKS_PATTERN = re.compile(
+    r"^(?:покажи|показать|какие|что)\s+(?:мои\s+)?(?:задачи|дела|туду)\s+"
+    rf"(?:на\s+)?(?P<date>{DATE_TOKEN})\s*[?.!]?$",
+    re.IGNORECASE
+)
+
+# "добавь ссылку ТЗ к проекту 5005 https://...", "... к проекту Polaroid https://..."
+ADD_LINK_PATTERN = re.compile(
+    r"^(?:добавь|добавить|прикрепи)\s+ссылку\s+(?:на\s+)?(?P<link_type>[^\s:/]+)\s+"
+    r"(?:к|в|для)\s+проект[ау]?\s+(?P<project>\S.*?)\s*:?\s+"
+    r"(?P<url>https?://\S+)$",
+    re.IGNORECASE
+)
+PROJECT_ID_PATTERN = re.compile(r"^\d{4,5}$")
+
+TIME_PATTERN = re.compile(DateParser.TIME_PATTERN)
+
+
+class IntentRouter:
+    """
+    Разбор запросов с однозначной структурой по правилам
+
+    Возвращает результат в формате OrchestratorAgent.analyze_request
+    (intent, entities, plan) с отметкой fast_path. Если запрос не подходит
+    ни под одно правило целиком, возвращается None и запрос уходит в LLM.
+    Названия проектов разрешаются через name_resolver, если он передан
+    и известно пространство. Задача закрывается по правилу, только если
+    через task_repo подтверждено, что она в пространстве пользователя.
+    """
+
+    def __init__(self, date_parser: Optional[DateParser] = None,
+                 name_resolver: Optional[NameResolver] = None,
+                 task_repo: Optional[TaskRepository] = None):
+        self.date_parser = date_parser or DateParser()
+        self.name_resolver = name_resolver
+        self.task_repo = task_repo
+        self._lock = threading.Lock()
+        self._hits: Dict[str, int] = {}
+        self._fallbacks = 0
+
+    def route(
+        self,
+        message: str,
+        reference_date: Optional[date] = None,
+        workspace_id: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Попытаться разобрать запрос без LLM
+
+        Args:
+            message: Сообщение пользователя
+            reference_date: Опорная дата для "сегодня"/"завтра" (по умолчанию сегодня)
+            workspace_id: Пространство для поиска проектов по названию
+
+        Returns:
+            Результат анализа или None, если нужен LLM
+        """
+        reference_date = reference_date or datetime.now().date()
+        text = message.strip()
+
+        result = None
+        for parse in (self._parse_todo_batch, self._parse_close_task,
+                      self._parse_show_tasks, self._parse_add_link):
+            try:
+                result = parse(text, reference_date, workspace_id)
+            except Exception as e:
+                logger.warning(f"Ошибка правила {parse.__name__}: {e}")
+                result = None
+            if result is not None:
+                break
+
+        with self._lock:
+            if result is None:
+                self._fallbacks += 1
+            else:
+                self._hits[result["intent"]] = self._hits.get(result["intent"], 0) + 1
+
+        if result is not None:
+            result["fast_path"] = True
+            logger.info(f"Запрос разобран без LLM: intent={result['intent']}")
+        return result
+
+    def _parse_date(self, token: Optional[str], reference_date: date) -> Optional[date]:
+        """Дата из совпавшего токена DATE_TOKEN"""
+        if not token:
+            return None
+        return self.date_parser.parse_date(token, reference_date)
+
+    def _parse_todo_batch(
+        self, text: str, reference_date: date, workspace_id: Optional[int]
+    ) -> Optional[Dict[str, Any]]:
+        """Нумерованный список задач с необязательным заголовком-датой"""
+        lines = [line.strip() for line in text.splitlines() if line.strip()]
+        if not lines:
+            return None
+
+        header_date = None
+        if not TODO_ITEM_PATTERN.match(lines[0]):
+            header = TODO_HEADER_PATTERN.match(lines[0])
+            if not header:
+                return None
+            header_date = self._parse_date(header.group("date"), reference_date)
+            if header.group("date") and header_date is None:
+                return None
+            lines = lines[1:]
+
+        items = [TODO_ITEM_PATTERN.match(line) for line in lines]
+        if not items or not all(items):
+            return None
+
+        target_date = (header_date or reference_date).isoformat()
+        tasks: List[Dict[str, Any]] = []
+        for item in items:
+            task_text = item.group("text").strip()
+            task = {"text": task_text, "date": target_date}
+            times = [f"{int(h):02d}:{m}" for h, m in TIME_PATTERN.findall(task_text)]
+            if times:
+                task["times"] = times
+            for pattern in TaskClassifier.PROJECT_ID_PATTERNS:
+                project_match = re.match(pattern, task_text)
+                if project_match:
+                    task["project_id"] = project_match.group(1)
+                    break
+            tasks.append(task)
+
+        return {
+            "intent": "add_todo_batch",
+            "entities": {"date": target_date, "tasks": tasks},
+            "plan": [{
+                "agent": "ATM",
+                "action": "create_todo_batch",
+                "params": {"tasks": tasks, "default_date": target_date}
+            }]
+        }
+
+    def _parse_close_task(
+        self, text: str, reference_date: date, workspace_id: Optional[int]
+    ) -> Optional[Dict[str, Any]]:
+        """Закрытие задачи по ID (только задачи из пространства пользователя)"""
+        match = CLOSE_TASK_PATTERN.match(text)
+        if not match:
+            return None
+
+        task_id = int(match.group("task_id"))
+        if self.task_repo is None or workspace_id is None:
+            return None
+        if self.task_repo.get_workspace_id(task_id) != workspace_id:
+            logger.warning(f"Задача {task_id} не из пространства {workspace_id}, правило закрытия не применено")
+            return None
+        return {
+            "intent": "close_task",
+            "entities": {"task_id": task_id, "actions": ["close"]},
+            "plan": [{
+                "agent": "ADM",
+                "action": "update_task",
+                "params": {"task_id": task_id, "status": "done"}
+            }]
+        }
+
+    def _parse_show_tasks(
+        self, text: str, reference_date: date, workspace_id: Optional[int]
+    ) -> Optional[Dict[str, Any]]:
+        """Просмотр задач на дату"""
+        match = SHOW_TASKS_PATTERN.match(text)
+        if not match:
+            return None
+
+        target_date = self._parse_date(match.group("date"), reference_date)
+        if target_date is None:
+            return None
+
+        return {
+            "intent": "query_data",
+            "entities": {"date": target_date.isoformat()},
+            "plan": [{
+                "agent": "ADM",
+                "action": "get_personal_tasks_by_date",
+                "params": {"target_date": target_date.isoformat()}
+            }]
+        }
+
+    def _parse_add_link(
+        self, text: str, reference_date: date, workspace_id: Optional[int]
+    ) -> Optional[Dict[str, Any]]:
+        """Добавление ссылки к проекту"""
+        match = ADD_LINK_PATTERN.match(text)
+        if not match:
+            return None
+
+        project_id = self._resolve_project_id(match.group("project"), workspace_id)
+        if project_id is None:
+            return None
+        link_type = match.group("link_type")
+        url = match.group("url")
+        return {
+            "intent": "add_link",
+            "entities": {
+                "project_id": project_id,
+                "links": [{"type": link_type, "url": url}]
+            },
+            "plan": [{
+                "agent": "ADM",
+                "action": "add_project_link",
+                "params": {"project_id": project_id, "link_type": link_type, "url": url}
+            }]
+        }
+
+    def _resolve_project_id(self, project: str, workspace_id: Optional[int]) -> Optional[str]:
+        """
+        ID проекта из запроса: номер или название из индекса пространства
+
+        Правило записывает данные, поэтому название должно совпасть точно
+        (без учета регистра и знаков); похожее название уходит в LLM.
+        """
+        if PROJECT_ID_PATTERN.match(project):
+            return project
+        if self.name_resolver is None or workspace_id is None:
+            return None
+        match = self.name_resolver.resolve_project(workspace_id, project, min_score=WRITE_MIN_SCORE)
+        return match.entry.id if match is not None else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Статистика покрытия запросов правилами"""
+        with self._lock:
+            fast_path_hits = sum(self._hits.values())
+            total_requests = fast_path_hits + self._fallbacks
+            coverage = (fast_path_hits / total_requests * 100) if total_requests > 0 else 0
+            return {
+                "fast_path_hits": fast_path_hits,
+                "llm_fallbacks": self._fallbacks,
+                "total_requests": total_requests,
+                "coverage_percent": round(coverage, 2),
+                "hits_by_intent": dict(self._hits)
+            }
@@ -0,0 +1,69 @@
+"""
+HTTP-клиенты io.net API с общим пулом соединений
+"""
+
+import asyncio
+import random
+import logging
+import threading
+from typing import Optional
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+_async_client: Optional[httpx.AsyncClient] = None
+_async_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_session() -> requests.Session:
+    """Общая requests.Session для синхронных вызовов (keep-alive между запросами)"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=Config.IO_NET_POOL_SIZE)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Общий httpx.AsyncClient для текущего event loop
+    
+    Соединения пула привязаны к loop, поэтому при смене loop
+    (например, в тестах) создается новый клиент.
+    """
+    global _async_client, _async_client_loop
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client.is_closed or _async_client_loop is not loop:
+        _async_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=Config.IO_NET_POOL_SIZE,
+                max_keepalive_connections=Config.IO_NET_KEEPALIVE
+            ),
+            timeout=httpx.Timeout(Config.IO_NET_TIMEOUT, connect=Config.IO_NET_CONNECT_TIMEOUT)
+        )
+        _async_client_loop = loop
+        logger.debug("Создан пул соединений к io.net API")
+    return _async_client
+
+
+async def close_async_client() -> None:
+    """Закрыть общий асинхронный клиент (вызывается при остановке бота)"""
+    global _async_client, _async_client_loop
+    if _async_client is not None and not _async_client.is_closed:
+        await _async_client.aclose()
+    _async_client = None
+    _async_client_loop = None
+
+
+def backoff_delay(base_delay: float, attempt: int) -> float:
+    """Экспоненциальная задержка с джиттером, чтобы повторы не шли синхронно"""
+    return base_delay * (2 ** attempt) * random.uniform(0.5, 1.5)
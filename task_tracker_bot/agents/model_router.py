@@ -0,0 +1,187 @@
+"""
+Выбор модели io.net по агенту и intent с учетом задержек моделей
+"""
+
+import time
+import logging
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, Optional, Tuple
+from config import Config
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+TIER_FAST = "fast"
+TIER_REASONING = "reasoning"
+TIER_CUSTOM = "custom"
+
+MODEL_CALLS = metrics.counter(
+    "agent_model_calls_total", "Вызовы моделей по уровням (fast/reasoning/custom)", ["agent", "tier", "outcome"]
+)
+TIER_FALLBACKS = metrics.counter(
+    "agent_model_tier_fallbacks_total", "Быстрый уровень пропущен по статистике задержек", ["agent", "reason"]
+)
+
+# Модель, заданная вызывающим кодом (повтор на модели с рассуждениями)
+_forced_model: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("forced_model", default=None)
+
+
+def parse_model_routes(value: str) -> Dict[str, str]:
+    """
+    Разобрать маршруты вида "OrchestratorAgent:fast,OrchestratorAgent.add_todo_batch:reasoning"
+
+    Значение - уровень (fast/reasoning) или идентификатор модели.
+    """
+    routes: Dict[str, str] = {}
+    for item in value.split(","):
+        key, _, target = item.partition(":")
+        if key.strip() and target.strip():
+            routes[key.strip()] = target.strip()
+    return routes
+
+
+class ModelLatencyStats:
+    """Скользящая статистика вызовов по моделям: задержки и ошибки за последние window секунд"""
+
+    def __init__(self, window: Optional[float] = None, max_samples: int = 50):
+        self.window = window if window is not None else Config.MODEL_STATS_WINDOW
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        # модель -> [(время записи, секунды или None при ошибке)]
+        self._samples: Dict[str, Deque[Tuple[float, Optional[float]]]] = {}
+
+    def record(self, model: str, seconds: Optional[float]) -> None:
+        """Учесть вызов модели (seconds=None - вызов завершился ошибкой)"""
+        with self._lock:
+            samples = self._samples.setdefault(model, deque(maxlen=self.max_samples))
+            samples.append((time.time(), seconds))
+
+    def _recent(self, model: str) -> list:
+        threshold = time.time() - self.window
+        return [seconds for at, seconds in self._samples.get(model, ()) if at >= threshold]
+
+    def get(self, model: str) -> Dict[str, Any]:
+        """calls, error_rate, p50 и p95 (секунды) за окно"""
+        with self._lock:
+            recent = self._recent(model)
+        latencies = sorted(seconds for seconds in recent if seconds is not None)
+
+        def percentile(q: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(q * len(latencies)))], 3)
+
+        return {
+            "calls": len(recent),
+            "error_rate": round((len(recent) - len(latencies)) / len(recent), 3) if recent else 0.0,
+            "p50": percentile(0.5),
+            "p95": percentile(0.95)
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._samples.clear()
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            models = list(self._samples)
+        return {model: self.get(model) for model in models}
+
+
+class ModelRouter:
+    """
+    Модель для вызова агента
+
+    Маршрут ищется по "Агент.intent", затем по "Агент" (MODEL_ROUTES).
+    Быстрый уровень используется, только если задан IO_NET_FAST_MODEL и
+    статистика не показывает, что он сейчас медленнее модели с
+    рассуждениями или часто ошибается; после окна статистики быстрая
+    модель снова пробуется. Агент, созданный с явной моделью, маршрутом
+    не переключается.
+    """
+
+    def __init__(
+        self,
+        routes: Optional[Dict[str, str]] = None,
+        fast_model: Optional[str] = None,
+        reasoning_model: Optional[str] = None,
+        stats: Optional[ModelLatencyStats] = None
+    ):
+        self.routes = routes if routes is not None else parse_model_routes(Config.MODEL_ROUTES)
+        self.fast_model = fast_model if fast_model is not None else Config.IO_NET_FAST_MODEL
+        self.reasoning_model = reasoning_model or Config.IO_NET_MODEL
+        self.stats = stats or ModelLatencyStats()
+
+    def tier_of(self, model: str) -> str:
+        if model == self.reasoning_model:
+            return TIER_REASONING
+        if model == self.fast_model:
+            return TIER_FAST
+        return TIER_CUSTOM
+
+    def select(self, agent_name: str, intent: Optional[str] = None, default: Optional[str] = None) -> str:
+        """Модель для вызова агента agent_name с предполагаемым intent"""
+        forced = _forced_model.get()
+        if forced:
+            return forced
+        target = self.routes.get(f"{agent_name}.{intent}") if intent else None
+        target = target or self.routes.get(agent_name)
+        if target is None or target == TIER_REASONING:
+            return default or self.reasoning_model
+        if target != TIER_FAST:
+            return target
+        if not self.fast_model:
+            return default or self.reasoning_model
+        reason = self._fast_tier_problem()
+        if reason is not None:
+            TIER_FALLBACKS.inc(agent=agent_name, reason=reason)
+            logger.info(f"{agent_name}: быстрая модель пропущена ({reason}), используется {self.reasoning_model}")
+            return self.reasoning_model
+        return self.fast_model
+
+    def _fast_tier_problem(self) -> Optional[str]:
+        """Причина не использовать быструю модель по статистике (None - можно)"""
+        fast = self.stats.get(self.fast_model)
+        if fast["calls"] < Config.MODEL_STATS_MIN_CALLS:
+            return None
+        if fast["error_rate"] >= Config.MODEL_FAST_MAX_ERROR_RATE:
+            return "errors"
+        reasoning = self.stats.get(self.reasoning_model)
+        if fast["p50"] is not None and reasoning["p50"] is not None and fast["p50"] >= reasoning["p50"]:
+            return "latency"
+        return None
+
+    def escalation_for(self, model: str) -> Optional[str]:
+        """Модель для повтора при неуверенном или неразобранном ответе (None - повторять негде)"""
+        return self.reasoning_model if model != self.reasoning_model else None
+
+    @contextmanager
+    def forced(self, model: str) -> Iterator[None]:
+        """Все вызовы моделей внутри блока идут в model"""
+        token = _forced_model.set(model)
+        try:
+            yield
+        finally:
+            _forced_model.reset(token)
+
+    def record(self, agent_name: str, model: str, seconds: Optional[float]) -> None:
+        """Учесть вызов в скользящей статистике и метриках уровней"""
+        self.stats.record(model, seconds)
+        MODEL_CALLS.inc(
+            agent=agent_name, tier=self.tier_of(model), outcome="success" if seconds is not None else "error"
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "fast_model": self.fast_model or None,
+            "reasoning_model": self.reasoning_model,
+            "routes": dict(self.routes),
+            "models": self.stats.get_stats()
+        }
+
+
+# Общий маршрутизатор для всех агентов
+model_router = ModelRouter()
@@ -2,33 +2,76 @@
 Оркестратор - главный координатор системы агентов
 """
 
+import copy
 import time
+import contextlib
+import hashlib
 import logging
 import sys
 import os
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Awaitable, Callable, List, Optional, Tuple
 from .base_agent import BaseAgent
+from .plan_cache import PlanCache
+from .plan_template import mask_entities, make_template, fill_template
+from .stream_parser import IncrementalJSONExtractor
+from .single_flight import SingleFlight
+from .prompt_registry import PromptSection, detect_intent_hint
+from .circuit_breaker import CircuitOpenError
+from .model_router import model_router
 
 # Добавляем путь к корню проекта для импорта
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 from config import Config
+from database import Database
+from repositories.plan_cache_repository import PlanCacheRepository
+from utils.metrics import metrics
+
+CACHE_LOOKUPS = metrics.counter(
+    "orchestrator_cache_lookups_total", "Поиск плана в кэше оркестратора (template/hit/miss)", ["result"]
+)
+MODEL_ESCALATIONS = metrics.counter(
+    "orchestrator_model_escalations_total",
+    "Повторы анализа на модели с рассуждениями (parse/empty_plan/confidence/error)",
+    ["reason"]
+)
+
+# Получает текст статуса обработки для показа пользователю
+ProgressCallback = Callable[[str], Awaitable[None]]
 
 
 class OrchestratorAgent(BaseAgent):
     """Оркестратор анализирует запросы и координирует работу других агентов"""
     
-    def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None,
+                 db: Optional[Database] = None,
+                 plan_validator: Optional[Callable[[List[Dict[str, Any]]], List[str]]] = None):
         """
         Инициализация оркестратора с кэшем
         
         Args:
             api_key: API ключ io.net
             model: Модель для использования
+            db: Экземпляр Database для постоянного кэша планов (None - только память)
+            plan_validator: Проверка плана перед записью в кэш (ActionRegistry.repair_plan):
+                исправляет шаги на месте и возвращает ошибки; план с ошибками не кэшируется
         """
         super().__init__(api_key, model)
-        self.cache: Dict[str, tuple] = {}  # {normalized_message: (result, timestamp)}
-        self.cache_ttl = Config.ORCHESTRATOR_CACHE_TTL
         self.logger = logging.getLogger(self.__class__.__name__)
+        self.plan_validator = plan_validator
+        self.cache_ttl = Config.ORCHESTRATOR_CACHE_TTL
+        self.cache = PlanCache(
+            version=self._cache_version(),
+            repository=PlanCacheRepository(db) if db is not None else None,
+            ttl=self.cache_ttl
+        )
+        self.template_hits = 0
+        # Одинаковые запросы, пришедшие до записи в кэш, ждут один анализ
+        self._analysis_flight = SingleFlight()
+    
+    def _cache_version(self) -> str:
+        """Версия кэша: меняется при изменении промптов или модели"""
+        source = f"{self.model}\n{self.get_system_prompt()}\n{self._build_analysis_prompt('')}"
+        return hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
     
     def _normalize_message(self, message: str) -> str:
         """
@@ -44,25 +87,24 @@ class OrchestratorAgent(BaseAgent):
         normalized = " ".join(message.lower().split())
         return normalized
     
-    def _is_cache_valid(self, timestamp: float) -> bool:
-        """
-        Проверяет, действителен ли кэш
-        
-        Args:
-            timestamp: Временная метка записи в кэше
-            
-        Returns:
-            True если кэш действителен, False иначе
-        """
-        return (time.time() - timestamp) < self.cache_ttl
-    
     def clear_cache(self) -> None:
         """Очищает кэш оркестратора"""
         self.cache.clear()
-        self.logger.info("Кэш оркестратора очищен")
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Статистика кэша планов"""
+        stats = self.cache.get_cache_stats()
+        stats["template_hits"] = self.template_hits
+        stats["coalesced"] = self._analysis_flight.get_stats()["coalesced"]
+        return stats
     
     def get_system_prompt(self) -> str:
-        return """Ты Оркестратор системы управления задачами PMAssist. 
+        return "\n\n".join(section.text for section in self.get_prompt_sections())
+    
+    def get_prompt_sections(self) -> List[PromptSection]:
+        """Секции промпта: todo-инструкции и правила многошаговых планов нужны не всегда"""
+        return [
+            PromptSection("role", """Ты Оркестратор системы управления задачами PMAssist.
 
 Твоя задача:
 1. Анализировать запросы пользователя
@@ -74,78 +116,108 @@ class OrchestratorAgent(BaseAgent):
 - ATM (Agent Task Manager): создание и управление задачами/проектами
 - ADM (Agent Data Manager): работа с базой данных
 - ACM (Agent Control Manager): проверка корректности данных
-- AAM (Agent Analyze Manager): аналитика и отчеты
-
-НОВЫЙ ФУНКЦИОНАЛ - Todo List:
+- AAM (Agent Analyze Manager): аналитика и отчеты (analyze_query, get_tasks_in_progress,
+  get_employee_efficiency, find_bottlenecks - считаются по БД, без модели)"""),
+            PromptSection("todo", """Todo List:
 - Распознавать intent "add_todo_batch" для пакетного добавления задач
 - Извлекать дату из запроса: "на завтра", "на 03.12", "на сегодня"
 - Разбивать нумерованный список задач на отдельные элементы
 - Определять тип каждой задачи (личная/рабочая) по наличию project_id
+- Для add_todo_batch используй ATM.create_todo_batch
 
-Формат ответа (JSON):
+Формат entities.tasks:
+[
+  {"text": "Выгул Феры в 10:00 и 19:00", "date": "2025-11-30", "times": ["10:00", "19:00"]},
+  {"text": "5001 - Протестировать приложение", "date": "2025-11-30", "project_id": "5001"}
+]""", frozenset({"add_todo_batch"})),
+            PromptSection("format", """Формат ответа (JSON):
 {
   "intent": "create_project|update_task|query_data|close_task|add_todo_batch|...",
+  "confidence": 0.9,  // уверенность в intent от 0 до 1
   "entities": {
     "project_id": "...",  // может быть "id+" для следующего свободного ID
     "project_name": "...",
     "task_id": "...",
     "board_name": "...",
-    "date": "2025-11-30",  // НОВОЕ: дата для задач
-    "tasks": [  // НОВОЕ: список задач для пакетного добавления
-      {
-        "text": "Выгул Феры в 10:00 и 19:00",
-        "date": "2025-11-30",
-        "times": ["10:00", "19:00"]
-      },
-      {
-        "text": "5001 - Протестировать приложение",
-        "date": "2025-11-30",
-        "project_id": "5001"
-      }
-    ],
+    "date": "2025-11-30",  // дата для задач
+    "tasks": [...],  // список задач для пакетного добавления
     "actions": ["create", "update", "close", ...],
     "links": [{"type": "ТЗ|Референс|Figma|...", "url": "..."}]
   },
   "plan": [
     {"agent": "ADM|ATM|ACM|AAM", "action": "...", "params": {...}},
+    {"agent": "...", "action": "...", "params": {"project_id": "$project_id"}, "depends_on": [0]},
     ...
   ]
-}
-
-Важно:
-- Если project_id = "id+", нужно сначала получить следующий свободный ID через ADM
+}"""),
+            PromptSection("rules", """Важно:
 - Все операции с БД выполняются через ADM
 - После изменений всегда проверяй через ACM
-- План должен быть последовательным и логичным
-- Для add_todo_batch используй ATM.create_todo_batch"""
+- План должен быть последовательным и логичным"""),
+            PromptSection("projects", """- Если project_id = "id+", нужно сначала получить следующий свободный ID через ADM""",
+                          frozenset({"create_project", "add_link"})),
+            PromptSection("dependencies", '''- Независимые шаги выполняются параллельно. Если шаг использует результат другого шага,
+  укажи "depends_on" (индексы шагов с 0) и сошлись на значение как "$ключ"''',
+                          frozenset({"create_project", "add_link", "update_task", "close_task"})),
+        ]
     
-    def analyze_request(self, user_message: str) -> Dict[str, Any]:
+    def _get_cached(self, user_message: str) -> Tuple[Optional[Dict[str, Any]], str, Dict[str, str]]:
         """
-        Анализирует запрос пользователя и составляет план с кэшированием
+        Получить результат анализа из кэша
         
-        Args:
-            user_message: Сообщение от пользователя
+        Сначала ищется шаблон плана по сообщению с замаскированными сущностями
+        (ID проектов, даты, время, ссылки, названия), затем точное совпадение.
         
         Returns:
-            Результат анализа с планом выполнения
+            (результат или None, маскированное нормализованное сообщение, слоты)
         """
-        # Нормализуем сообщение для кэша
-        normalized = self._normalize_message(user_message)
+        masked_text, slots = mask_entities(user_message)
+        masked = self._normalize_message(masked_text)
         
-        # Проверяем кэш
-        if normalized in self.cache:
-            cached_result, timestamp = self.cache[normalized]
-            if self._is_cache_valid(timestamp):
-                self.logger.info(f"Кэш попадание для запроса: {user_message[:50]}...")
-                return cached_result
-            else:
-                # Кэш устарел, удаляем
-                del self.cache[normalized]
-                self.logger.debug(f"Кэш устарел для запроса: {user_message[:50]}...")
+        if slots:
+            template = self.cache.get(self.cache.make_key(masked))
+            if template is not None:
+                self.template_hits += 1
+                CACHE_LOOKUPS.inc(result="template")
+                self.logger.info(f"Кэш попадание (шаблон) для запроса: {user_message[:50]}...")
+                return fill_template(template, slots), masked, slots
         
-        # Кэш промах или устарел - выполняем запрос
+        cached = self.cache.get(self.cache.make_key(self._normalize_message(user_message)))
+        if cached is not None:
+            CACHE_LOOKUPS.inc(result="hit")
+            self.logger.info(f"Кэш попадание для запроса: {user_message[:50]}...")
+            # Координатор дополняет params шагов - кэш не должен меняться
+            return copy.deepcopy(cached), masked, slots
+        
+        CACHE_LOOKUPS.inc(result="miss")
         self.logger.debug(f"Кэш промах для запроса: {user_message[:50]}...")
-        prompt = f"""Проанализируй следующий запрос пользователя и составь план выполнения:
+        return None, masked, slots
+    
+    def _store_cached(self, user_message: str, masked: str, slots: Dict[str, str], result: Dict[str, Any]) -> None:
+        """Сохранить результат анализа в кэш (шаблоном, если возможно)"""
+        # Нераспознанные ответы ({"response": текст}) не кэшируем, чтобы не закрепить ошибку модели
+        if not isinstance(result, dict) or "intent" not in result:
+            return
+        # План, который координатор отклонит, тоже не кэшируем: иначе похожие запросы
+        # получали бы тот же отказ до истечения TTL без нового обращения к модели
+        plan = result.get("plan")
+        if self.plan_validator is not None and isinstance(plan, list):
+            errors = self.plan_validator(plan)
+            if errors:
+                self.logger.warning(f"План не сохранен в кэш: {'; '.join(errors)}")
+                return
+        
+        if slots:
+            template = make_template(result, slots)
+            if template is not None:
+                self.cache.set(self.cache.make_key(masked), template)
+                return
+        
+        self.cache.set(self.cache.make_key(self._normalize_message(user_message)), copy.deepcopy(result))
+    
+    def _build_analysis_prompt(self, user_message: str) -> str:
+        """Промпт для анализа запроса"""
+        return f"""Проанализируй следующий запрос пользователя и составь план выполнения:
 
 Запрос: {user_message}
 
@@ -154,6 +226,7 @@ class OrchestratorAgent(BaseAgent):
 Формат ответа (строго JSON):
 {{
   "intent": "create_project|update_task|query_data|close_task|add_todo_batch|...",
+  "confidence": 0.9,
   "entities": {{
     "project_id": "...",
     "project_name": "...",
@@ -167,24 +240,209 @@ class OrchestratorAgent(BaseAgent):
     ...
   ]
 }}"""
+    
+    def _escalation_reason(self, result: Any) -> Optional[str]:
+        """Почему ответ модели нельзя принять без повтора (None - ответ годится)"""
+        if not isinstance(result, dict) or not result.get("intent") or not isinstance(result.get("plan"), list):
+            return "parse"
+        if not result["plan"]:
+            return "empty_plan"
+        confidence = result.get("confidence")
+        if isinstance(confidence, (int, float)) and confidence < Config.MODEL_ESCALATION_CONFIDENCE:
+            return "confidence"
+        return None
+    
+    def _escalation(
+        self,
+        model: str,
+        result: Any = None,
+        error: Optional[Exception] = None
+    ) -> Optional[str]:
+        """
+        Модель для повтора анализа, выполненного на model
         
-        result = self.process(prompt)
+        Повтор нужен, если быстрая модель вернула неразобранный ответ, пустой
+        план или низкую уверенность либо завершилась ошибкой. При открытом
+        circuit breaker повтор не выполняется - io.net недоступен целиком.
         
-        # Сохраняем в кэш
-        self.cache[normalized] = (result, time.time())
+        Returns:
+            Модель с рассуждениями или None, если ответ принимается как есть
+        """
+        if isinstance(error, CircuitOpenError):
+            return None
+        escalation = self._escalation_model(model)
+        if escalation is None:
+            return None
+        reason = "error" if error is not None else self._escalation_reason(result)
+        if reason is None:
+            return None
+        MODEL_ESCALATIONS.inc(reason=reason)
+        self.logger.info(f"Анализ на {model} не принят ({reason}), повтор на {escalation}")
+        return escalation
+    
+    def analyze_request(self, user_message: str) -> Dict[str, Any]:
+        """
+        Анализирует запрос пользователя и составляет план с кэшированием
         
-        # Очищаем устаревшие записи (опционально, для экономии памяти)
-        current_time = time.time()
-        expired_keys = [
-            key for key, (_, timestamp) in self.cache.items()
-            if not self._is_cache_valid(timestamp)
-        ]
-        for key in expired_keys:
-            del self.cache[key]
+        Args:
+            user_message: Сообщение от пользователя
+        
+        Returns:
+            Результат анализа с планом выполнения
+        """
+        cached, masked, slots = self._get_cached(user_message)
+        if cached is not None:
+            return cached
+        
+        def analyze() -> Dict[str, Any]:
+            prompt = self._build_analysis_prompt(user_message)
+            intent = detect_intent_hint(user_message)
+            model = self._select_model(intent)
+            try:
+                with model_router.forced(model):
+                    result = self.process(prompt, intent=intent)
+                escalation = self._escalation(model, result=result)
+            except Exception as e:
+                escalation = self._escalation(model, error=e)
+                if escalation is None:
+                    raise
+            if escalation is not None:
+                with model_router.forced(escalation):
+                    result = self.process(prompt, intent=intent)
+            self._store_cached(user_message, masked, slots, result)
+            return result
+        
+        return self._analysis_flight.do(self._normalize_message(user_message), analyze)
+    
+    async def analyze_request_async(self, user_message: str) -> Dict[str, Any]:
+        """
+        Асинхронный вариант analyze_request (не блокирует event loop)
+        
+        Args:
+            user_message: Сообщение от пользователя
+        
+        Returns:
+            Результат анализа с планом выполнения
+        """
+        cached, masked, slots = self._get_cached(user_message)
+        if cached is not None:
+            return cached
+        
+        async def analyze() -> Dict[str, Any]:
+            prompt = self._build_analysis_prompt(user_message)
+            intent = detect_intent_hint(user_message)
+            model = self._select_model(intent)
+            try:
+                with model_router.forced(model):
+                    result = await self.process_async(prompt, intent=intent)
+                escalation = self._escalation(model, result=result)
+            except Exception as e:
+                escalation = self._escalation(model, error=e)
+                if escalation is None:
+                    raise
+            if escalation is not None:
+                with model_router.forced(escalation):
+                    result = await self.process_async(prompt, intent=intent)
+            self._store_cached(user_message, masked, slots, result)
+            return result
+        
+        return await self._analysis_flight.do_async(self._normalize_message(user_message), analyze)
+    
+    async def analyze_request_stream(
+        self,
+        user_message: str,
+        on_progress: Optional[ProgressCallback] = None
+    ) -> Dict[str, Any]:
+        """
+        Анализ запроса с потоковым ответом модели
+        
+        Поля ответа разбираются по мере генерации. Как только получены intent
+        и закрыт массив plan, генерация прерывается и результат возвращается -
+        выполнение плана начинается, не дожидаясь конца ответа модели.
+        Одинаковые одновременные запросы ждут один анализ (этапы видит
+        только первый из них).
+        
+        Args:
+            user_message: Сообщение от пользователя
+            on_progress: Вызывается с текстом текущего этапа анализа
+        
+        Returns:
+            Результат анализа с планом выполнения
+        """
+        cached, masked, slots = self._get_cached(user_message)
+        if cached is not None:
+            return cached
+        
+        return await self._analysis_flight.do_async(
+            self._normalize_message(user_message),
+            lambda: self._analyze_stream(user_message, masked, slots, on_progress)
+        )
+    
+    async def _analyze_stream(
+        self,
+        user_message: str,
+        masked: str,
+        slots: Dict[str, str],
+        on_progress: Optional[ProgressCallback]
+    ) -> Dict[str, Any]:
+        """Потоковый вызов модели, разбор плана и запись в кэш"""
+        async def notify(text: str) -> None:
+            if on_progress is not None:
+                await on_progress(text)
+        
+        start_time = time.time()
+        extractor = IncrementalJSONExtractor()
+        reasoning_chars = 0
+        result = None
+        prompt = self._build_analysis_prompt(user_message)
+        intent = detect_intent_hint(user_message)
+        model = self._select_model(intent)
+        
+        try:
+            with model_router.forced(model):
+                stream = self.stream_api_async(prompt, intent=intent)
+                async with contextlib.aclosing(stream):
+                    async for kind, text in stream:
+                        if kind == "reasoning":
+                            reasoning_chars += len(text)
+                            await notify(f"🧠 Анализирую запрос... ({reasoning_chars} симв.)")
+                            continue
+                        
+                        for key in extractor.feed(text):
+                            if key == "intent":
+                                await notify(f"🎯 Намерение: {extractor.fields['intent']}")
+                            elif key == "plan" and isinstance(extractor.fields["plan"], list):
+                                await notify(f"📋 План готов: шагов - {len(extractor.fields['plan'])}")
+                        
+                        if "intent" in extractor.fields and isinstance(extractor.fields.get("plan"), list):
+                            result = {
+                                "intent": extractor.fields["intent"],
+                                "entities": extractor.fields.get("entities") or {},
+                                "plan": extractor.fields["plan"]
+                            }
+                            if "confidence" in extractor.fields:
+                                result["confidence"] = extractor.fields["confidence"]
+                            break
+            
+            elapsed_time = (time.time() - start_time) * 1000
+            if result is None:
+                # Поля не удалось разобрать по ходу - разбор полного текста
+                result = self._parse_content(extractor.buffer)
+                self.logger.info(f"Потоковый анализ завершен за {elapsed_time:.2f}ms (разбор полного ответа)")
+            else:
+                self.logger.info(f"План получен из потока за {elapsed_time:.2f}ms, генерация прервана")
+            escalation = self._escalation(model, result=result)
+        except Exception as e:
+            escalation = self._escalation(model, error=e)
+            if escalation is None:
+                raise
         
-        if expired_keys:
-            self.logger.debug(f"Очищено {len(expired_keys)} устаревших записей из кэша")
+        if escalation is not None:
+            await notify("🧠 Уточняю план...")
+            with model_router.forced(escalation):
+                result = await self.process_async(prompt, intent=intent)
         
+        self._store_cached(user_message, masked, slots, result)
         return result
     
     def execute_plan(
@@ -0,0 +1,166 @@
+"""
+Двухуровневый кэш планов оркестратора: LRU в памяти + SQLite
+"""
+
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Optional, Tuple
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class PlanCache:
+    """
+    Кэш результатов analyze_request
+    
+    Ключ - хэш версии (промпт + модель) и нормализованного сообщения, так что
+    смена промпта или модели автоматически отсекает старые планы.
+    
+    Истечение за O(1): TTL одинаков для всех записей, поэтому очередь
+    (expires_at, key) упорядочена по времени вставки и истекшие записи
+    снимаются с ее начала. Постоянный уровень чистится запросом по
+    индексу expires_at не чаще раза в cleanup_interval секунд.
+    """
+    
+    def __init__(
+        self,
+        version: str,
+        repository=None,
+        ttl: Optional[int] = None,
+        max_size: Optional[int] = None,
+        cleanup_interval: int = 600
+    ):
+        """
+        Args:
+            version: Версия промпта и модели (часть ключа)
+            repository: PlanCacheRepository для постоянного уровня (None - только память)
+            ttl: Время жизни плана в секундах
+            max_size: Максимум записей в памяти
+            cleanup_interval: Период очистки истекших записей в SQLite
+        """
+        self.version = version
+        self.repository = repository
+        self.ttl = ttl if ttl is not None else Config.ORCHESTRATOR_CACHE_TTL
+        self.max_size = max_size or Config.ORCHESTRATOR_CACHE_SIZE
+        self.cleanup_interval = cleanup_interval
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._expiry: Deque[Tuple[float, str]] = deque()
+        self._last_cleanup = 0.0
+        self._stats = {
+            "memory_hits": 0,
+            "db_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expired": 0
+        }
+    
+    def make_key(self, normalized_message: str) -> str:
+        """Ключ кэша для нормализованного сообщения"""
+        return hashlib.sha256(f"{self.version}\n{normalized_message}".encode("utf-8")).hexdigest()
+    
+    def _expire(self, now: float) -> None:
+        """Снять истекшие записи с начала очереди (вызывается под блокировкой)"""
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, key = self._expiry.popleft()
+            entry = self._entries.get(key)
+            # Запись могла быть перезаписана позже - тогда у нее другое время истечения
+            if entry is not None and entry[1] == expires_at:
+                del self._entries[key]
+                self._stats["expired"] += 1
+    
+    def _put_memory(self, key: str, value: Any, expires_at: float) -> None:
+        """Положить запись в память (вызывается под блокировкой)"""
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        self._expiry.append((expires_at, key))
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+        # Очередь не должна расти из-за перезаписей и вытеснений
+        if len(self._expiry) > 2 * self.max_size:
+            self._expiry = deque(
+                (exp, k) for exp, k in self._expiry
+                if k in self._entries and self._entries[k][1] == exp
+            )
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Получить план из памяти, затем из SQLite"""
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            entry = self._entries.get(key)
+            # Записи, поднятые из БД, приходят со своим временем истечения
+            # и могут стоять в очереди не по порядку - проверяем явно
+            if entry is not None and entry[1] <= now:
+                del self._entries[key]
+                self._stats["expired"] += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return entry[0]
+        
+        if self.repository is not None:
+            try:
+                stored = self.repository.get(key, now)
+            except Exception as e:
+                logger.warning(f"Ошибка чтения кэша планов из БД: {e}")
+                stored = None
+            if stored is not None:
+                with self._lock:
+                    self._put_memory(key, stored["plan"], stored["expires_at"])
+                    self._stats["db_hits"] += 1
+                return stored["plan"]
+        
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+    
+    def set(self, key: str, value: Any) -> None:
+        """Сохранить план в оба уровня"""
+        now = time.time()
+        expires_at = now + self.ttl
+        with self._lock:
+            self._expire(now)
+            self._put_memory(key, value, expires_at)
+        
+        if self.repository is not None:
+            try:
+                self.repository.set(key, value, expires_at)
+                if now - self._last_cleanup > self.cleanup_interval:
+                    self._last_cleanup = now
+                    removed = self.repository.delete_expired(now)
+                    if removed:
+                        logger.debug(f"Удалено {removed} истекших планов из БД")
+            except Exception as e:
+                logger.warning(f"Ошибка записи кэша планов в БД: {e}")
+    
+    def clear(self) -> None:
+        """Очистить оба уровня"""
+        with self._lock:
+            self._entries.clear()
+            self._expiry.clear()
+        if self.repository is not None:
+            try:
+                self.repository.clear()
+            except Exception as e:
+                logger.warning(f"Ошибка очистки кэша планов в БД: {e}")
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Статистика попаданий и промахов"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+        hits = stats["memory_hits"] + stats["db_hits"]
+        total_requests = hits + stats["misses"]
+        stats["total_requests"] = total_requests
+        stats["hit_ratio_percent"] = round(hits / total_requests * 100, 2) if total_requests else 0
+        return stats
@@ -0,0 +1,139 @@
+"""
+Шаблоны планов: маскирование сущностей запроса для общего кэша
+"""
+
+import re
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+from utils.date_parser import DateParser
+
+logger = logging.getLogger(__name__)
+
+_date_parser = DateParser()
+
+# Порядок важен: URL и имена в кавычках маскируются раньше, чтобы
+# даты и числа внутри них не превратились в отдельные слоты
+ENTITY_PATTERNS: List[Tuple[str, re.Pattern]] = [
+    ("url", re.compile(r"https?://\S+")),
+    ("name", re.compile(r"«([^»]+)»|\"([^\"]+)\"|'([^']+)'")),
+    ("date", re.compile(r"\b\d{4}-\d{2}-\d{2}\b|\b\d{1,2}\.\d{1,2}(?:\.\d{4})?\b")),
+    ("time", re.compile(r"\b\d{1,2}:\d{2}\b")),
+    ("pid", re.compile(r"\b\d{4}\b")),
+]
+
+# Название после "проект id+" / "проект 5005" - до предлога, другой сущности или конца строки
+PROJECT_NAME_PATTERN = re.compile(
+    r"(проект\s+(?:id\+|<<pid\d+>>)\s+)(?!(?:на|в|к|до|с)\b)([^\n<]+?)(?=\s+(?:на|в|к|до|с)\b|\s*<<|\s*$)",
+    re.IGNORECASE | re.MULTILINE
+)
+
+PLACEHOLDER_PATTERN = re.compile(r"<<(\w+?)(?::(iso))?>>")
+
+
+def mask_entities(message: str) -> Tuple[str, Dict[str, str]]:
+    """
+    Заменить сущности сообщения плейсхолдерами <<date1>>, <<pid1>>, ...
+    
+    Args:
+        message: Исходное сообщение
+    
+    Returns:
+        (маскированный текст, {имя слота: исходное значение})
+    """
+    slots: Dict[str, str] = {}
+    counters: Dict[str, int] = {}
+    
+    def placeholder(kind: str, value: str) -> str:
+        counters[kind] = counters.get(kind, 0) + 1
+        name = f"{kind}{counters[kind]}"
+        slots[name] = value
+        return f"<<{name}>>"
+    
+    text = message
+    for kind, pattern in ENTITY_PATTERNS:
+        def replace(match: re.Match) -> str:
+            # Для имен в кавычках берем текст без кавычек
+            groups = [g for g in match.groups() if g is not None] if match.groups() else []
+            if groups:
+                return match.group(0).replace(groups[0], placeholder(kind, groups[0]))
+            return placeholder(kind, match.group(0))
+        text = pattern.sub(replace, text)
+    
+    text = PROJECT_NAME_PATTERN.sub(lambda m: m.group(1) + placeholder("name", m.group(2)), text)
+    return text, slots
+
+
+def _slot_forms(name: str, value: str) -> Dict[str, str]:
+    """Варианты значения слота, в которых оно может попасть в план"""
+    forms = {f"<<{name}>>": value}
+    if name.startswith("date"):
+        parsed = _date_parser.parse_date(value)
+        if parsed:
+            forms[f"<<{name}:iso>>"] = parsed.isoformat()
+    return forms
+
+
+def _walk(value: Any, convert) -> Any:
+    """Применить convert ко всем строкам вложенной структуры"""
+    if isinstance(value, str):
+        return convert(value)
+    if isinstance(value, dict):
+        return {k: _walk(v, convert) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_walk(v, convert) for v in value]
+    return value
+
+
+def make_template(result: Dict[str, Any], slots: Dict[str, str]) -> Optional[Dict[str, Any]]:
+    """
+    Превратить результат анализа в шаблон, заменив значения слотов плейсхолдерами
+    
+    Returns:
+        Шаблон или None, если значение какого-то слота не найдено в плане
+        (модель его преобразовала, и подставить другое значение нельзя) или
+        входит в другую строку плана не отдельным значением
+    """
+    forms: List[Tuple[str, str, re.Pattern]] = []
+    for name, value in slots.items():
+        for placeholder, form in _slot_forms(name, value).items():
+            if form:
+                forms.append((placeholder, form, re.compile(rf"(?<![\w-]){re.escape(form)}(?![\w-])")))
+    # Длинные значения заменяем первыми, чтобы дата "2025-10-20" маскировалась раньше ID "2025"
+    forms.sort(key=lambda item: len(item[1]), reverse=True)
+    
+    found = set()
+    overlaps = set()
+    
+    def convert(text: str) -> str:
+        for placeholder, value, pattern in forms:
+            if value not in text:
+                continue
+            # Значение внутри другого значения ("2025" в "2025-10-20") не маскируется:
+            # подстановка другого слота испортила бы его
+            if text.count(value) != len(pattern.findall(text)):
+                overlaps.add(placeholder)
+            text = pattern.sub(placeholder, text)
+            found.add(placeholder.split(":")[0].strip("<>"))
+        return text
+    
+    template = _walk(result, convert)
+    if overlaps:
+        logger.debug(f"Шаблон плана не создан: значения {sorted(overlaps)} входят в другие строки плана")
+        return None
+    missing = set(slots) - found
+    if missing:
+        logger.debug(f"Шаблон плана не создан: значения слотов {sorted(missing)} не найдены в плане")
+        return None
+    return template
+
+
+def fill_template(template: Dict[str, Any], slots: Dict[str, str]) -> Dict[str, Any]:
+    """Подставить значения слотов в шаблон плана"""
+    values: Dict[str, str] = {}
+    for name, value in slots.items():
+        values.update(_slot_forms(name, value))
+    
+    def convert(text: str) -> str:
+        return PLACEHOLDER_PATTERN.sub(lambda m: values.get(m.group(0), m.group(0)), text)
+    
+    return _walk(template, convert)
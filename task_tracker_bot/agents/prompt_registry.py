@@ -0,0 +1,156 @@
+"""
+Реестр системных промптов агентов: сжатие, отбор секций по intent, лимиты токенов
+"""
+
+import re
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Лимит ответа по intent: план из одного-двух шагов намного короче пакета задач.
+# Запас оставлен на рассуждения модели, они тоже входят в max_tokens.
+DEFAULT_INTENT_MAX_TOKENS = {
+    "query_data": 1200,
+    "close_task": 1200,
+    "add_link": 1200,
+    "update_task": 1500,
+    "create_project": 1500,
+    "add_todo_batch": 3000,
+    "classify_todo": 1500,
+}
+
+# Признаки intent в сообщении (до вызова модели); проверяются по порядку
+INTENT_HINT_PATTERNS = [
+    ("add_todo_batch", re.compile(r"(?m)^\s*\d+[.)]\s+\S|туду|todo|список дел", re.IGNORECASE)),
+    ("add_link", re.compile(r"ссылк|https?://", re.IGNORECASE)),
+    ("create_project", re.compile(r"(?:созда|заведи|новый)\w*\s+(?:\w+\s+)?проект", re.IGNORECASE)),
+    ("close_task", re.compile(r"закр[оы]|заверш", re.IGNORECASE)),
+    ("query_data", re.compile(r"сколько|покажи|какие|статистик|отчет|отчёт|аналит|загрузк", re.IGNORECASE)),
+]
+
+
+@dataclass(frozen=True)
+class PromptSection:
+    """Часть системного промпта; intents=None - нужна для любого запроса"""
+    name: str
+    text: str
+    intents: Optional[FrozenSet[str]] = None
+
+
+def detect_intent_hint(message: str) -> Optional[str]:
+    """Предполагаемый intent по ключевым словам или None, если не ясно"""
+    for intent, pattern in INTENT_HINT_PATTERNS:
+        if pattern.search(message):
+            return intent
+    return None
+
+
+def compact_prompt(text: str) -> str:
+    """Убрать отступы, хвостовые пробелы и повторные пустые строки"""
+    lines = [line.strip() for line in text.strip().splitlines()]
+    compacted: List[str] = []
+    for line in lines:
+        if not line and compacted and not compacted[-1]:
+            continue
+        compacted.append(line)
+    return "\n".join(compacted)
+
+
+def estimate_tokens(text: str) -> int:
+    """Грубая оценка числа токенов: кириллица ~2.5 символа на токен, латиница ~4"""
+    cyrillic = sum(1 for char in text if "Ѐ" <= char <= "ӿ")
+    return max(1, round(cyrillic / 2.5 + (len(text) - cyrillic) / 4))
+
+
+def parse_intent_limits(value: str) -> Dict[str, int]:
+    """Разобрать переопределения лимитов вида "query_data:800,add_todo_batch:4000" """
+    limits: Dict[str, int] = {}
+    for item in value.split(","):
+        intent, _, tokens = item.partition(":")
+        if intent.strip() and tokens.strip().isdigit():
+            limits[intent.strip()] = int(tokens)
+    return limits
+
+
+class PromptRegistry:
+    """
+    Сжатые системные промпты агентов с оценкой размера в токенах
+
+    Промпт собирается из секций агента (BaseAgent.get_prompt_sections): секции,
+    помеченные intent, попадают в промпт только для этих intent, а при
+    неизвестном intent промпт полный. Результат кэшируется по (агент, intent).
+    Реестр также учитывает фактический расход токенов по ответам API.
+    """
+
+    def __init__(self, intent_max_tokens: Optional[Dict[str, int]] = None):
+        self.intent_max_tokens = dict(DEFAULT_INTENT_MAX_TOKENS)
+        self.intent_max_tokens.update(
+            intent_max_tokens if intent_max_tokens is not None
+            else parse_intent_limits(Config.IO_NET_MAX_TOKENS_BY_INTENT)
+        )
+        self._lock = threading.Lock()
+        self._prompts: Dict[Tuple[str, Optional[str]], Tuple[str, int]] = {}
+        self._usage: Dict[str, Dict[str, int]] = {}
+
+    def system_prompt(self, agent: Any, intent: Optional[str] = None) -> str:
+        """Системный промпт агента для intent"""
+        key = (type(agent).__name__, intent)
+        with self._lock:
+            entry = self._prompts.get(key)
+        if entry is not None:
+            return entry[0]
+
+        sections = [
+            section for section in agent.get_prompt_sections()
+            if intent is None or section.intents is None or intent in section.intents
+        ]
+        prompt = "\n\n".join(compact_prompt(section.text) for section in sections)
+        tokens = estimate_tokens(prompt)
+        with self._lock:
+            self._prompts[key] = (prompt, tokens)
+        logger.info(
+            f"Промпт {key[0]} (intent={intent}): ~{tokens} токенов, "
+            f"секции: {', '.join(section.name for section in sections)}"
+        )
+        return prompt
+
+    def max_tokens(self, intent: Optional[str], default: int) -> int:
+        """Лимит ответа для intent (default, если intent не задан)"""
+        if intent is None:
+            return default
+        return self.intent_max_tokens.get(intent, default)
+
+    def record_usage(self, agent_name: str, usage: Dict[str, Any], intent: Optional[str] = None) -> None:
+        """Учесть расход токенов из поля usage ответа API"""
+        prompt_tokens = int(usage.get("prompt_tokens") or 0)
+        completion_tokens = int(usage.get("completion_tokens") or 0)
+        with self._lock:
+            totals = self._usage.setdefault(
+                agent_name, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0}
+            )
+            totals["calls"] += 1
+            totals["prompt_tokens"] += prompt_tokens
+            totals["completion_tokens"] += completion_tokens
+        logger.info(
+            f"Токены {agent_name} (intent={intent}): prompt={prompt_tokens}, "
+            f"completion={completion_tokens}"
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Размеры собранных промптов и суммарный расход токенов по агентам"""
+        with self._lock:
+            return {
+                "prompts": {
+                    f"{agent}:{intent or '*'}": tokens
+                    for (agent, intent), (_, tokens) in self._prompts.items()
+                },
+                "usage": {agent: dict(totals) for agent, totals in self._usage.items()}
+            }
+
+
+# Общий реестр для всех агентов
+prompt_registry = PromptRegistry()
@@ -0,0 +1,166 @@
+"""
+Кэш чтений ADM в пределах обработки одного сообщения
+"""
+
+import inspect
+import logging
+import threading
+import functools
+import contextvars
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_current_cache: contextvars.ContextVar[Optional["RequestCache"]] = contextvars.ContextVar(
+    "request_cache", default=None
+)
+# Чтение выполняется упреждающей загрузкой, а не шагом плана
+_prefetching: contextvars.ContextVar[bool] = contextvars.ContextVar("request_cache_prefetching", default=False)
+
+
+class RequestCache:
+    """
+    Результаты чтений ADM за время одного запроса пользователя
+
+    Значение хранится как Future: шаг плана, которому нужен результат
+    упреждающей загрузки, еще не завершенной, ждет ее вместо повторного
+    запроса к БД. Любая запись через ADM сбрасывает кэш целиком.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # ключ -> (результат, загружен упреждающе, уже прочитан шагом)
+        self._entries: Dict[Tuple, Tuple[Future, bool, bool]] = {}
+        self._hits = 0
+        self._misses = 0
+        self._prefetched = 0
+        self._prefetch_hits = 0
+
+    def get_or_load(self, key: Tuple, loader: Callable[[], Any]) -> Any:
+        """Значение по ключу или результат loader (одна загрузка на ключ)"""
+        prefetching = _prefetching.get()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                future, prefetched, used = entry
+                if not prefetching:
+                    self._hits += 1
+                    if prefetched and not used:
+                        self._prefetch_hits += 1
+                    self._entries[key] = (future, prefetched, True)
+            else:
+                future = Future()
+                self._entries[key] = (future, prefetching, not prefetching)
+                if prefetching:
+                    self._prefetched += 1
+                else:
+                    self._misses += 1
+
+        if entry is not None:
+            return future.result()
+
+        try:
+            value = loader()
+        except BaseException as e:
+            # Ошибку не кэшируем: следующий вызов повторит чтение
+            with self._lock:
+                if self._entries.get(key, (None,))[0] is future:
+                    del self._entries[key]
+            future.set_exception(e)
+            raise
+        future.set_result(value)
+        return value
+
+    def invalidate(self) -> None:
+        """Сбросить все значения (после записи в БД)"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "prefetched": self._prefetched,
+                "prefetch_hits": self._prefetch_hits
+            }
+
+
+def current_request_cache() -> Optional[RequestCache]:
+    """Кэш текущего запроса или None вне запроса"""
+    return _current_cache.get()
+
+
+@contextmanager
+def request_scope(cache: Optional[RequestCache]) -> Iterator[Optional[RequestCache]]:
+    """Сделать cache текущим в этом потоке (контексте) на время блока"""
+    token = _current_cache.set(cache)
+    try:
+        yield cache
+    finally:
+        _current_cache.reset(token)
+
+
+def run_in_request_scope(cache: Optional[RequestCache], func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Вызвать func с текущим cache (для запуска в пуле потоков)"""
+    with request_scope(cache):
+        return func(*args, **kwargs)
+
+
+def prefetch(cache: RequestCache, func: Callable[..., Any], **kwargs) -> None:
+    """Упреждающе загрузить func(**kwargs) в cache; ошибки только логируются"""
+    token = _prefetching.set(True)
+    try:
+        with request_scope(cache):
+            func(**kwargs)
+    except Exception as e:
+        logger.debug(f"Упреждающая загрузка {getattr(func, '__name__', func)} не удалась: {e}")
+    finally:
+        _prefetching.reset(token)
+
+
+def request_cached(method: Callable[..., Any]) -> Callable[..., Any]:
+    """Метод чтения ADM: в пределах запроса результат берется из RequestCache"""
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        cache = _current_cache.get()
+        if cache is None:
+            return method(self, *args, **kwargs)
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        # str: ID из плана приходят то строкой, то числом, даты - строкой ISO
+        key = (method.__name__,) + tuple(
+            (name, str(value)) for name, value in bound.arguments.items() if name != "self"
+        )
+        return cache.get_or_load(key, lambda: method(self, *args, **kwargs))
+
+    return wrapper
+
+
+def invalidates_request_cache(method: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Метод записи ADM: сбрасывает RequestCache текущего запроса
+
+    Слушатели записи агента (self.notify_write) получают workspace_id
+    вызова или None, если метод его не принимает.
+    """
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            cache = _current_cache.get()
+            if cache is not None:
+                cache.invalidate()
+            notify_write = getattr(self, "notify_write", None)
+            if notify_write is not None:
+                bound = signature.bind_partial(self, *args, **kwargs)
+                notify_write(bound.arguments.get("workspace_id"))
+
+    return wrapper
@@ -0,0 +1,97 @@
+"""
+Объединение одинаковых одновременных вызовов (single-flight)
+"""
+
+import copy
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Выполняет одну функцию на ключ, пока вызов с этим ключом в работе
+
+    Вызовы с тем же ключом, пришедшие во время выполнения, не запускают
+    функцию повторно, а ждут результата первого вызова. Ожидающие получают
+    копию результата: вызывающий код может изменять его (координатор
+    дополняет params шагов плана).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        self._executed = 0
+        self._coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Выполнить fn или дождаться уже идущего вызова с тем же ключом
+
+        Исключение первого вызова получают все ожидающие.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+                self._executed += 1
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            logger.debug(f"Ожидание идущего вызова: {str(key)[:50]}")
+            return copy.deepcopy(future.result())
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Асинхронный вариант do: одинаковые вызовы ждут одну задачу
+
+        Отмена одного из ожидающих не отменяет общую задачу.
+        """
+        loop = asyncio.get_running_loop()
+        task_key = (id(loop), key)
+        with self._lock:
+            task = self._tasks.get(task_key)
+            if task is None:
+                task = loop.create_task(fn())
+                self._tasks[task_key] = task
+                self._executed += 1
+                task.add_done_callback(lambda _: self._forget_task(task_key))
+            else:
+                self._coalesced += 1
+                logger.debug(f"Ожидание идущего вызова: {str(key)[:50]}")
+
+        result = await asyncio.shield(task)
+        return copy.deepcopy(result)
+
+    def _forget_task(self, task_key: Hashable) -> None:
+        with self._lock:
+            self._tasks.pop(task_key, None)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Статистика: выполнено вызовов и объединено с уже идущими"""
+        with self._lock:
+            return {
+                "executed": self._executed,
+                "coalesced": self._coalesced,
+                "in_flight": len(self._calls) + len(self._tasks)
+            }
@@ -0,0 +1,124 @@
+"""
+Инкрементальный разбор JSON-ответа модели, приходящего потоком
+"""
+
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+THINK_OPEN = "<think>"
+THINK_CLOSE = "</think>"
+
+
+class IncrementalJSONExtractor:
+    """
+    Разбирает поток текста с JSON-объектом и отдает его поля по мере закрытия
+
+    Ответ модели вида ``{"intent": ..., "entities": {...}, "plan": [...]}``
+    приходит по кускам. Как только значение поля верхнего уровня полностью
+    получено, оно разбирается и попадает в fields - не дожидаясь конца ответа.
+    Текст до объекта (блок <think>, markdown-ограда, пояснения) пропускается.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.fields: Dict[str, Any] = {}
+        self.complete = False
+        self.failed = False
+        self._pos = 0
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect_key = True
+        self._key: Optional[str] = None
+        self._key_start: Optional[int] = None
+        self._value_start: Optional[int] = None
+
+    def feed(self, chunk: str) -> List[str]:
+        """
+        Добавить кусок ответа
+
+        Returns:
+            Имена полей верхнего уровня, полностью полученных в этом куске
+        """
+        self.buffer += chunk
+        if self.complete or self.failed:
+            return []
+
+        completed: List[str] = []
+        buf = self.buffer
+        i = self._pos
+        while i < len(buf):
+            c = buf[i]
+
+            if not self._started:
+                if c == "<" and buf.startswith(THINK_OPEN[:len(buf) - i], i):
+                    if len(buf) - i < len(THINK_OPEN):
+                        break  # Тег пришел не полностью - ждем следующий кусок
+                    end = buf.find(THINK_CLOSE, i)
+                    if end == -1:
+                        break
+                    i = end + len(THINK_CLOSE)
+                    continue
+                if c == "{":
+                    self._started = True
+                    self._depth = 1
+                i += 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._key_start is not None:
+                        self._key = json.loads(buf[self._key_start:i + 1])
+                        self._key_start = None
+                i += 1
+                continue
+
+            if c == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expect_key:
+                    self._key_start = i
+            elif c == ":" and self._depth == 1 and self._expect_key:
+                self._expect_key = False
+                self._value_start = i + 1
+            elif c in "{[":
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    if not self._finish_field(buf, i, completed):
+                        break
+                    self.complete = True
+                    i += 1
+                    break
+            elif c == "," and self._depth == 1:
+                if not self._finish_field(buf, i, completed):
+                    break
+            i += 1
+
+        self._pos = i
+        return completed
+
+    def _finish_field(self, buf: str, end: int, completed: List[str]) -> bool:
+        """Разобрать значение текущего поля; False при невалидном JSON"""
+        if self._key is not None and self._value_start is not None:
+            raw_value = buf[self._value_start:end].strip()
+            try:
+                self.fields[self._key] = json.loads(raw_value)
+            except json.JSONDecodeError as e:
+                logger.debug(f"Не удалось разобрать поле '{self._key}' потокового ответа: {e}")
+                self.failed = True
+                return False
+            completed.append(self._key)
+        self._key = None
+        self._value_start = None
+        self._expect_key = True
+        return True
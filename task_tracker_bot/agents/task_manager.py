@@ -2,10 +2,12 @@
 ATM (Agent Task Manager) - управление задачами и проектами
 """
 
+import json
 import logging
 from typing import Dict, Any, Optional, List
 from datetime import date
 from .base_agent import BaseAgent
+from config import Config
 
 logger = logging.getLogger(__name__)
 
@@ -174,7 +176,8 @@ class TaskManagerAgent(BaseAgent):
         workspace_id: int,
         user_id: int,
         tasks: List[Dict[str, Any]],
-        default_date: Optional[date] = None
+        default_date: Optional[date] = None,
+        classify_with_llm: Optional[bool] = None
     ) -> Dict[str, Any]:
         """
         Создает пакет задач (личные + рабочие)
@@ -184,6 +187,8 @@ class TaskManagerAgent(BaseAgent):
             user_id: ID пользователя
             tasks: Список задач из entities.tasks
             default_date: Дата по умолчанию
+            classify_with_llm: Уточнять неоднозначные строки одним вызовом модели
+                (None - по Config.TODO_LLM_CLASSIFICATION)
         
         Returns:
             {
@@ -205,12 +210,16 @@ class TaskManagerAgent(BaseAgent):
             f"tasks_count={len(tasks)}, default_date={default_date}"
         )
         
+        if classify_with_llm is None:
+            classify_with_llm = Config.TODO_LLM_CLASSIFICATION
+        
         # Используем TodoService через data_manager
         result = self.data_manager.create_todo_batch(
             workspace_id=workspace_id,
             user_id=user_id,
             tasks=tasks,
-            default_date=default_date
+            default_date=default_date,
+            refine_classification=self.classify_todo_lines if classify_with_llm else None
         )
         
         logger.info(
@@ -222,4 +231,65 @@ class TaskManagerAgent(BaseAgent):
         )
         
         return result
+    
+    def classify_todo_lines(self, items: List[Dict[str, Any]], workspace_id: int) -> Dict[int, Dict[str, Any]]:
+        """
+        Отнести неоднозначные строки туду-листа к проектам одним вызовом модели
+        
+        Модель получает массив строк и проекты пространства и возвращает
+        массив с проектом и уверенностью для каждой строки. Ответы с
+        уверенностью ниже Config.TODO_LLM_MIN_CONFIDENCE и с проектами не из
+        пространства отбрасываются - для таких строк остается результат правил.
+        
+        Args:
+            items: [{"index": индекс строки, "text": текст}]
+            workspace_id: ID пространства
+        
+        Returns:
+            {индекс строки: классификация в формате TaskClassifier}
+        """
+        projects = {
+            str(project.id): project
+            for project in self.data_manager.project_repo.get_all_by_workspace(workspace_id)
+        }
+        if not items or not projects:
+            return {}
+        
+        request = {
+            "projects": [{"id": project_id, "name": project.name} for project_id, project in projects.items()],
+            "lines": items
+        }
+        prompt = (
+            "Отнеси каждую строку туду-листа к проекту из списка или оставь личной.\n"
+            "Ответь JSON: {\"items\": [{\"index\": 0, \"project_id\": \"5001\" или null, "
+            "\"title\": \"заголовок без кода проекта\", \"confidence\": 0.0-1.0}]} "
+            "- по одному элементу на каждую строку.\n\n"
+            + json.dumps(request, ensure_ascii=False)
+        )
+        result = self.process(prompt, intent="classify_todo")
+        
+        texts = {item["index"]: item["text"] for item in items}
+        classifications: Dict[int, Dict[str, Any]] = {}
+        for item in result.get("items") or []:
+            if not isinstance(item, dict) or item.get("index") not in texts:
+                continue
+            try:
+                confidence = float(item.get("confidence") or 0)
+            except (TypeError, ValueError):
+                continue
+            project_id = item.get("project_id")
+            if confidence < Config.TODO_LLM_MIN_CONFIDENCE or str(project_id) not in projects:
+                continue
+            classifications[item["index"]] = {
+                "type": "work",
+                "project_id": str(project_id),
+                "title": item.get("title") or texts[item["index"]],
+                "description": None
+            }
+        
+        logger.info(
+            f"Классификация строк моделью: запрошено {len(items)}, "
+            f"отнесено к проектам {len(classifications)}"
+        )
+        return classifications
 
@@ -2,7 +2,10 @@
 Главный файл для запуска Advanced Telegram Task Tracker Bot
 """
 import os
+import re
 import logging
+import secrets
+from typing import Any, Dict
 from dotenv import load_dotenv
 from telegram import Update
 from telegram.ext import Application, CommandHandler, MessageHandler, CallbackQueryHandler, filters, ConversationHandler, ContextTypes
@@ -24,11 +27,13 @@ from handlers.dependency import dependencies_command, newdependency_command, del
 from handlers.field import newfield_command, addfield_command
 from handlers.tag import newtag_command, addtag_command, deltag_command
 from handlers.statistics import stats_command, statsproject_command, statsboard_command
+from handlers.admin import metrics_command
 from handlers.menu_buttons import handle_menu_button
-from handlers.ai_handler import ai_command, handle_ai_message
+from handlers.ai_handler import ai_command, handle_ai_message, shutdown_ai_dispatcher
 from handlers.todo_handler import (
-    todo_command, handle_todo_date_callback, 
-    handle_todo_navigation, handle_mark_todo_completed
+    todo_command, week_command, month_command, handle_todo_date_callback, 
+    handle_todo_navigation, handle_mark_todo_completed,
+    handle_todo_calendar_callback, handle_todo_day_callback, handle_todo_refresh
 )
 from callbacks.handle_callbacks import handle_callback_query
 
@@ -122,7 +127,12 @@ def setup_handlers(application: Application) -> None:
     
     # Обработка AI запросов (естественный язык) - РАНЬШЕ других обработчиков группы 1
     # Должен быть перед обработчиком workspace_name_input, чтобы не блокировать AI запросы
-    application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_ai_message), group=1)
+    # Блокирующий: следующие обновления чата (кнопки меню группы 2 и т.п.) ждут ответа AI
+    # и не меняют user_data во время запроса. Чаты обрабатываются параллельно update_processor
+    application.add_handler(
+        MessageHandler(filters.TEXT & ~filters.COMMAND, handle_ai_message),
+        group=1
+    )
     
     # Обработка ввода названия пространства через кнопку (вне ConversationHandler)
     async def handle_workspace_name_input(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -192,6 +202,8 @@ def setup_handlers(application: Application) -> None:
     
     # Todo List
     application.add_handler(CommandHandler("todo", todo_command))
+    application.add_handler(CommandHandler("week", week_command))
+    application.add_handler(CommandHandler("month", month_command))
     
     # Зависимости досок
     application.add_handler(CommandHandler("dependencies", dependencies_command))
@@ -212,6 +224,9 @@ def setup_handlers(application: Application) -> None:
     application.add_handler(CommandHandler("statsproject", statsproject_command))
     application.add_handler(CommandHandler("statsboard", statsboard_command))
     
+    # Администрирование
+    application.add_handler(CommandHandler("metrics", metrics_command))
+    
     # Обработка inline-кнопок для туду-листа (до общего обработчика)
     async def handle_todo_callbacks(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Обработка callbacks для туду-листа"""
@@ -228,17 +243,12 @@ def setup_handlers(application: Application) -> None:
             await handle_todo_date_callback(update, context)
         elif callback_data.startswith("todo_complete_"):
             await handle_mark_todo_completed(update, context)
+        elif callback_data.startswith("todo_cal_"):
+            await handle_todo_calendar_callback(update, context)
+        elif callback_data.startswith("todo_day_"):
+            await handle_todo_day_callback(update, context)
         elif callback_data.startswith("todo_refresh_"):
-            # Извлечь дату из callback_data и вызвать todo_command
-            date_str = callback_data.replace("todo_refresh_", "")
-            from datetime import datetime
-            try:
-                target_date = datetime.fromisoformat(date_str).date()
-                # Создаем временный context.args для передачи даты
-                context.args = [target_date.strftime("%d.%m.%Y")]
-                await todo_command(update, context)
-            except ValueError:
-                await query.answer("❌ Некорректная дата", show_alert=True)
+            await handle_todo_refresh(update, context)
         else:
             # Передаем обработку общему обработчику
             await handle_callback_query(update, context)
@@ -252,6 +262,52 @@ def setup_handlers(application: Application) -> None:
     # Должен быть последним, чтобы не перехватывать другие сообщения
     application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_menu_button), group=2)
 
+# Эндпоинт метрик для Prometheus (если задан METRICS_PORT)
+metrics_server = None
+
+async def _post_shutdown(application: Application) -> None:
+    """Остановить пул AI-воркеров, эндпоинт метрик и закрыть соединения к io.net API"""
+    from agents.llm_client import close_async_client
+    shutdown_ai_dispatcher()
+    if metrics_server is not None:
+        metrics_server.stop()
+    await close_async_client()
+
+# Типы обновлений, которые бот получает от Telegram
+ALLOWED_UPDATES = ["message", "callback_query"]
+
+# Допустимые символы секрета вебхука по Bot API
+SECRET_TOKEN_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,256}$")
+
+def webhook_settings() -> Dict[str, Any]:
+    """
+    Параметры Application.run_webhook из конфигурации
+    
+    Запросы без заголовка X-Telegram-Bot-Api-Secret-Token с секретом
+    отклоняются встроенным сервером (403). Если WEBHOOK_SECRET_TOKEN не
+    задан, секрет генерируется при запуске и передается Telegram в setWebhook.
+    
+    Raises:
+        ValueError: не задан WEBHOOK_URL или секрет содержит недопустимые символы
+    """
+    if not Config.WEBHOOK_URL:
+        raise ValueError("WEBHOOK_URL не задан для BOT_MODE=webhook")
+    
+    secret_token = Config.WEBHOOK_SECRET_TOKEN or secrets.token_urlsafe(32)
+    if not SECRET_TOKEN_PATTERN.match(secret_token):
+        raise ValueError("WEBHOOK_SECRET_TOKEN: допустимы 1-256 символов A-Z, a-z, 0-9, _ и -")
+    
+    url_path = Config.WEBHOOK_PATH.strip("/")
+    return {
+        "listen": Config.WEBHOOK_LISTEN,
+        "port": Config.WEBHOOK_PORT,
+        "url_path": url_path,
+        "webhook_url": f"{Config.WEBHOOK_URL.rstrip('/')}/{url_path}",
+        "secret_token": secret_token,
+        "allowed_updates": ALLOWED_UPDATES,
+        "max_connections": Config.WEBHOOK_MAX_CONNECTIONS
+    }
+
 def main() -> None:
     """Главная функция запуска бота"""
     load_dotenv()
@@ -259,6 +315,9 @@ def main() -> None:
     token = Config.BOT_TOKEN
     if not token:
         raise ValueError("BOT_TOKEN не найден в переменных окружения!")
+    if Config.BOT_MODE not in ("polling", "webhook"):
+        raise ValueError(f"Неизвестный BOT_MODE: {Config.BOT_MODE} (polling или webhook)")
+    settings = webhook_settings() if Config.BOT_MODE == "webhook" else None
     
     # Инициализация БД
     db = Database()
@@ -285,15 +344,36 @@ def main() -> None:
         import traceback
         logger.warning(traceback.format_exc())
     
-    # Создание приложения
-    application = Application.builder().token(token).build()
+    # Эндпоинт метрик
+    global metrics_server
+    if Config.METRICS_PORT:
+        from utils.metrics import MetricsServer, metrics
+        metrics_server = MetricsServer(metrics, Config.METRICS_HOST, Config.METRICS_PORT).start()
+    
+    # Создание приложения: чаты обрабатываются параллельно, обновления одного чата - по порядку
+    from utils.update_processor import update_processor
+    application = (
+        Application.builder()
+        .token(token)
+        .concurrent_updates(update_processor)
+        .post_shutdown(_post_shutdown)
+        .build()
+    )
     
     # Регистрация обработчиков
     setup_handlers(application)
     
-    # Запуск бота
-    logger.info("Бот запущен и готов к работе!")
-    application.run_polling(allowed_updates=["message", "callback_query"])
+    # Запуск бота. По SIGINT/SIGTERM сервер вебхука (или опрос) останавливается,
+    # обновления из очереди дообрабатываются, затем вызывается _post_shutdown
+    if settings is not None:
+        logger.info(
+            f"Бот запущен в режиме webhook: {settings['listen']}:{settings['port']}/{settings['url_path']} "
+            f"-> {settings['webhook_url']}"
+        )
+        application.run_webhook(**settings)
+    else:
+        logger.info("Бот запущен и готов к работе!")
+        application.run_polling(allowed_updates=ALLOWED_UPDATES)
 
 if __name__ == "__main__":
     main()
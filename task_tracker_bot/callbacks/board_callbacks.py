@@ -3,23 +3,17 @@ Callbacks для работы с досками
 """
 from telegram import Update
 from telegram.ext import ContextTypes
-from database import Database
-from repositories.board_repository import BoardRepository
-from repositories.workspace_repository import WorkspaceRepository
-from repositories.task_repository import TaskRepository
-from services.board_service import BoardService
-from services.task_service import TaskService
-from repositories.column_repository import ColumnRepository
+from services.container import container
 from utils.formatters import format_board_view, format_board_list, format_task
 from utils.keyboards import board_keyboard, columns_keyboard, main_menu_keyboard, task_card_keyboard
 
-db = Database()
-board_repo = BoardRepository(db)
-column_repo = ColumnRepository(db)
-workspace_repo = WorkspaceRepository(db)
-task_repo = TaskRepository(db)
-board_service = BoardService(board_repo, column_repo)
-task_service = TaskService(task_repo, column_repo)
+db = container.db
+board_repo = container.board_repo
+column_repo = container.column_repo
+workspace_repo = container.workspace_repo
+task_repo = container.task_repo
+board_service = container.board_service
+task_service = container.task_service
 
 # Для использования в других функциях
 def get_board_service():
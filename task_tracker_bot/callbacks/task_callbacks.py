@@ -3,38 +3,23 @@ Callbacks для работы с задачами
 """
 from telegram import Update
 from telegram.ext import ContextTypes
-from database import Database
-from repositories.task_repository import TaskRepository
-from services.task_service import TaskService
-from repositories.column_repository import ColumnRepository
-from utils.formatters import format_task
+from services.container import container
+from utils.formatters import format_task, format_task_tree
 from utils.keyboards import task_actions_keyboard, priority_keyboard, confirm_delete_keyboard
 
 # Инициализация
-db = Database()
-task_repo = TaskRepository(db)
-column_repo = ColumnRepository(db)
-from repositories.board_repository import BoardRepository
-from repositories.board_dependency_repository import BoardDependencyRepository
-from repositories.project_repository import ProjectRepository
-from repositories.task_assignee_repository import TaskAssigneeRepository
-from repositories.project_member_repository import ProjectMemberRepository
-from services.dependency_service import DependencyService
-from services.assignment_service import AssignmentService
-
-board_repo = BoardRepository(db)
-dependency_repo = BoardDependencyRepository(db)
-project_repo = ProjectRepository(db)
-assignee_repo = TaskAssigneeRepository(db)
-member_repo = ProjectMemberRepository(db)
-
-dependency_service = DependencyService(
-    dependency_repo, task_repo, project_repo, column_repo, board_repo
-)
-assignment_service = AssignmentService(
-    assignee_repo, member_repo, task_repo, project_repo, column_repo, board_repo
-)
-task_service = TaskService(task_repo, column_repo, dependency_service, assignment_service)
+db = container.db
+task_repo = container.task_repo
+column_repo = container.column_repo
+board_repo = container.board_repo
+dependency_repo = container.dependency_repo
+project_repo = container.project_repo
+assignee_repo = container.assignee_repo
+member_repo = container.member_repo
+
+dependency_service = container.dependency_service
+assignment_service = container.assignment_service
+task_service = container.workflow_task_service
 
 async def handle_task_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Обработка callback для задач"""
@@ -64,8 +49,6 @@ async def handle_task_callback(update: Update, context: ContextTypes.DEFAULT_TYP
         task_id = int(data.split("_")[2])
         task = task_service.get_task(task_id)
         if task:
-            from repositories.board_repository import BoardRepository
-            board_repo = BoardRepository(db)
             text = format_task(task, column_repo, board_repo)
             await query.edit_message_text(
                 f"❌ <b>Удаление отменено</b>\n\n{text}",
@@ -100,8 +83,6 @@ async def handle_edit_task(query, task_id: int):
         await query.edit_message_text("❌ Задача не найдена")
         return
     
-    from repositories.board_repository import BoardRepository
-    board_repo = BoardRepository(db)
     await query.edit_message_text(
         f"✏️ <b>Редактирование задачи:</b>\n\n{format_task(task, column_repo, board_repo)}\n\n"
         f"<b>Используйте команды:</b>\n"
@@ -119,8 +100,6 @@ async def handle_delete_task(query, task_id: int):
         await query.edit_message_text("❌ Задача не найдена")
         return
     
-    from repositories.board_repository import BoardRepository
-    board_repo = BoardRepository(db)
     await query.edit_message_text(
         f"⚠️ <b>Вы уверены, что хотите удалить задачу?</b>\n\n{format_task(task, column_repo, board_repo)}",
         reply_markup=confirm_delete_keyboard(task_id),
@@ -142,8 +121,6 @@ async def handle_priority_task(query, task_id: int):
         await query.edit_message_text("❌ Задача не найдена")
         return
     
-    from repositories.board_repository import BoardRepository
-    board_repo = BoardRepository(db)
     await query.edit_message_text(
         f"🔴 <b>Выберите приоритет для задачи:</b>\n\n{format_task(task, column_repo, board_repo)}",
         reply_markup=priority_keyboard(task_id),
@@ -156,8 +133,6 @@ async def handle_set_priority(query, task_id: int, priority: int):
     if success:
         priority_names = {0: 'Низкий', 1: 'Средний', 2: 'Высокий', 3: 'Критический'}
         task = task_service.get_task(task_id)
-        from repositories.board_repository import BoardRepository
-        board_repo = BoardRepository(db)
         await query.edit_message_text(
             f"✅ <b>Приоритет установлен: {priority_names[priority]}</b>\n\n{format_task(task, column_repo, board_repo)}",
             reply_markup=task_actions_keyboard(task_id),
@@ -178,8 +153,6 @@ async def handle_move_task(query, task_id: int):
         await query.edit_message_text("❌ Колонка не найдена")
         return
     
-    from repositories.board_repository import BoardRepository
-    board_repo = BoardRepository(db)
     from callbacks.board_callbacks import get_board_service
     board_service = get_board_service()
     board = board_repo.get_by_id(column.board_id)
@@ -217,12 +190,10 @@ async def handle_tags_task(query, task_id: int):
     )
 
 async def handle_subtasks_task(query, task_id: int):
-    """Обработка подзадач"""
-    subtasks = task_service.get_subtasks(task_id)
-    if subtasks:
-        text = f"<b>📋 Подзадачи:</b>\n\n"
-        for subtask in subtasks:
-            text += f"• {subtask.priority_emoji} {subtask.title}\n"
+    """Обработка подзадач (все уровни вложенности одним запросом)"""
+    tree = task_service.get_task_tree(task_id)
+    if tree and tree["subtask_count"]:
+        text = format_task_tree(tree)
     else:
         text = "📭 Подзадач пока нет\n\nИспользуйте команду:\n<code>/newsubtask &lt;parent_id&gt; &lt;название&gt;</code>"
     
@@ -235,9 +206,7 @@ async def handle_show_task(query, task_id: int):
         await query.edit_message_text("❌ Задача не найдена")
         return
     
-    from repositories.board_repository import BoardRepository
-    board_repo = BoardRepository(db)
-    text = format_task(task, column_repo, board_repo)
+    text = format_task(task, column_repo, board_repo, task_service.get_task_tree(task_id))
     await query.edit_message_text(
         text,
         reply_markup=task_actions_keyboard(task_id),
@@ -251,8 +220,6 @@ async def handle_move_to_column(query, task_id: int, column_id: int):
     if success:
         task = task_service.get_task(task_id)
         column = column_repo.get_by_id(column_id)
-        from repositories.board_repository import BoardRepository
-        board_repo = BoardRepository(db)
         text = format_task(task, column_repo, board_repo)
         await query.edit_message_text(
             f"✅ <b>Задача перемещена в колонку '{column.name if column else 'Неизвестно'}'</b>\n\n{text}",
@@ -3,15 +3,13 @@ Callbacks для работы с пространствами
 """
 from telegram import Update
 from telegram.ext import ContextTypes
-from database import Database
-from repositories.workspace_repository import WorkspaceRepository
-from services.workspace_service import WorkspaceService
+from services.container import container
 from utils.formatters import format_workspace_list
 from utils.keyboards import workspace_keyboard, main_menu_keyboard
 
-db = Database()
-workspace_repo = WorkspaceRepository(db)
-workspace_service = WorkspaceService(workspace_repo)
+db = container.db
+workspace_repo = container.workspace_repo
+workspace_service = container.workspace_service
 
 async def handle_workspace_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Обработка callback для пространств"""
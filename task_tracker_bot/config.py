@@ -11,15 +11,61 @@ class Config:
     DATABASE_PATH = os.getenv("DATABASE_PATH", "data/tasks.db")
     TASKS_PER_PAGE = int(os.getenv("TASKS_PER_PAGE", "10"))
     TIMEZONE = os.getenv("TIMEZONE", "Europe/Moscow")
+    BOT_MODE = os.getenv("BOT_MODE", "polling").lower()  # polling | webhook
+    WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")  # Публичный HTTPS-адрес для Telegram (без пути), обязателен для webhook
+    WEBHOOK_LISTEN = os.getenv("WEBHOOK_LISTEN", "127.0.0.1")  # Адрес локального сервера (за reverse proxy)
+    WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8443"))
+    WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "telegram")  # Путь эндпоинта обновлений
+    WEBHOOK_SECRET_TOKEN = os.getenv("WEBHOOK_SECRET_TOKEN", "")  # Проверяется в X-Telegram-Bot-Api-Secret-Token (пусто - случайный при запуске)
+    WEBHOOK_MAX_CONNECTIONS = int(os.getenv("WEBHOOK_MAX_CONNECTIONS", "40"))  # Одновременных соединений Telegram к вебхуку
+    UPDATE_MAX_CONCURRENCY = int(os.getenv("UPDATE_MAX_CONCURRENCY", "16"))  # Чатов, обновления которых обрабатываются одновременно (1 - по очереди)
     
     # io.net AI API настройки
     IO_NET_API_KEY = os.getenv("IO_NET_API_KEY")
     IO_NET_MODEL = os.getenv("IO_NET_MODEL", "deepseek-ai/DeepSeek-R1-0528")
     IO_NET_TEMPERATURE = float(os.getenv("IO_NET_TEMPERATURE", "0.3"))
     IO_NET_MAX_TOKENS = int(os.getenv("IO_NET_MAX_TOKENS", "2000"))
+    IO_NET_MAX_TOKENS_BY_INTENT = os.getenv("IO_NET_MAX_TOKENS_BY_INTENT", "")  # "query_data:800,add_todo_batch:4000"
+    IO_NET_FAST_MODEL = os.getenv("IO_NET_FAST_MODEL", "")  # Быстрая модель для первого прохода (пусто - все агенты на IO_NET_MODEL)
+    MODEL_ROUTES = os.getenv("MODEL_ROUTES", "OrchestratorAgent:fast,TaskManagerAgent.classify_todo:fast")  # Агент[.intent]:fast|reasoning|модель
+    MODEL_ESCALATION_CONFIDENCE = float(os.getenv("MODEL_ESCALATION_CONFIDENCE", "0.6"))  # Ниже - повтор анализа на IO_NET_MODEL
+    MODEL_STATS_WINDOW = float(os.getenv("MODEL_STATS_WINDOW", "300"))  # Секунд скользящей статистики задержек моделей
+    MODEL_STATS_MIN_CALLS = int(os.getenv("MODEL_STATS_MIN_CALLS", "5"))  # Вызовов в окне для решения о быстрой модели
+    MODEL_FAST_MAX_ERROR_RATE = float(os.getenv("MODEL_FAST_MAX_ERROR_RATE", "0.5"))  # Доля ошибок, при которой быстрая модель пропускается
     IO_NET_API_URL = os.getenv("IO_NET_API_URL", "https://api.intelligence.io.solutions/api/v1/chat/completions")
     IO_NET_TIMEOUT = int(os.getenv("IO_NET_TIMEOUT", "60"))
     IO_NET_RETRY_COUNT = int(os.getenv("IO_NET_RETRY_COUNT", "3"))
     IO_NET_RETRY_DELAY = float(os.getenv("IO_NET_RETRY_DELAY", "1.0"))
+    IO_NET_CONNECT_TIMEOUT = float(os.getenv("IO_NET_CONNECT_TIMEOUT", "10"))
+    IO_NET_POOL_SIZE = int(os.getenv("IO_NET_POOL_SIZE", "10"))  # Максимум соединений в пуле
+    IO_NET_KEEPALIVE = int(os.getenv("IO_NET_KEEPALIVE", "5"))  # Сколько соединений держать открытыми
+    IO_NET_STREAMING = os.getenv("IO_NET_STREAMING", "true").lower() == "true"  # Потоковые ответы (SSE) для анализа запросов
+    IO_NET_CASSETTE_MODE = os.getenv("IO_NET_CASSETTE_MODE", "off")  # off / record / replay - запись и воспроизведение ответов API
+    IO_NET_CASSETTE_PATH = os.getenv("IO_NET_CASSETTE_PATH", "data/cassettes/io_net.jsonl")
+    CIRCUIT_WINDOW = int(os.getenv("CIRCUIT_WINDOW", "20"))  # Последних вызовов API в окне размыкателя
+    CIRCUIT_MIN_CALLS = int(os.getenv("CIRCUIT_MIN_CALLS", "5"))  # Минимум вызовов в окне для решения
+    CIRCUIT_FAILURE_RATE = float(os.getenv("CIRCUIT_FAILURE_RATE", "0.5"))  # Доля ошибок для размыкания
+    CIRCUIT_SLOW_CALL_SECONDS = float(os.getenv("CIRCUIT_SLOW_CALL_SECONDS", "45"))  # Медленный ответ API
+    CIRCUIT_SLOW_RATE = float(os.getenv("CIRCUIT_SLOW_RATE", "0.8"))  # Доля медленных ответов для размыкания
+    CIRCUIT_OPEN_SECONDS = float(os.getenv("CIRCUIT_OPEN_SECONDS", "30"))  # Пауза до пробного вызова
     ORCHESTRATOR_CACHE_TTL = int(os.getenv("ORCHESTRATOR_CACHE_TTL", "300"))
-
+    ORCHESTRATOR_CACHE_SIZE = int(os.getenv("ORCHESTRATOR_CACHE_SIZE", "500"))  # Записей в памяти
+    AI_MAX_CONCURRENCY = int(os.getenv("AI_MAX_CONCURRENCY", "4"))  # Одновременно обрабатываемых AI-запросов
+    AI_WORKER_THREADS = int(os.getenv("AI_WORKER_THREADS", "4"))  # Потоков для шагов плана
+    AI_PROGRESS_EDIT_INTERVAL = float(os.getenv("AI_PROGRESS_EDIT_INTERVAL", "1.5"))  # Минимум секунд между правками статуса
+    PLAN_MAX_PARALLEL_STEPS = int(os.getenv("PLAN_MAX_PARALLEL_STEPS", "4"))  # Параллельных шагов одного плана
+    INTENT_FAST_PATH = os.getenv("INTENT_FAST_PATH", "true").lower() == "true"  # Разбор типовых запросов без LLM
+    SPECULATIVE_PREFETCH = os.getenv("SPECULATIVE_PREFETCH", "true").lower() == "true"  # Читать данные для плана, пока думает оркестратор
+    PREFETCH_MAX_WORKERS = int(os.getenv("PREFETCH_MAX_WORKERS", "2"))  # Потоков упреждающего чтения (отдельно от шагов плана)
+    PREFETCH_MAX_PENDING = int(os.getenv("PREFETCH_MAX_PENDING", "8"))  # Ожидающих упреждающих чтений, лишние пропускаются
+    ANALYTICS_CACHE_TTL = int(os.getenv("ANALYTICS_CACHE_TTL", "60"))  # Секунд хранения метрик AAM по пространству
+    ACM_SYNC_VALIDATION_INTENTS = {x.strip() for x in os.getenv("ACM_SYNC_VALIDATION_INTENTS", "").split(",") if x.strip()}  # Интенты с проверкой ACM до ответа (остальные - после)
+    METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))  # Порт HTTP-эндпоинта /metrics (0 - выключен)
+    METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+    ADMIN_USER_IDS = {int(x) for x in os.getenv("ADMIN_USER_IDS", "").split(",") if x.strip().isdigit()}  # Telegram ID администраторов
+    
+    # Todo List
+    TODO_WINDOW_TTL = int(os.getenv("TODO_WINDOW_TTL", "120"))
+    TODO_CACHE_TTL = int(os.getenv("TODO_CACHE_TTL", "300"))
+    TODO_LLM_CLASSIFICATION = os.getenv("TODO_LLM_CLASSIFICATION", "false").lower() == "true"  # Уточнять неоднозначные строки пакета одним вызовом модели
+    TODO_LLM_MIN_CONFIDENCE = float(os.getenv("TODO_LLM_MIN_CONFIDENCE", "0.7"))  # Ниже - остается результат правил
@@ -235,4 +235,18 @@ class Database:
                 CREATE INDEX IF NOT EXISTS idx_project_field_sync_project_id 
                 ON project_field_sync(project_id)
             """)
+            
+            # Таблица: plan_cache (постоянный кэш планов оркестратора)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS plan_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    plan_json TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_plan_cache_expires_at 
+                ON plan_cache(expires_at)
+            """)
 
@@ -0,0 +1,36 @@
+"""
+Handlers для администраторов бота
+"""
+from io import BytesIO
+from telegram import Update
+from telegram.ext import ContextTypes
+from config import Config
+from utils.metrics import metrics
+
+# Метрики короче этого отправляются сообщением, длиннее - файлом
+MAX_INLINE_METRICS_LENGTH = 3500
+
+
+def is_admin(user_id: int) -> bool:
+    """Пользователь указан в ADMIN_USER_IDS"""
+    return user_id in Config.ADMIN_USER_IDS
+
+
+async def metrics_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Метрики агентов в формате Prometheus"""
+    if not is_admin(update.effective_user.id):
+        await update.message.reply_text("❌ Команда доступна только администраторам")
+        return
+
+    text = metrics.render_prometheus()
+    if len(text) <= MAX_INLINE_METRICS_LENGTH:
+        await update.message.reply_text(f"<pre>{_escape_html(text)}</pre>", parse_mode="HTML")
+        return
+
+    document = BytesIO(text.encode("utf-8"))
+    document.name = "metrics.prom"
+    await update.message.reply_document(document=document, caption="📊 Метрики агентов (Prometheus)")
+
+
+def _escape_html(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
@@ -2,29 +2,157 @@
 AI Handler для обработки естественных запросов через систему агентов
 """
 
+import time
+import asyncio
 import logging
+from typing import Optional
 from telegram import Update
+from telegram.error import RetryAfter, TelegramError
 from telegram.ext import ContextTypes
 from agents.agent_coordinator import AgentCoordinator
-from database import Database
-from repositories.workspace_repository import WorkspaceRepository
+from agents.ai_dispatcher import AIDispatcher, UserBusyError
+from config import Config
+from services.container import container
 
 logger = logging.getLogger(__name__)
 
 # Глобальный экземпляр координатора (инициализируется при первом использовании)
 _agent_coordinator = None
 
+# Глобальный диспетчер AI-запросов (лимит параллелизма и очередь)
+_ai_dispatcher = None
+
+PROCESSING_TEXT = "🤔 Обрабатываю запрос..."
+
+
+def _retry_after_seconds(error: RetryAfter) -> float:
+    """Пауза из RetryAfter (int или timedelta в зависимости от версии PTB)"""
+    retry_after = error.retry_after
+    return retry_after.total_seconds() if hasattr(retry_after, "total_seconds") else float(retry_after)
+
+
+class ThrottledStatusMessage:
+    """
+    Сообщение со статусом обработки, которое правится не чаще min_interval
+    
+    Telegram ограничивает частоту правок сообщений в чате, поэтому
+    промежуточные статусы схлопываются: показывается последний из пришедших
+    за интервал. Итоговый ответ выставляется через finish.
+    """
+    
+    def __init__(self, message, min_interval: Optional[float] = None):
+        self.message = message
+        self.min_interval = min_interval if min_interval is not None else Config.AI_PROGRESS_EDIT_INTERVAL
+        self._shown = message.text if isinstance(getattr(message, "text", None), str) else None
+        self._pending: Optional[str] = None
+        self._next_edit_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+    
+    async def update(self, text: str) -> None:
+        """Показать статус (сразу или по истечении интервала)"""
+        self._pending = text
+        if self._task is not None and not self._task.done():
+            return
+        delay = self._next_edit_at - time.monotonic()
+        if delay <= 0:
+            await self._flush()
+        else:
+            self._task = asyncio.create_task(self._flush_later(delay))
+    
+    async def _flush_later(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        await self._flush()
+    
+    async def _flush(self) -> None:
+        text, self._pending = self._pending, None
+        if text is None or text == self._shown:
+            return
+        self._next_edit_at = time.monotonic() + self.min_interval
+        try:
+            await self.message.edit_text(text)
+            self._shown = text
+        except RetryAfter as e:
+            seconds = _retry_after_seconds(e)
+            self._next_edit_at = time.monotonic() + seconds
+            if self._pending is None:
+                self._pending = text
+            self._task = asyncio.create_task(self._flush_later(seconds))
+            logger.debug(f"Правка статуса отложена Telegram на {seconds}s")
+        except TelegramError as e:
+            logger.debug(f"Не удалось обновить статус обработки: {e}")
+    
+    def cancel(self) -> None:
+        """Отменить отложенную правку статуса"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._pending = None
+    
+    async def finish(self, text: str) -> None:
+        """Показать итоговый текст (отложенные статусы отбрасываются)"""
+        self.cancel()
+        try:
+            await self.message.edit_text(text)
+        except RetryAfter as e:
+            await asyncio.sleep(_retry_after_seconds(e))
+            await self.message.edit_text(text)
+        self._shown = text
+
 
 def get_agent_coordinator() -> AgentCoordinator:
     """Получить или создать экземпляр AgentCoordinator"""
     global _agent_coordinator
     if _agent_coordinator is None:
-        db = Database()
-        _agent_coordinator = AgentCoordinator(db=db)
+        _agent_coordinator = AgentCoordinator()
         logger.info("AgentCoordinator создан")
     return _agent_coordinator
 
 
+def get_ai_dispatcher() -> AIDispatcher:
+    """Получить или создать диспетчер AI-запросов"""
+    global _ai_dispatcher
+    if _ai_dispatcher is None:
+        _ai_dispatcher = AIDispatcher()
+        logger.info(f"AIDispatcher создан (лимит: {_ai_dispatcher.max_concurrency})")
+    return _ai_dispatcher
+
+
+def shutdown_ai_dispatcher() -> None:
+    """Остановить пул потоков диспетчера (при остановке бота)"""
+    global _ai_dispatcher
+    if _ai_dispatcher is not None:
+        _ai_dispatcher.shutdown()
+        _ai_dispatcher = None
+
+
+async def deliver_deferred_validation(
+    coordinator: AgentCoordinator,
+    pending_validation: dict,
+    message,
+    response_text: str,
+    executor=None
+) -> None:
+    """
+    Выполнить отложенную проверку ACM и дописать предупреждения к ответу
+    
+    Args:
+        coordinator: Координатор, вернувший pending_validation
+        pending_validation: Описание проверки из результата обработки
+        message: Отправленное сообщение с ответом
+        response_text: Текст ответа
+        executor: Пул потоков для проверки (None - пул по умолчанию)
+    """
+    try:
+        loop = asyncio.get_running_loop()
+        validation = await loop.run_in_executor(
+            executor, coordinator.run_deferred_validation, pending_validation
+        )
+        warnings = coordinator.format_validation_warnings(validation)
+        if warnings:
+            await message.edit_text(response_text + warnings)
+    except Exception as e:
+        logger.warning(f"Не удалось доставить результат отложенной валидации: {e}")
+
+
 def get_user_workspace(user_id: int, context: ContextTypes.DEFAULT_TYPE) -> int:
     """
     Получить workspace пользователя из user_data или БД
@@ -46,9 +174,7 @@ def get_user_workspace(user_id: int, context: ContextTypes.DEFAULT_TYPE) -> int:
         return workspace_id
     
     # Если workspace не сохранен, получаем из БД
-    db = Database()
-    workspace_repo = WorkspaceRepository(db)
-    workspaces = workspace_repo.get_all_by_user(user_id)
+    workspaces = container.workspace_repo.get_all_by_user(user_id)
     
     if not workspaces:
         raise ValueError("У пользователя нет пространств")
@@ -91,7 +217,6 @@ async def handle_ai_message(update: Update, context: ContextTypes.DEFAULT_TYPE)
     Определяет, является ли сообщение естественным запросом (не командой)
     и обрабатывает его через AgentCoordinator
     """
-    import time
     start_time = time.time()
     
     # Логирование входа в обработчик
@@ -128,19 +253,45 @@ async def handle_ai_message(update: Update, context: ContextTypes.DEFAULT_TYPE)
             )
             return
         
+        dispatcher = get_ai_dispatcher()
+        if dispatcher.is_busy(user_id):
+            await update.message.reply_text(
+                "⏳ Предыдущий запрос еще обрабатывается. Дождитесь ответа и повторите."
+            )
+            return
+        
         # Показать индикатор обработки
-        processing_msg = await update.message.reply_text("🤔 Обрабатываю запрос...")
+        processing_msg = await update.message.reply_text(PROCESSING_TEXT)
+        status_msg = ThrottledStatusMessage(processing_msg)
+        
+        async def show_queue_position(position: int) -> None:
+            await status_msg.update(f"{PROCESSING_TEXT}\n⏳ Место в очереди: {position}")
+        
+        async def show_progress(stage: str) -> None:
+            await status_msg.update(f"{PROCESSING_TEXT}\n{stage}")
         
         # Получить координатор агентов
         coordinator = get_agent_coordinator()
         
-        # Обработать запрос через систему агентов
+        # Обработать запрос через систему агентов (с ожиданием свободного слота)
         logger.debug(f"Отправка запроса в AgentCoordinator: '{text[:100]}...'")
-        result = coordinator.process_user_message(
-            user_message=text,
-            workspace_id=workspace_id,
-            user_id=user_id
-        )
+        try:
+            result = await dispatcher.run(
+                user_id,
+                lambda: coordinator.process_user_message_async(
+                    user_message=text,
+                    workspace_id=workspace_id,
+                    user_id=user_id,
+                    executor=dispatcher.executor,
+                    on_progress=show_progress
+                ),
+                on_position=show_queue_position
+            )
+        except UserBusyError:
+            await status_msg.finish(
+                "⏳ Предыдущий запрос еще обрабатывается. Дождитесь ответа и повторите."
+            )
+            return
         
         elapsed_time = time.time() - start_time
         status = result.get('status', 'unknown')
@@ -167,7 +318,16 @@ async def handle_ai_message(update: Update, context: ContextTypes.DEFAULT_TYPE)
         response_text = coordinator.format_response_for_telegram(result)
         
         # Отправить ответ
-        await processing_msg.edit_text(response_text)
+        await status_msg.finish(response_text)
+        
+        # Проверка ACM после ответа: предупреждения дописываются правкой сообщения
+        pending_validation = result.get("pending_validation")
+        if pending_validation:
+            context.application.create_task(
+                deliver_deferred_validation(
+                    coordinator, pending_validation, processing_msg, response_text, dispatcher.executor
+                )
+            )
         
     except Exception as e:
         elapsed_time = time.time() - start_time
@@ -179,6 +339,8 @@ async def handle_ai_message(update: Update, context: ContextTypes.DEFAULT_TYPE)
         
         # Попытка обновить сообщение обработки, если оно существует
         try:
+            if 'status_msg' in locals():
+                status_msg.cancel()
             if 'processing_msg' in locals():
                 await processing_msg.edit_text(error_msg)
             else:
@@ -3,27 +3,38 @@ Handlers для работы с Board и Column
 """
 from telegram import Update
 from telegram.ext import ContextTypes
-from database import Database
-from repositories.board_repository import BoardRepository
-from repositories.column_repository import ColumnRepository
-from repositories.workspace_repository import WorkspaceRepository
-from repositories.task_repository import TaskRepository
-from services.board_service import BoardService
-from services.task_service import TaskService
+from services.container import container
 from utils.formatters import format_board_list, format_column_list, format_board_view, format_task
 from utils.keyboards import board_keyboard, task_card_keyboard
 from utils.board_visualizer import BoardVisualizer
 
 # Инициализация
-db = Database()
-board_repo = BoardRepository(db)
-column_repo = ColumnRepository(db)
-workspace_repo = WorkspaceRepository(db)
-task_repo = TaskRepository(db)
-board_service = BoardService(board_repo, column_repo)
-task_service = TaskService(task_repo, column_repo)
+db = container.db
+board_repo = container.board_repo
+column_repo = container.column_repo
+workspace_repo = container.workspace_repo
+task_repo = container.task_repo
+board_service = container.board_service
+task_service = container.task_service
+name_resolver = container.name_resolver
 board_visualizer = BoardVisualizer(board_service)
 
+def find_board(workspace_id: int, name: str):
+    """Доска по точному названию, иначе по похожему ("разработки", "Дизйн")"""
+    board = board_service.get_board_by_name(workspace_id, name)
+    if board is None:
+        match = name_resolver.resolve_board(workspace_id, name)
+        if match is not None:
+            board = board_service.get_board(match.entry.id)
+    return board
+
+def board_not_found_text(workspace_id: int, name: str) -> str:
+    """Сообщение "доска не найдена" с похожими названиями"""
+    suggestions = name_resolver.suggest(workspace_id, name, "board")
+    if suggestions:
+        return f"❌ Доска не найдена. Возможно, вы имели в виду: {', '.join(suggestions)}"
+    return "❌ Доска не найдена"
+
 async def boards_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Показать список досок с улучшенным UI"""
     user_id = update.effective_user.id
@@ -121,9 +132,9 @@ async def board_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
     
     workspace_id = workspaces[0].id
     
-    board = board_service.get_board_by_name(workspace_id, name)
+    board = find_board(workspace_id, name)
     if not board:
-        await update.message.reply_text("❌ Доска не найдена")
+        await update.message.reply_text(board_not_found_text(workspace_id, name))
         return
     
     try:
@@ -153,9 +164,9 @@ async def columns_command(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     
     workspace_id = workspaces[0].id
     
-    board = board_service.get_board_by_name(workspace_id, board_name)
+    board = find_board(workspace_id, board_name)
     if not board:
-        await update.message.reply_text("❌ Доска не найдена")
+        await update.message.reply_text(board_not_found_text(workspace_id, board_name))
         return
     
     try:
@@ -255,9 +266,9 @@ async def boardlist_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
     
     workspace_id = workspaces[0].id
     
-    board = board_service.get_board_by_name(workspace_id, name)
+    board = find_board(workspace_id, name)
     if not board:
-        await update.message.reply_text("❌ Доска не найдена")
+        await update.message.reply_text(board_not_found_text(workspace_id, name))
         return
     
     try:
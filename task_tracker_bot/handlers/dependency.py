@@ -3,29 +3,19 @@ Handlers для работы с зависимостями досок
 """
 from telegram import Update
 from telegram.ext import ContextTypes
-from database import Database
-from repositories.board_dependency_repository import BoardDependencyRepository
-from repositories.board_repository import BoardRepository
-from repositories.column_repository import ColumnRepository
-from repositories.workspace_repository import WorkspaceRepository
-from services.dependency_service import DependencyService
-from services.task_service import TaskService
+from services.container import container
 from utils.validators import parse_quoted_args
 
 # Инициализация
-db = Database()
-dependency_repo = BoardDependencyRepository(db)
-board_repo = BoardRepository(db)
-column_repo = ColumnRepository(db)
-workspace_repo = WorkspaceRepository(db)
-from repositories.project_repository import ProjectRepository
-from repositories.task_repository import TaskRepository
-project_repo = ProjectRepository(db)
-task_repo = TaskRepository(db)
+db = container.db
+dependency_repo = container.dependency_repo
+board_repo = container.board_repo
+column_repo = container.column_repo
+workspace_repo = container.workspace_repo
+project_repo = container.project_repo
+task_repo = container.task_repo
 
-dependency_service = DependencyService(
-    dependency_repo, task_repo, project_repo, column_repo, board_repo
-)
+dependency_service = container.dependency_service
 
 async def dependencies_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Показать список зависимостей"""
@@ -3,19 +3,15 @@ Handlers для работы с CustomField
 """
 from telegram import Update
 from telegram.ext import ContextTypes
-from database import Database
-from repositories.custom_field_repository import CustomFieldRepository
-from repositories.task_repository import TaskRepository
-from repositories.workspace_repository import WorkspaceRepository
-from services.sync_service import SyncService
+from services.container import container
 from utils.validators import validate_url
 
 # Инициализация
-db = Database()
-field_repo = CustomFieldRepository(db)
-task_repo = TaskRepository(db)
-workspace_repo = WorkspaceRepository(db)
-sync_service = SyncService(task_repo, field_repo)
+db = container.db
+field_repo = container.field_repo
+task_repo = container.task_repo
+workspace_repo = container.workspace_repo
+sync_service = container.sync_service
 
 async def newfield_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Создать поле"""
@@ -109,12 +105,8 @@ async def addfield_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -
     except Exception as e:
         await update.message.reply_text(f"❌ Ошибка: {str(e)}")
 
-# Добавить импорты для addfield_command
-from repositories.project_repository import ProjectRepository
-from repositories.column_repository import ColumnRepository
-from repositories.board_repository import BoardRepository
-
-project_repo = ProjectRepository(db)
-column_repo = ColumnRepository(db)
-board_repo = BoardRepository(db)
+# Репозитории для addfield_command
+project_repo = container.project_repo
+column_repo = container.column_repo
+board_repo = container.board_repo
 
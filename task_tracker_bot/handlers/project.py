@@ -3,24 +3,18 @@ Handlers для работы с Project
 """
 from telegram import Update
 from telegram.ext import ContextTypes
-from database import Database
-from repositories.project_repository import ProjectRepository
-from repositories.board_repository import BoardRepository
-from repositories.column_repository import ColumnRepository
-from repositories.task_repository import TaskRepository
-from repositories.workspace_repository import WorkspaceRepository
-from services.project_service import ProjectService
+from services.container import container
 from utils.formatters import format_project, format_project_dashboard, format_project_list
 from utils.keyboards import project_dashboard_keyboard
 
 # Инициализация
-db = Database()
-project_repo = ProjectRepository(db)
-board_repo = BoardRepository(db)
-column_repo = ColumnRepository(db)
-task_repo = TaskRepository(db)
-workspace_repo = WorkspaceRepository(db)
-project_service = ProjectService(project_repo, board_repo, column_repo, task_repo)
+db = container.db
+project_repo = container.project_repo
+board_repo = container.board_repo
+column_repo = container.column_repo
+task_repo = container.task_repo
+workspace_repo = container.workspace_repo
+project_service = container.project_service
 
 async def projects_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Показать список проектов с улучшенным UI"""
@@ -55,6 +55,10 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
         "/task <id> - Показать задачу\n"
         "/movetask <id> <column> - Переместить задачу\n"
         "/priority <id> <level> - Установить приоритет\n\n"
+        "🗓 Туду-лист:\n"
+        "/todo [дата] - Задачи на день\n"
+        "/week [дата] - Задачи на неделю\n"
+        "/month [дата] - Задачи на месяц\n\n"
         "📈 Статистика:\n"
         "/stats - Общая статистика\n"
         "/statsproject <id> - Статистика проекта\n"
@@ -112,14 +116,13 @@ async def start_test_basecase_command(update: Update, context: ContextTypes.DEFA
         if project_root not in sys.path:
             sys.path.insert(0, project_root)
         
-        from database import Database
+        from services.container import container
         from tests.test_base_case import BaseCaseTestRunner
         
-        logger.info("Модули импортированы, создаем БД и runner")
+        logger.info("Модули импортированы, создаем runner")
         
-        db = Database()
-        db.init_db()
-        runner = BaseCaseTestRunner(db, user_id)
+        # БД бота уже инициализирована при запуске - используем общее подключение
+        runner = BaseCaseTestRunner(container.db, user_id)
         
         logger.info("Запуск теста в отдельном потоке")
         
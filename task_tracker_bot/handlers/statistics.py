@@ -3,23 +3,17 @@ Handlers для статистики
 """
 from telegram import Update
 from telegram.ext import ContextTypes
-from database import Database
-from repositories.task_repository import TaskRepository
-from repositories.project_repository import ProjectRepository
-from repositories.board_repository import BoardRepository
-from repositories.workspace_repository import WorkspaceRepository
-from repositories.column_repository import ColumnRepository
-from services.statistics_service import StatisticsService
+from services.container import container
 from utils.formatters import format_stats, format_project_stats, format_board_stats
 
 # Инициализация
-db = Database()
-task_repo = TaskRepository(db)
-project_repo = ProjectRepository(db)
-board_repo = BoardRepository(db)
-workspace_repo = WorkspaceRepository(db)
-column_repo = ColumnRepository(db)
-stats_service = StatisticsService(task_repo, project_repo, board_repo, workspace_repo, column_repo)
+db = container.db
+task_repo = container.task_repo
+project_repo = container.project_repo
+board_repo = container.board_repo
+workspace_repo = container.workspace_repo
+column_repo = container.column_repo
+stats_service = container.stats_service
 
 async def stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Общая статистика"""
@@ -3,20 +3,15 @@ Handlers для работы с метками (Tags)
 """
 from telegram import Update
 from telegram.ext import ContextTypes
-from database import Database
-from repositories.tag_repository import TagRepository
-from repositories.task_repository import TaskRepository
-from repositories.workspace_repository import WorkspaceRepository
-from repositories.column_repository import ColumnRepository
-from repositories.board_repository import BoardRepository
+from services.container import container
 
 # Инициализация
-db = Database()
-tag_repo = TagRepository(db)
-task_repo = TaskRepository(db)
-workspace_repo = WorkspaceRepository(db)
-column_repo = ColumnRepository(db)
-board_repo = BoardRepository(db)
+db = container.db
+tag_repo = container.tag_repo
+task_repo = container.task_repo
+workspace_repo = container.workspace_repo
+column_repo = container.column_repo
+board_repo = container.board_repo
 
 async def newtag_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Создать метку"""
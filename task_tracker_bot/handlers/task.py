@@ -4,39 +4,26 @@ Handlers для работы с Task
 from telegram import Update
 from telegram.ext import ContextTypes, ConversationHandler
 from datetime import datetime
-from database import Database
-from repositories.task_repository import TaskRepository
-from repositories.column_repository import ColumnRepository
-from repositories.board_repository import BoardRepository
-from repositories.workspace_repository import WorkspaceRepository
-from repositories.board_dependency_repository import BoardDependencyRepository
-from repositories.project_repository import ProjectRepository
-from services.task_service import TaskService
-from services.dependency_service import DependencyService
-from services.assignment_service import AssignmentService
-from repositories.task_assignee_repository import TaskAssigneeRepository
-from repositories.project_member_repository import ProjectMemberRepository
+from services.container import container
 from utils.formatters import format_task
 from utils.keyboards import task_actions_keyboard
+from utils.name_index import WRITE_MIN_SCORE
 
 # Инициализация
-db = Database()
-task_repo = TaskRepository(db)
-column_repo = ColumnRepository(db)
-board_repo = BoardRepository(db)
-workspace_repo = WorkspaceRepository(db)
-dependency_repo = BoardDependencyRepository(db)
-project_repo = ProjectRepository(db)
-assignee_repo = TaskAssigneeRepository(db)
-member_repo = ProjectMemberRepository(db)
+db = container.db
+task_repo = container.task_repo
+column_repo = container.column_repo
+board_repo = container.board_repo
+workspace_repo = container.workspace_repo
+dependency_repo = container.dependency_repo
+project_repo = container.project_repo
+assignee_repo = container.assignee_repo
+member_repo = container.member_repo
 
-dependency_service = DependencyService(
-    dependency_repo, task_repo, project_repo, column_repo, board_repo
-)
-assignment_service = AssignmentService(
-    assignee_repo, member_repo, task_repo, project_repo, column_repo, board_repo
-)
-task_service = TaskService(task_repo, column_repo, dependency_service, assignment_service)
+dependency_service = container.dependency_service
+assignment_service = container.assignment_service
+task_service = container.workflow_task_service
+name_resolver = container.name_resolver
 
 # Состояния для ConversationHandler
 WAITING_TASK_BOARD, WAITING_TASK_COLUMN, WAITING_TASK_TITLE, WAITING_TASK_DESCRIPTION = range(4)
@@ -168,7 +155,7 @@ async def task_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
             await update.message.reply_text("❌ Задача не найдена")
             return
         
-        text = format_task(task, column_repo, board_repo)
+        text = format_task(task, column_repo, board_repo, task_service.get_task_tree(task_id))
         await update.message.reply_text(
             text,
             reply_markup=task_actions_keyboard(task_id),
@@ -200,17 +187,33 @@ async def movetask_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -
             await update.message.reply_text("❌ Колонка задачи не найдена")
             return
         
-        # Найти колонку по имени в той же доске
+        # Найти колонку по имени в той же доске, затем без учета регистра и знаков ("в работе!").
+        # Перенос - запись, поэтому похожие названия только предлагаются, а не применяются
         column = column_repo.get_by_name(current_column.board_id, column_name)
+        board = None
+        if not column:
+            board = board_repo.get_by_id(current_column.board_id)
+            match = name_resolver.resolve_column(
+                board.workspace_id, column_name, board_id=board.id, min_score=WRITE_MIN_SCORE
+            ) if board else None
+            column = column_repo.get_by_id(match.entry.id) if match else None
         
         if not column:
-            await update.message.reply_text("❌ Колонка не найдена")
+            suggestions = name_resolver.suggest(
+                board.workspace_id, column_name, "column", board_id=board.id
+            ) if board else []
+            if suggestions:
+                await update.message.reply_text(
+                    f"❌ Колонка не найдена. Возможно, вы имели в виду: {', '.join(suggestions)}"
+                )
+            else:
+                await update.message.reply_text("❌ Колонка не найдена")
             return
         
         user_id = update.effective_user.id
         success, error = task_service.move_task(task_id, column.id, user_id)
         if success:
-            await update.message.reply_text(f"✅ Задача перемещена в колонку '{column_name}'")
+            await update.message.reply_text(f"✅ Задача перемещена в колонку '{column.name}'")
         else:
             await update.message.reply_text(f"❌ {error}")
     except ValueError:
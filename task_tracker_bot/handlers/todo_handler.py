@@ -1,46 +1,184 @@
 """
 Handlers для работы с Todo List
 """
+import asyncio
 import logging
+import time
 from datetime import datetime, date, timedelta
+from typing import Dict, Any, Optional, Tuple
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import BadRequest
 from telegram.ext import ContextTypes
-from database import Database
-from repositories.personal_task_repository import PersonalTaskRepository
-from repositories.task_repository import TaskRepository
-from repositories.project_repository import ProjectRepository
-from repositories.column_repository import ColumnRepository
-from repositories.board_repository import BoardRepository
-from services.todo_service import TodoService
-from utils.date_parser import DateParser
-from utils.task_classifier import TaskClassifier
-from utils.formatters import format_todo_list
-from utils.keyboards import todo_list_keyboard
+from config import Config
+from services.container import container
+from utils.formatters import format_todo_list, format_todo_calendar
+from utils.keyboards import todo_list_keyboard, todo_calendar_keyboard
+from utils.todo_cache import todo_day_cache
 
 logger = logging.getLogger(__name__)
 
 # Инициализация сервисов
-db = Database()
-personal_task_repo = PersonalTaskRepository(db)
-task_repo = TaskRepository(db)
-project_repo = ProjectRepository(db)
-column_repo = ColumnRepository(db)
-board_repo = BoardRepository(db)
-date_parser = DateParser()
-task_classifier = TaskClassifier(project_repo)
-todo_service = TodoService(
-    personal_task_repo,
-    task_repo,
-    project_repo,
-    column_repo,
-    board_repo,
-    date_parser,
-    task_classifier
-)
+db = container.db
+personal_task_repo = container.personal_task_repo
+task_repo = container.task_repo
+project_repo = container.project_repo
+column_repo = container.column_repo
+board_repo = container.board_repo
+date_parser = container.date_parser
+task_classifier = container.task_classifier
+todo_service = container.todo_service
+
+# Ключ context.user_data для окна задач, загруженного календарем (/week, /month)
+TODO_WINDOW_KEY = "todo_window"
+
+def _get_todo_window(
+    context: ContextTypes.DEFAULT_TYPE,
+    user_id: int,
+    start_date: date,
+    end_date: date
+) -> Optional[Dict[str, Any]]:
+    """Вернуть закэшированный диапазон, если он актуален и покрывает [start_date, end_date]"""
+    user_data = context.user_data
+    window = user_data.get(TODO_WINDOW_KEY) if isinstance(user_data, dict) else None
+    if not window:
+        return None
+    
+    # Окно устаревает по времени или при любом изменении задач пользователя
+    if (time.time() - window["loaded_at"] > Config.TODO_WINDOW_TTL
+            or window["version"] != todo_day_cache.version(user_id)):
+        user_data.pop(TODO_WINDOW_KEY, None)
+        return None
+    
+    todo_range = window["range"]
+    if todo_range["start_date"] <= start_date and end_date <= todo_range["end_date"]:
+        return todo_range
+    return None
+
+def load_todo_range(
+    context: ContextTypes.DEFAULT_TYPE,
+    user_id: int,
+    start_date: date,
+    end_date: date
+) -> Dict[str, Any]:
+    """Получить диапазон задач из окна в user_data или одним запросом к БД"""
+    cached = _get_todo_window(context, user_id, start_date, end_date)
+    if cached is not None:
+        logger.debug(f"Окно туду-листа из кэша: {start_date}..{end_date}, user_id={user_id}")
+        days = {d: day for d, day in cached["days"].items() if start_date <= d <= end_date}
+        return {
+            "start_date": start_date,
+            "end_date": end_date,
+            "days": days,
+            "total": sum(day["total"] for day in days.values()),
+            "completed": sum(day["completed"] for day in days.values())
+        }
+    
+    version = todo_day_cache.version(user_id)
+    todo_range = todo_service.get_todo_range(user_id, start_date, end_date, include_work_tasks=True)
+    if isinstance(context.user_data, dict):
+        context.user_data[TODO_WINDOW_KEY] = {
+            "range": todo_range,
+            "loaded_at": time.time(),
+            "version": version
+        }
+    return todo_range
+
+def _todo_list_from_window(
+    context: ContextTypes.DEFAULT_TYPE,
+    user_id: int,
+    target_date: date
+) -> Optional[Dict[str, Any]]:
+    """Собрать туду-лист на день из окна в user_data без запроса к БД"""
+    todo_range = _get_todo_window(context, user_id, target_date, target_date)
+    if todo_range is None:
+        return None
+    day = todo_range["days"][target_date]
+    return todo_service.build_todo_list(target_date, day["personal_tasks"], day["work_tasks"])
+
+def _render_day(target_date: date, todo_list: Dict[str, Any]) -> Tuple[str, InlineKeyboardMarkup]:
+    """Текст и клавиатура туду-листа на день"""
+    return (
+        format_todo_list(todo_list),
+        todo_list_keyboard(target_date, todo_list.get("personal_tasks", []))
+    )
+
+def render_todo_day(
+    context: ContextTypes.DEFAULT_TYPE,
+    user_id: int,
+    target_date: date
+) -> Tuple[str, InlineKeyboardMarkup]:
+    """
+    Получить отрисованный туду-лист на день
+    
+    Порядок: кэш дней -> окно календаря в user_data -> запрос к БД.
+    """
+    today = datetime.now().date()
+    cached = todo_day_cache.get(user_id, target_date)
+    # Клавиатура зависит от текущей даты (кнопка "Сегодня"), поэтому после полуночи перерисовываем
+    if cached is not None and cached[0] == today:
+        return cached[1], cached[2]
+    
+    version = todo_day_cache.version(user_id)
+    todo_list = _todo_list_from_window(context, user_id, target_date)
+    if todo_list is None:
+        todo_list = todo_service.get_todo_list(
+            user_id=user_id,
+            target_date=target_date,
+            include_work_tasks=True
+        )
+    
+    text, keyboard = _render_day(target_date, todo_list)
+    todo_day_cache.set(user_id, target_date, (today, text, keyboard), version)
+    return text, keyboard
+
+async def _prefetch_neighbour_days(user_id: int, target_date: date) -> None:
+    """Фоново отрисовать соседние дни одним запросом за диапазон"""
+    neighbours = [
+        d for d in (target_date - timedelta(days=1), target_date + timedelta(days=1))
+        if not todo_day_cache.contains(user_id, d)
+    ]
+    if not neighbours:
+        return
+    
+    today = datetime.now().date()
+    version = todo_day_cache.version(user_id)
+    try:
+        todo_range = await asyncio.to_thread(
+            todo_service.get_todo_range, user_id, min(neighbours), max(neighbours)
+        )
+        for day_date in neighbours:
+            day = todo_range["days"][day_date]
+            todo_list = todo_service.build_todo_list(day_date, day["personal_tasks"], day["work_tasks"])
+            text, keyboard = _render_day(day_date, todo_list)
+            todo_day_cache.set(user_id, day_date, (today, text, keyboard), version)
+        logger.debug(f"Предзагружены дни {neighbours} для user_id={user_id}")
+    except Exception as e:
+        logger.warning(f"Не удалось предзагрузить соседние дни для user_id={user_id}: {e}")
+
+def schedule_neighbour_prefetch(context: ContextTypes.DEFAULT_TYPE, user_id: int, target_date: date) -> None:
+    """Запустить предзагрузку соседних дней в фоне, не задерживая ответ"""
+    context.application.create_task(_prefetch_neighbour_days(user_id, target_date))
+
+async def _has_workspace(user_id: int, target_date: date) -> bool:
+    """Проверить наличие пространства (пропускается, если день уже в кэше)"""
+    if todo_day_cache.contains(user_id, target_date):
+        return True
+    from repositories.workspace_repository import WorkspaceRepository
+    workspace_repo = WorkspaceRepository(db)
+    return bool(workspace_repo.get_all_by_user(user_id))
+
+def calendar_range(view: str, anchor: date) -> Tuple[date, date]:
+    """Границы недели (пн-вс) или месяца, содержащих anchor"""
+    if view == "month":
+        start_date = anchor.replace(day=1)
+        end_date = (start_date + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    else:
+        start_date = anchor - timedelta(days=anchor.weekday())
+        end_date = start_date + timedelta(days=6)
+    return start_date, end_date
 
 async def todo_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Обработка команды /todo [дата]"""
-    import time
     start_time = time.time()
     user_id = update.effective_user.id
     args = context.args or []
@@ -76,30 +214,17 @@ async def todo_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
             )
             return
         
-        workspace_id = workspaces[0].id
-        
-        todo_list = todo_service.get_todo_list(
-            user_id=user_id,
-            target_date=target_date,
-            include_work_tasks=True
-        )
-        
-        personal_tasks_count = len(todo_list.get("personal_tasks", []))
-        work_tasks_count = len(todo_list.get("work_tasks", []))
-        logger.info(f"Получен туду-лист: личных задач={personal_tasks_count}, рабочих={work_tasks_count}")
-        
-        # Форматирование и отправка
-        formatted_text = format_todo_list(todo_list)
-        keyboard = todo_list_keyboard(target_date, todo_list.get("personal_tasks", []))
+        text, keyboard = render_todo_day(context, user_id, target_date)
         
         elapsed_time = time.time() - start_time
         logger.info(f"Команда /todo выполнена за {elapsed_time:.2f}s для user_id={user_id}, date={target_date}")
         
         await update.message.reply_text(
-            formatted_text,
+            text,
             reply_markup=keyboard,
             parse_mode='HTML'
         )
+        schedule_neighbour_prefetch(context, user_id, target_date)
     except Exception as e:
         elapsed_time = time.time() - start_time
         logger.error(f"Ошибка при получении туду-листа (время: {elapsed_time:.2f}s): {e}", exc_info=True)
@@ -126,30 +251,18 @@ async def handle_todo_date_callback(update: Update, context: ContextTypes.DEFAUL
     
     # Получить туду-лист
     try:
-        from task_tracker_bot.repositories.workspace_repository import WorkspaceRepository
-        workspace_repo = WorkspaceRepository(db)
-        workspaces = workspace_repo.get_all_by_user(user_id)
-        
-        if not workspaces:
+        if not await _has_workspace(user_id, target_date):
             await query.edit_message_text("❌ У вас нет пространств")
             return
         
-        workspace_id = workspaces[0].id
-        
-        todo_list = todo_service.get_todo_list(
-            user_id=user_id,
-            target_date=target_date,
-            include_work_tasks=True
-        )
-        
-        formatted_text = format_todo_list(todo_list)
-        keyboard = todo_list_keyboard(target_date, todo_list.get("personal_tasks", []))
+        text, keyboard = render_todo_day(context, user_id, target_date)
         
         await query.edit_message_text(
-            formatted_text,
+            text,
             reply_markup=keyboard,
             parse_mode='HTML'
         )
+        schedule_neighbour_prefetch(context, user_id, target_date)
     except Exception as e:
         logger.error(f"Ошибка при получении туду-листа: {e}", exc_info=True)
         await query.edit_message_text(f"❌ Ошибка: {str(e)}")
@@ -182,30 +295,18 @@ async def handle_todo_navigation(update: Update, context: ContextTypes.DEFAULT_T
     
     # Получить туду-лист
     try:
-        from task_tracker_bot.repositories.workspace_repository import WorkspaceRepository
-        workspace_repo = WorkspaceRepository(db)
-        workspaces = workspace_repo.get_all_by_user(user_id)
-        
-        if not workspaces:
+        if not await _has_workspace(user_id, target_date):
             await query.edit_message_text("❌ У вас нет пространств")
             return
         
-        workspace_id = workspaces[0].id
-        
-        todo_list = todo_service.get_todo_list(
-            user_id=user_id,
-            target_date=target_date,
-            include_work_tasks=True
-        )
-        
-        formatted_text = format_todo_list(todo_list)
-        keyboard = todo_list_keyboard(target_date, todo_list.get("personal_tasks", []))
+        text, keyboard = render_todo_day(context, user_id, target_date)
         
         await query.edit_message_text(
-            formatted_text,
+            text,
             reply_markup=keyboard,
             parse_mode='HTML'
         )
+        schedule_neighbour_prefetch(context, user_id, target_date)
     except Exception as e:
         logger.error(f"Ошибка при навигации по туду-листу: {e}", exc_info=True)
         await query.edit_message_text(f"❌ Ошибка: {str(e)}")
@@ -237,18 +338,12 @@ async def handle_mark_todo_completed(update: Update, context: ContextTypes.DEFAU
             
             # Обновить сообщение с туду-листом
             # Получаем текущую дату из сообщения или используем сегодня
+            # (репозиторий уже сбросил кэш дней пользователя)
             today = datetime.now().date()
-            todo_list = todo_service.get_todo_list(
-                user_id=user_id,
-                target_date=today,
-                include_work_tasks=True
-            )
-            
-            formatted_text = format_todo_list(todo_list)
-            keyboard = todo_list_keyboard(today, todo_list.get("personal_tasks", []))
+            text, keyboard = render_todo_day(context, user_id, today)
             
             await query.edit_message_text(
-                formatted_text,
+                text,
                 reply_markup=keyboard,
                 parse_mode='HTML'
             )
@@ -258,3 +353,136 @@ async def handle_mark_todo_completed(update: Update, context: ContextTypes.DEFAU
         logger.error(f"Ошибка при отметке задачи: {e}", exc_info=True)
         await query.answer(f"❌ Ошибка: {str(e)}", show_alert=True)
 
+
+async def _send_todo_calendar(update: Update, context: ContextTypes.DEFAULT_TYPE, view: str) -> None:
+    """Общая реализация /week и /month"""
+    start_time = time.time()
+    user_id = update.effective_user.id
+    
+    anchor = datetime.now().date()
+    if context.args:
+        date_arg = " ".join(context.args)
+        parsed_date = date_parser.parse_date(date_arg)
+        if parsed_date:
+            anchor = parsed_date
+        else:
+            logger.warning(f"Не удалось распарсить дату: '{date_arg}', используется сегодня")
+    
+    start_date, end_date = calendar_range(view, anchor)
+    
+    try:
+        todo_range = load_todo_range(context, user_id, start_date, end_date)
+        
+        formatted_text = format_todo_calendar(todo_range, view)
+        keyboard = todo_calendar_keyboard(view, start_date, todo_range["days"])
+        
+        elapsed_time = time.time() - start_time
+        logger.info(
+            f"Календарь туду-листа ({view}) {start_date}..{end_date} выполнен за "
+            f"{elapsed_time:.2f}s для user_id={user_id}"
+        )
+        
+        await update.message.reply_text(
+            formatted_text,
+            reply_markup=keyboard,
+            parse_mode='HTML'
+        )
+    except Exception as e:
+        logger.error(f"Ошибка при получении календаря туду-листа: {e}", exc_info=True)
+        await update.message.reply_text(f"❌ Ошибка при получении туду-листа: {str(e)}")
+
+async def week_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Обработка команды /week [дата] - задачи на неделю"""
+    await _send_todo_calendar(update, context, "week")
+
+async def month_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Обработка команды /month [дата] - задачи на месяц"""
+    await _send_todo_calendar(update, context, "month")
+
+async def handle_todo_calendar_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Навигация по календарю (формат: todo_cal_week_2025-12-01, todo_cal_month_2025-12-01)"""
+    query = update.callback_query
+    await query.answer()
+    
+    user_id = update.effective_user.id
+    
+    try:
+        view, date_str = query.data.replace("todo_cal_", "", 1).split("_", 1)
+        anchor = datetime.fromisoformat(date_str).date()
+    except ValueError:
+        await query.edit_message_text("❌ Некорректная дата")
+        return
+    
+    if view not in ("week", "month"):
+        await query.edit_message_text("❌ Некорректный callback")
+        return
+    
+    start_date, end_date = calendar_range(view, anchor)
+    
+    try:
+        todo_range = load_todo_range(context, user_id, start_date, end_date)
+        await query.edit_message_text(
+            format_todo_calendar(todo_range, view),
+            reply_markup=todo_calendar_keyboard(view, start_date, todo_range["days"]),
+            parse_mode='HTML'
+        )
+    except Exception as e:
+        logger.error(f"Ошибка при навигации по календарю: {e}", exc_info=True)
+        await query.edit_message_text(f"❌ Ошибка: {str(e)}")
+
+async def handle_todo_day_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Открыть день из календаря (формат: todo_day_2025-12-01)"""
+    query = update.callback_query
+    await query.answer()
+    
+    user_id = update.effective_user.id
+    
+    try:
+        target_date = datetime.fromisoformat(query.data.replace("todo_day_", "", 1)).date()
+    except ValueError:
+        await query.edit_message_text("❌ Некорректная дата")
+        return
+    
+    try:
+        text, keyboard = render_todo_day(context, user_id, target_date)
+        await query.edit_message_text(
+            text,
+            reply_markup=keyboard,
+            parse_mode='HTML'
+        )
+        schedule_neighbour_prefetch(context, user_id, target_date)
+    except Exception as e:
+        logger.error(f"Ошибка при открытии дня из календаря: {e}", exc_info=True)
+        await query.edit_message_text(f"❌ Ошибка: {str(e)}")
+
+async def handle_todo_refresh(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Обновление туду-листа (формат: todo_refresh_2025-12-01)"""
+    query = update.callback_query
+    
+    user_id = update.effective_user.id
+    
+    try:
+        target_date = datetime.fromisoformat(query.data.replace("todo_refresh_", "", 1)).date()
+    except ValueError:
+        await query.answer("❌ Некорректная дата", show_alert=True)
+        return
+    
+    await query.answer()
+    
+    try:
+        # Явное обновление всегда строит день заново, не из кэша
+        todo_day_cache.invalidate(user_id, target_date)
+        text, keyboard = render_todo_day(context, user_id, target_date)
+        await query.edit_message_text(
+            text,
+            reply_markup=keyboard,
+            parse_mode='HTML'
+        )
+        schedule_neighbour_prefetch(context, user_id, target_date)
+    except BadRequest as e:
+        # Telegram отклоняет редактирование без изменений - это не ошибка
+        if "not modified" not in str(e).lower():
+            raise
+    except Exception as e:
+        logger.error(f"Ошибка при обновлении туду-листа: {e}", exc_info=True)
+        await query.edit_message_text(f"❌ Ошибка: {str(e)}")
@@ -3,16 +3,14 @@ Handlers для работы с Workspace
 """
 from telegram import Update
 from telegram.ext import ContextTypes, ConversationHandler
-from database import Database
-from repositories.workspace_repository import WorkspaceRepository
-from services.workspace_service import WorkspaceService
+from services.container import container
 from utils.formatters import format_workspace_list
 from utils.keyboards import workspace_keyboard, main_menu_keyboard
 
 # Инициализация
-db = Database()
-workspace_repo = WorkspaceRepository(db)
-workspace_service = WorkspaceService(workspace_repo)
+db = container.db
+workspace_repo = container.workspace_repo
+workspace_service = container.workspace_service
 
 # Состояния для ConversationHandler
 WAITING_WORKSPACE_NAME = 1
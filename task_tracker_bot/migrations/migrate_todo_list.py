@@ -6,6 +6,7 @@ import sqlite3
 import logging
 import sys
 import os
+from typing import Optional
 
 # Добавляем путь к модулям проекта
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -14,9 +15,13 @@ from database import Database
 
 logger = logging.getLogger(__name__)
 
-def migrate():
-    """Выполнить миграцию БД"""
-    db = Database()
+def migrate(db: Optional[Database] = None):
+    """Выполнить миграцию БД
+    
+    Args:
+        db: Экземпляр Database (по умолчанию БД из Config)
+    """
+    db = db or Database()
     
     try:
         with db.get_connection() as conn:
@@ -111,6 +116,11 @@ def migrate():
                 CREATE INDEX IF NOT EXISTS idx_tasks_scheduled_datetime 
                 ON tasks(scheduled_date, scheduled_time) WHERE scheduled_date IS NOT NULL
             """)
+            # Для выборки туду-листа по диапазону дат с JOIN на проекты пользователя
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_tasks_scheduled_project 
+                ON tasks(scheduled_date, project_id) WHERE scheduled_date IS NOT NULL
+            """)
             logger.info("✅ Индексы для tasks созданы")
             
             conn.commit()
@@ -132,6 +142,7 @@ def rollback():
             logger.warning("⚠️ Начинается откат миграции...")
             
             # Удалить индексы
+            cursor.execute("DROP INDEX IF EXISTS idx_tasks_scheduled_project")
             cursor.execute("DROP INDEX IF EXISTS idx_tasks_scheduled_datetime")
             cursor.execute("DROP INDEX IF EXISTS idx_tasks_project_scheduled")
             cursor.execute("DROP INDEX IF EXISTS idx_tasks_scheduled_date")
@@ -0,0 +1,105 @@
+"""
+Репозиторий агрегатных запросов для аналитики пространства
+"""
+from typing import Any, Dict, List, Optional
+from database import Database
+
+# Задачи пространства: колонка -> доска -> workspace
+WORKSPACE_TASKS = """
+    SELECT t.id, t.column_id, t.created_at, t.started_at, t.completed_at
+    FROM tasks t
+    JOIN columns c ON c.id = t.column_id
+    JOIN boards b ON b.id = c.board_id
+    WHERE b.workspace_id = ?
+"""
+
+
+class AnalyticsRepository:
+    """Метрики считаются одним запросом в SQLite, без загрузки задач в память"""
+
+    def __init__(self, db: Database):
+        self.db = db
+
+    def get_wip_by_column(self, workspace_id: int) -> List[Dict[str, Any]]:
+        """
+        Незавершенные задачи по колонкам
+
+        Returns:
+            [{column_id, column_name, board_name, open_tasks, in_progress}] в порядке досок и колонок
+        """
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT c.id AS column_id, c.name AS column_name, b.name AS board_name,
+                       COUNT(t.id) AS open_tasks,
+                       COALESCE(SUM(t.started_at IS NOT NULL), 0) AS in_progress
+                FROM columns c
+                JOIN boards b ON b.id = c.board_id
+                LEFT JOIN tasks t ON t.column_id = c.id AND t.completed_at IS NULL
+                WHERE b.workspace_id = ?
+                GROUP BY c.id
+                ORDER BY b.position, c.position
+            """, (workspace_id,))
+            return [dict(row) for row in cursor.fetchall()]
+
+    def get_assignee_completion(self, workspace_id: int, board_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Выполнение задач по исполнителям (task_assignees и tasks.assignee_id)
+
+        Args:
+            workspace_id: ID пространства
+            board_name: Учитывать только задачи доски (отдела) с этим названием
+
+        Returns:
+            [{user_id, assigned, completed, in_progress, avg_cycle_hours}], лучшие первыми.
+            avg_cycle_hours - среднее время от started_at до completed_at
+        """
+        board_filter = "AND LOWER(b.name) = LOWER(?)" if board_name else ""
+        params = [workspace_id] + ([board_name] if board_name else [])
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                WITH workspace_tasks AS ({WORKSPACE_TASKS} {board_filter}),
+                assignments AS (
+                    SELECT task_id, user_id FROM task_assignees
+                    UNION
+                    SELECT id, assignee_id FROM tasks WHERE assignee_id IS NOT NULL
+                )
+                SELECT a.user_id,
+                       COUNT(*) AS assigned,
+                       SUM(wt.completed_at IS NOT NULL) AS completed,
+                       SUM(wt.started_at IS NOT NULL AND wt.completed_at IS NULL) AS in_progress,
+                       AVG(CASE WHEN wt.started_at IS NOT NULL AND wt.completed_at IS NOT NULL
+                           THEN (julianday(wt.completed_at) - julianday(wt.started_at)) * 24 END
+                       ) AS avg_cycle_hours
+                FROM assignments a
+                JOIN workspace_tasks wt ON wt.id = a.task_id
+                GROUP BY a.user_id
+                ORDER BY completed DESC, assigned ASC
+            """, params)
+            return [dict(row) for row in cursor.fetchall()]
+
+    def get_column_age(self, workspace_id: int, limit: int = 3) -> List[Dict[str, Any]]:
+        """
+        Колонки с самым большим средним возрастом незавершенных задач
+
+        Returns:
+            [{column_id, column_name, board_name, open_tasks, avg_age_days, max_age_days}]
+        """
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                WITH workspace_tasks AS ({WORKSPACE_TASKS})
+                SELECT c.id AS column_id, c.name AS column_name, b.name AS board_name,
+                       COUNT(*) AS open_tasks,
+                       AVG(julianday('now') - julianday(wt.created_at)) AS avg_age_days,
+                       MAX(julianday('now') - julianday(wt.created_at)) AS max_age_days
+                FROM workspace_tasks wt
+                JOIN columns c ON c.id = wt.column_id
+                JOIN boards b ON b.id = c.board_id
+                WHERE wt.completed_at IS NULL
+                GROUP BY c.id
+                ORDER BY avg_age_days DESC
+                LIMIT ?
+            """, (workspace_id, limit))
+            return [dict(row) for row in cursor.fetchall()]
@@ -4,6 +4,7 @@
 from typing import List, Optional
 from database import Database
 from models.board import Board
+from utils.name_index import name_index_cache
 
 class BoardRepository:
     def __init__(self, db: Database):
@@ -17,7 +18,9 @@ class BoardRepository:
                 INSERT INTO boards (workspace_id, name, position)
                 VALUES (?, ?, ?)
             """, (workspace_id, name, position))
-            return cursor.lastrowid
+            board_id = cursor.lastrowid
+        name_index_cache.invalidate(workspace_id)
+        return board_id
     
     def get_by_id(self, board_id: int) -> Optional[Board]:
         """Получить доску по ID"""
@@ -82,7 +85,10 @@ class BoardRepository:
                 SET {', '.join(updates)}
                 WHERE id = ?
             """, params)
-            return cursor.rowcount > 0
+            updated = cursor.rowcount > 0
+        if updated and name is not None:
+            name_index_cache.invalidate_all()
+        return updated
     
     def delete(self, board_id: int) -> bool:
         """Удалить доску"""
@@ -92,5 +98,9 @@ class BoardRepository:
                 DELETE FROM boards
                 WHERE id = ?
             """, (board_id,))
-            return cursor.rowcount > 0
+            deleted = cursor.rowcount > 0
+        if deleted:
+            # Пространство доски здесь неизвестно; записи досок редки
+            name_index_cache.invalidate_all()
+        return deleted
 
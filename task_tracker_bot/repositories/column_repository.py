@@ -4,6 +4,7 @@
 from typing import List, Optional
 from database import Database
 from models.column import Column
+from utils.name_index import name_index_cache
 
 class ColumnRepository:
     def __init__(self, db: Database):
@@ -17,7 +18,9 @@ class ColumnRepository:
                 INSERT INTO columns (board_id, name, position)
                 VALUES (?, ?, ?)
             """, (board_id, name, position))
-            return cursor.lastrowid
+            column_id = cursor.lastrowid
+        name_index_cache.invalidate_all()
+        return column_id
     
     def get_by_id(self, column_id: int) -> Optional[Column]:
         """Получить колонку по ID"""
@@ -96,7 +99,10 @@ class ColumnRepository:
                 SET {', '.join(updates)}
                 WHERE id = ?
             """, params)
-            return cursor.rowcount > 0
+            updated = cursor.rowcount > 0
+        if updated and name is not None:
+            name_index_cache.invalidate_all()
+        return updated
     
     def delete(self, column_id: int) -> bool:
         """Удалить колонку"""
@@ -106,5 +112,8 @@ class ColumnRepository:
                 DELETE FROM columns
                 WHERE id = ?
             """, (column_id,))
-            return cursor.rowcount > 0
+            deleted = cursor.rowcount > 0
+        if deleted:
+            name_index_cache.invalidate_all()
+        return deleted
 
@@ -5,6 +5,7 @@ from typing import List, Optional
 from datetime import date, time, datetime
 from database import Database
 from models.personal_task import PersonalTask
+from utils.todo_cache import todo_day_cache
 
 class PersonalTaskRepository:
     def __init__(self, db: Database):
@@ -35,7 +36,9 @@ class PersonalTaskRepository:
                 scheduled_time_end.isoformat() if scheduled_time_end else None,
                 deadline.isoformat() if deadline else None
             ))
-            return cursor.lastrowid
+            task_id = cursor.lastrowid
+        todo_day_cache.invalidate(user_id, scheduled_date)
+        return task_id
     
     def get_by_id(self, task_id: int) -> Optional[PersonalTask]:
         """Получить задачу по ID"""
@@ -90,7 +93,10 @@ class PersonalTaskRepository:
                 SET completed = 1, completed_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP
                 WHERE id = ? AND user_id = ?
             """, (task_id, user_id))
-            return cursor.rowcount > 0
+            updated = cursor.rowcount > 0
+        if updated:
+            todo_day_cache.invalidate(user_id)
+        return updated
     
     def update(
         self,
@@ -139,7 +145,10 @@ class PersonalTaskRepository:
                 SET {', '.join(updates)}
                 WHERE id = ? AND user_id = ?
             """, params)
-            return cursor.rowcount > 0
+            updated = cursor.rowcount > 0
+        if updated:
+            todo_day_cache.invalidate(user_id)
+        return updated
     
     def delete(self, task_id: int, user_id: int) -> bool:
         """Удалить задачу"""
@@ -149,5 +158,8 @@ class PersonalTaskRepository:
                 DELETE FROM personal_tasks
                 WHERE id = ? AND user_id = ?
             """, (task_id, user_id))
-            return cursor.rowcount > 0
+            deleted = cursor.rowcount > 0
+        if deleted:
+            todo_day_cache.invalidate(user_id)
+        return deleted
 
@@ -0,0 +1,45 @@
+"""
+Репозиторий для постоянного кэша планов оркестратора
+"""
+import json
+from typing import Any, Dict, Optional
+from database import Database
+
+class PlanCacheRepository:
+    def __init__(self, db: Database):
+        self.db = db
+    
+    def get(self, cache_key: str, now: float) -> Optional[Dict[str, Any]]:
+        """Получить неистекший план и время его истечения"""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT plan_json, expires_at FROM plan_cache
+                WHERE cache_key = ? AND expires_at > ?
+            """, (cache_key, now))
+            row = cursor.fetchone()
+            if row:
+                return {"plan": json.loads(row["plan_json"]), "expires_at": row["expires_at"]}
+            return None
+    
+    def set(self, cache_key: str, plan: Dict[str, Any], expires_at: float) -> None:
+        """Сохранить план (перезаписывает существующий)"""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT OR REPLACE INTO plan_cache (cache_key, plan_json, expires_at)
+                VALUES (?, ?, ?)
+            """, (cache_key, json.dumps(plan, ensure_ascii=False), expires_at))
+    
+    def delete_expired(self, now: float) -> int:
+        """Удалить истекшие планы (по индексу expires_at)"""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM plan_cache WHERE expires_at <= ?", (now,))
+            return cursor.rowcount
+    
+    def clear(self) -> None:
+        """Удалить все планы"""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM plan_cache")
@@ -4,6 +4,7 @@
 from typing import List, Optional
 from database import Database
 from models.project import Project
+from utils.name_index import name_index_cache
 
 class ProjectRepository:
     def __init__(self, db: Database):
@@ -17,7 +18,8 @@ class ProjectRepository:
                 INSERT INTO projects (id, workspace_id, name, dashboard_stage)
                 VALUES (?, ?, ?, ?)
             """, (project_id, workspace_id, name, dashboard_stage))
-            return project_id
+        name_index_cache.invalidate(workspace_id)
+        return project_id
     
     def get_by_id(self, project_id: str) -> Optional[Project]:
         """Получить проект по ID"""
@@ -69,7 +71,10 @@ class ProjectRepository:
                 SET {', '.join(updates)}
                 WHERE id = ?
             """, params)
-            return cursor.rowcount > 0
+            updated = cursor.rowcount > 0
+        if updated and name is not None:
+            name_index_cache.invalidate_all()
+        return updated
     
     def delete(self, project_id: str) -> bool:
         """Удалить проект"""
@@ -79,5 +84,8 @@ class ProjectRepository:
                 DELETE FROM projects
                 WHERE id = ?
             """, (project_id,))
-            return cursor.rowcount > 0
+            deleted = cursor.rowcount > 0
+        if deleted:
+            name_index_cache.invalidate_all()
+        return deleted
 
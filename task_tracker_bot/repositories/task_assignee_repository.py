@@ -4,6 +4,7 @@
 from typing import List, Optional
 from database import Database
 from models.task_assignee import TaskAssignee
+from utils.todo_cache import todo_day_cache
 
 class TaskAssigneeRepository:
     def __init__(self, db: Database):
@@ -19,6 +20,8 @@ class TaskAssigneeRepository:
                 VALUES (?, ?, ?)
             """, (task_id, user_id, role))
             if cursor.rowcount > 0:
+                # Назначенная задача появляется в туду-листе пользователя
+                todo_day_cache.invalidate(user_id)
                 return cursor.lastrowid
             # Если запись уже существует, получаем её ID
             cursor.execute("""
@@ -86,15 +89,26 @@ class TaskAssigneeRepository:
                     DELETE FROM task_assignees
                     WHERE task_id = ? AND user_id = ?
                 """, (task_id, user_id))
-            return cursor.rowcount > 0
+            deleted = cursor.rowcount > 0
+        if deleted:
+            todo_day_cache.invalidate(user_id)
+        return deleted
     
     def delete_by_task(self, task_id: int) -> bool:
         """Удалить все назначения задачи"""
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.execute("""
+                SELECT DISTINCT user_id FROM task_assignees
+                WHERE task_id = ?
+            """, (task_id,))
+            user_ids = [row['user_id'] for row in cursor.fetchall()]
             cursor.execute("""
                 DELETE FROM task_assignees
                 WHERE task_id = ?
             """, (task_id,))
-            return cursor.rowcount > 0
+            deleted = cursor.rowcount > 0
+        for user_id in user_ids:
+            todo_day_cache.invalidate(user_id)
+        return deleted
 
@@ -1,10 +1,11 @@
 """
 Репозиторий для работы с Task
 """
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from datetime import date, time
 from database import Database
 from models.task import Task
+from utils.todo_cache import todo_day_cache
 
 class TaskRepository:
     def __init__(self, db: Database):
@@ -32,7 +33,10 @@ class TaskRepository:
                 scheduled_time.isoformat() if scheduled_time else None,
                 scheduled_time_end.isoformat() if scheduled_time_end else None
             ))
-            return cursor.lastrowid
+            task_id = cursor.lastrowid
+        if scheduled_date:
+            todo_day_cache.invalidate_all()
+        return task_id
     
     def get_by_id(self, task_id: int) -> Optional[Task]:
         """Получить задачу по ID"""
@@ -47,6 +51,19 @@ class TaskRepository:
                 return Task.from_row(row)
             return None
     
+    def get_workspace_id(self, task_id: int) -> Optional[int]:
+        """Получить ID пространства задачи (через колонку и доску)"""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT b.workspace_id FROM tasks t
+                JOIN columns c ON c.id = t.column_id
+                JOIN boards b ON b.id = c.board_id
+                WHERE t.id = ?
+            """, (task_id,))
+            row = cursor.fetchone()
+            return row['workspace_id'] if row else None
+    
     def get_all_by_column(self, column_id: int) -> List[Task]:
         """Получить все задачи колонки"""
         with self.db.get_connection() as conn:
@@ -83,6 +100,70 @@ class TaskRepository:
             rows = cursor.fetchall()
             return [Task.from_row(row) for row in rows]
     
+    def get_task_tree(self, root_id: int, max_depth: int = 5) -> Optional[Dict[str, Any]]:
+        """Получить дерево подзадач одним запросом (рекурсивный CTE)
+        
+        Каждый узел: {"task", "depth", "children", "subtask_count",
+        "completed_count", "max_priority"}. Сводные значения считаются
+        по всему поддереву узла за один проход от листьев к корню.
+        
+        Args:
+            root_id: ID корневой задачи
+            max_depth: Максимальная глубина вложенности (корень = 0)
+        
+        Returns:
+            Корневой узел или None, если задача не найдена
+        """
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            # path защищает от циклов в parent_task_id
+            cursor.execute("""
+                WITH RECURSIVE tree(id, depth, path) AS (
+                    SELECT id, 0, '/' || id || '/' FROM tasks WHERE id = ?
+                    UNION ALL
+                    SELECT t.id, tree.depth + 1, tree.path || t.id || '/'
+                    FROM tasks t
+                    JOIN tree ON t.parent_task_id = tree.id
+                    WHERE tree.depth < ?
+                    AND instr(tree.path, '/' || t.id || '/') = 0
+                )
+                SELECT t.*, tree.depth AS tree_depth
+                FROM tree
+                JOIN tasks t ON t.id = tree.id
+                ORDER BY tree.depth ASC, t.position ASC, t.created_at ASC
+            """, (root_id, max_depth))
+            rows = cursor.fetchall()
+        
+        if not rows:
+            return None
+        
+        # Строки упорядочены по глубине: родитель всегда создается раньше детей
+        nodes: Dict[int, Dict[str, Any]] = {}
+        for row in rows:
+            task = Task.from_row(row)
+            node = {
+                "task": task,
+                "depth": row["tree_depth"],
+                "children": [],
+                "subtask_count": 0,
+                "completed_count": 0,
+                "max_priority": task.priority
+            }
+            nodes[task.id] = node
+            if node["depth"] > 0:
+                nodes[task.parent_task_id]["children"].append(node)
+        
+        # Обратный порядок - от самых глубоких узлов к корню
+        for node in reversed(list(nodes.values())):
+            if node["depth"] == 0:
+                continue
+            parent = nodes[node["task"].parent_task_id]
+            parent["subtask_count"] += 1 + node["subtask_count"]
+            parent["completed_count"] += node["completed_count"] + (1 if node["task"].completed_at else 0)
+            parent["max_priority"] = max(parent["max_priority"], node["max_priority"])
+        
+        return nodes[root_id]
+    
     def update(self, task_id: int, column_id: Optional[int] = None, title: Optional[str] = None,
                description: Optional[str] = None, priority: Optional[int] = None,
                position: Optional[int] = None, assignee_id: Optional[int] = None,
@@ -156,7 +237,11 @@ class TaskRepository:
                 SET {', '.join(updates)}
                 WHERE id = ?
             """, params)
-            return cursor.rowcount > 0
+            updated = cursor.rowcount > 0
+        if updated:
+            # Рабочие задачи видны в туду-листах нескольких пользователей
+            todo_day_cache.invalidate_all()
+        return updated
     
     def delete(self, task_id: int) -> bool:
         """Удалить задачу"""
@@ -166,7 +251,10 @@ class TaskRepository:
                 DELETE FROM tasks
                 WHERE id = ?
             """, (task_id,))
-            return cursor.rowcount > 0
+            deleted = cursor.rowcount > 0
+        if deleted:
+            todo_day_cache.invalidate_all()
+        return deleted
     
     def get_max_position(self, column_id: int) -> int:
         """Получить максимальную позицию в колонке"""
@@ -241,3 +329,44 @@ class TaskRepository:
             rows = cursor.fetchall()
             return [Task.from_row(row) for row in rows]
 
+    
+    def get_scheduled_for_user(
+        self,
+        user_id: int,
+        start_date: date,
+        end_date: Optional[date] = None
+    ) -> List[Task]:
+        """Получить рабочие задачи пользователя в диапазоне дат
+        
+        Задача попадает в выборку, если её доска находится в пространстве
+        пользователя или пользователь назначен на задачу. Пространство
+        определяется через колонку и доску: project_id может быть NULL.
+        Фильтр по scheduled_date идет первым, чтобы использовался индекс
+        idx_tasks_scheduled_project (scheduled_date, project_id).
+        
+        Args:
+            user_id: ID пользователя
+            start_date: Начало диапазона (включительно)
+            end_date: Конец диапазона (включительно), по умолчанию = start_date
+        """
+        end_date = end_date or start_date
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT t.* FROM tasks t
+                JOIN columns c ON c.id = t.column_id
+                JOIN boards b ON b.id = c.board_id
+                JOIN workspaces w ON w.id = b.workspace_id
+                WHERE t.scheduled_date BETWEEN ? AND ?
+                AND (
+                    w.user_id = ?
+                    OR t.assignee_id = ?
+                    OR EXISTS (
+                        SELECT 1 FROM task_assignees ta
+                        WHERE ta.task_id = t.id AND ta.user_id = ?
+                    )
+                )
+                ORDER BY t.scheduled_date ASC, t.scheduled_time ASC, t.created_at ASC
+            """, (start_date.isoformat(), end_date.isoformat(), user_id, user_id, user_id))
+            rows = cursor.fetchall()
+            return [Task.from_row(row) for row in rows]
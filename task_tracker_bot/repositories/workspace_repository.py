@@ -4,6 +4,7 @@
 from typing import List, Optional
 from database import Database
 from models.workspace import Workspace
+from utils.name_index import name_index_cache
 
 class WorkspaceRepository:
     def __init__(self, db: Database):
@@ -76,5 +77,8 @@ class WorkspaceRepository:
                 DELETE FROM workspaces
                 WHERE id = ? AND user_id = ?
             """, (workspace_id, user_id))
-            return cursor.rowcount > 0
+            deleted = cursor.rowcount > 0
+        if deleted:
+            name_index_cache.invalidate(workspace_id)
+        return deleted
 
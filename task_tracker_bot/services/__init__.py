@@ -9,6 +9,7 @@ from .sync_service import SyncService
 from .statistics_service import StatisticsService
 from .dependency_service import DependencyService
 from .assignment_service import AssignmentService
+from .name_resolver import NameResolver
 
 __all__ = [
     'WorkspaceService',
@@ -19,5 +20,6 @@ __all__ = [
     'StatisticsService',
     'DependencyService',
     'AssignmentService',
+    'NameResolver',
 ]
 
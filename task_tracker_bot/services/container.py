@@ -0,0 +1,197 @@
+"""
+Общий контейнер репозиториев и сервисов процесса
+"""
+import logging
+import functools
+import threading
+from typing import Any, Callable, Dict, Optional
+from database import Database
+from repositories.project_repository import ProjectRepository
+from repositories.task_repository import TaskRepository
+from repositories.board_repository import BoardRepository
+from repositories.column_repository import ColumnRepository
+from repositories.workspace_repository import WorkspaceRepository
+from repositories.custom_field_repository import CustomFieldRepository
+from repositories.personal_task_repository import PersonalTaskRepository
+from repositories.tag_repository import TagRepository
+from repositories.board_dependency_repository import BoardDependencyRepository
+from repositories.task_assignee_repository import TaskAssigneeRepository
+from repositories.project_member_repository import ProjectMemberRepository
+from repositories.analytics_repository import AnalyticsRepository
+from services.project_service import ProjectService
+from services.task_service import TaskService
+from services.board_service import BoardService
+from services.statistics_service import StatisticsService
+from services.workspace_service import WorkspaceService
+from services.dependency_service import DependencyService
+from services.assignment_service import AssignmentService
+from services.sync_service import SyncService
+from services.todo_service import TodoService
+from services.name_resolver import NameResolver
+from utils.date_parser import DateParser
+from utils.task_classifier import TaskClassifier
+
+logger = logging.getLogger(__name__)
+
+
+def _shared(factory: Callable[["ServiceContainer"], Any]) -> property:
+    """Свойство контейнера: объект создается при первом обращении и переиспользуется"""
+    name = factory.__name__
+
+    @functools.wraps(factory)
+    def getter(self: "ServiceContainer") -> Any:
+        instance = self._instances.get(name)
+        if instance is None:
+            with self._lock:
+                instance = self._instances.get(name)
+                if instance is None:
+                    instance = factory(self)
+                    self._instances[name] = instance
+        return instance
+
+    return property(getter)
+
+
+class ServiceContainer:
+    """
+    Репозитории и сервисы, общие для обработчиков и агентов
+
+    Каждый объект создается один раз при первом обращении. Обработчики
+    берут зависимости из общего контейнера container, агенты - из
+    контейнера координатора (для другой БД, например в тестах, создается
+    отдельный контейнер).
+    """
+
+    def __init__(self, db: Optional[Database] = None):
+        self._db = db
+        # RLock: фабрика одного объекта обращается к другим свойствам контейнера
+        self._lock = threading.RLock()
+        self._instances: Dict[str, Any] = {}
+
+    @_shared
+    def db(self) -> Database:
+        return self._db or Database()
+
+    # Репозитории
+
+    @_shared
+    def project_repo(self) -> ProjectRepository:
+        return ProjectRepository(self.db)
+
+    @_shared
+    def task_repo(self) -> TaskRepository:
+        return TaskRepository(self.db)
+
+    @_shared
+    def board_repo(self) -> BoardRepository:
+        return BoardRepository(self.db)
+
+    @_shared
+    def column_repo(self) -> ColumnRepository:
+        return ColumnRepository(self.db)
+
+    @_shared
+    def workspace_repo(self) -> WorkspaceRepository:
+        return WorkspaceRepository(self.db)
+
+    @_shared
+    def field_repo(self) -> CustomFieldRepository:
+        return CustomFieldRepository(self.db)
+
+    @_shared
+    def personal_task_repo(self) -> PersonalTaskRepository:
+        return PersonalTaskRepository(self.db)
+
+    @_shared
+    def tag_repo(self) -> TagRepository:
+        return TagRepository(self.db)
+
+    @_shared
+    def dependency_repo(self) -> BoardDependencyRepository:
+        return BoardDependencyRepository(self.db)
+
+    @_shared
+    def assignee_repo(self) -> TaskAssigneeRepository:
+        return TaskAssigneeRepository(self.db)
+
+    @_shared
+    def member_repo(self) -> ProjectMemberRepository:
+        return ProjectMemberRepository(self.db)
+
+    @_shared
+    def analytics_repo(self) -> AnalyticsRepository:
+        return AnalyticsRepository(self.db)
+
+    # Сервисы
+
+    @_shared
+    def project_service(self) -> ProjectService:
+        return ProjectService(self.project_repo, self.board_repo, self.column_repo, self.task_repo)
+
+    @_shared
+    def task_service(self) -> TaskService:
+        return TaskService(self.task_repo, self.column_repo)
+
+    @_shared
+    def workflow_task_service(self) -> TaskService:
+        """TaskService с зависимостями досок и назначениями (перемещение задач пользователем)"""
+        return TaskService(self.task_repo, self.column_repo, self.dependency_service, self.assignment_service)
+
+    @_shared
+    def board_service(self) -> BoardService:
+        return BoardService(self.board_repo, self.column_repo)
+
+    @_shared
+    def stats_service(self) -> StatisticsService:
+        return StatisticsService(
+            self.task_repo, self.project_repo, self.board_repo, self.workspace_repo, self.column_repo
+        )
+
+    @_shared
+    def workspace_service(self) -> WorkspaceService:
+        return WorkspaceService(self.workspace_repo)
+
+    @_shared
+    def dependency_service(self) -> DependencyService:
+        return DependencyService(
+            self.dependency_repo, self.task_repo, self.project_repo, self.column_repo, self.board_repo
+        )
+
+    @_shared
+    def assignment_service(self) -> AssignmentService:
+        return AssignmentService(
+            self.assignee_repo, self.member_repo, self.task_repo,
+            self.project_repo, self.column_repo, self.board_repo
+        )
+
+    @_shared
+    def sync_service(self) -> SyncService:
+        return SyncService(self.task_repo, self.field_repo)
+
+    @_shared
+    def name_resolver(self) -> NameResolver:
+        return NameResolver(self.board_repo, self.column_repo, self.project_repo)
+
+    @_shared
+    def date_parser(self) -> DateParser:
+        return DateParser()
+
+    @_shared
+    def task_classifier(self) -> TaskClassifier:
+        return TaskClassifier(self.project_repo)
+
+    @_shared
+    def todo_service(self) -> TodoService:
+        return TodoService(
+            self.personal_task_repo,
+            self.task_repo,
+            self.project_repo,
+            self.column_repo,
+            self.board_repo,
+            self.date_parser,
+            self.task_classifier
+        )
+
+
+# Общий контейнер процесса (БД по умолчанию из Config.DATABASE_PATH)
+container = ServiceContainer()
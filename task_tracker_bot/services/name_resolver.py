@@ -0,0 +1,89 @@
+"""
+Сервис поиска досок, колонок и проектов по названию с опечатками
+"""
+import logging
+from typing import List, Optional
+from repositories.board_repository import BoardRepository
+from repositories.column_repository import ColumnRepository
+from repositories.project_repository import ProjectRepository
+from utils.name_index import MIN_SCORE, NameEntry, NameIndex, NameIndexCache, NameMatch, name_index_cache
+
+logger = logging.getLogger(__name__)
+
+
+class NameResolver:
+    """
+    Названия пространства из памяти: "доска подготовки" -> "Подготовка",
+    "в дизайн" -> "Дизайн", "Polarod" -> проект "Polaroid"
+
+    Индекс строится при первом обращении к пространству (доски, их колонки
+    и проекты) и сбрасывается репозиториями при записи. Для записей
+    вызывающий код передает min_score=WRITE_MIN_SCORE - тогда находится
+    только точное (после нормализации) название.
+    """
+
+    def __init__(self, board_repo: BoardRepository, column_repo: ColumnRepository,
+                 project_repo: ProjectRepository, cache: Optional[NameIndexCache] = None):
+        self.board_repo = board_repo
+        self.column_repo = column_repo
+        self.project_repo = project_repo
+        self.cache = cache or name_index_cache
+
+    def get_index(self, workspace_id: int) -> NameIndex:
+        """Индекс названий пространства"""
+        index = self.cache.get(workspace_id)
+        if index is None:
+            version = self.cache.version(workspace_id)
+            index = self._build_index(workspace_id)
+            self.cache.set(workspace_id, index, version)
+        return index
+
+    def _build_index(self, workspace_id: int) -> NameIndex:
+        entries = []
+        for board in self.board_repo.get_all_by_workspace(workspace_id):
+            entries.append(NameEntry("board", board.id, board.name))
+            entries.extend(
+                NameEntry("column", column.id, column.name, board_id=board.id)
+                for column in self.column_repo.get_all_by_board(board.id)
+            )
+        entries.extend(
+            NameEntry("project", project.id, project.name)
+            for project in self.project_repo.get_all_by_workspace(workspace_id)
+        )
+        logger.debug(f"Индекс названий workspace_id={workspace_id}: {len(entries)} записей")
+        return NameIndex(entries)
+
+    def resolve_board(self, workspace_id: int, name: str, min_score: float = MIN_SCORE) -> Optional[NameMatch]:
+        """Доска по названию или None, если не найдена или неоднозначна"""
+        return self.get_index(workspace_id).resolve(name, "board", min_score=min_score)
+
+    def resolve_column(self, workspace_id: int, name: str, board_id: Optional[int] = None,
+                       min_score: float = MIN_SCORE) -> Optional[NameMatch]:
+        """Колонка по названию (в пределах доски board_id, если указана)"""
+        return self.get_index(workspace_id).resolve(name, "column", board_id=board_id, min_score=min_score)
+
+    def resolve_project(self, workspace_id: int, name: str, min_score: float = MIN_SCORE) -> Optional[NameMatch]:
+        """Проект по ID или названию"""
+        index = self.get_index(workspace_id)
+        project_id = name.strip().lstrip("#")
+        for entry in index.entries:
+            if entry.kind == "project" and entry.id == project_id:
+                return NameMatch(entry, 1.0)
+        return index.resolve(name, "project", min_score=min_score)
+
+    def find_in_text(self, workspace_id: int, text: str, kind: str) -> Optional[NameMatch]:
+        """Название типа kind, упомянутое в свободном тексте"""
+        return self.get_index(workspace_id).find_in_text(text, kind)
+
+    def suggest(self, workspace_id: int, name: str, kind: str,
+                board_id: Optional[int] = None, limit: int = 3) -> List[str]:
+        """Похожие названия для подсказки "Возможно, вы имели в виду" """
+        matches = self.get_index(workspace_id).search(name, kind=kind, board_id=board_id, limit=limit)
+        return [match.entry.name for match in matches]
+
+    def column_ids(self, workspace_id: int, board_id: int) -> List[int]:
+        """ID колонок доски из индекса"""
+        return [
+            entry.id for entry in self.get_index(workspace_id).entries
+            if entry.kind == "column" and entry.board_id == board_id
+        ]
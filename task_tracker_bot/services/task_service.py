@@ -2,7 +2,7 @@
 Сервис для работы с Task
 """
 import logging
-from typing import List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
 from repositories.task_repository import TaskRepository
 from repositories.column_repository import ColumnRepository
@@ -77,6 +77,10 @@ class TaskService:
         """Получить подзадачи"""
         return self.task_repo.get_subtasks(parent_task_id)
     
+    def get_task_tree(self, task_id: int, max_depth: int = 5) -> Optional[Dict[str, Any]]:
+        """Получить дерево подзадач со сводным прогрессом"""
+        return self.task_repo.get_task_tree(task_id, max_depth)
+    
     def update_task(self, task_id: int, title: Optional[str] = None,
                    description: Optional[str] = None, priority: Optional[int] = None) -> tuple[bool, Optional[str]]:
         """Обновить задачу"""
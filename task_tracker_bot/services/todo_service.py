@@ -4,7 +4,7 @@
 import re
 import logging
 from datetime import datetime, date, time, timedelta
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional
 from repositories.personal_task_repository import PersonalTaskRepository
 from repositories.task_repository import TaskRepository
 from repositories.project_repository import ProjectRepository
@@ -15,6 +15,9 @@ from utils.task_classifier import TaskClassifier
 
 logger = logging.getLogger(__name__)
 
+# Уточнение классификации: ([{index, text}], workspace_id) -> {index: классификация}
+ClassificationRefiner = Callable[[List[Dict[str, Any]], int], Dict[int, Dict[str, Any]]]
+
 class TodoService:
     """Сервис для работы с туду-листом"""
     
@@ -41,7 +44,8 @@ class TodoService:
         tasks_text: str,
         workspace_id: int,
         user_id: int,
-        default_date: Optional[date] = None
+        default_date: Optional[date] = None,
+        refine_classification: Optional[ClassificationRefiner] = None
     ) -> Dict[str, Any]:
         """
         Создает пакет задач из текста
@@ -51,6 +55,8 @@ class TodoService:
             workspace_id: ID пространства
             user_id: ID пользователя
             default_date: Дата по умолчанию (если не указана в задаче)
+            refine_classification: Уточнение неоднозначных строк (вызывается
+                один раз на пакет со всеми такими строками)
         
         Returns:
             {
@@ -77,6 +83,8 @@ class TodoService:
         tasks_list = self._parse_task_list(tasks_text)
         logger.debug(f"Распарсено задач из текста: {len(tasks_list)}")
         
+        classifications = self._classify_batch(tasks_list, workspace_id, default_date, refine_classification)
+        
         for idx, task_text in enumerate(tasks_list, 1):
             try:
                 logger.debug(f"Обработка задачи {idx}/{len(tasks_list)}: '{task_text}'")
@@ -99,7 +107,7 @@ class TodoService:
                 )
                 
                 # Классификация задачи
-                classification = self.task_classifier.classify_task(
+                classification = classifications.get(idx - 1) or self.task_classifier.classify_task(
                     cleaned_text,
                     workspace_id
                 )
@@ -263,18 +271,92 @@ class TodoService:
         # Получение рабочих задач (если нужно)
         work_tasks = []
         if include_work_tasks:
-            # Получаем все задачи с scheduled_date на эту дату
-            # Фильтруем только те, которые связаны с проектами пользователя
-            work_tasks = self.task_repo.get_by_scheduled_date(target_date)
-        
-        # Группировка по времени
-        grouped_by_time = self._group_tasks_by_time(personal_tasks, work_tasks)
+            # Только задачи из пространств пользователя или назначенные на него
+            work_tasks = self.task_repo.get_scheduled_for_user(user_id, target_date)
         
+        return self.build_todo_list(target_date, personal_tasks, work_tasks)
+    
+    def build_todo_list(
+        self,
+        target_date: date,
+        personal_tasks: List,
+        work_tasks: List
+    ) -> Dict[str, Any]:
+        """Собрать туду-лист на дату из уже загруженных задач (без запросов к БД)"""
         return {
             "date": target_date.strftime("%d.%m.%Y"),
             "personal_tasks": personal_tasks,
             "work_tasks": work_tasks,
-            "grouped_by_time": grouped_by_time
+            "grouped_by_time": self._group_tasks_by_time(personal_tasks, work_tasks)
+        }
+    
+    def get_todo_range(
+        self,
+        user_id: int,
+        start_date: date,
+        end_date: date,
+        include_work_tasks: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Получает задачи за диапазон дат одним запросом на таблицу
+        
+        Счетчики по дням считаются за один проход по загруженным задачам.
+        
+        Args:
+            user_id: ID пользователя
+            start_date: Начало диапазона (включительно)
+            end_date: Конец диапазона (включительно)
+            include_work_tasks: Включать ли рабочие задачи
+        
+        Returns:
+            {
+                "start_date": date,
+                "end_date": date,
+                "days": {date: {"personal_tasks": [...], "work_tasks": [...],
+                                "total": int, "completed": int}},
+                "total": int,
+                "completed": int
+            }
+        """
+        personal_tasks = self.personal_task_repo.get_by_date_range(user_id, start_date, end_date)
+        work_tasks = []
+        if include_work_tasks:
+            work_tasks = self.task_repo.get_scheduled_for_user(user_id, start_date, end_date)
+        
+        days = {}
+        current = start_date
+        while current <= end_date:
+            days[current] = {"personal_tasks": [], "work_tasks": [], "total": 0, "completed": 0}
+            current += timedelta(days=1)
+        
+        total = 0
+        completed = 0
+        for key, tasks, is_done in (
+            ("personal_tasks", personal_tasks, lambda t: t.completed),
+            ("work_tasks", work_tasks, lambda t: t.completed_at is not None),
+        ):
+            for task in tasks:
+                day = days.get(task.scheduled_date)
+                if day is None:
+                    continue
+                day[key].append(task)
+                day["total"] += 1
+                total += 1
+                if is_done(task):
+                    day["completed"] += 1
+                    completed += 1
+        
+        logger.debug(
+            f"Загружен диапазон туду-листа {start_date}..{end_date} для user_id={user_id}: "
+            f"личных={len(personal_tasks)}, рабочих={len(work_tasks)}"
+        )
+        
+        return {
+            "start_date": start_date,
+            "end_date": end_date,
+            "days": days,
+            "total": total,
+            "completed": completed
         }
     
     def mark_personal_task_completed(
@@ -298,6 +380,52 @@ class TodoService:
             logger.error(f"Ошибка при отметке задачи {task_id}: {e}", exc_info=True)
             return (False, str(e))
     
+    def _classify_batch(
+        self,
+        tasks_list: List[str],
+        workspace_id: int,
+        default_date: date,
+        refine_classification: Optional[ClassificationRefiner]
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Классификация строк пакета до создания задач
+        
+        Строки классифицируются правилами, неоднозначные отправляются в
+        refine_classification одним вызовом. Без refine_classification
+        классификация выполняется по ходу создания задач.
+        
+        Returns:
+            {индекс строки: классификация}
+        """
+        if refine_classification is None:
+            return {}
+        
+        classifications: Dict[int, Dict[str, Any]] = {}
+        for index, task_text in enumerate(tasks_list):
+            try:
+                cleaned_text = self.date_parser.parse_datetime_from_task(task_text, default_date)["remaining_text"]
+                classifications[index] = self.task_classifier.classify_task(cleaned_text, workspace_id)
+            except Exception as e:
+                # Ошибка строки будет учтена при создании задачи
+                logger.debug(f"Строка {index + 1} не классифицирована заранее: {e}")
+        
+        ambiguous = self.task_classifier.find_ambiguous(classifications, workspace_id)
+        if not ambiguous:
+            return classifications
+        
+        items = [{"index": index, "text": classifications[index]["title"]} for index in ambiguous]
+        try:
+            refined = refine_classification(items, workspace_id)
+        except Exception as e:
+            logger.warning(f"Уточнение классификации не удалось, используются правила: {e}")
+            return classifications
+        
+        for index in ambiguous:
+            if index in refined:
+                classifications[index] = refined[index]
+        logger.info(f"Уточнено строк пакета: {len(refined)} из {len(ambiguous)} неоднозначных")
+        return classifications
+    
     def _parse_task_list(self, tasks_text: str) -> List[str]:
         """Разбить текст на отдельные задачи"""
         tasks = []
@@ -12,6 +12,25 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database import Database
 
+@pytest.fixture(autouse=True)
+def reset_circuit_breaker():
+    """Замкнуть общий размыкатель io.net API: ошибки API в одном тесте не влияют на другие"""
+    # Модуль может быть загружен и как agents.*, и как task_tracker_bot.agents.*
+    breakers = [
+        module.io_net_breaker for name, module in list(sys.modules.items())
+        if name.endswith("agents.circuit_breaker") and hasattr(module, "io_net_breaker")
+    ]
+    for breaker in breakers:
+        breaker.reset()
+    yield
+
+@pytest.fixture(autouse=True)
+def reset_name_index():
+    """Очистить индекс названий: у пространств разных временных БД одинаковые ID"""
+    from utils.name_index import name_index_cache
+    name_index_cache.clear()
+    yield
+
 @pytest.fixture
 def temp_db():
     """Создать временную БД для тестов"""
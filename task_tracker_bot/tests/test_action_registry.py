@@ -0,0 +1,95 @@
+"""
+Тесты реестра действий агентов и проверки плана
+"""
+from unittest.mock import Mock, patch
+
+import pytest
+
+from agents.action_registry import ActionValidationError
+from agents.agent_coordinator import AgentCoordinator, action_registry
+
+
+def test_registry_lists_plan_actions_only():
+    """Тест: в реестре методы агентов без process/call_api и служебных методов"""
+    assert "get_project" in action_registry.actions("ADM")
+    assert "find_bottlenecks" in action_registry.actions("AAM")
+    assert "process" not in action_registry.actions("ADM")
+    assert "classify_todo_lines" not in action_registry.actions("ATM")
+    assert action_registry.get("Orchestrator", "analyze_request") is None
+
+
+def test_repair_plan_fixes_names():
+    """Тест: регистр, число слов, агент и опечатки в параметрах исправляются локально"""
+    plan = [
+        {"agent": "ADM", "action": "getProject", "params": {"projectId": "5005"}},
+        {"agent": "ATM", "action": "get_task", "params": {"task_id": 12}},
+        {"agent": "adm", "action": "get_task_by_board_name", "params": {"board_nme": "Дизайн"}},
+        {"agent": "AAM", "action": "ADM.get_next_project_id"},
+    ]
+
+    assert action_registry.repair_plan(plan) == []
+    assert [(step["agent"], step["action"]) for step in plan] == [
+        ("ADM", "get_project"),
+        ("ADM", "get_task"),
+        ("ADM", "get_tasks_by_board_name"),
+        ("ADM", "get_next_project_id"),
+    ]
+    assert plan[0]["params"] == {"project_id": "5005"}
+    assert plan[2]["params"] == {"board_name": "Дизайн"}
+    assert plan[3]["params"] == {}
+
+
+def test_repair_plan_rejects_unknown_actions():
+    """Тест: неизвестное действие или агент - ошибка шага"""
+    errors = action_registry.repair_plan([
+        {"agent": "ADM", "action": "get_project", "params": {"project_id": "5005"}},
+        {"agent": "ATM", "action": "send_invoice", "params": {}},
+        {"agent": "XYZ", "action": "get_project", "params": {}},
+    ])
+
+    assert errors == ["Шаг 2: неизвестное действие ATM.send_invoice", "Шаг 3: неизвестный агент XYZ"]
+
+
+@pytest.mark.parametrize("action", ["read_project", "delete_project", "rename_project", "get_tasks_by_bord_name"])
+def test_repair_plan_does_not_guess_similar_actions(action):
+    """Тест: похожее по написанию действие не подставляется вместо неизвестного"""
+    step = {"agent": "ADM", "action": action, "params": {"project_id": "5005"}}
+
+    assert action_registry.repair_plan([step]) == [f"Шаг 1: неизвестное действие ADM.{action}"]
+    assert step["action"] == action
+
+
+def test_bind_coerces_and_checks_required():
+    """Тест: лишние параметры отбрасываются, значения приводятся к типам аннотаций"""
+    get_task = action_registry.get("ADM", "get_task")
+    assert get_task.bind({"task_id": "#12", "workspace_id": 1, "entities": {}}) == {"task_id": 12}
+
+    get_project = action_registry.get("ADM", "get_project")
+    assert get_project.bind({"project_id": 5005}) == {"project_id": "5005"}
+
+    with pytest.raises(ActionValidationError, match="не указаны параметры task_id"):
+        get_task.bind({"workspace_id": 1})
+    with pytest.raises(ActionValidationError, match="ожидается int"):
+        get_task.bind({"task_id": "двенадцать"})
+
+
+def test_unknown_action_fails_without_llm_call():
+    """Тест: план с неизвестным действием отклоняется до выполнения шагов"""
+    coordinator = AgentCoordinator(api_key="test-key", db=Mock())
+    coordinator.agents["ADM"] = Mock()
+    coordinator.agents["Orchestrator"] = Mock(analyze_request=Mock(return_value={
+        "intent": "create_project",
+        "entities": {},
+        "plan": [
+            {"agent": "ADM", "action": "get_next_project_id", "params": {}},
+            {"agent": "ADM", "action": "archive_everything", "params": {}},
+        ]
+    }))
+
+    with patch('agents.agent_coordinator.Config.INTENT_FAST_PATH', False):
+        result = coordinator.process_user_message("Сделай что-нибудь", workspace_id=1)
+
+    assert result["status"] == "error"
+    assert "неизвестное действие ADM.archive_everything" in result["message"]
+    coordinator.adm.get_next_project_id.assert_not_called()
+    coordinator.adm.process.assert_not_called()
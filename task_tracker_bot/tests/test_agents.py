@@ -30,18 +30,8 @@ def mock_api_key():
 @pytest.fixture
 def data_manager(mock_db, mock_api_key):
     """Создание DataManagerAgent с моками"""
-    with patch('agents.data_manager.ProjectRepository'), \
-         patch('agents.data_manager.TaskRepository'), \
-         patch('agents.data_manager.BoardRepository'), \
-         patch('agents.data_manager.ColumnRepository'), \
-         patch('agents.data_manager.CustomFieldRepository'), \
-         patch('agents.data_manager.ProjectService'), \
-         patch('agents.data_manager.TaskService'), \
-         patch('agents.data_manager.BoardService'), \
-         patch('agents.data_manager.StatisticsService'):
-        
-        adm = DataManagerAgent(api_key=mock_api_key, db=mock_db)
-        return adm
+    # Контейнер создает репозитории и сервисы над mock_db, тесты подменяют их методы
+    return DataManagerAgent(api_key=mock_api_key, db=mock_db)
 
 
 class TestDataManagerAgent:
@@ -141,6 +131,27 @@ class TestTaskManagerAgent:
         )
         
         assert result["status"] == "success"
+    
+    def test_classify_todo_lines_single_call(self, mock_api_key, data_manager):
+        """Тест: строки классифицируются одним вызовом, низкая уверенность отбрасывается"""
+        atm = TaskManagerAgent(api_key=mock_api_key, data_manager=data_manager)
+        project = Mock(id="5001")
+        project.name = "Polaroid"
+        data_manager.project_repo.get_all_by_workspace = Mock(return_value=[project])
+        atm.process = Mock(return_value={"items": [
+            {"index": 1, "project_id": "5001", "title": "Иконки", "confidence": 0.9},
+            {"index": 2, "project_id": "5001", "title": "Макет", "confidence": 0.3},
+            {"index": 3, "project_id": "7777", "title": "Чужой", "confidence": 0.95},
+        ]})
+        
+        result = atm.classify_todo_lines(
+            [{"index": 1, "text": "Иконки Polaroid"}, {"index": 2, "text": "Макет"}, {"index": 3, "text": "7777 Чужой"}],
+            workspace_id=1
+        )
+        
+        atm.process.assert_called_once()
+        assert atm.process.call_args.kwargs["intent"] == "classify_todo"
+        assert result == {1: {"type": "work", "project_id": "5001", "title": "Иконки", "description": None}}
 
 
 class TestControlManagerAgent:
@@ -213,6 +224,162 @@ class TestAgentCoordinator:
         )
         
         assert "status" in result
+    
+    @patch('agents.agent_coordinator.DataManagerAgent')
+    @patch('agents.agent_coordinator.OrchestratorAgent')
+    @patch('agents.agent_coordinator.TaskManagerAgent')
+    @patch('agents.agent_coordinator.ControlManagerAgent')
+    @patch('agents.agent_coordinator.AnalyzeManagerAgent')
+    def test_plan_dependencies(self, mock_aam, mock_acm, mock_atm, mock_orch, mock_adm, mock_db):
+        """Тест вывода зависимостей шагов плана"""
+        coordinator = AgentCoordinator(api_key="test-key", db=mock_db)
+        plan = [
+            {"agent": "ADM", "action": "create_project", "params": {"project_id": "5005"}},
+            {"agent": "ADM", "action": "add_project_link", "params": {"project_id": "5005", "url": "a"}},
+            {"agent": "ADM", "action": "add_project_link", "params": {"project_id": "5006", "url": "b"}},
+            {"agent": "ATM", "action": "create_task", "params": {"title": "$project_id"}},
+            {"agent": "ACM", "action": "validate_project", "params": {}},
+            {"id": "last", "agent": "AAM", "action": "report", "params": {}, "depends_on": [2]},
+        ]
+        
+        assert coordinator._plan_dependencies(plan) == [
+            set(), {0}, set(), {0, 1, 2}, {0, 1, 2, 3}, {2}
+        ]
+        
+        # Записи одной сущности идут по порядку плана, чтения между собой - параллельно
+        plan = [
+            {"agent": "ADM", "action": "update_task", "params": {"task_id": 7}},
+            {"agent": "ADM", "action": "update_task", "params": {"task_id": 7, "status": "done"}},
+            {"agent": "ADM", "action": "get_task", "params": {"task_id": 7}},
+            {"agent": "ADM", "action": "get_task", "params": {"task_id": 7}},
+            {"agent": "ADM", "action": "delete_task", "params": {"task_id": 7}},
+            {"agent": "ADM", "action": "update_task", "params": {"task_id": 8}},
+        ]
+        assert coordinator._plan_dependencies(plan) == [
+            set(), {0}, {0, 1}, {0, 1}, {0, 1, 2, 3}, set()
+        ]
+        
+        # Явный пустой depends_on не отменяет выведенные зависимости
+        plan = [
+            {"agent": "ADM", "action": "get_next_project_id", "params": {}},
+            {"agent": "ADM", "action": "create_project", "params": {"project_id": "$project_id"}, "depends_on": []},
+            {"agent": "AAM", "action": "report", "params": {"project_id": "5005"}, "depends_on": [0]},
+            {"agent": "ADM", "action": "add_project_link", "params": {"project_id": "5005"}, "depends_on": [1]},
+        ]
+        assert coordinator._plan_dependencies(plan) == [set(), {0}, {0}, {1, 2}]
+    
+    @patch('agents.agent_coordinator.DataManagerAgent')
+    @patch('agents.agent_coordinator.OrchestratorAgent')
+    @patch('agents.agent_coordinator.TaskManagerAgent')
+    @patch('agents.agent_coordinator.ControlManagerAgent')
+    @patch('agents.agent_coordinator.AnalyzeManagerAgent')
+    def test_independent_steps_run_in_parallel(self, mock_aam, mock_acm, mock_atm, mock_orch, mock_adm, mock_db):
+        """Тест параллельного выполнения независимых шагов и подстановки контекста"""
+        import threading
+        coordinator = AgentCoordinator(api_key="test-key", db=mock_db)
+        barrier = threading.Barrier(2, timeout=5)
+        
+        def add_link(project_id, url):
+            # Оба шага должны выполняться одновременно, иначе барьер не пройдет
+            barrier.wait()
+            return {"status": "success", "message": f"Ссылка {url}", "data": {"link": url}}
+        
+        requested = []
+        
+        def get_project(project_id):
+            requested.append(project_id)
+            return {"status": "success", "message": "Проект"}
+        
+        # Функции, а не Mock: координатор фильтрует параметры по сигнатуре метода
+        coordinator.adm.add_project_link = add_link
+        coordinator.adm.get_project = get_project
+        coordinator.orchestrator.analyze_request = Mock(return_value={
+            "intent": "add_links",
+            "entities": {},
+            "plan": [
+                {"agent": "ADM", "action": "add_project_link", "params": {"project_id": "5005", "url": "a"}},
+                {"agent": "ADM", "action": "add_project_link", "params": {"project_id": "5006", "url": "b"}},
+                {"agent": "ADM", "action": "get_project", "params": {"project_id": "$link"}, "depends_on": [0, 1]},
+            ]
+        })
+        
+        result = coordinator.process_user_message(user_message="Добавь две ссылки", workspace_id=1)
+        
+        assert result["status"] == "success"
+        assert [r["action"] for r in result["execution_results"]] == [
+            "add_project_link", "add_project_link", "get_project"
+        ]
+        assert all("execution_time_ms" in r for r in result["execution_results"])
+        # Оба шага задают "link": в контексте значение последнего по плану
+        assert requested == ["b"]
+    
+    @patch('agents.agent_coordinator.DataManagerAgent')
+    @patch('agents.agent_coordinator.OrchestratorAgent')
+    @patch('agents.agent_coordinator.TaskManagerAgent')
+    @patch('agents.agent_coordinator.ControlManagerAgent')
+    @patch('agents.agent_coordinator.AnalyzeManagerAgent')
+    def test_context_merged_in_plan_order(self, mock_aam, mock_acm, mock_atm, mock_orch, mock_adm, mock_db):
+        """Тест: данные шагов попадают в контекст в порядке плана, а не завершения"""
+        import time
+        coordinator = AgentCoordinator(api_key="test-key", db=mock_db)
+        
+        def add_link(project_id, url):
+            if url == "a":
+                time.sleep(0.1)
+            return {"status": "success", "message": f"Ссылка {url}", "data": {"link": url}}
+        
+        requested = []
+        
+        def get_project(project_id):
+            requested.append(project_id)
+            return {"status": "success", "message": "Проект", "data": ["не словарь"]}
+        
+        coordinator.adm.add_project_link = add_link
+        coordinator.adm.get_project = get_project
+        coordinator.orchestrator.analyze_request = Mock(return_value={
+            "intent": "add_links",
+            "entities": {},
+            "plan": [
+                {"agent": "ADM", "action": "add_project_link", "params": {"project_id": "5005", "url": "a"}},
+                {"agent": "ADM", "action": "add_project_link", "params": {"project_id": "5006", "url": "b"}},
+                {"agent": "ADM", "action": "get_project", "params": {"project_id": "$link"}},
+            ]
+        })
+        
+        result = coordinator.process_user_message(user_message="Добавь две ссылки", workspace_id=1)
+        
+        # Первый шаг завершается последним, но в контексте остается значение второго
+        assert result["status"] == "success"
+        assert requested == ["b"]
+        assert [r["status"] for r in result["execution_results"]] == ["success"] * 3
+    
+    @patch('agents.agent_coordinator.DataManagerAgent')
+    @patch('agents.agent_coordinator.OrchestratorAgent')
+    @patch('agents.agent_coordinator.TaskManagerAgent')
+    @patch('agents.agent_coordinator.ControlManagerAgent')
+    @patch('agents.agent_coordinator.AnalyzeManagerAgent')
+    def test_error_stops_dependent_steps(self, mock_aam, mock_acm, mock_atm, mock_orch, mock_adm, mock_db):
+        """Тест: после ошибки шага зависимые шаги не запускаются"""
+        coordinator = AgentCoordinator(api_key="test-key", db=mock_db)
+        def create_project(project_id, name):
+            raise Exception("Проект уже существует")
+        
+        coordinator.adm.create_project = create_project
+        coordinator.adm.add_project_link = Mock()
+        coordinator.orchestrator.analyze_request = Mock(return_value={
+            "intent": "create_project",
+            "entities": {},
+            "plan": [
+                {"agent": "ADM", "action": "create_project", "params": {"project_id": "5005", "name": "X"}},
+                {"agent": "ADM", "action": "add_project_link", "params": {"project_id": "5005", "url": "a"}},
+            ]
+        })
+        
+        result = coordinator.process_user_message(user_message="Создай проект", workspace_id=1)
+        
+        assert result["status"] == "error"
+        assert len(result["execution_results"]) == 1
+        coordinator.adm.add_project_link.assert_not_called()
 
 
 class TestIntegration:
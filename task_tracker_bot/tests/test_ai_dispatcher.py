@@ -0,0 +1,83 @@
+"""
+Тесты для диспетчера AI-запросов
+"""
+
+import asyncio
+import pytest
+
+from agents.ai_dispatcher import AIDispatcher, UserBusyError
+
+
+@pytest.fixture
+def dispatcher():
+    """Диспетчер с одним слотом"""
+    d = AIDispatcher(max_concurrency=1, max_workers=1)
+    yield d
+    d.shutdown()
+
+
+async def test_queue_positions_and_order(dispatcher):
+    """Запросы сверх лимита ждут в очереди и получают позицию"""
+    gate = asyncio.Event()
+    order = []
+    positions = {2: [], 3: []}
+    
+    async def job(user_id):
+        order.append(user_id)
+        if user_id == 1:
+            await gate.wait()
+        return user_id
+    
+    def on_position(user_id):
+        async def callback(position):
+            positions[user_id].append(position)
+        return callback
+    
+    first = asyncio.create_task(dispatcher.run(1, lambda: job(1)))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(dispatcher.run(2, lambda: job(2), on_position(2)))
+    third = asyncio.create_task(dispatcher.run(3, lambda: job(3), on_position(3)))
+    await asyncio.sleep(0)
+    
+    assert dispatcher.get_stats() == {"running": 1, "queued": 2, "max_concurrency": 1}
+    gate.set()
+    assert await asyncio.gather(first, second, third) == [1, 2, 3]
+    await asyncio.sleep(0)
+    
+    assert order == [1, 2, 3]
+    assert positions[2] == [1]
+    assert positions[3] == [2, 1]
+    assert dispatcher.get_stats()["running"] == 0
+
+
+async def test_one_request_per_user(dispatcher):
+    """Второй запрос того же пользователя отклоняется"""
+    gate = asyncio.Event()
+    task = asyncio.create_task(dispatcher.run(1, gate.wait))
+    await asyncio.sleep(0)
+    
+    assert dispatcher.is_busy(1)
+    with pytest.raises(UserBusyError):
+        await dispatcher.run(1, gate.wait)
+    
+    gate.set()
+    await task
+    assert not dispatcher.is_busy(1)
+
+
+async def test_cancelled_waiter_leaves_queue(dispatcher):
+    """Отмененный запрос не занимает слот"""
+    gate = asyncio.Event()
+    first = asyncio.create_task(dispatcher.run(1, gate.wait))
+    await asyncio.sleep(0)
+    waiting = asyncio.create_task(dispatcher.run(2, gate.wait))
+    await asyncio.sleep(0)
+    
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    assert dispatcher.get_stats()["queued"] == 0
+    
+    gate.set()
+    await first
+    assert dispatcher.get_stats()["running"] == 0
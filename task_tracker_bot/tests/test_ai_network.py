@@ -38,16 +38,13 @@ def mock_context():
 class TestWorkspaceUserData:
     """Тесты для сохранения workspace в user_data"""
     
-    @patch('handlers.ai_handler.WorkspaceRepository')
-    @patch('handlers.ai_handler.Database')
-    def test_workspace_saved_in_user_data(self, mock_db_class, mock_repo_class, mock_context):
+    @patch('task_tracker_bot.handlers.ai_handler.container')
+    def test_workspace_saved_in_user_data(self, mock_container, mock_context):
         """Проверка сохранения workspace в user_data"""
         # Настройка моков
         mock_workspace = Mock()
         mock_workspace.id = 1
-        mock_repo = Mock()
-        mock_repo.get_all_by_user = Mock(return_value=[mock_workspace])
-        mock_repo_class.return_value = mock_repo
+        mock_container.workspace_repo.get_all_by_user = Mock(return_value=[mock_workspace])
         
         # Вызов функции
         workspace_id = get_user_workspace(user_id=12345, context=mock_context)
@@ -56,18 +53,15 @@ class TestWorkspaceUserData:
         assert workspace_id == 1
         assert mock_context.user_data['current_workspace_id'] == 1
     
-    @patch('task_tracker_bot.handlers.ai_handler.WorkspaceRepository')
-    @patch('task_tracker_bot.handlers.ai_handler.Database')
-    def test_workspace_fallback_to_first(self, mock_db_class, mock_repo_class, mock_context):
+    @patch('task_tracker_bot.handlers.ai_handler.container')
+    def test_workspace_fallback_to_first(self, mock_container, mock_context):
         """Проверка fallback на первое пространство"""
         # Настройка моков - нет сохраненного workspace
         mock_workspace1 = Mock()
         mock_workspace1.id = 1
         mock_workspace2 = Mock()
         mock_workspace2.id = 2
-        mock_repo = Mock()
-        mock_repo.get_all_by_user = Mock(return_value=[mock_workspace1, mock_workspace2])
-        mock_repo_class.return_value = mock_repo
+        mock_container.workspace_repo.get_all_by_user = Mock(return_value=[mock_workspace1, mock_workspace2])
         
         # Вызов функции
         workspace_id = get_user_workspace(user_id=12345, context=mock_context)
@@ -76,9 +70,8 @@ class TestWorkspaceUserData:
         assert workspace_id == 1
         assert mock_context.user_data['current_workspace_id'] == 1
     
-    @patch('task_tracker_bot.handlers.ai_handler.WorkspaceRepository')
-    @patch('task_tracker_bot.handlers.ai_handler.Database')
-    def test_workspace_uses_cached(self, mock_db_class, mock_repo_class, mock_context):
+    @patch('task_tracker_bot.handlers.ai_handler.container')
+    def test_workspace_uses_cached(self, mock_container, mock_context):
         """Проверка использования сохраненного workspace"""
         # Настройка - workspace уже сохранен
         mock_context.user_data['current_workspace_id'] = 5
@@ -89,7 +82,7 @@ class TestWorkspaceUserData:
         # Проверки - должен использоваться сохраненный
         assert workspace_id == 5
         # Репозиторий не должен вызываться
-        mock_repo_class.assert_not_called()
+        mock_container.workspace_repo.get_all_by_user.assert_not_called()
 
 
 class TestAPIRetry:
@@ -208,7 +201,7 @@ class TestOrchestratorCache:
         orchestrator = OrchestratorAgent(api_key=mock_api_key)
         
         # Добавляем что-то в кэш
-        orchestrator.cache["test"] = ({"result": "test"}, time.time())
+        orchestrator.cache.set(orchestrator.cache.make_key("test"), {"result": "test"})
         assert len(orchestrator.cache) == 1
         
         # Очищаем кэш
@@ -402,3 +395,85 @@ class TestIntegration:
         assert result1 == result2
         assert result1 != result3
 
+
+
+class TestAsyncAPIClient:
+    """Тесты асинхронного клиента io.net API"""
+    
+    @staticmethod
+    def _make_agent(mock_api_key):
+        from task_tracker_bot.agents.base_agent import BaseAgent
+        
+        class EchoAgent(BaseAgent):
+            def get_system_prompt(self) -> str:
+                return "system"
+        
+        agent = EchoAgent(api_key=mock_api_key)
+        agent.retry_count = 3
+        agent.retry_delay = 0.01
+        return agent
+    
+    @staticmethod
+    def _client(responses):
+        """AsyncClient, отдающий заранее заданные ответы по очереди"""
+        import httpx
+        calls = []
+        
+        def handler(request):
+            calls.append(request)
+            status, body = responses[len(calls) - 1]
+            return httpx.Response(status, json=body)
+        
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler)), calls
+    
+    async def test_process_async_retries_5xx(self, mock_api_key):
+        """Проверка retry при 5xx и разбора JSON из ответа"""
+        agent = self._make_agent(mock_api_key)
+        ok = {"choices": [{"message": {"content": '```json\n{"status": "ok"}\n```'}}]}
+        client, calls = self._client([(500, {}), (503, {}), (200, ok)])
+        
+        with patch('task_tracker_bot.agents.base_agent.get_async_client', return_value=client), \
+             patch('task_tracker_bot.agents.base_agent.asyncio.sleep') as mock_sleep:
+            result = await agent.process_async("prompt", timeout=5)
+        
+        assert result == {"status": "ok"}
+        assert len(calls) == 3
+        assert mock_sleep.await_count == 2
+        await client.aclose()
+    
+    async def test_call_api_async_no_retry_on_4xx(self, mock_api_key):
+        """Проверка, что 4xx ошибки не повторяются"""
+        agent = self._make_agent(mock_api_key)
+        client, calls = self._client([(400, {}), (200, {})])
+        
+        with patch('task_tracker_bot.agents.base_agent.get_async_client', return_value=client):
+            with pytest.raises(Exception, match="400"):
+                await agent.call_api_async("prompt")
+        
+        assert len(calls) == 1
+        await client.aclose()
+    
+    @patch('task_tracker_bot.agents.agent_coordinator.DataManagerAgent')
+    @patch('task_tracker_bot.agents.agent_coordinator.OrchestratorAgent')
+    @patch('task_tracker_bot.agents.agent_coordinator.TaskManagerAgent')
+    @patch('task_tracker_bot.agents.agent_coordinator.ControlManagerAgent')
+    @patch('task_tracker_bot.agents.agent_coordinator.AnalyzeManagerAgent')
+    async def test_coordinator_async(self, mock_aam, mock_acm, mock_atm, mock_orch, mock_adm, mock_db):
+        """Проверка асинхронной обработки сообщения координатором"""
+        from unittest.mock import AsyncMock
+        coordinator = AgentCoordinator(api_key="test-key", db=mock_db)
+        coordinator.orchestrator.analyze_request_async = AsyncMock(return_value={
+            "intent": "query_data",
+            "entities": {},
+            "plan": [{"agent": "ADM", "action": "get_next_project_id", "params": {}}]
+        })
+        coordinator.adm.get_next_project_id = Mock(return_value={
+            "status": "success",
+            "message": "Следующий ID: 5005"
+        })
+        
+        result = await coordinator.process_user_message_async(user_message="Какой следующий ID?", workspace_id=1)
+        
+        assert result["status"] == "success"
+        assert result["message"] == "Следующий ID: 5005"
+        coordinator.orchestrator.analyze_request_async.assert_awaited_once()
@@ -0,0 +1,107 @@
+"""
+Тесты аналитики AAM на агрегатных запросах
+"""
+from unittest.mock import Mock, patch
+
+import pytest
+
+from agents.analyze_manager import AnalyzeManagerAgent
+from migrations.migrate_todo_list import migrate as migrate_todo_list
+from repositories.analytics_repository import AnalyticsRepository
+from repositories.workspace_repository import WorkspaceRepository
+from repositories.board_repository import BoardRepository
+from repositories.column_repository import ColumnRepository
+from repositories.task_repository import TaskRepository
+from repositories.task_assignee_repository import TaskAssigneeRepository
+
+
+@pytest.fixture
+def workspace(temp_db, sample_user_id):
+    """Пространство с доской: 2 задачи в работе, 1 выполнена, 1 в очереди"""
+    migrate_todo_list(temp_db)
+    workspace_id = WorkspaceRepository(temp_db).create(sample_user_id, "Аналитика")
+    board_id = BoardRepository(temp_db).create(workspace_id, "Разработка")
+    columns = ColumnRepository(temp_db)
+    queue = columns.create(board_id, "Очередь", 0)
+    work = columns.create(board_id, "В работе", 1)
+    done = columns.create(board_id, "Готово", 2)
+
+    task_repo = TaskRepository(temp_db)
+    assignees = TaskAssigneeRepository(temp_db)
+    old = task_repo.create(queue, "Старая задача")
+    first = task_repo.create(work, "Первая")
+    second = task_repo.create(work, "Вторая")
+    finished = task_repo.create(done, "Готовая")
+    with temp_db.get_connection() as conn:
+        conn.execute("UPDATE tasks SET created_at = datetime('now', '-10 days') WHERE id = ?", (old,))
+        conn.execute("UPDATE tasks SET started_at = '2025-01-01T10:00:00' WHERE id IN (?, ?)", (first, second))
+        conn.execute(
+            "UPDATE tasks SET started_at = '2025-01-01T10:00:00', completed_at = '2025-01-01T14:00:00' WHERE id = ?",
+            (finished,)
+        )
+    assignees.create(first, 1)
+    assignees.create(finished, 1)
+    assignees.create(second, 2)
+    return workspace_id
+
+
+def make_agent(db):
+    return AnalyzeManagerAgent(api_key="test-key", data_manager=Mock(analytics_repo=AnalyticsRepository(db)))
+
+
+def test_metrics_from_sql(temp_db, workspace):
+    """Тест: WIP по колонкам, выполнение по исполнителям и самая старая колонка"""
+    agent = make_agent(temp_db)
+
+    wip = agent.get_tasks_in_progress(workspace)
+    assert wip["value"] == 2
+    assert [c["open_tasks"] for c in wip["by_column"]] == [1, 2, 0]
+
+    efficiency = {row["user_id"]: row for row in agent.get_employee_efficiency(workspace)["data"]}
+    assert efficiency[1]["completion_rate"] == 0.5
+    assert efficiency[1]["avg_cycle_hours"] == pytest.approx(4.0)
+    assert efficiency[2]["completed"] == 0
+    assert agent.get_employee_efficiency(workspace, department="Маркетинг")["data"] == []
+
+    bottlenecks = agent.find_bottlenecks(workspace)["bottlenecks"]
+    assert bottlenecks[0]["column_name"] == "Очередь"
+    assert bottlenecks[0]["avg_age_days"] >= 9.9
+
+
+def test_analyze_query_without_llm_and_cached(temp_db, workspace):
+    """Тест: запрос разбирается по ключевым словам, метрики кэшируются по пространству"""
+    agent = make_agent(temp_db)
+
+    with patch.object(agent, 'call_api') as call_api, \
+         patch.object(agent.data_manager.analytics_repo, 'get_column_age',
+                      wraps=agent.data_manager.analytics_repo.get_column_age) as get_column_age:
+        result = agent.analyze_query("Где у нас узкое горлышко?", workspace)
+        agent.analyze_query("Где узкое место?", workspace)
+        overview = agent.analyze_query("Как дела у команды", workspace)
+
+    call_api.assert_not_called()
+    assert result["metric"] == "bottlenecks"
+    assert "Очередь" in result["message"]
+    assert get_column_age.call_count == 1
+    assert set(overview["metrics"]) == {"tasks_in_progress", "employee_efficiency", "bottlenecks"}
+
+    agent.invalidate_cache(workspace)
+    assert agent._cache == {}
+
+
+def test_adm_write_invalidates_metrics(temp_db, workspace):
+    """Тест: запись через ADM сбрасывает метрики пространства, кэш ограничен по размеру"""
+    from agents.data_manager import DataManagerAgent
+
+    adm = DataManagerAgent(api_key="test-key", db=temp_db)
+    agent = AnalyzeManagerAgent(api_key="test-key", data_manager=adm)
+
+    assert agent.get_tasks_in_progress(workspace)["value"] == 2
+    assert agent._cache
+    adm.create_project("5005", workspace, "Новый проект")
+    assert agent._cache == {}
+
+    with patch("agents.analyze_manager.MAX_CACHE_ENTRIES", 2):
+        for department in ("Разработка", "Маркетинг", "Продажи"):
+            agent.get_employee_efficiency(workspace, department=department)
+    assert len(agent._cache) == 2
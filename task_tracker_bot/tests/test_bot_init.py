@@ -54,3 +54,34 @@ def test_config_defaults():
     assert isinstance(Config.TIMEZONE, str)
     assert len(Config.TIMEZONE) > 0
 
+
+
+def test_webhook_settings(monkeypatch):
+    """Тест параметров вебхука: URL с путем, заданный секрет, типы обновлений"""
+    from bot import webhook_settings, ALLOWED_UPDATES
+    monkeypatch.setattr(Config, "WEBHOOK_URL", "https://bot.example.com/")
+    monkeypatch.setattr(Config, "WEBHOOK_PATH", "/telegram/")
+    monkeypatch.setattr(Config, "WEBHOOK_SECRET_TOKEN", "s3cret_token-1")
+
+    settings = webhook_settings()
+
+    assert settings["url_path"] == "telegram"
+    assert settings["webhook_url"] == "https://bot.example.com/telegram"
+    assert settings["secret_token"] == "s3cret_token-1"
+    assert settings["allowed_updates"] == ALLOWED_UPDATES
+
+
+def test_webhook_settings_validation(monkeypatch):
+    """Тест: без WEBHOOK_URL и с недопустимым секретом вебхук не запускается"""
+    from bot import webhook_settings
+    monkeypatch.setattr(Config, "WEBHOOK_URL", "")
+    with pytest.raises(ValueError, match="WEBHOOK_URL"):
+        webhook_settings()
+
+    monkeypatch.setattr(Config, "WEBHOOK_URL", "https://bot.example.com")
+    monkeypatch.setattr(Config, "WEBHOOK_SECRET_TOKEN", "")
+    assert len(webhook_settings()["secret_token"]) >= 32
+
+    monkeypatch.setattr(Config, "WEBHOOK_SECRET_TOKEN", "bad secret!")
+    with pytest.raises(ValueError, match="WEBHOOK_SECRET_TOKEN"):
+        webhook_settings()
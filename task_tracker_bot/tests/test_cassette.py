@@ -0,0 +1,97 @@
+"""
+Тесты кассет io.net API, stub-сервера и бенчмарка
+"""
+from unittest.mock import Mock, patch
+
+import httpx
+import pytest
+
+from agents.base_agent import BaseAgent
+from agents.cassette import Cassette, CassetteMissError
+from utils.io_net_stub import LatencyModel, StubIoNetServer
+from utils.benchmark_agents import percentile, run_benchmark
+
+
+class EchoAgent(BaseAgent):
+    def get_system_prompt(self) -> str:
+        return "Отвечай JSON."
+
+
+def make_agent(url):
+    agent = EchoAgent(api_key="test-key")
+    agent.api_url = url
+    agent.retry_count = 1
+    return agent
+
+
+def test_record_then_replay_without_network(tmp_path):
+    """Тест: ответ, записанный в режиме record, воспроизводится без сервера"""
+    path = str(tmp_path / "io_net.jsonl")
+
+    with StubIoNetServer(fallback_content='{"ok": true}') as server:
+        with patch('agents.base_agent.io_net_cassette', Cassette(path, Cassette.RECORD)):
+            recorded = make_agent(server.url).call_api("Привет")
+        assert server.get_stats()["fallback"] == 1
+
+    replay = Cassette(path, Cassette.REPLAY)
+    with patch('agents.base_agent.io_net_cassette', replay), \
+         patch('agents.base_agent.get_session') as get_session:
+        agent = make_agent(server.url)
+        assert agent.call_api("Привет") == recorded
+        with pytest.raises(CassetteMissError):
+            agent.call_api("Другой запрос")
+
+    get_session.assert_not_called()
+    assert replay.get_stats()["replayed"] == 1
+    assert replay.get_stats()["misses"] == 1
+
+
+async def test_stub_streams_recorded_response(tmp_path):
+    """Тест: stub-сервер отдает записанный ответ потоком SSE"""
+    path = str(tmp_path / "io_net.jsonl")
+    agent = make_agent("")
+    payload = agent._build_payload("Сколько задач?")
+    content = '{"intent": "query_data", "entities": {}, "plan": []}'
+    recorder = Cassette(path, Cassette.RECORD)
+    recorder.record("EchoAgent", payload, {
+        "choices": [{"message": {"content": content, "reasoning_content": "думаю"}, "finish_reason": "stop"}]
+    })
+
+    with StubIoNetServer(cassette=Cassette(path, Cassette.REPLAY)) as server:
+        agent.api_url = server.url
+        async with httpx.AsyncClient() as client:
+            with patch('agents.base_agent.get_async_client', return_value=client):
+                fragments = [item async for item in agent.stream_api_async("Сколько задач?")]
+
+        assert server.get_stats()["replayed"] == 1
+    assert "".join(text for kind, text in fragments if kind == "content") == content
+    assert ("reasoning", "думаю") in fragments
+
+
+def test_latency_model_parse():
+    """Тест разбора распределений задержки"""
+    assert LatencyModel.parse("const:0.5").sample() == 0.5
+    assert 0.2 <= LatencyModel.parse("uniform:0.2:0.4").sample() <= 0.4
+    assert LatencyModel.parse("lognormal:1.5:0.5").sample() > 0
+    with pytest.raises(ValueError):
+        LatencyModel.parse("gamma:1")
+
+
+def test_run_benchmark_reports_percentiles_and_llm_calls():
+    """Тест сводки бенчмарка: перцентили и вызовы LLM на запрос"""
+    calls = {"count": 0}
+
+    def process_user_message(message, workspace_id, user_id=None):
+        if "?" in message:
+            calls["count"] += 1
+        return {"status": "success"}
+
+    coordinator = Mock(process_user_message=process_user_message)
+    summary = run_benchmark(coordinator, ["Сколько?", "закрой задачу #1"], 1, lambda: calls["count"], repeat=2)
+
+    assert summary["requests"] == 4
+    assert summary["llm_calls_total"] == 2
+    assert summary["llm_calls_per_request"] == 0.5
+    assert summary["statuses"] == {"success": 4}
+    assert percentile([5, 1, 3, 2, 4], 50) == 3
+    assert percentile([5, 1, 3, 2, 4], 95) == 5
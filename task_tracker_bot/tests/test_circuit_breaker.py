@@ -0,0 +1,117 @@
+"""
+Тесты размыкателя цепи io.net и деградированного режима
+"""
+from unittest.mock import Mock, patch
+
+import pytest
+
+from agents.agent_coordinator import AgentCoordinator
+from agents.circuit_breaker import CircuitBreaker, CircuitOpenError, io_net_breaker
+from config import Config
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_breaker(clock):
+    return CircuitBreaker(
+        "test", window=10, min_calls=4, failure_rate=0.5,
+        slow_call_seconds=5, slow_rate=0.8, open_seconds=30, clock=clock
+    )
+
+
+def test_opens_on_failure_rate_and_rejects():
+    """Тест: цепь размыкается по доле ошибок и отклоняет вызовы"""
+    breaker = make_breaker(FakeClock())
+
+    breaker.record_success(0.1)
+    breaker.record_success(0.1)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.is_open()
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    assert breaker.get_stats()["rejected"] == 1
+    assert breaker.get_stats()["times_opened"] == 1
+
+
+def test_opens_on_slow_calls():
+    """Тест: цепь размыкается, если API отвечает слишком медленно"""
+    breaker = make_breaker(FakeClock())
+
+    for _ in range(4):
+        breaker.record_success(6)
+
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_half_open_probe_closes_or_reopens():
+    """Тест: после паузы пропускается один пробный вызов"""
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    for _ in range(4):
+        breaker.record_failure()
+
+    clock.now += 30
+    assert breaker.allow_request() is True
+    assert breaker.allow_request() is False
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock.now += 30
+    assert breaker.allow_request() is True
+    breaker.record_success(0.2)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow_request() is True
+
+
+def test_lost_probe_does_not_block_forever():
+    """Тест: неучтенный пробный вызов не держит цепь разомкнутой"""
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    for _ in range(4):
+        breaker.record_failure()
+
+    clock.now += 30
+    assert breaker.allow_request() is True
+    clock.now += 30
+    assert breaker.allow_request() is True
+
+
+@patch('agents.agent_coordinator.DataManagerAgent')
+@patch('agents.agent_coordinator.OrchestratorAgent')
+@patch('agents.agent_coordinator.TaskManagerAgent')
+@patch('agents.agent_coordinator.ControlManagerAgent')
+@patch('agents.agent_coordinator.AnalyzeManagerAgent')
+def test_coordinator_degraded_mode(mock_aam, mock_acm, mock_atm, mock_orch, mock_adm):
+    """Тест: при разомкнутой цепи типовые запросы идут по правилам, остальные - быстрый отказ"""
+    coordinator = AgentCoordinator(api_key="test-key", db=Mock())
+    coordinator.orchestrator.analyze_request.side_effect = CircuitOpenError("io.net")
+    calls = []
+
+    def update_task(task_id, status=None, **kwargs):
+        calls.append(task_id)
+        return {"status": "success", "message": f"Задача {task_id} перемещена в Готово"}
+
+    coordinator.agents["ADM"] = Mock(update_task=update_task)
+    coordinator.intent_router.task_repo = Mock(get_workspace_id=Mock(return_value=1))
+    for _ in range(io_net_breaker.min_calls):
+        io_net_breaker.record_failure()
+
+    with patch.object(Config, "INTENT_FAST_PATH", False):
+        closed = coordinator.process_user_message("закрой задачу #3", workspace_id=1)
+        other = coordinator.process_user_message("Что у нас с дедлайнами?", workspace_id=1)
+
+    assert calls == [3]
+    assert closed["status"] == "success"
+    assert other["degraded"] is True
+    assert "/menu" in other["message"]
+    assert coordinator.get_circuit_stats()["state"] == CircuitBreaker.OPEN
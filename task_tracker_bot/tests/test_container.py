@@ -0,0 +1,61 @@
+"""
+Тесты контейнера сервисов и ленивого создания агентов
+"""
+from unittest.mock import Mock, patch
+
+from agents.agent_coordinator import AgentCoordinator
+from agents.data_manager import DataManagerAgent
+from services.container import ServiceContainer, container
+
+
+def test_container_shares_instances():
+    """Тест: объекты создаются один раз и переиспользуются зависимыми сервисами"""
+    services = ServiceContainer(Mock())
+
+    assert services.task_repo is services.task_repo
+    assert services.todo_service is services.todo_service
+    assert services.workflow_task_service is not services.task_service
+    assert services.task_service.task_repo is services.task_repo
+    assert services.workflow_task_service.dependency_service is services.dependency_service
+
+
+def test_handlers_share_container_repositories():
+    """Тест: обработчики берут репозитории из общего контейнера"""
+    from handlers import task, todo_handler
+    from callbacks import task_callbacks
+
+    assert task.task_repo is container.task_repo
+    assert todo_handler.task_repo is container.task_repo
+    assert task_callbacks.task_service is container.workflow_task_service
+
+
+def test_data_manager_uses_services():
+    """Тест: ADM получает репозитории и сервисы из переданного контейнера"""
+    services = ServiceContainer(Mock())
+    adm = DataManagerAgent(api_key="test-key", services=services)
+
+    assert adm.db is services.db
+    assert adm.task_service is services.task_service
+    assert adm.stats_service is services.stats_service
+
+
+def test_coordinator_creates_agents_on_demand():
+    """Тест: агенты создаются при первом обращении, ADM общий для ATM и ACM"""
+    with patch('agents.agent_coordinator.DataManagerAgent') as adm_cls, \
+         patch('agents.agent_coordinator.OrchestratorAgent') as orchestrator_cls, \
+         patch('agents.agent_coordinator.TaskManagerAgent') as atm_cls, \
+         patch('agents.agent_coordinator.ControlManagerAgent') as acm_cls, \
+         patch('agents.agent_coordinator.AnalyzeManagerAgent'):
+        coordinator = AgentCoordinator(api_key="test-key", db=Mock())
+        assert coordinator.agents.created() == []
+        assert "ACM" in coordinator.agents
+
+        assert coordinator.atm is coordinator.agents["ATM"]
+        coordinator.acm
+
+    adm_cls.assert_called_once()
+    assert atm_cls.call_args.kwargs["data_manager"] is adm_cls.return_value
+    assert acm_cls.call_args.kwargs["data_manager"] is adm_cls.return_value
+    orchestrator_cls.assert_not_called()
+    assert sorted(coordinator.agents.created()) == ["ACM", "ADM", "ATM"]
+    assert "Unknown" not in coordinator.agents
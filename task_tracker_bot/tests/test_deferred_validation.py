@@ -0,0 +1,69 @@
+"""
+Тесты отложенной проверки ACM
+"""
+from unittest.mock import AsyncMock, Mock, patch
+
+from agents.agent_coordinator import AgentCoordinator
+from handlers.ai_handler import deliver_deferred_validation
+
+
+CLOSE_TASK_PLAN = {
+    "intent": "close_task",
+    "entities": {"task_id": 12},
+    "plan": [{"agent": "ADM", "action": "update_task", "params": {"task_id": 12}}]
+}
+
+
+def make_coordinator(warnings):
+    coordinator = AgentCoordinator(api_key="test-key", db=Mock())
+    coordinator.agents["ADM"] = Mock(update_task=Mock(return_value={
+        "status": "success", "message": "Задача закрыта", "data": {"id": 12}
+    }))
+    coordinator.agents["ACM"] = Mock(validate_changes=Mock(return_value={
+        "status": "valid", "errors": [], "warnings": warnings
+    }))
+    coordinator.agents["Orchestrator"] = Mock(analyze_request=Mock(return_value=CLOSE_TASK_PLAN))
+    return coordinator
+
+
+def test_validation_deferred_by_default():
+    """Тест: ответ возвращается без проверки ACM, проверка описана в pending_validation"""
+    coordinator = make_coordinator(["Задача без исполнителя"])
+
+    with patch('agents.agent_coordinator.Config.INTENT_FAST_PATH', False):
+        result = coordinator.process_user_message("закрой двенадцатую", workspace_id=1)
+
+    coordinator.acm.validate_changes.assert_not_called()
+    assert result["validation"] is None
+    assert result["pending_validation"]["entity_id"] == "12"
+    assert "Предупреждения" not in coordinator.format_response_for_telegram(result)
+
+    validation = coordinator.run_deferred_validation(result["pending_validation"])
+    assert validation["warnings"] == ["Задача без исполнителя"]
+
+
+def test_validation_sync_for_configured_intents():
+    """Тест: для интентов из ACM_SYNC_VALIDATION_INTENTS проверка идет до ответа"""
+    coordinator = make_coordinator(["Задача без исполнителя"])
+
+    with patch('agents.agent_coordinator.Config.INTENT_FAST_PATH', False), \
+         patch('agents.agent_coordinator.Config.ACM_SYNC_VALIDATION_INTENTS', {"close_task"}):
+        result = coordinator.process_user_message("закрой двенадцатую", workspace_id=1)
+
+    assert result["pending_validation"] is None
+    assert "• Задача без исполнителя" in coordinator.format_response_for_telegram(result)
+
+
+async def test_deliver_deferred_validation_edits_reply():
+    """Тест: предупреждения дописываются к отправленному ответу, пустая проверка не правит его"""
+    coordinator = make_coordinator(["Задача без исполнителя"])
+    message = Mock(edit_text=AsyncMock())
+    pending = {"operation_type": "close_task", "entity_id": "12", "context": {}}
+
+    await deliver_deferred_validation(coordinator, pending, message, "✅ Задача закрыта")
+    message.edit_text.assert_awaited_once_with("✅ Задача закрыта\n\n⚠️ Предупреждения:\n• Задача без исполнителя")
+
+    message.edit_text.reset_mock()
+    coordinator.acm.validate_changes.return_value = {"status": "valid", "errors": [], "warnings": []}
+    await deliver_deferred_validation(coordinator, pending, message, "✅ Задача закрыта")
+    message.edit_text.assert_not_awaited()
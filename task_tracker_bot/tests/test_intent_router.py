@@ -0,0 +1,167 @@
+"""
+Тесты для разбора типовых запросов без LLM
+"""
+from datetime import date, timedelta
+from unittest.mock import Mock, patch
+
+from agents.intent_router import IntentRouter
+from agents.agent_coordinator import AgentCoordinator
+
+
+TODAY = date(2025, 11, 29)
+
+
+def test_todo_batch_with_date_header():
+    """Тест нумерованного списка с датой в заголовке"""
+    router = IntentRouter()
+    result = router.route(
+        "на завтра:\n1. Выгул Феры в 10:00 и 19:00\n2. 5001 - Протестировать приложение",
+        reference_date=TODAY
+    )
+
+    assert result["intent"] == "add_todo_batch"
+    assert result["fast_path"] is True
+    tasks = result["entities"]["tasks"]
+    assert tasks[0] == {"text": "Выгул Феры в 10:00 и 19:00", "date": "2025-11-30", "times": ["10:00", "19:00"]}
+    assert tasks[1]["project_id"] == "5001"
+    step = result["plan"][0]
+    assert (step["agent"], step["action"]) == ("ATM", "create_todo_batch")
+    assert step["params"]["default_date"] == "2025-11-30"
+
+
+def test_todo_batch_without_header_uses_reference_date():
+    """Тест списка без заголовка - задачи на сегодня"""
+    result = IntentRouter().route("1. Купить молоко\n2) Позвонить маме", reference_date=TODAY)
+
+    assert result["entities"]["date"] == "2025-11-29"
+    assert [t["text"] for t in result["entities"]["tasks"]] == ["Купить молоко", "Позвонить маме"]
+
+
+def test_close_task():
+    """Тест закрытия задачи по ID"""
+    task_repo = Mock(get_workspace_id=Mock(return_value=1))
+    result = IntentRouter(task_repo=task_repo).route("Закрой задачу #42", reference_date=TODAY, workspace_id=1)
+
+    assert result["intent"] == "close_task"
+    assert result["plan"] == [{
+        "agent": "ADM", "action": "update_task", "params": {"task_id": 42, "status": "done"}
+    }]
+    task_repo.get_workspace_id.assert_called_once_with(42)
+
+
+def test_close_task_outside_workspace_falls_back():
+    """Тест: задача не из пространства пользователя правилом не закрывается"""
+    router = IntentRouter(task_repo=Mock(get_workspace_id=Mock(return_value=2)))
+    assert router.route("Закрой задачу #42", reference_date=TODAY, workspace_id=1) is None
+    # Несуществующая задача и неизвестное пространство - тоже в LLM
+    router.task_repo.get_workspace_id.return_value = None
+    assert router.route("Закрой задачу #42", reference_date=TODAY, workspace_id=1) is None
+    assert IntentRouter().route("Закрой задачу #42", reference_date=TODAY, workspace_id=1) is None
+
+
+def test_show_tasks():
+    """Тест просмотра задач на дату"""
+    result = IntentRouter().route("покажи задачи на 03.12", reference_date=TODAY)
+
+    assert result["intent"] == "query_data"
+    assert result["plan"][0]["params"] == {"target_date": "2025-12-03"}
+
+
+def test_add_link():
+    """Тест добавления ссылки к проекту"""
+    result = IntentRouter().route(
+        "добавь ссылку ТЗ к проекту 5005 https://docs.example.com/tz", reference_date=TODAY
+    )
+
+    assert result["entities"]["links"] == [{"type": "ТЗ", "url": "https://docs.example.com/tz"}]
+    assert result["plan"][0]["params"] == {
+        "project_id": "5005", "link_type": "ТЗ", "url": "https://docs.example.com/tz"
+    }
+
+
+def test_ambiguous_requests_fall_back():
+    """Тест: неоднозначные запросы уходят в LLM"""
+    router = IntentRouter()
+    for message in [
+        "Создай проект id+ Сайт для клиента",
+        "на завтра:\n1. Купить молоко\nи еще позвонить маме",
+        "закрой задачу по подготовке на доске",
+        "покажи задачи на следующей неделе",
+    ]:
+        assert router.route(message, reference_date=TODAY) is None
+
+
+def test_stats_coverage():
+    """Тест статистики покрытия"""
+    router = IntentRouter(task_repo=Mock(get_workspace_id=Mock(return_value=1)))
+    router.route("закрой задачу 1", reference_date=TODAY, workspace_id=1)
+    router.route("закрой задачу 2", reference_date=TODAY, workspace_id=1)
+    router.route("проанализируй загрузку команды", reference_date=TODAY)
+
+    stats = router.get_stats()
+    assert stats["fast_path_hits"] == 2
+    assert stats["llm_fallbacks"] == 1
+    assert stats["coverage_percent"] == 66.67
+    assert stats["hits_by_intent"] == {"close_task": 2}
+
+
+@patch('agents.agent_coordinator.DataManagerAgent')
+@patch('agents.agent_coordinator.OrchestratorAgent')
+@patch('agents.agent_coordinator.TaskManagerAgent')
+@patch('agents.agent_coordinator.ControlManagerAgent')
+@patch('agents.agent_coordinator.AnalyzeManagerAgent')
+def test_coordinator_skips_orchestrator_on_fast_path(mock_aam, mock_acm, mock_atm, mock_orch, mock_adm):
+    """Тест: координатор не обращается к оркестратору для типового запроса"""
+    coordinator = AgentCoordinator(api_key="test-key", db=Mock())
+    calls = []
+
+    def update_task(task_id, status=None, **kwargs):
+        calls.append((task_id, status))
+        return {"status": "success", "message": f"Задача {task_id} перемещена в Готово"}
+
+    coordinator.agents["ADM"] = Mock(update_task=update_task)
+    coordinator.intent_router.task_repo = Mock(get_workspace_id=Mock(return_value=1))
+
+    result = coordinator.process_user_message("закрой задачу #7", workspace_id=1, user_id=10)
+
+    assert calls == [(7, "done")]
+    assert result["status"] == "success"
+    assert result["metrics"]["fast_path"] is True
+    coordinator.orchestrator.analyze_request.assert_not_called()
+    assert coordinator.get_fast_path_stats()["fast_path_hits"] == 1
+
+
+def test_coordinator_show_tasks_with_personal_tasks(temp_db):
+    """Тест: просмотр непустого списка задач на дату через координатор"""
+    from migrations.migrate_todo_list import migrate
+    migrate(temp_db)
+    coordinator = AgentCoordinator(api_key="test-key", db=temp_db)
+    tomorrow = date.today() + timedelta(days=1)
+    coordinator.services.personal_task_repo.create(10, "Выгул Феры", tomorrow)
+
+    with patch('agents.agent_coordinator.Config.INTENT_FAST_PATH', True):
+        result = coordinator.process_user_message("покажи задачи на завтра", workspace_id=1, user_id=10)
+
+    assert result["status"] == "success"
+    assert "Выгул Феры" in result["message"]
+    assert [task.title for task in result["data"]] == ["Выгул Феры"]
+
+
+def test_coordinator_does_not_close_foreign_task(temp_db):
+    """Тест: задачу из чужого пространства быстрый путь не закрывает"""
+    from repositories.board_repository import BoardRepository
+    from repositories.column_repository import ColumnRepository
+    from repositories.workspace_repository import WorkspaceRepository
+
+    from migrations.migrate_todo_list import migrate
+    migrate(temp_db)
+    coordinator = AgentCoordinator(api_key="test-key", db=temp_db)
+    own_ws = WorkspaceRepository(temp_db).create(10, "Моё")
+    other_ws = WorkspaceRepository(temp_db).create(20, "Чужое")
+    column_id = ColumnRepository(temp_db).create(BoardRepository(temp_db).create(other_ws, "Доска"), "Очередь")
+    task_id = coordinator.services.task_repo.create(column_id, "Чужая задача")
+    assert coordinator.services.task_repo.get_workspace_id(task_id) == other_ws
+
+    with patch('agents.agent_coordinator.Config.INTENT_FAST_PATH', True):
+        assert coordinator._route_fast_path(f"закрой задачу #{task_id}", own_ws) is None
+        assert coordinator._route_fast_path(f"закрой задачу #{task_id}", other_ws)["intent"] == "close_task"
@@ -0,0 +1,141 @@
+"""
+Тесты потоковых ответов модели и статуса обработки
+"""
+import json
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import httpx
+import pytest
+
+from agents.stream_parser import IncrementalJSONExtractor
+from agents.orchestrator import OrchestratorAgent
+from handlers.ai_handler import ThrottledStatusMessage
+
+
+RESPONSE = (
+    '<think>Нужно {создать} проект</think>\n```json\n'
+    '{"intent": "create_project", "entities": {"project_name": "Сайт \\"A\\""}, '
+    '"plan": [{"agent": "ADM", "action": "get_next_project_id", "params": {}}], '
+    '"comment": "ок"}\n```'
+)
+
+
+def _sse(chunks, reasoning=None):
+    """Тело SSE-ответа chat/completions"""
+    events = []
+    for text in reasoning or []:
+        events.append({"choices": [{"delta": {"reasoning_content": text}}]})
+    for text in chunks:
+        events.append({"choices": [{"delta": {"content": text}}]})
+    body = "".join(f"data: {json.dumps(e, ensure_ascii=False)}\n\n" for e in events)
+    return body + "data: [DONE]\n\n"
+
+
+def test_extractor_fields_by_character():
+    """Тест: поля отдаются по мере закрытия даже при посимвольной подаче"""
+    extractor = IncrementalJSONExtractor()
+    completed = []
+    for char in RESPONSE:
+        completed.extend(extractor.feed(char))
+
+    assert completed == ["intent", "entities", "plan", "comment"]
+    assert extractor.complete
+    assert extractor.fields["entities"] == {"project_name": 'Сайт "A"'}
+    assert extractor.fields["plan"][0]["action"] == "get_next_project_id"
+
+
+def test_extractor_plan_before_end():
+    """Тест: plan доступен до окончания ответа"""
+    extractor = IncrementalJSONExtractor()
+    cut = RESPONSE.index('"comment"')
+    assert extractor.feed(RESPONSE[:cut]) == ["intent", "entities", "plan"]
+    assert not extractor.complete
+
+
+def test_extractor_invalid_json():
+    """Тест: невалидное значение помечает разбор как неудачный"""
+    extractor = IncrementalJSONExtractor()
+    extractor.feed('{"intent": create, "plan": []}')
+    assert extractor.failed
+    assert "plan" not in extractor.fields
+
+
+class TestStreamingAnalysis:
+    """Тесты потокового анализа запроса оркестратором"""
+
+    @staticmethod
+    def _client(bodies):
+        calls = []
+
+        def handler(request):
+            calls.append(json.loads(request.content))
+            status, body = bodies[len(calls) - 1]
+            return httpx.Response(status, text=body, headers={"Content-Type": "text/event-stream"})
+
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler)), calls
+
+    async def test_plan_returned_from_stream(self):
+        """Тест: план из потока, этапы сообщаются через on_progress"""
+        orchestrator = OrchestratorAgent(api_key="test-key")
+        chunks = [RESPONSE[i:i + 7] for i in range(0, len(RESPONSE), 7)]
+        client, calls = self._client([(200, _sse(chunks, reasoning=["думаю", "..."]))])
+        on_progress = AsyncMock()
+
+        with patch('agents.base_agent.get_async_client', return_value=client):
+            result = await orchestrator.analyze_request_stream("Создай проект Сайт", on_progress)
+
+        assert calls[0]["stream"] is True
+        assert result["intent"] == "create_project"
+        assert result["plan"][0]["agent"] == "ADM"
+        assert "comment" not in result
+        stages = [c.args[0] for c in on_progress.await_args_list]
+        assert stages[0].startswith("🧠")
+        assert "🎯 Намерение: create_project" in stages
+        assert "📋 План готов: шагов - 1" in stages
+        await client.aclose()
+
+    async def test_retry_before_first_chunk_and_fallback_parse(self):
+        """Тест: повтор при 5xx и разбор полного текста, если поля не разобраны"""
+        orchestrator = OrchestratorAgent(api_key="test-key")
+        orchestrator.retry_delay = 0.01
+        client, calls = self._client([(503, ""), (200, _sse(['{"response": ', '"нет плана"}']))])
+
+        with patch('agents.base_agent.get_async_client', return_value=client), \
+             patch('agents.base_agent.asyncio.sleep', new=AsyncMock()):
+            result = await orchestrator.analyze_request_stream("Привет")
+
+        assert len(calls) == 2
+        assert result == {"response": "нет плана"}
+        await client.aclose()
+
+
+class TestThrottledStatusMessage:
+    """Тесты ограничения частоты правок статуса"""
+
+    async def test_updates_collapsed_within_interval(self):
+        """Тест: в пределах интервала показывается только последний статус"""
+        message = Mock(text="🤔")
+        message.edit_text = AsyncMock()
+        status = ThrottledStatusMessage(message, min_interval=0.05)
+
+        await status.update("этап 1")
+        await status.update("этап 2")
+        await status.update("этап 3")
+        assert [c.args[0] for c in message.edit_text.await_args_list] == ["этап 1"]
+
+        await asyncio.sleep(0.1)
+        assert [c.args[0] for c in message.edit_text.await_args_list] == ["этап 1", "этап 3"]
+
+    async def test_finish_drops_pending_status(self):
+        """Тест: итоговый ответ не перезаписывается отложенным статусом"""
+        message = Mock(text="🤔")
+        message.edit_text = AsyncMock()
+        status = ThrottledStatusMessage(message, min_interval=0.05)
+
+        await status.update("этап 1")
+        await status.update("этап 2")
+        await status.finish("✅ Готово")
+        await asyncio.sleep(0.1)
+
+        assert [c.args[0] for c in message.edit_text.await_args_list] == ["этап 1", "✅ Готово"]
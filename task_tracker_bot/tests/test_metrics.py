@@ -0,0 +1,103 @@
+"""
+Тесты реестра метрик и экспорта в формате Prometheus
+"""
+import urllib.request
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from agents.base_agent import BaseAgent, API_CALLS, API_TOKENS
+from handlers.admin import metrics_command
+from utils.date_parser import DateParser
+from utils.metrics import MetricsRegistry, MetricsServer, metrics
+
+
+class MetricsAgent(BaseAgent):
+    def get_system_prompt(self) -> str:
+        return "Отвечай JSON."
+
+
+def test_counter_and_histogram_render():
+    """Тест текстового формата: HELP/TYPE, метки, накопительные корзины"""
+    registry = MetricsRegistry()
+    calls = registry.counter("calls_total", "Вызовы", ["agent"])
+    latency = registry.histogram("latency_seconds", "Время", ["agent"], buckets=(0.1, 1.0))
+
+    calls.inc(agent='ATM "x"')
+    calls.inc(2, agent='ATM "x"')
+    latency.observe(0.05, agent="ATM")
+    latency.observe(0.5, agent="ATM")
+
+    text = registry.render_prometheus()
+    assert "# TYPE calls_total counter" in text
+    assert 'calls_total{agent="ATM \\"x\\""} 3' in text
+    assert 'latency_seconds_bucket{agent="ATM",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{agent="ATM",le="1"} 2' in text
+    assert 'latency_seconds_bucket{agent="ATM",le="+Inf"} 2' in text
+    assert 'latency_seconds_count{agent="ATM"} 2' in text
+    assert registry.counter("calls_total", "Вызовы", ["agent"]) is calls
+    with pytest.raises(ValueError):
+        calls.inc(step="x")
+
+
+def test_date_parser_cache_exported():
+    """Тест: статистика кэша DateParser попадает в метрики"""
+    parser = DateParser()
+    parser.parse_date("завтра")
+    parser.parse_date("завтра")
+
+    text = metrics.render_prometheus()
+    hits = [line for line in text.splitlines() if line.startswith("date_parser_cache_hits ")]
+    assert hits and int(hits[0].split()[1]) >= 1
+
+
+def test_agent_call_metrics():
+    """Тест: успешный вызов API учитывается в счетчиках агента и токенов"""
+    agent = MetricsAgent(api_key="test-key")
+    response = Mock()
+    response.json.return_value = {
+        "choices": [{"message": {"content": "{}"}}],
+        "usage": {"prompt_tokens": 10, "completion_tokens": 4}
+    }
+    before = API_CALLS.value(agent="MetricsAgent", outcome="success")
+    tokens_before = API_TOKENS.value(agent="MetricsAgent", kind="completion")
+
+    with patch('agents.base_agent.get_session') as get_session:
+        get_session.return_value.post.return_value = response
+        agent.call_api("Привет")
+
+    assert API_CALLS.value(agent="MetricsAgent", outcome="success") == before + 1
+    assert API_TOKENS.value(agent="MetricsAgent", kind="completion") == tokens_before + 4
+
+
+def test_metrics_http_endpoint():
+    """Тест HTTP-эндпоинта /metrics"""
+    registry = MetricsRegistry()
+    registry.counter("up_total", "Проверка").inc()
+    server = MetricsServer(registry).start()
+    try:
+        host, port = server.address
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics", timeout=5) as response:
+            body = response.read().decode("utf-8")
+            content_type = response.headers["Content-Type"]
+    finally:
+        server.stop()
+
+    assert "up_total 1" in body
+    assert content_type.startswith("text/plain")
+
+
+async def test_metrics_command_admin_only():
+    """Тест: /metrics доступна только администраторам"""
+    update = Mock()
+    update.effective_user.id = 7
+    update.message.reply_text = AsyncMock()
+
+    with patch('handlers.admin.Config.ADMIN_USER_IDS', {1}):
+        await metrics_command(update, Mock())
+    assert "администраторам" in update.message.reply_text.call_args[0][0]
+
+    with patch('handlers.admin.Config.ADMIN_USER_IDS', {7}), \
+         patch('handlers.admin.metrics', Mock(render_prometheus=Mock(return_value="up 1\n"))):
+        await metrics_command(update, Mock())
+    assert update.message.reply_text.call_args[0][0] == "<pre>up 1\n</pre>"
@@ -0,0 +1,123 @@
+"""
+Тесты выбора модели по агенту и intent и повтора анализа на модели с рассуждениями
+"""
+import json
+from unittest.mock import patch
+
+import pytest
+
+from agents.model_router import MODEL_CALLS, ModelLatencyStats, ModelRouter, parse_model_routes
+from agents.orchestrator import OrchestratorAgent
+
+
+def make_router(routes=None) -> ModelRouter:
+    return ModelRouter(
+        routes=routes or {"OrchestratorAgent": "fast", "TaskManagerAgent.classify_todo": "fast"},
+        fast_model="fast-model",
+        reasoning_model="reasoning-model",
+        stats=ModelLatencyStats(window=60)
+    )
+
+
+def test_routes_by_agent_and_intent():
+    """Тест: маршрут по "Агент.intent" важнее маршрута агента"""
+    assert parse_model_routes("OrchestratorAgent:fast, AAM.query_data:custom-model,bad") == {
+        "OrchestratorAgent": "fast", "AAM.query_data": "custom-model"
+    }
+    router = make_router(routes={
+        "OrchestratorAgent": "fast",
+        "OrchestratorAgent.add_todo_batch": "reasoning",
+        "AnalyzeManagerAgent": "custom-model",
+    })
+
+    assert router.select("OrchestratorAgent", "query_data") == "fast-model"
+    assert router.select("OrchestratorAgent", "add_todo_batch") == "reasoning-model"
+    assert router.select("AnalyzeManagerAgent") == "custom-model"
+    assert router.select("DataManagerAgent", default="pinned") == "pinned"
+    with router.forced("reasoning-model"):
+        assert router.select("OrchestratorAgent") == "reasoning-model"
+
+    # Без быстрой модели маршрут fast ведет на основную модель
+    no_fast = ModelRouter(routes={"OrchestratorAgent": "fast"}, fast_model="", reasoning_model="reasoning-model")
+    assert no_fast.select("OrchestratorAgent") == "reasoning-model"
+
+
+@pytest.mark.parametrize("fast_latency, fast_ok, expected", [
+    (0.5, True, "fast-model"),
+    (3.0, True, "reasoning-model"),   # быстрая модель сейчас не быстрее
+    (0.5, False, "reasoning-model"),  # быстрая модель часто ошибается
+])
+def test_fast_tier_uses_latency_stats(fast_latency, fast_ok, expected):
+    """Тест: быстрый уровень пропускается по скользящей статистике задержек и ошибок"""
+    router = make_router()
+    for _ in range(5):
+        router.record("OrchestratorAgent", "fast-model", fast_latency if fast_ok else None)
+        router.record("DataManagerAgent", "reasoning-model", 2.0)
+
+    assert router.select("OrchestratorAgent") == expected
+
+
+def test_tier_metrics_recorded():
+    """Тест: вызовы учитываются в метриках по уровням"""
+    router = make_router()
+    before_fast = MODEL_CALLS.value(agent="OrchestratorAgent", tier="fast", outcome="success")
+    before_error = MODEL_CALLS.value(agent="OrchestratorAgent", tier="reasoning", outcome="error")
+
+    router.record("OrchestratorAgent", "fast-model", 0.4)
+    router.record("OrchestratorAgent", "reasoning-model", None)
+
+    assert MODEL_CALLS.value(agent="OrchestratorAgent", tier="fast", outcome="success") == before_fast + 1
+    assert MODEL_CALLS.value(agent="OrchestratorAgent", tier="reasoning", outcome="error") == before_error + 1
+    assert router.get_stats()["models"]["fast-model"]["p50"] == 0.4
+
+
+PLAN = {
+    "intent": "query_data",
+    "entities": {},
+    "plan": [{"agent": "AAM", "action": "analyze_query", "params": {"query": "задачи"}}]
+}
+
+
+@pytest.mark.parametrize("fast_content", [
+    "Не понял запрос",
+    json.dumps({**PLAN, "confidence": 0.3}),
+])
+def test_orchestrator_escalates_uncertain_analysis(fast_content):
+    """Тест: неразобранный или неуверенный ответ быстрой модели повторяется на модели с рассуждениями"""
+    orchestrator = OrchestratorAgent(api_key="test-key")
+    models = []
+
+    def fake_call_api(prompt, context=None, intent=None):
+        model = orchestrator._build_payload(prompt, intent=intent)["model"]
+        models.append(model)
+        content = fast_content if model == "fast-model" else json.dumps({**PLAN, "confidence": 0.9})
+        return {"choices": [{"message": {"content": content}}]}
+
+    orchestrator.call_api = fake_call_api
+    with patch("agents.base_agent.model_router", make_router()):
+        result = orchestrator.analyze_request("Покажи задачи")
+
+    assert models == ["fast-model", "reasoning-model"]
+    assert result["confidence"] == 0.9
+
+
+def test_orchestrator_accepts_confident_fast_analysis():
+    """Тест: уверенный ответ быстрой модели принимается без повтора; явная модель не переключается"""
+    orchestrator = OrchestratorAgent(api_key="test-key")
+    pinned = OrchestratorAgent(api_key="test-key", model="pinned-model")
+    models = []
+
+    def fake_call_api(agent):
+        def call_api(prompt, context=None, intent=None):
+            models.append(agent._build_payload(prompt, intent=intent)["model"])
+            return {"choices": [{"message": {"content": json.dumps({**PLAN, "confidence": 0.3})}}]}
+        return call_api
+
+    orchestrator.call_api = fake_call_api(orchestrator)
+    pinned.call_api = fake_call_api(pinned)
+    with patch("agents.base_agent.model_router", make_router()):
+        with patch("agents.orchestrator.Config.MODEL_ESCALATION_CONFIDENCE", 0.2):
+            orchestrator.analyze_request("Покажи задачи")
+        pinned.analyze_request("Покажи задачи")
+
+    assert models == ["fast-model", "pinned-model"]
@@ -0,0 +1,121 @@
+"""
+Тесты поиска досок, колонок и проектов по названию
+"""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from agents.data_manager import DataManagerAgent
+from agents.intent_router import IntentRouter
+from migrations.migrate_todo_list import migrate as migrate_todo_list
+from services.container import ServiceContainer
+from repositories.workspace_repository import WorkspaceRepository
+from utils.name_index import WRITE_MIN_SCORE, NameEntry, NameIndex, name_index_cache
+
+
+@pytest.fixture
+def services(temp_db, sample_user_id):
+    """Пространство с досками Подготовка и Дизайн и проектом Polaroid"""
+    migrate_todo_list(temp_db)
+    services = ServiceContainer(temp_db)
+    workspace_id = WorkspaceRepository(temp_db).create(sample_user_id, "Студия")
+    services.board_service.create_board(workspace_id, "Подготовка")
+    services.board_service.create_board(workspace_id, "Дизайн")
+    services.project_repo.create("5005", workspace_id, "Polaroid")
+    services.workspace_id = workspace_id
+    return services
+
+
+def test_index_matches_typos_and_word_forms():
+    """Тест: падежи, предлоги, опечатки; неоднозначное название не разрешается"""
+    index = NameIndex([
+        NameEntry("board", 1, "Подготовка"),
+        NameEntry("board", 2, "Дизайн"),
+        NameEntry("column", 10, "Готово", board_id=1),
+        NameEntry("column", 20, "Готово", board_id=2),
+        NameEntry("project", "5005", "Polaroid"),
+    ])
+
+    assert index.resolve("доска подготовки", "board").entry.id == 1
+    assert index.resolve("в дизайн", "board").entry.id == 2
+    assert index.resolve("Дизйн", "board").entry.id == 2
+    assert index.resolve("Polarod", "project").entry.id == "5005"
+    assert index.resolve("Маркетинг", "board") is None
+    assert index.resolve("Готово", "column") is None
+    assert index.resolve("готов", "column", board_id=2).entry.id == 20
+    assert index.find_in_text("Что с задачами на доске подготовки по 5005?", "board").entry.id == 1
+    # Для записей - только точное название после нормализации
+    assert index.resolve("доска ПОДГОТОВКА!", "board", min_score=WRITE_MIN_SCORE).entry.id == 1
+    assert index.resolve("Дизйн", "board", min_score=WRITE_MIN_SCORE) is None
+
+
+def test_resolver_rebuilds_index_on_writes(services):
+    """Тест: индекс берется из памяти и сбрасывается при создании доски"""
+    resolver = services.name_resolver
+    workspace_id = services.workspace_id
+
+    assert resolver.resolve_board(workspace_id, "подготовки").entry.name == "Подготовка"
+    assert resolver.resolve_project(workspace_id, "5005").entry.name == "Polaroid"
+    resolver.resolve_board(workspace_id, "дизайн")
+    assert name_index_cache.get_cache_stats()["cache_misses"] == 1
+
+    assert resolver.resolve_board(workspace_id, "Маркетинг") is None
+    services.board_service.create_board(workspace_id, "Маркетинг")
+    assert resolver.resolve_board(workspace_id, "маркетинга").entry.name == "Маркетинг"
+
+
+def test_adm_tasks_by_board_name_tolerates_typos(services):
+    """Тест: задачи доски проекта находятся по названию с опечаткой"""
+    board = services.board_service.get_board_by_name(services.workspace_id, "Дизайн")
+    column = services.board_service.list_columns(board.id)[0]
+    services.task_repo.create(column.id, "Макет", project_id="5005")
+    adm = DataManagerAgent(api_key="test-key", services=services)
+
+    tasks = adm.get_tasks_by_board_name("дизайна", project_id="5005")
+
+    assert [(t["title"], t["board_name"]) for t in tasks] == [("Макет", "Дизайн")]
+
+
+def test_router_resolves_project_name(services):
+    """Тест: ссылка к проекту по названию разбирается без LLM"""
+    router = IntentRouter(name_resolver=services.name_resolver)
+    message = "добавь ссылку Figma к проекту Polaroid https://figma.com/x"
+
+    result = router.route(message, workspace_id=services.workspace_id)
+    assert result["plan"][0]["params"]["project_id"] == "5005"
+    assert router.route("добавь ссылку Figma к проекту polaroid https://figma.com/x",
+                        workspace_id=services.workspace_id) is not None
+    # Ссылка - запись: похожее название не применяется, запрос уходит в LLM
+    for project in ("Kodak", "Polarod"):
+        assert router.route(f"добавь ссылку Figma к проекту {project} https://figma.com/x",
+                            workspace_id=services.workspace_id) is None
+    assert router.route(message) is None
+
+
+async def test_movetask_requires_exact_column_name(services, sample_user_id):
+    """Тест: /movetask не переносит задачу в колонку, угаданную по похожему названию"""
+    from handlers.task import movetask_command
+
+    board = services.board_service.get_board_by_name(services.workspace_id, "Дизайн")
+    queue, in_progress = services.board_service.list_columns(board.id)[:2]
+    task_id = services.task_repo.create(queue.id, "Макет")
+    update = MagicMock()
+    update.effective_user.id = sample_user_id
+    update.message.reply_text = AsyncMock()
+    context = MagicMock()
+    task_service = MagicMock(get_task=services.task_repo.get_by_id, move_task=MagicMock(return_value=(True, None)))
+
+    with patch("handlers.task.task_service", task_service), \
+         patch("handlers.task.column_repo", services.column_repo), \
+         patch("handlers.task.board_repo", services.board_repo), \
+         patch("handlers.task.name_resolver", services.name_resolver):
+        context.args = [str(task_id), "в", "работу"]
+        await movetask_command(update, context)
+        task_service.move_task.assert_not_called()
+        assert "Возможно, вы имели в виду: В работе" in update.message.reply_text.call_args.args[0]
+
+        context.args = [str(task_id), "в", "работе!"]
+        await movetask_command(update, context)
+        task_service.move_task.assert_called_once_with(task_id, in_progress.id, sample_user_id)
+        # Пользователь видит, в какую колонку перенесена задача
+        assert update.message.reply_text.call_args.args[0] == "✅ Задача перемещена в колонку 'В работе'"
@@ -0,0 +1,197 @@
+"""
+Тесты для кэша планов оркестратора
+"""
+from unittest.mock import patch
+
+from agents.plan_cache import PlanCache
+from repositories.plan_cache_repository import PlanCacheRepository
+
+
+PLAN = {"intent": "create_project", "entities": {}, "plan": [{"agent": "ADM", "action": "get_next_project_id"}]}
+
+
+def test_memory_hit_and_stats():
+    """Тест попадания в память и статистики"""
+    cache = PlanCache(version="v1", ttl=60, max_size=10)
+    key = cache.make_key("создай проект")
+    assert cache.get(key) is None
+    cache.set(key, PLAN)
+    assert cache.get(key) == PLAN
+    
+    stats = cache.get_cache_stats()
+    assert stats["memory_hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_ratio_percent"] == 50.0
+
+
+def test_lru_eviction():
+    """Тест вытеснения давно не использованной записи"""
+    cache = PlanCache(version="v1", ttl=60, max_size=2)
+    keys = [cache.make_key(str(i)) for i in range(3)]
+    cache.set(keys[0], PLAN)
+    cache.set(keys[1], PLAN)
+    cache.get(keys[0])
+    cache.set(keys[2], PLAN)
+    
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == PLAN
+    assert cache.get_cache_stats()["evictions"] == 1
+
+
+def test_ttl_expiry():
+    """Тест истечения записей по TTL"""
+    cache = PlanCache(version="v1", ttl=10, max_size=10)
+    key = cache.make_key("запрос")
+    with patch("agents.plan_cache.time.time", return_value=1000.0):
+        cache.set(key, PLAN)
+    with patch("agents.plan_cache.time.time", return_value=1011.0):
+        assert cache.get(key) is None
+    assert cache.get_cache_stats()["expired"] == 1
+
+
+def test_version_changes_key():
+    """Тест: смена версии промпта/модели дает другой ключ"""
+    assert PlanCache(version="v1").make_key("запрос") != PlanCache(version="v2").make_key("запрос")
+
+
+def test_persistent_tier_survives_restart(temp_db):
+    """Тест: план из SQLite доступен новому экземпляру кэша"""
+    first = PlanCache(version="v1", repository=PlanCacheRepository(temp_db), ttl=60)
+    key = first.make_key("создай проект")
+    first.set(key, PLAN)
+    
+    second = PlanCache(version="v1", repository=PlanCacheRepository(temp_db), ttl=60)
+    assert second.get(key) == PLAN
+    assert second.get_cache_stats()["db_hits"] == 1
+    # Повторное чтение - уже из памяти
+    assert second.get(key) == PLAN
+    assert second.get_cache_stats()["memory_hits"] == 1
+
+
+def test_persistent_tier_expiry(temp_db):
+    """Тест: истекшие планы не читаются и удаляются из SQLite"""
+    repo = PlanCacheRepository(temp_db)
+    repo.set("old", PLAN, expires_at=100.0)
+    repo.set("new", PLAN, expires_at=300.0)
+    
+    assert repo.get("old", now=200.0) is None
+    assert repo.delete_expired(now=200.0) == 1
+    assert repo.get("new", now=200.0)["plan"] == PLAN
+
+
+def test_mask_entities():
+    """Тест маскирования сущностей запроса"""
+    from agents.plan_template import mask_entities
+    
+    text, slots = mask_entities("Добавь ссылку ТЗ https://x.com/tz к проекту 5005 на 03.12 в 10:00")
+    assert text == "Добавь ссылку ТЗ <<url1>> к проекту <<pid1>> на <<date1>> в <<time1>>"
+    assert slots == {"url1": "https://x.com/tz", "pid1": "5005", "date1": "03.12", "time1": "10:00"}
+    
+    assert mask_entities("Создай проект id+ Polaroid")[0] == mask_entities("Создай проект id+ Instax")[0]
+
+
+def test_template_roundtrip():
+    """Тест: шаблон плана переиспользуется с другими сущностями"""
+    from agents.plan_template import mask_entities, make_template, fill_template
+    
+    _, slots = mask_entities("Создай проект id+ Polaroid на 03.12")
+    result = {
+        "intent": "create_project",
+        "entities": {"project_name": "Polaroid", "date": "2025-12-03"},
+        "plan": [{"agent": "ATM", "action": "create_project", "params": {"name": "Polaroid"}}]
+    }
+    with patch("agents.plan_template._date_parser.parse_date") as mock_parse:
+        from datetime import date
+        mock_parse.side_effect = lambda text: date(2025, 12, int(text.split(".")[0]))
+        template = make_template(result, slots)
+        _, other_slots = mask_entities("Создай проект id+ Instax на 05.12")
+        filled = fill_template(template, other_slots)
+    
+    assert filled["entities"] == {"project_name": "Instax", "date": "2025-12-05"}
+    assert filled["plan"][0]["params"]["name"] == "Instax"
+
+
+def test_template_rejected_when_value_transformed():
+    """Тест: если модель изменила значение слота, шаблон не создается"""
+    from agents.plan_template import mask_entities, make_template
+    
+    _, slots = mask_entities("Создай проект id+ Polaroid")
+    assert make_template({"intent": "x", "plan": [{"params": {"name": "POLAROID"}}]}, slots) is None
+
+
+def test_template_rejected_when_value_inside_other_string():
+    """Тест: ID проекта внутри даты плана не маскируется - шаблон не создается"""
+    from agents.plan_template import mask_entities, make_template
+
+    _, slots = mask_entities("создай задачу в проекте 2025 на завтра")
+    assert slots == {"pid1": "2025"}
+    result = {
+        "intent": "create_task",
+        "entities": {"project_id": "2025"},
+        "plan": [{"agent": "ADM", "action": "create_task",
+                  "params": {"project_id": "2025", "scheduled_date": "2025-10-20"}}]
+    }
+
+    assert make_template(result, slots) is None
+    # Отдельное значение маскируется как прежде
+    del result["plan"][0]["params"]["scheduled_date"]
+    assert make_template(result, slots)["plan"][0]["params"]["project_id"] == "<<pid1>>"
+
+
+def test_orchestrator_shares_template(monkeypatch):
+    """Тест: похожие запросы используют один шаблон без повторного вызова модели"""
+    from agents.orchestrator import OrchestratorAgent
+    
+    orchestrator = OrchestratorAgent(api_key="test-key")
+    calls = []
+    
+    def fake_process(prompt, context=None, intent=None):
+        calls.append(prompt)
+        return {
+            "intent": "create_project",
+            "entities": {"project_name": "Polaroid"},
+            "plan": [{"agent": "ATM", "action": "create_project", "params": {"name": "Polaroid"}}]
+        }
+    
+    monkeypatch.setattr(orchestrator, "process", fake_process)
+    orchestrator.analyze_request("Создай проект id+ Polaroid")
+    result = orchestrator.analyze_request("Создай проект id+ Instax")
+    
+    assert len(calls) == 1
+    assert result["plan"][0]["params"]["name"] == "Instax"
+    assert orchestrator.get_cache_stats()["template_hits"] == 1
+    
+    # Изменение результата не портит кэш
+    result["plan"][0]["params"]["workspace_id"] = 1
+    again = orchestrator.analyze_request("Создай проект id+ Instax")
+    assert "workspace_id" not in again["plan"][0]["params"]
+
+
+def test_orchestrator_does_not_cache_rejected_plan(monkeypatch):
+    """Тест: план с неизвестным действием не кэшируется, исправленный - кэшируется исправленным"""
+    from agents.agent_coordinator import action_registry
+    from agents.orchestrator import OrchestratorAgent
+    
+    orchestrator = OrchestratorAgent(api_key="test-key", plan_validator=action_registry.repair_plan)
+    calls = []
+    
+    def fake_process(prompt, context=None, intent=None):
+        calls.append(prompt)
+        action = "read_project" if "Что с проектом" in prompt else "GetProject"
+        return {
+            "intent": "query_data",
+            "entities": {},
+            "plan": [{"agent": "ADM", "action": action, "params": {"project_id": "5005"}}]
+        }
+    
+    monkeypatch.setattr(orchestrator, "process", fake_process)
+    orchestrator.analyze_request("Что с проектом 5005?")
+    orchestrator.analyze_request("Что с проектом 5006?")
+    # Отклоненный план не сохранен ни точным ключом, ни шаблоном
+    assert len(calls) == 2
+    assert len(orchestrator.cache) == 0
+    
+    orchestrator.analyze_request("Покажи проект Polaroid")
+    result = orchestrator.analyze_request("Покажи проект Polaroid")
+    assert len(calls) == 3
+    assert result["plan"][0]["action"] == "get_project"
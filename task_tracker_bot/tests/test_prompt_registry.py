@@ -0,0 +1,89 @@
+"""
+Тесты реестра промптов и лимитов токенов
+"""
+from unittest.mock import patch
+
+from agents.base_agent import BaseAgent
+from agents.orchestrator import OrchestratorAgent
+from agents.prompt_registry import (
+    PromptRegistry, PromptSection, compact_prompt, detect_intent_hint, parse_intent_limits
+)
+
+
+class SectionedAgent(BaseAgent):
+    def get_system_prompt(self) -> str:
+        return "\n\n".join(section.text for section in self.get_prompt_sections())
+
+    def get_prompt_sections(self):
+        return [
+            PromptSection("base", "   Ты агент.\n\n\n   Отвечай JSON.   "),
+            PromptSection("todo", "Правила туду", frozenset({"add_todo_batch"})),
+        ]
+
+
+def test_detect_intent_hint():
+    """Тест определения intent по ключевым словам"""
+    assert detect_intent_hint("на завтра:\n1. Купить молоко") == "add_todo_batch"
+    assert detect_intent_hint("Добавь ссылку Figma к проекту 5005") == "add_link"
+    assert detect_intent_hint("Создай новый проект id+ Сайт") == "create_project"
+    assert detect_intent_hint("Сколько задач в работе?") == "query_data"
+    assert detect_intent_hint("Привет") is None
+
+
+def test_sections_filtered_by_intent():
+    """Тест: секции с intent попадают в промпт только для своего intent"""
+    registry = PromptRegistry(intent_max_tokens={})
+    agent = SectionedAgent(api_key="test-key")
+
+    assert registry.system_prompt(agent, "query_data") == "Ты агент.\n\nОтвечай JSON."
+    assert registry.system_prompt(agent, "add_todo_batch").endswith("Правила туду")
+    # Неизвестный intent - полный промпт
+    assert "Правила туду" in registry.system_prompt(agent)
+    assert set(registry.get_stats()["prompts"]) == {
+        "SectionedAgent:query_data", "SectionedAgent:add_todo_batch", "SectionedAgent:*"
+    }
+
+
+def test_compact_prompt():
+    """Тест сжатия промпта"""
+    assert compact_prompt("\n  a  \n\n\n\n  b\n") == "a\n\nb"
+
+
+def test_max_tokens_by_intent():
+    """Тест лимита ответа по intent с переопределением из конфигурации"""
+    registry = PromptRegistry(intent_max_tokens=parse_intent_limits("query_data:800, bad, add_link:x"))
+
+    assert registry.max_tokens("query_data", 2000) == 800
+    assert registry.max_tokens("add_todo_batch", 2000) == 3000
+    assert registry.max_tokens(None, 2000) == 2000
+
+
+def test_orchestrator_payload_uses_trimmed_prompt():
+    """Тест: запрос анализа без todo-секции и с лимитом для intent"""
+    orchestrator = OrchestratorAgent(api_key="test-key")
+
+    query_payload = orchestrator._build_payload("prompt", intent="query_data")
+    full_payload = orchestrator._build_payload("prompt")
+
+    assert "Todo List" not in query_payload["messages"][0]["content"]
+    assert "Todo List" in full_payload["messages"][0]["content"]
+    assert query_payload["max_tokens"] == 1200
+    assert full_payload["max_tokens"] == orchestrator.max_tokens
+
+
+def test_usage_recorded_from_response():
+    """Тест учета токенов из ответа API"""
+    registry = PromptRegistry(intent_max_tokens={})
+    agent = SectionedAgent(api_key="test-key")
+    response = {
+        "choices": [{"message": {"content": "{}"}, "finish_reason": "length"}],
+        "usage": {"prompt_tokens": 120, "completion_tokens": 30}
+    }
+
+    with patch('agents.base_agent.prompt_registry', registry):
+        agent._track_usage(response, "query_data")
+        agent._track_usage(response)
+
+    assert registry.get_stats()["usage"]["SectionedAgent"] == {
+        "calls": 2, "prompt_tokens": 240, "completion_tokens": 60
+    }
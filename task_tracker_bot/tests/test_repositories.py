@@ -124,3 +124,97 @@ def test_custom_field_repository_create(temp_db, sample_user_id):
     assert field.name == "Figma"
     assert field.field_type == "url"
 
+
+def test_task_repository_get_scheduled_for_user(temp_db, sample_user_id):
+    """Тест выборки рабочих задач пользователя по диапазону дат"""
+    from datetime import date
+    from migrations.migrate_todo_list import migrate
+    from repositories.task_assignee_repository import TaskAssigneeRepository
+    assert migrate(temp_db)
+    
+    other_user_id = sample_user_id + 1
+    workspace_repo = WorkspaceRepository(temp_db)
+    own_ws = workspace_repo.create(sample_user_id, "Моё пространство")
+    other_ws = workspace_repo.create(other_user_id, "Чужое пространство")
+    
+    board_repo = BoardRepository(temp_db)
+    column_repo = ColumnRepository(temp_db)
+    own_column = column_repo.create(board_repo.create(own_ws, "Подготовка"), "Очередь")
+    other_column = column_repo.create(board_repo.create(other_ws, "Подготовка"), "Очередь")
+    
+    project_repo = ProjectRepository(temp_db)
+    project_repo.create("5001", own_ws, "Свой проект")
+    project_repo.create("6001", other_ws, "Чужой проект")
+    
+    task_repo = TaskRepository(temp_db)
+    own_id = task_repo.create(own_column, "Своя", project_id="5001", scheduled_date=date(2025, 12, 1))
+    task_repo.create(own_column, "Вне диапазона", project_id="5001", scheduled_date=date(2025, 12, 10))
+    task_repo.create(other_column, "Чужая", project_id="6001", scheduled_date=date(2025, 12, 2))
+    assigned_id = task_repo.create(other_column, "Назначенная", project_id="6001", scheduled_date=date(2025, 12, 3))
+    TaskAssigneeRepository(temp_db).create(assigned_id, sample_user_id)
+    
+    tasks = task_repo.get_scheduled_for_user(sample_user_id, date(2025, 12, 1), date(2025, 12, 7))
+    assert [t.id for t in tasks] == [own_id, assigned_id]
+    
+    day_tasks = task_repo.get_scheduled_for_user(sample_user_id, date(2025, 12, 1))
+    assert [t.id for t in day_tasks] == [own_id]
+
+
+def test_task_repository_get_scheduled_for_user_without_project(temp_db, sample_user_id):
+    """Тест: задачи без проекта (project_id = NULL) попадают в выборку пользователя"""
+    from datetime import date
+    from migrations.migrate_todo_list import migrate
+    from repositories.task_assignee_repository import TaskAssigneeRepository
+    assert migrate(temp_db)
+    
+    other_user_id = sample_user_id + 1
+    workspace_repo = WorkspaceRepository(temp_db)
+    own_ws = workspace_repo.create(sample_user_id, "Моё пространство")
+    other_ws = workspace_repo.create(other_user_id, "Чужое пространство")
+    board_repo = BoardRepository(temp_db)
+    column_repo = ColumnRepository(temp_db)
+    own_column = column_repo.create(board_repo.create(own_ws, "Подготовка"), "Очередь")
+    other_column = column_repo.create(board_repo.create(other_ws, "Подготовка"), "Очередь")
+    
+    task_repo = TaskRepository(temp_db)
+    own_id = task_repo.create(own_column, "Своя без проекта", scheduled_date=date(2025, 12, 1))
+    task_repo.create(other_column, "Чужая без проекта", scheduled_date=date(2025, 12, 1))
+    assigned_id = task_repo.create(other_column, "Назначенная", scheduled_date=date(2025, 12, 2))
+    task_repo.update(assigned_id, assignee_id=sample_user_id)
+    co_assigned_id = task_repo.create(other_column, "Соисполнитель", scheduled_date=date(2025, 12, 3))
+    TaskAssigneeRepository(temp_db).create(co_assigned_id, sample_user_id)
+    
+    tasks = task_repo.get_scheduled_for_user(sample_user_id, date(2025, 12, 1), date(2025, 12, 7))
+    assert [t.id for t in tasks] == [own_id, assigned_id, co_assigned_id]
+
+def test_task_repository_get_task_tree(temp_db, sample_user_id):
+    """Тест загрузки дерева подзадач со сводными значениями"""
+    from datetime import datetime
+    from migrations.migrate_todo_list import migrate
+    migrate(temp_db)
+    workspace_id = WorkspaceRepository(temp_db).create(sample_user_id, "Пространство")
+    board_id = BoardRepository(temp_db).create(workspace_id, "Доска")
+    column_id = ColumnRepository(temp_db).create(board_id, "Колонка")
+    
+    task_repo = TaskRepository(temp_db)
+    root_id = task_repo.create(column_id, "Корень", priority=0)
+    child_id = task_repo.create(column_id, "Подзадача", parent_task_id=root_id, priority=1)
+    done_id = task_repo.create(column_id, "Готово", parent_task_id=root_id)
+    grandchild_id = task_repo.create(column_id, "Вложенная", parent_task_id=child_id, priority=3)
+    task_repo.update(done_id, completed_at=datetime.now())
+    
+    tree = task_repo.get_task_tree(root_id)
+    assert tree["task"].id == root_id
+    assert tree["subtask_count"] == 3
+    assert tree["completed_count"] == 1
+    assert tree["max_priority"] == 3
+    assert [c["task"].id for c in tree["children"]] == [child_id, done_id]
+    
+    child = tree["children"][0]
+    assert child["subtask_count"] == 1
+    assert child["children"][0]["task"].id == grandchild_id
+    
+    # Ограничение глубины
+    shallow = task_repo.get_task_tree(root_id, max_depth=1)
+    assert shallow["subtask_count"] == 2
+    assert task_repo.get_task_tree(999999) is None
@@ -0,0 +1,121 @@
+"""
+Тесты кэша запроса и упреждающей загрузки данных
+"""
+import time
+import threading
+from unittest.mock import Mock, patch
+
+from agents.agent_coordinator import AgentCoordinator
+from agents.data_manager import DataManagerAgent
+from agents.request_cache import RequestCache, prefetch, request_scope
+from config import Config
+from services.container import ServiceContainer
+
+
+def make_adm():
+    adm = DataManagerAgent(api_key="test-key", services=ServiceContainer(Mock()))
+    adm.project_service = Mock()
+    adm.project_service.get_project.return_value = Mock(
+        id="5005", workspace_id=1, dashboard_stage="preparation", **{"name": "Polaroid"}
+    )
+    return adm
+
+
+def test_reads_cached_within_request_and_reset_by_writes():
+    """Тест: повторное чтение берется из кэша, запись сбрасывает кэш"""
+    adm = make_adm()
+    adm.project_service.create_project.return_value = (True, None)
+    cache = RequestCache()
+
+    with request_scope(cache):
+        adm.get_project("5005")
+        adm.get_project(project_id=5005)
+        adm.create_project("5006", 1, "Новый")
+        adm.get_project("5005")
+
+    assert adm.project_service.get_project.call_count == 2
+    assert cache.get_stats()["hits"] == 1
+    # Вне запроса кэш не используется
+    adm.get_project("5005")
+    assert adm.project_service.get_project.call_count == 3
+
+
+def test_prefetch_errors_not_cached():
+    """Тест: ошибка упреждающей загрузки не попадает в кэш"""
+    cache = RequestCache()
+    loader = Mock(side_effect=[RuntimeError("db locked"), "ok"])
+
+    prefetch(cache, lambda: cache.get_or_load(("key",), loader))
+    with request_scope(cache):
+        assert cache.get_or_load(("key",), loader) == "ok"
+    assert loader.call_count == 2
+
+
+def test_coordinator_prefetches_while_orchestrator_thinks():
+    """Тест: проект из сообщения читается до плана, шаг плана получает его из кэша"""
+    coordinator = AgentCoordinator(api_key="test-key", db=Mock())
+    adm = make_adm()
+    adm.board_service = Mock(list_boards=Mock(return_value=[]))
+    coordinator.agents["ADM"] = adm
+    plan = {
+        "intent": "query_data",
+        "entities": {"project_id": "5005"},
+        "plan": [{"agent": "ADM", "action": "get_project", "params": {"project_id": "5005"}}]
+    }
+
+    def analyze_request(message):
+        time.sleep(0.1)
+        return plan
+
+    coordinator.agents["Orchestrator"] = Mock(analyze_request=Mock(side_effect=analyze_request))
+
+    with patch('agents.agent_coordinator.Config.INTENT_FAST_PATH', False):
+        result = coordinator.process_user_message("Что с проектом 5005?", workspace_id=1, user_id=7)
+
+    assert result["status"] == "success"
+    # get_project и get_project_boards прочитаны упреждающе, шаг плана БД не читал
+    assert adm.project_service.get_project.call_count == 2
+    adm.board_service.list_boards.assert_called_with(1)
+    assert result["metrics"]["request_cache"]["prefetch_hits"] >= 1
+
+
+def test_prefetch_disabled():
+    """Тест: SPECULATIVE_PREFETCH=false - упреждающих чтений нет"""
+    coordinator = AgentCoordinator(api_key="test-key", db=Mock())
+    coordinator.agents["ADM"] = Mock()
+
+    with patch('agents.agent_coordinator.Config.SPECULATIVE_PREFETCH', False):
+        assert coordinator._speculative_prefetch("проект 5005 завтра", 1, 7, RequestCache()) == []
+    coordinator.agents["ADM"].get_project.assert_not_called()
+
+
+def test_prefetch_uses_own_bounded_pool():
+    """Тест: упреждающие чтения не занимают пул шагов, лишние пропускаются, ждущие отменяются"""
+    coordinator = AgentCoordinator(api_key="test-key", db=Mock())
+    adm = coordinator.agents["ADM"] = Mock()
+    coordinator._step_executor = Mock()
+    coordinator._prefetch_slots = threading.BoundedSemaphore(2)
+    # Все потоки пула упреждающего чтения заняты
+    gate = threading.Event()
+    blockers = [coordinator._prefetch_executor.submit(gate.wait, 1) for _ in range(Config.PREFETCH_MAX_WORKERS)]
+
+    futures = coordinator._speculative_prefetch("проект 5005", 1, None, RequestCache())
+    # Три чтения, слотов два - третье пропущено; пул шагов не используется
+    assert len(futures) == 2
+    coordinator._step_executor.submit.assert_not_called()
+
+    # План известен - ждущие чтения отменяются и не выполняются
+    coordinator._cancel_prefetch(futures)
+    gate.set()
+    for blocker in blockers:
+        blocker.result(timeout=1)
+    assert all(future.cancelled() for future in futures)
+    adm.get_workspace_boards.assert_not_called()
+    adm.get_project.assert_not_called()
+
+    # Отмененные чтения вернули слоты
+    futures = coordinator._speculative_prefetch("проект 5005", 1, None, RequestCache())
+    assert len(futures) == 2
+    for future in futures:
+        future.result(timeout=1)
+    adm.get_project.assert_called_once_with(project_id="5005")
@@ -0,0 +1,92 @@
+"""
+Тесты объединения одинаковых одновременных запросов
+"""
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+from agents.single_flight import SingleFlight
+from agents.orchestrator import OrchestratorAgent
+
+
+def test_concurrent_calls_share_result():
+    """Тест: одновременные вызовы с одним ключом выполняют функцию один раз"""
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"value": [1]}
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        leader = pool.submit(flight.do, "key", work)
+        started.wait(5)
+        followers = [pool.submit(flight.do, "key", work) for _ in range(2)]
+        while flight.get_stats()["coalesced"] < 2:
+            time.sleep(0.001)
+        release.set()
+        results = [leader.result(5)] + [f.result(5) for f in followers]
+
+    assert len(calls) == 1
+    assert all(r == {"value": [1]} for r in results)
+    # Ожидающие получают копии и могут их менять
+    assert results[1] is not results[0]
+    assert flight.get_stats() == {"executed": 1, "coalesced": 2, "in_flight": 0}
+
+
+def test_exception_shared_and_key_released():
+    """Тест: ошибка передается ожидающим, следующий вызов выполняется заново"""
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        flight.do("key", fail)
+    assert flight.do("key", lambda: 42) == 42
+
+
+async def test_async_calls_share_task():
+    """Тест: одинаковые асинхронные вызовы ждут одну задачу"""
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"plan": []}
+
+    results = await asyncio.gather(*(flight.do_async("key", work) for _ in range(3)))
+
+    assert len(calls) == 1
+    assert results == [{"plan": []}] * 3
+    assert flight.get_stats()["coalesced"] == 2
+
+
+async def test_orchestrator_coalesces_identical_requests():
+    """Тест: одинаковые одновременные запросы к оркестратору - один вызов модели"""
+    orchestrator = OrchestratorAgent(api_key="test-key")
+    calls = []
+
+    async def fake_call_api_async(prompt, context=None, timeout=None, intent=None):
+        calls.append(prompt)
+        await asyncio.sleep(0.01)
+        return {"choices": [{"message": {"content": '{"intent": "query_data", "entities": {}, "plan": []}'}}]}
+
+    with patch.object(orchestrator, "call_api_async", side_effect=fake_call_api_async):
+        results = await asyncio.gather(
+            orchestrator.analyze_request_async("Сколько задач в работе?"),
+            orchestrator.analyze_request_async("сколько   задач в работе?")
+        )
+
+    assert len(calls) == 1
+    assert results[0] == results[1]
+    assert orchestrator.get_cache_stats()["coalesced"] == 1
@@ -72,3 +72,17 @@ def test_classify_task_wrong_workspace(task_classifier, mock_project_repo):
     # Если проект из другого workspace, задача считается личной
     assert result["type"] == "personal"
 
+
+def test_find_ambiguous(task_classifier, mock_project_repo):
+    """Тест: неоднозначны личные задачи с кодом без проекта или с названием проекта"""
+    project = Mock()
+    project.name = "Polaroid"
+    mock_project_repo.get_all_by_workspace.return_value = [project]
+    classifications = {
+        0: {"type": "personal", "project_id": None, "title": "Выгул Феры"},
+        1: {"type": "personal", "project_id": None, "title": "9999 - Созвон"},
+        2: {"type": "personal", "project_id": None, "title": "Иконки для polaroid"},
+        3: {"type": "work", "project_id": "5001", "title": "Тесты"},
+    }
+    
+    assert task_classifier.find_ambiguous(classifications, workspace_id=1) == [1, 2]
@@ -0,0 +1,89 @@
+"""
+Unit тесты для кэша дней туду-листа
+"""
+from datetime import date
+from unittest.mock import patch
+
+from utils.todo_cache import TodoDayCache
+
+
+DAY = date(2025, 12, 1)
+
+
+def test_set_and_get():
+    """Тест сохранения и получения значения"""
+    cache = TodoDayCache(ttl=60)
+    assert cache.set(1, DAY, "text", cache.version(1))
+    assert cache.get(1, DAY) == "text"
+    assert cache.get(2, DAY) is None
+    stats = cache.get_cache_stats()
+    assert stats["cache_hits"] == 1
+    assert stats["cache_misses"] == 1
+
+
+def test_set_skipped_after_invalidate():
+    """Тест: значение, посчитанное до изменения данных, не сохраняется"""
+    cache = TodoDayCache(ttl=60)
+    version = cache.version(1)
+    cache.invalidate(1, DAY)
+    assert not cache.set(1, DAY, "stale", version)
+    assert cache.get(1, DAY) is None
+
+    version = cache.version(1)
+    cache.invalidate_all()
+    assert not cache.set(1, DAY, "stale", version)
+
+
+def test_invalidate_user_only():
+    """Тест: сброс одного пользователя не затрагивает других"""
+    cache = TodoDayCache(ttl=60)
+    cache.set(1, DAY, "a", cache.version(1))
+    cache.set(2, DAY, "b", cache.version(2))
+    cache.invalidate(1)
+    assert cache.get(1, DAY) is None
+    assert cache.get(2, DAY) == "b"
+
+
+def test_ttl_expiry():
+    """Тест устаревания значения по TTL"""
+    cache = TodoDayCache(ttl=10)
+    with patch("utils.todo_cache.time.time", return_value=1000.0):
+        cache.set(1, DAY, "text", cache.version(1))
+    with patch("utils.todo_cache.time.time", return_value=1011.0):
+        assert not cache.contains(1, DAY)
+        assert cache.get(1, DAY) is None
+
+
+def test_lru_eviction():
+    """Тест вытеснения самого старого пользователя"""
+    cache = TodoDayCache(ttl=60, max_users=2)
+    for user_id in (1, 2, 3):
+        cache.set(user_id, DAY, user_id, cache.version(user_id))
+    assert cache.get(1, DAY) is None
+    assert cache.get(3, DAY) == 3
+
+
+def test_assignment_changes_invalidate_user(temp_db, sample_user_id):
+    """Тест: назначение и снятие назначения сбрасывают кэш туду-листа исполнителя"""
+    from repositories.task_assignee_repository import TaskAssigneeRepository
+    from utils.todo_cache import todo_day_cache
+
+    repo = TaskAssigneeRepository(temp_db)
+    other_user_id = sample_user_id + 1
+
+    def cache_day(user_id):
+        todo_day_cache.set(user_id, DAY, "day", todo_day_cache.version(user_id))
+
+    todo_day_cache.clear()
+    for write in (
+        lambda: repo.create(1, sample_user_id),
+        lambda: repo.delete(1, sample_user_id),
+        lambda: repo.create(2, sample_user_id),
+        lambda: repo.delete_by_task(2),
+    ):
+        cache_day(sample_user_id)
+        cache_day(other_user_id)
+        assert write()
+        assert not todo_day_cache.contains(sample_user_id, DAY)
+        assert todo_day_cache.contains(other_user_id, DAY)
+    todo_day_cache.clear()
@@ -13,6 +13,7 @@ from handlers.todo_handler import (
     handle_todo_navigation,
     handle_mark_todo_completed
 )
+from utils.todo_cache import todo_day_cache
 
 
 @pytest.fixture
@@ -26,11 +27,21 @@ def mock_update():
     return update
 
 
+@pytest.fixture(autouse=True)
+def clear_todo_day_cache():
+    """Кэш дней общий для модуля - очищаем между тестами"""
+    todo_day_cache.clear()
+    yield
+    todo_day_cache.clear()
+
+
 @pytest.fixture
 def mock_context():
     """Мок Context для тестов"""
     context = Mock(spec=ContextTypes.DEFAULT_TYPE)
     context.args = []
+    # Фоновая предзагрузка не запускается в тестах обработчиков
+    context.application.create_task = Mock(side_effect=lambda coro, **kwargs: coro.close())
     return context
 
 
@@ -365,3 +376,106 @@ class TestMarkTodoCompleted:
         call_args = str(mock_update_with_callback.callback_query.edit_message_text.call_args)
         assert "некоррект" in call_args.lower()
 
+
+
+class TestTodoCalendar:
+    """Тесты для календаря /week и /month"""
+    
+    @patch('handlers.todo_handler.todo_service')
+    async def test_week_command_caches_window(self, mock_todo_service, mock_update, mock_update_with_callback, mock_context):
+        """Тест /week: один запрос на диапазон, день открывается из окна без БД"""
+        from handlers.todo_handler import week_command, handle_todo_day_callback, calendar_range
+        mock_context.user_data = {}
+        start_date, end_date = calendar_range("week", datetime.now().date())
+        days = {
+            start_date + timedelta(days=i): {"personal_tasks": [], "work_tasks": [], "total": 0, "completed": 0}
+            for i in range(7)
+        }
+        mock_todo_service.get_todo_range.return_value = {
+            "start_date": start_date, "end_date": end_date, "days": days, "total": 0, "completed": 0
+        }
+        mock_todo_service.build_todo_list.return_value = {
+            "date": start_date.strftime("%d.%m.%Y"), "personal_tasks": [], "work_tasks": [], "grouped_by_time": {}
+        }
+        
+        await week_command(mock_update, mock_context)
+        
+        mock_todo_service.get_todo_range.assert_called_once_with(12345, start_date, end_date, include_work_tasks=True)
+        mock_update.message.reply_text.assert_called_once()
+        assert "todo_window" in mock_context.user_data
+        
+        mock_update_with_callback.callback_query.data = f"todo_day_{start_date.isoformat()}"
+        await handle_todo_day_callback(mock_update_with_callback, mock_context)
+        
+        mock_todo_service.get_todo_list.assert_not_called()
+        mock_todo_service.build_todo_list.assert_called_once_with(start_date, [], [])
+        mock_update_with_callback.callback_query.edit_message_text.assert_called_once()
+    
+    def test_calendar_range_month(self):
+        """Тест границ месяца"""
+        from handlers.todo_handler import calendar_range
+        assert calendar_range("month", date(2025, 2, 14)) == (date(2025, 2, 1), date(2025, 2, 28))
+        assert calendar_range("week", date(2025, 12, 3)) == (date(2025, 12, 1), date(2025, 12, 7))
+
+
+class TestTodoDayCache:
+    """Тесты кэша дней и предзагрузки соседних дней"""
+    
+    @patch('repositories.workspace_repository.WorkspaceRepository')
+    @patch('handlers.todo_handler.todo_service')
+    async def test_navigation_served_from_cache(self, mock_todo_service, mock_workspace_repo, mock_update_with_callback, mock_context):
+        """Тест: повторный показ дня не обращается к БД"""
+        target_date = date(2025, 11, 28)
+        mock_todo_service.get_todo_list.return_value = {
+            "date": target_date.strftime("%d.%m.%Y"), "personal_tasks": [], "work_tasks": [], "grouped_by_time": {}
+        }
+        mock_update_with_callback.callback_query.data = f"todo_date_{target_date.isoformat()}"
+        
+        await handle_todo_date_callback(mock_update_with_callback, mock_context)
+        await handle_todo_date_callback(mock_update_with_callback, mock_context)
+        
+        mock_todo_service.get_todo_list.assert_called_once()
+        mock_workspace_repo.return_value.get_all_by_user.assert_called_once()
+        assert mock_update_with_callback.callback_query.edit_message_text.call_count == 2
+        mock_context.application.create_task.assert_called()
+    
+    @patch('handlers.todo_handler.todo_service')
+    async def test_prefetch_neighbour_days(self, mock_todo_service):
+        """Тест: соседние дни загружаются одним запросом и попадают в кэш"""
+        from handlers.todo_handler import _prefetch_neighbour_days
+        target_date = date(2025, 11, 28)
+        prev_date, next_date = target_date - timedelta(days=1), target_date + timedelta(days=1)
+        days = {
+            prev_date + timedelta(days=i): {"personal_tasks": [], "work_tasks": [], "total": 0, "completed": 0}
+            for i in range(3)
+        }
+        mock_todo_service.get_todo_range.return_value = {
+            "start_date": prev_date, "end_date": next_date, "days": days, "total": 0, "completed": 0
+        }
+        mock_todo_service.build_todo_list.side_effect = lambda d, p, w: {
+            "date": d.strftime("%d.%m.%Y"), "personal_tasks": p, "work_tasks": w, "grouped_by_time": {}
+        }
+        
+        await _prefetch_neighbour_days(12345, target_date)
+        
+        mock_todo_service.get_todo_range.assert_called_once_with(12345, prev_date, next_date)
+        assert todo_day_cache.contains(12345, prev_date)
+        assert todo_day_cache.contains(12345, next_date)
+        assert not todo_day_cache.contains(12345, target_date)
+    
+    @patch('handlers.todo_handler.todo_service')
+    async def test_todo_refresh(self, mock_todo_service, mock_update_with_callback, mock_context):
+        """Тест кнопки обновления: редактирует сообщение, а не отправляет новое"""
+        from handlers.todo_handler import handle_todo_refresh
+        target_date = date(2025, 11, 28)
+        mock_todo_service.get_todo_list.return_value = {
+            "date": target_date.strftime("%d.%m.%Y"), "personal_tasks": [], "work_tasks": [], "grouped_by_time": {}
+        }
+        mock_update_with_callback.callback_query.data = f"todo_refresh_{target_date.isoformat()}"
+        
+        await handle_todo_refresh(mock_update_with_callback, mock_context)
+        
+        mock_todo_service.get_todo_list.assert_called_once_with(
+            user_id=12345, target_date=target_date, include_work_tasks=True
+        )
+        mock_update_with_callback.callback_query.edit_message_text.assert_called_once()
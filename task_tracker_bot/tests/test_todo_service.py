@@ -131,6 +131,40 @@ def test_create_todo_batch_work_task(todo_service, mock_repos, mock_utils):
     assert len(result["work_tasks_created"]) == 1
     mock_repos['task'].create.assert_called_once()
 
+def test_create_todo_batch_refines_ambiguous_lines_once(todo_service, mock_repos, mock_utils):
+    """Тест: неоднозначные строки уточняются одним вызовом, остальные - по правилам"""
+    tasks_text = "1. Выгул Феры\n2. Иконки для Polaroid\n3. Макет Polaroid"
+    default_date = date(2025, 11, 30)
+    
+    mock_utils['date_parser'].parse_datetime_from_task.side_effect = lambda text, _: {
+        "date": default_date, "time": None, "time_end": None, "remaining_text": text
+    }
+    mock_utils['task_classifier'].classify_task.side_effect = lambda text, _: {
+        "type": "personal", "project_id": None, "title": text
+    }
+    mock_utils['task_classifier'].find_ambiguous.return_value = [1, 2]
+    mock_repos['project'].get_by_id.return_value = Mock(id="5001", workspace_id=1)
+    mock_repos['board'].get_all_by_workspace.return_value = [Mock(id=1)]
+    mock_repos['column'].get_all_by_board.return_value = [Mock(id=1)]
+    mock_repos['task'].create.return_value = 100
+    mock_repos['personal_task'].create.return_value = 1
+    refine = Mock(return_value={1: {"type": "work", "project_id": "5001", "title": "Иконки"}})
+    
+    result = todo_service.create_todo_batch(
+        tasks_text=tasks_text,
+        workspace_id=1,
+        user_id=123,
+        default_date=default_date,
+        refine_classification=refine
+    )
+    
+    refine.assert_called_once_with(
+        [{"index": 1, "text": "Иконки для Polaroid"}, {"index": 2, "text": "Макет Polaroid"}], 1
+    )
+    # Строка 3 без уверенного ответа модели остается личной
+    assert len(result["work_tasks_created"]) == 1
+    assert len(result["personal_tasks_created"]) == 2
+
 def test_get_todo_list(todo_service, mock_repos):
     """Тест получения туду-листа"""
     user_id = 123
@@ -147,7 +181,7 @@ def test_get_todo_list(todo_service, mock_repos):
     mock_personal_task.time_display = "10:00"
     
     mock_repos['personal_task'].get_by_date.return_value = [mock_personal_task]
-    mock_repos['task'].get_by_scheduled_date.return_value = []
+    mock_repos['task'].get_scheduled_for_user.return_value = []
     
     result = todo_service.get_todo_list(
         user_id=user_id,
@@ -158,6 +192,7 @@ def test_get_todo_list(todo_service, mock_repos):
     assert result["date"] == "30.11.2025"
     assert len(result["personal_tasks"]) == 1
     assert "grouped_by_time" in result
+    mock_repos['task'].get_scheduled_for_user.assert_called_once_with(user_id, target_date)
 
 def test_mark_personal_task_completed(todo_service, mock_repos):
     """Тест отметки личной задачи как выполненной"""
@@ -381,3 +416,28 @@ def test_create_todo_batch_mixed_personal_and_work(todo_service, mock_repos, moc
     assert len(result["personal_tasks_created"]) == 1
     assert len(result["work_tasks_created"]) == 1
 
+
+def test_get_todo_range(todo_service, mock_repos):
+    """Тест получения задач за диапазон дат с подсчетом по дням"""
+    from models.personal_task import PersonalTask
+    from models.task import Task
+    user_id = 123
+    start_date = date(2025, 12, 1)
+    end_date = date(2025, 12, 7)
+    
+    done = Mock(spec=PersonalTask, scheduled_date=start_date, completed=True)
+    open_task = Mock(spec=PersonalTask, scheduled_date=start_date, completed=False)
+    work = Mock(spec=Task, scheduled_date=date(2025, 12, 3), completed_at=None)
+    mock_repos['personal_task'].get_by_date_range.return_value = [done, open_task]
+    mock_repos['task'].get_scheduled_for_user.return_value = [work]
+    
+    result = todo_service.get_todo_range(user_id, start_date, end_date)
+    
+    mock_repos['personal_task'].get_by_date_range.assert_called_once_with(user_id, start_date, end_date)
+    mock_repos['task'].get_scheduled_for_user.assert_called_once_with(user_id, start_date, end_date)
+    assert len(result["days"]) == 7
+    assert result["days"][start_date]["total"] == 2
+    assert result["days"][start_date]["completed"] == 1
+    assert result["days"][date(2025, 12, 3)]["work_tasks"] == [work]
+    assert result["total"] == 3
+    assert result["completed"] == 1
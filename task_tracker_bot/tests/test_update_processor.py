@@ -0,0 +1,156 @@
+"""
+Тесты обработчика обновлений с порядком внутри чата
+"""
+import asyncio
+from datetime import datetime
+
+from telegram import Chat, Message, Update
+
+from utils.update_processor import QUEUE_WAIT, ChatSequentialUpdateProcessor
+
+
+def make_update(update_id: int, chat_id: int) -> Update:
+    message = Message(message_id=update_id, date=datetime.now(), chat=Chat(id=chat_id, type="private"))
+    return Update(update_id=update_id, message=message)
+
+
+async def test_chat_updates_in_order_chats_in_parallel():
+    """Обновления одного чата выполняются по очереди, разных чатов - одновременно"""
+    processor = ChatSequentialUpdateProcessor(max_concurrent_updates=4)
+    gate = asyncio.Event()
+    events = []
+
+    async def handle(name, wait=False):
+        events.append(f"start {name}")
+        if wait:
+            await gate.wait()
+        events.append(f"end {name}")
+
+    tasks = [
+        asyncio.create_task(processor.process_update(make_update(1, 100), handle("a1", wait=True))),
+        asyncio.create_task(processor.process_update(make_update(2, 100), handle("a2"))),
+        asyncio.create_task(processor.process_update(make_update(3, 200), handle("b1"))),
+    ]
+    await asyncio.sleep(0.01)
+
+    # a2 ждет a1, b1 из другого чата уже выполнен
+    assert events == ["start a1", "start b1", "end b1"]
+    assert processor.get_stats()["queued"] == 1
+    wait_count = QUEUE_WAIT.count()
+
+    gate.set()
+    await asyncio.gather(*tasks)
+    await asyncio.sleep(0.01)
+
+    assert events[3:] == ["end a1", "start a2", "end a2"]
+    assert processor.get_stats()["active_chats"] == 0
+    assert processor.get_stats()["max_chat_queue"] == 1
+    assert QUEUE_WAIT.count() == wait_count + 1
+
+
+async def test_busy_chat_does_not_hold_slots():
+    """Поток сообщений из одного чата занимает один слот, остальные чаты не ждут"""
+    processor = ChatSequentialUpdateProcessor(max_concurrent_updates=2)
+    gate = asyncio.Event()
+    done = []
+
+    async def handle(name, wait=False):
+        if wait:
+            await gate.wait()
+        done.append(name)
+
+    busy = [asyncio.create_task(processor.process_update(make_update(1, 100), handle("a1", wait=True)))]
+    busy += [
+        asyncio.create_task(processor.process_update(make_update(i, 100), handle(f"a{i}")))
+        for i in range(2, 6)
+    ]
+    await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(processor.process_update(make_update(10, 200), handle("b1")), timeout=1)
+    assert done == ["b1"]
+
+    gate.set()
+    await asyncio.gather(*busy)
+    await asyncio.sleep(0.01)
+    assert done == ["b1", "a1", "a2", "a3", "a4", "a5"]
+
+
+async def test_error_does_not_break_chat_queue():
+    """Ошибка обработки обновления не прерывает очередь чата"""
+    processor = ChatSequentialUpdateProcessor(max_concurrent_updates=2)
+    done = []
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def handle():
+        done.append("ok")
+
+    first = asyncio.create_task(processor.process_update(make_update(1, 100), fail()))
+    await asyncio.sleep(0)
+    await processor.process_update(make_update(2, 100), handle())
+    await first
+
+    assert done == ["ok"]
+    assert processor.chat_key(object()) is None
+
+
+async def test_ai_message_blocks_next_update_of_chat(monkeypatch):
+    """AI-запрос и кнопка меню того же чата выполняются строго по очереди"""
+    import bot
+    from telegram import User
+    from telegram.ext import Application, ExtBot
+
+    events = []
+    gate = asyncio.Event()
+
+    async def handle_ai_message(update, context):
+        events.append(f"ai start {update.update_id}")
+        context.user_data["current_workspace_id"] = update.update_id
+        if update.update_id == 1:
+            await gate.wait()
+        events.append(f"ai end {update.update_id}")
+
+    async def handle_menu_button(update, context):
+        events.append(f"menu {update.update_id} workspace={context.user_data['current_workspace_id']}")
+
+    monkeypatch.setattr(bot, "handle_ai_message", handle_ai_message)
+    monkeypatch.setattr(bot, "handle_menu_button", handle_menu_button)
+    processor = ChatSequentialUpdateProcessor(max_concurrent_updates=4)
+    application = Application.builder().token("123:TEST").updater(None).concurrent_updates(processor).build()
+    bot.setup_handlers(application)
+
+    async def get_me(self, *args, **kwargs):
+        return User(id=123, first_name="Bot", is_bot=True, username="test_bot")
+
+    # Без запроса к Telegram при initialize
+    monkeypatch.setattr(ExtBot, "get_me", get_me)
+    await application.initialize()
+    try:
+        def text_update(update_id: int, text: str) -> Update:
+            user = User(id=100, first_name="User", is_bot=False)
+            message = Message(
+                message_id=update_id, date=datetime.now(), chat=Chat(id=100, type="private"),
+                from_user=user, text=text
+            )
+            message.set_bot(application.bot)
+            return Update(update_id=update_id, message=message)
+
+        updates = [text_update(1, "Создай проект id+ Polaroid"), text_update(2, "📋 Меню")]
+        tasks = [
+            asyncio.create_task(processor.process_update(update, application.process_update(update)))
+            for update in updates
+        ]
+        await asyncio.sleep(0.05)
+        # Пока AI-запрос не завершен, ни кнопка меню, ни следующее обновление чата не выполняются
+        assert events == ["ai start 1"]
+
+        gate.set()
+        await asyncio.gather(*tasks)
+        assert events == [
+            "ai start 1", "ai end 1", "menu 1 workspace=1",
+            "ai start 2", "ai end 2", "menu 2 workspace=2"
+        ]
+    finally:
+        await application.shutdown()
@@ -0,0 +1,174 @@
+"""
+Бенчмарк конвейера агентов без обращения к реальному io.net API
+
+Прогоняет корпус сообщений через AgentCoordinator.process_user_message
+на временной БД и выводит p50/p95 полного времени обработки и число
+вызовов LLM на сообщение.
+
+Режимы:
+    replay - ответы модели берутся из кассеты без сети (время без учета модели);
+    stub - запросы идут в локальный stub-сервер (utils/io_net_stub.py) с
+           задержкой из заданного распределения, ответы - из той же кассеты.
+
+Корпус - сообщения, записанные в кассету (IO_NET_CASSETTE_MODE=record),
+или JSON-файл со списком строк (--corpus).
+
+Запуск:
+    python utils/benchmark_agents.py --cassette data/cassettes/io_net.jsonl
+    python utils/benchmark_agents.py --cassette data/cassettes/io_net.jsonl \\
+        --mode stub --latency lognormal:1.5:0.5 --repeat 3
+"""
+import sys
+import os
+import json
+import math
+import time
+import random
+import shutil
+import logging
+import argparse
+import tempfile
+from typing import Any, Dict, List, Optional
+
+# Добавляем путь к модулям проекта
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from database import Database
+from repositories.workspace_repository import WorkspaceRepository
+from agents.agent_coordinator import AgentCoordinator
+from agents.cassette import Cassette, io_net_cassette
+from utils.io_net_stub import LatencyModel, StubIoNetServer
+
+BENCHMARK_USER_ID = 1
+
+
+def percentile(values: List[float], percent: float) -> float:
+    """Перцентиль методом ближайшего ранга"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(percent / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def load_corpus(corpus_path: Optional[str], cassette: Cassette) -> List[str]:
+    """Сообщения для прогона: из JSON-файла или записанные в кассету"""
+    if corpus_path:
+        with open(corpus_path, encoding="utf-8") as f:
+            return [str(message) for message in json.load(f)]
+    return cassette.messages()
+
+
+def prepare_database(temp_dir: str) -> tuple:
+    """Временная БД со схемой бота и пространством для прогона"""
+    Config.DATABASE_PATH = os.path.join(temp_dir, "benchmark.db")
+    db = Database()
+    db.init_db()
+    from migrations.migrate_0_2 import migrate
+    from migrations.migrate_todo_list import migrate as migrate_todo_list
+    migrate()
+    migrate_todo_list(db)
+    workspace_id = WorkspaceRepository(db).create(BENCHMARK_USER_ID, "Benchmark")
+    return db, workspace_id
+
+
+def run_benchmark(
+    coordinator: AgentCoordinator,
+    corpus: List[str],
+    workspace_id: int,
+    count_llm_calls,
+    repeat: int = 1
+) -> Dict[str, Any]:
+    """
+    Прогнать корпус через координатор
+
+    Args:
+        coordinator: Координатор агентов
+        corpus: Сообщения пользователя
+        workspace_id: ID пространства
+        count_llm_calls: Функция без аргументов - текущее число вызовов LLM
+        repeat: Сколько раз прогнать корпус (повторы показывают эффект кэшей)
+
+    Returns:
+        Сводка: латентность, вызовы LLM, статусы ответов
+    """
+    latencies: List[float] = []
+    llm_calls: List[int] = []
+    statuses: Dict[str, int] = {}
+    for _ in range(repeat):
+        for message in corpus:
+            calls_before = count_llm_calls()
+            start = time.perf_counter()
+            result = coordinator.process_user_message(message, workspace_id, BENCHMARK_USER_ID)
+            latencies.append((time.perf_counter() - start) * 1000)
+            llm_calls.append(count_llm_calls() - calls_before)
+            status = result.get("status", "unknown")
+            statuses[status] = statuses.get(status, 0) + 1
+
+    return {
+        "requests": len(latencies),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "max_ms": round(max(latencies), 2) if latencies else 0.0,
+        "llm_calls_total": sum(llm_calls),
+        "llm_calls_per_request": round(sum(llm_calls) / len(llm_calls), 2) if llm_calls else 0.0,
+        "statuses": statuses
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк конвейера агентов")
+    parser.add_argument("--cassette", default=Config.IO_NET_CASSETTE_PATH, help="Кассета с записанными ответами")
+    parser.add_argument("--corpus", help="JSON-файл со списком сообщений (по умолчанию - из кассеты)")
+    parser.add_argument("--mode", choices=["replay", "stub"], default="replay")
+    parser.add_argument("--latency", default="lognormal:1.5:0.5", help="Задержка stub-сервера")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Доля ответов 503 stub-сервера")
+    parser.add_argument("--repeat", type=int, default=1, help="Число прогонов корпуса")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    cassette = Cassette(args.cassette, Cassette.REPLAY)
+    corpus = load_corpus(args.corpus, cassette)
+    if not corpus:
+        print("Корпус пуст: запишите сообщения (IO_NET_CASSETTE_MODE=record) или передайте --corpus")
+        sys.exit(1)
+
+    temp_dir = tempfile.mkdtemp(prefix="agents_benchmark_")
+    server = None
+    try:
+        db, workspace_id = prepare_database(temp_dir)
+        if args.mode == "stub":
+            server = StubIoNetServer(
+                latency=LatencyModel.parse(args.latency, random.Random(args.seed)),
+                cassette=cassette,
+                error_rate=args.error_rate,
+                seed=args.seed
+            ).start()
+            Config.IO_NET_API_URL = server.url
+            count_llm_calls = lambda: server.get_stats()["requests"]
+        else:
+            io_net_cassette.configure(args.cassette, Cassette.REPLAY)
+            count_llm_calls = lambda: io_net_cassette.get_stats()["replayed"] + io_net_cassette.get_stats()["misses"]
+
+        coordinator = AgentCoordinator(api_key=Config.IO_NET_API_KEY or "benchmark", db=db)
+        summary = run_benchmark(coordinator, corpus, workspace_id, count_llm_calls, args.repeat)
+        summary["mode"] = args.mode
+        if server is not None:
+            summary["stub"] = server.get_stats()
+        else:
+            summary["cassette"] = io_net_cassette.get_stats()
+        summary["fast_path"] = coordinator.get_fast_path_stats()
+        summary["orchestrator_cache"] = coordinator.orchestrator.get_cache_stats()
+    finally:
+        if server is not None:
+            server.stop()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
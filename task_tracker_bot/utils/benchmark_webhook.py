@@ -0,0 +1,135 @@
+"""
+Бенчмарк приема обновлений вебхуком бота
+
+Отправляет синтетические обновления Telegram на локальный эндпоинт бота,
+запущенного с BOT_MODE=webhook, и выводит число принятых обновлений в
+секунду и p50/p95 времени ответа эндпоинта. Эндпоинт отвечает, как только
+обновление поставлено в очередь, поэтому измеряется прием, а не обработка.
+
+Обновления - сообщения от chat_id/user_id из аргументов. По умолчанию
+текст - неизвестная команда /bench, на которую бот не отвечает; для
+прогона обработчиков задайте --text и тестовый чат. Запускайте против
+бота с тестовым токеном: setWebhook при старте бота перенаправит на
+вебхук обновления этого токена.
+
+Запуск:
+    BOT_MODE=webhook WEBHOOK_URL=https://example.com WEBHOOK_SECRET_TOKEN=secret python bot.py
+    python utils/benchmark_webhook.py --count 2000 --concurrency 50
+    python utils/benchmark_webhook.py --secret wrong --count 10   # проверка отказа (403)
+"""
+import sys
+import os
+import math
+import time
+import asyncio
+import argparse
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+# Добавляем путь к модулям проекта
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+def percentile(values: List[float], percent: float) -> float:
+    """Перцентиль методом ближайшего ранга"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(percent / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def make_update(update_id: int, chat_id: int, user_id: int, text: str) -> Dict[str, Any]:
+    """Синтетическое обновление Telegram с текстовым сообщением"""
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": "Benchmark"},
+            "text": text
+        }
+    }
+
+
+async def run_benchmark(
+    url: str,
+    secret: Optional[str],
+    count: int,
+    concurrency: int,
+    chat_id: int,
+    user_id: int,
+    text: str
+) -> Dict[str, Any]:
+    """Отправить count обновлений не более чем concurrency запросами одновременно"""
+    headers = {SECRET_HEADER: secret} if secret else {}
+    semaphore = asyncio.Semaphore(concurrency)
+    statuses: Counter = Counter()
+    latencies: List[float] = []
+    # update_id растут от текущего времени, чтобы не пересекаться с прошлыми прогонами
+    first_update_id = int(time.time() * 1000)
+
+    async with httpx.AsyncClient(
+        timeout=30.0, limits=httpx.Limits(max_connections=concurrency)
+    ) as client:
+        async def send(i: int) -> None:
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await client.post(
+                        url, json=make_update(first_update_id + i, chat_id, user_id, text), headers=headers
+                    )
+                    statuses[str(response.status_code)] += 1
+                except httpx.HTTPError as e:
+                    statuses[type(e).__name__] += 1
+                    return
+                latencies.append(time.perf_counter() - start)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(send(i) for i in range(count)))
+        elapsed = time.perf_counter() - started
+
+    accepted = statuses.get("200", 0)
+    return {
+        "count": count,
+        "elapsed": elapsed,
+        "updates_per_sec": accepted / elapsed if elapsed > 0 else 0.0,
+        "statuses": dict(statuses),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк приема обновлений вебхуком")
+    default_url = f"http://{Config.WEBHOOK_LISTEN}:{Config.WEBHOOK_PORT}/{Config.WEBHOOK_PATH.strip('/')}"
+    parser.add_argument("--url", default=default_url, help=f"Эндпоинт вебхука (по умолчанию {default_url})")
+    parser.add_argument("--secret", default=Config.WEBHOOK_SECRET_TOKEN,
+                        help="Секрет вебхука (по умолчанию WEBHOOK_SECRET_TOKEN)")
+    parser.add_argument("--count", type=int, default=1000, help="Число обновлений")
+    parser.add_argument("--concurrency", type=int, default=20, help="Одновременных запросов")
+    parser.add_argument("--chat-id", type=int, default=1, help="chat_id синтетических сообщений")
+    parser.add_argument("--user-id", type=int, default=1, help="ID отправителя синтетических сообщений")
+    parser.add_argument("--text", default="/bench", help="Текст сообщений")
+    args = parser.parse_args()
+
+    result = asyncio.run(run_benchmark(
+        args.url, args.secret, args.count, args.concurrency, args.chat_id, args.user_id, args.text
+    ))
+
+    print(f"Эндпоинт: {args.url}")
+    print(f"Обновлений: {result['count']}, одновременно: {args.concurrency}, за {result['elapsed']:.2f}s")
+    print(f"Принято в секунду: {result['updates_per_sec']:.1f}")
+    print(f"Ответ эндпоинта: p50={result['p50_ms']:.1f}ms p95={result['p95_ms']:.1f}ms")
+    print(f"Статусы: {result['statuses']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,13 +3,32 @@
 """
 import re
 import logging
+import weakref
 from datetime import datetime, date, time, timedelta
 from typing import Optional, Tuple, Dict, Any
 from functools import lru_cache
 from dateutil import parser as dateutil_parser
+from utils.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
+# Живые экземпляры парсера: у каждого свой кэш, в метрики идет сумма
+_parsers = weakref.WeakSet()
+
+
+def _collect_cache_metrics():
+    """Статистика кэшей всех парсеров для реестра метрик"""
+    stats = [parser.get_cache_stats() for parser in list(_parsers)]
+    for key, name, documentation in (
+        ("cache_hits", "date_parser_cache_hits", "Попадания в кэш DateParser (с последней очистки)"),
+        ("cache_misses", "date_parser_cache_misses", "Промахи кэша DateParser (с последней очистки)"),
+        ("cache_size", "date_parser_cache_size", "Записей в кэшах DateParser"),
+    ):
+        yield name, "gauge", documentation, [(name, {}, sum(item[key] for item in stats))]
+
+
+metrics.register_collector(_collect_cache_metrics)
+
 class DateParser:
     """Парсинг дат и времени из естественного языка"""
     
@@ -24,6 +43,7 @@ class DateParser:
         self._cache_misses = 0
         # Кэш для parse_date с учетом reference_date
         self._date_cache = {}
+        _parsers.add(self)
     
     def parse_date(self, text: str, reference_date: Optional[date] = None) -> Optional[date]:
         """
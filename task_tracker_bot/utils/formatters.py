@@ -55,9 +55,61 @@ def format_column_list(columns: List[Column], board_name: str) -> str:
     
     return text.strip()
 
+def _progress_bar(done: int, total: int, width: int = 5) -> str:
+    """Полоска прогресса ▰▱"""
+    filled = round(done / total * width) if total else 0
+    return "▰" * filled + "▱" * (width - filled)
+
+def format_task_tree(tree: Dict, max_lines: int = 30) -> str:
+    """
+    Форматировать дерево подзадач с вложенным прогрессом
+    
+    Args:
+        tree: Корневой узел из TaskRepository.get_task_tree()
+        max_lines: Ограничение числа строк, чтобы не превысить лимит сообщения
+    
+    Returns:
+        Форматированный текст дерева
+    """
+    total = tree["subtask_count"]
+    if not total:
+        return "📭 Подзадач пока нет"
+    
+    completed = tree["completed_count"]
+    percent = round(completed / total * 100)
+    text = (
+        f"<b>📋 Подзадачи: {completed}/{total}</b> "
+        f"{_progress_bar(completed, total)} {percent}%\n"
+    )
+    
+    lines = []
+    
+    def walk(node: Dict) -> None:
+        for child in node["children"]:
+            if len(lines) >= max_lines:
+                return
+            task = child["task"]
+            status = "✅" if task.completed_at else "⬜"
+            line = f"{'   ' * (child['depth'] - 1)}{status} {task.priority_emoji} {task.title}"
+            if child["subtask_count"]:
+                line += f" ({child['completed_count']}/{child['subtask_count']})"
+            lines.append(line)
+            walk(child)
+    
+    walk(tree)
+    text += "\n".join(lines)
+    if len(lines) < total:
+        text += f"\n… и еще {total - len(lines)}"
+    return text
+
 def format_task(task: Task, column_repo: Optional[ColumnRepository] = None,
-                board_repo: Optional[BoardRepository] = None) -> str:
-    """Форматировать задачу с улучшенным UI"""
+                board_repo: Optional[BoardRepository] = None,
+                subtask_tree: Optional[Dict] = None) -> str:
+    """Форматировать задачу с улучшенным UI
+    
+    Если передан subtask_tree (TaskRepository.get_task_tree), в карточку
+    добавляется сводный прогресс по подзадачам.
+    """
     text = f"<b>📋 Задача #{task.id}</b>\n"
     text += f"<b>{task.title}</b>\n\n"
     
@@ -105,6 +157,18 @@ def format_task(task: Task, column_repo: Optional[ColumnRepository] = None,
         deadline_str = format_datetime(task.deadline) if isinstance(task.deadline, datetime) else str(task.deadline)
         text += f"⏰ Дедлайн: {deadline_str}\n"
     
+    # Прогресс подзадач (все уровни вложенности)
+    if subtask_tree and subtask_tree["subtask_count"]:
+        total = subtask_tree["subtask_count"]
+        completed = subtask_tree["completed_count"]
+        text += f"\n📋 Подзадачи: {_progress_bar(completed, total)} {completed}/{total}\n"
+        for child in subtask_tree["children"]:
+            if child["subtask_count"]:
+                text += (
+                    f"   • {child['task'].title}: "
+                    f"{child['completed_count']}/{child['subtask_count']}\n"
+                )
+    
     # Даты создания и обновления
     text += f"\n📅 Создано: {format_datetime(task.created_at)}\n"
     text += f"🔄 Обновлено: {format_datetime(task.updated_at)}"
@@ -350,3 +414,52 @@ def format_todo_list(todo_list: Dict) -> str:
     
     return text
 
+
+WEEKDAY_SHORT = ["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс"]
+
+def format_todo_calendar(todo_range: Dict, view: str = "week") -> str:
+    """
+    Форматировать компактный календарь туду-листа (неделя/месяц)
+    
+    Args:
+        todo_range: Результат todo_service.get_todo_range()
+        view: "week" или "month"
+    
+    Returns:
+        Форматированный текст календаря
+    """
+    start_date = todo_range["start_date"]
+    end_date = todo_range["end_date"]
+    days = todo_range.get("days", {})
+    total = todo_range.get("total", 0)
+    completed = todo_range.get("completed", 0)
+    
+    title = "Неделя" if view == "week" else "Месяц"
+    text = (
+        f"🗓 <b>{title} {start_date.strftime('%d.%m')} – "
+        f"{end_date.strftime('%d.%m.%Y')}</b>\n\n"
+    )
+    
+    today = datetime.now().date()
+    for day_date, day in sorted(days.items()):
+        day_total = day.get("total", 0)
+        # В месячном виде пропускаем пустые дни, чтобы сообщение оставалось компактным
+        if view == "month" and not day_total:
+            continue
+        
+        marker = "👉 " if day_date == today else ""
+        label = f"{WEEKDAY_SHORT[day_date.weekday()]} {day_date.strftime('%d.%m')}"
+        if day_total:
+            day_completed = day.get("completed", 0)
+            bar = _progress_bar(day_completed, day_total)
+            text += f"{marker}<code>{label}</code> {bar} {day_completed}/{day_total}\n"
+        else:
+            text += f"{marker}<code>{label}</code> —\n"
+    
+    if total:
+        percent = round(completed / total * 100)
+        text += f"\n✅ Выполнено: {completed}/{total} ({percent}%)"
+    else:
+        text += "📭 Задач за этот период нет"
+    
+    return text
@@ -0,0 +1,264 @@
+"""
+Локальный OpenAI-совместимый stub io.net API для бенчмарков и нагрузочных тестов
+
+Отвечает на POST .../chat/completions (обычный и потоковый режим) с
+задержкой из заданного распределения. Ответы берутся из кассеты
+(agents/cassette.py) по ключу запроса, для незаписанных запросов
+возвращается fallback-ответ. GET /stats - счетчики сервера.
+
+Запуск:
+    python utils/io_net_stub.py --port 8089 --latency lognormal:1.5:0.5 \\
+        --cassette data/cassettes/io_net.jsonl
+    IO_NET_API_URL=http://127.0.0.1:8089/v1/chat/completions python bot.py
+"""
+import sys
+import os
+import json
+import math
+import time
+import random
+import logging
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+# Добавляем путь к модулям проекта
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.cassette import Cassette, response_content
+
+logger = logging.getLogger(__name__)
+
+# Ответ на незаписанный запрос: пустой план оркестратора
+DEFAULT_FALLBACK_CONTENT = json.dumps(
+    {"intent": "unknown", "entities": {}, "plan": []}, ensure_ascii=False
+)
+
+# Размер фрагмента потокового ответа в символах
+STREAM_CHUNK_SIZE = 24
+
+
+class LatencyModel:
+    """
+    Распределение задержки ответа в секундах
+
+    Формат спецификации:
+        const:0.5 - постоянная задержка;
+        uniform:0.2:1.5 - равномерно в интервале;
+        lognormal:1.5:0.5 - логнормальное с медианой 1.5 и sigma 0.5
+                            (длинный хвост, как у реального API).
+    """
+
+    def __init__(self, kind: str, params: tuple, rng: Optional[random.Random] = None):
+        self.kind = kind
+        self.params = params
+        self._rng = rng or random.Random()
+
+    @classmethod
+    def parse(cls, spec: str, rng: Optional[random.Random] = None) -> "LatencyModel":
+        kind, _, rest = spec.partition(":")
+        try:
+            params = tuple(float(value) for value in rest.split(":")) if rest else ()
+        except ValueError:
+            raise ValueError(f"Некорректные параметры задержки: {spec}")
+        expected = {"const": 1, "uniform": 2, "lognormal": 2}
+        if kind not in expected or len(params) != expected[kind]:
+            raise ValueError(f"Неизвестное распределение задержки: {spec}")
+        return cls(kind, params, rng)
+
+    def sample(self) -> float:
+        if self.kind == "const":
+            return self.params[0]
+        if self.kind == "uniform":
+            return self._rng.uniform(*self.params)
+        median, sigma = self.params
+        return self._rng.lognormvariate(math.log(median), sigma)
+
+
+class StubIoNetServer:
+    """
+    Stub-сервер io.net API в фоновом потоке
+
+    error_rate - доля запросов, на которые сервер отвечает 503
+    (проверка повторов и размыкателя цепи).
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: Optional[LatencyModel] = None,
+        cassette: Optional[Cassette] = None,
+        error_rate: float = 0.0,
+        fallback_content: str = DEFAULT_FALLBACK_CONTENT,
+        seed: Optional[int] = None
+    ):
+        self.latency = latency or LatencyModel("const", (0.0,))
+        self.cassette = cassette
+        self.error_rate = error_rate
+        self.fallback_content = fallback_content
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "errors": 0, "replayed": 0, "fallback": 0}
+        self._thread: Optional[threading.Thread] = None
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1/chat/completions"
+
+    def start(self) -> "StubIoNetServer":
+        """Запустить сервер в фоновом потоке"""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Stub io.net API запущен: {self.url}")
+        return self
+
+    def serve_forever(self) -> None:
+        """Обслуживать запросы в текущем потоке до прерывания"""
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+
+    def stop(self) -> None:
+        """Остановить сервер"""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "StubIoNetServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Счетчики запросов: всего, ошибок, из кассеты, fallback"""
+        with self._lock:
+            return dict(self._stats)
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+
+    def _respond(self, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Ответ на запрос или None для имитации ошибки сервера"""
+        self._count("requests")
+        time.sleep(self.latency.sample())
+        with self._lock:
+            failed = self._rng.random() < self.error_rate
+        if failed:
+            self._count("errors")
+            return None
+        response = self.cassette.lookup(payload) if self.cassette else None
+        if response is not None:
+            self._count("replayed")
+            return response
+        self._count("fallback")
+        return {
+            "choices": [{
+                "message": {"role": "assistant", "content": self.fallback_content},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0}
+        }
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+            def _send_json(self, status: int, body: Dict[str, Any]) -> None:
+                raw = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def do_GET(self):
+                if self.path.rstrip("/") == "/stats":
+                    self._send_json(200, server.get_stats())
+                else:
+                    self._send_json(404, {"error": "not found"})
+
+            def do_POST(self):
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send_json(404, {"error": "not found"})
+                    return
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    payload = json.loads(self.rfile.read(length) or b"{}")
+                except json.JSONDecodeError:
+                    self._send_json(400, {"error": "invalid json"})
+                    return
+
+                response = server._respond(payload)
+                if response is None:
+                    self._send_json(503, {"error": "stub: service unavailable"})
+                elif payload.get("stream"):
+                    self._send_stream(response)
+                else:
+                    self._send_json(200, response)
+
+            def _send_stream(self, response: Dict[str, Any]) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.end_headers()
+                text = response_content(response)
+                for field, key in (("reasoning", "reasoning_content"), ("content", "content")):
+                    value = text[field]
+                    for start in range(0, len(value), STREAM_CHUNK_SIZE):
+                        self._send_event({"choices": [{"delta": {key: value[start:start + STREAM_CHUNK_SIZE]}}]})
+                choice = (response.get("choices") or [{}])[0]
+                self._send_event({
+                    "choices": [{"delta": {}, "finish_reason": choice.get("finish_reason") or "stop"}],
+                    "usage": response.get("usage")
+                })
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+
+            def _send_event(self, event: Dict[str, Any]) -> None:
+                self.wfile.write(f"data: {json.dumps(event, ensure_ascii=False)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub io.net API (OpenAI-совместимый)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", default="lognormal:1.5:0.5", help="const:S | uniform:A:B | lognormal:MEDIAN:SIGMA")
+    parser.add_argument("--cassette", help="Кассета с записанными ответами (JSON Lines)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Доля ответов 503")
+    parser.add_argument("--seed", type=int, help="Seed генератора случайных чисел")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    rng = random.Random(args.seed)
+    server = StubIoNetServer(
+        host=args.host,
+        port=args.port,
+        latency=LatencyModel.parse(args.latency, rng),
+        cassette=Cassette(args.cassette, Cassette.REPLAY) if args.cassette else None,
+        error_rate=args.error_rate,
+        seed=args.seed
+    )
+    print(f"Stub io.net API: {server.url} (задержка {args.latency})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nОстановка...")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@
 Утилиты для создания клавиатур
 """
 from telegram import ReplyKeyboardMarkup, InlineKeyboardMarkup, InlineKeyboardButton
-from typing import Optional, List
+from typing import Optional, List, Dict
 
 def main_menu_keyboard() -> ReplyKeyboardMarkup:
     """Главное меню с улучшенным UI"""
@@ -239,3 +239,43 @@ def todo_list_keyboard(target_date, personal_tasks=None) -> InlineKeyboardMarkup
     
     return InlineKeyboardMarkup(keyboard)
 
+
+def todo_calendar_keyboard(view: str, start_date, days: Optional[Dict] = None) -> InlineKeyboardMarkup:
+    """Клавиатура календаря туду-листа (неделя/месяц) с переходом к дням"""
+    from datetime import datetime, timedelta
+    
+    if view == "week":
+        prev_start = start_date - timedelta(days=7)
+        next_start = start_date + timedelta(days=7)
+        other_view, other_label = "month", "🗓 Месяц"
+    else:
+        prev_start = (start_date - timedelta(days=1)).replace(day=1)
+        next_start = (start_date + timedelta(days=32)).replace(day=1)
+        other_view, other_label = "week", "🗓 Неделя"
+    
+    today = datetime.now().date()
+    keyboard = [
+        [
+            InlineKeyboardButton("◀️", callback_data=f"todo_cal_{view}_{prev_start.isoformat()}"),
+            InlineKeyboardButton("📅 Сегодня", callback_data=f"todo_cal_{view}_{today.isoformat()}"),
+            InlineKeyboardButton("▶️", callback_data=f"todo_cal_{view}_{next_start.isoformat()}")
+        ]
+    ]
+    
+    # Кнопки дней: в неделе все дни, в месяце только дни с задачами
+    day_buttons = []
+    for day_date, day in sorted((days or {}).items()):
+        if view == "month" and not day.get("total"):
+            continue
+        day_buttons.append(
+            InlineKeyboardButton(str(day_date.day), callback_data=f"todo_day_{day_date.isoformat()}")
+        )
+    for i in range(0, len(day_buttons), 7):
+        keyboard.append(day_buttons[i:i + 7])
+    
+    keyboard.append([
+        InlineKeyboardButton(other_label, callback_data=f"todo_cal_{other_view}_{start_date.isoformat()}"),
+        InlineKeyboardButton("🏠 Главное меню", callback_data="main_menu")
+    ])
+    
+    return InlineKeyboardMarkup(keyboard)
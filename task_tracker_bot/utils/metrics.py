@@ -0,0 +1,244 @@
+"""
+Реестр метрик (счетчики и гистограммы) с экспортом в текстовом формате Prometheus
+"""
+import math
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Границы гистограмм времени в секундах: от шагов плана до ответа модели
+DEFAULT_BUCKETS = (0.005, 0.025, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Семейство метрик для экспорта: (имя, тип, описание, [(имя образца, метки, значение)])
+MetricFamily = Tuple[str, str, str, List[Tuple[str, Dict[str, str], float]]]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(str(value))}"' for name, value in labels.items()) + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Метрика {self.name} ожидает метки {self.labelnames}, получены {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Монотонно растущий счетчик"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        with self._lock:
+            return [(self.name, self._labels(key), value) for key, value in sorted(self._values.items())]
+
+
+class Histogram(_Metric):
+    """Распределение значений по корзинам (накопительные счетчики le)"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # метки -> (счетчики по корзинам, сумма, количество)
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], float, int]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total, count = self._values.get(key) or ([0] * len(self.buckets), 0.0, 0)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._values[key] = (counts, total + value, count + 1)
+
+    def count(self, **labels: Any) -> int:
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+            return entry[2] if entry else 0
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        result = []
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._values.items()):
+                labels = self._labels(key)
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    result.append((f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+                result.append((f"{self.name}_sum", labels, total))
+                result.append((f"{self.name}_count", labels, count))
+        return result
+
+
+class MetricsRegistry:
+    """
+    Реестр метрик процесса
+
+    Счетчики и гистограммы создаются модулями при импорте и обновляются по
+    ходу работы. Показатели, которые удобнее читать на момент экспорта
+    (размеры кэшей), отдают коллекторы - функции, возвращающие MetricFamily.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[MetricFamily]]] = []
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, *args, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Метрика {name} уже зарегистрирована как {metric.kind}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Счетчик name (повторный вызов возвращает уже созданный)"""
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """Гистограмма name (повторный вызов возвращает уже созданную)"""
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets)
+
+    def register_collector(self, collector: Callable[[], Iterable[MetricFamily]]) -> None:
+        """Добавить функцию, отдающую метрики на момент экспорта"""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def collect(self) -> List[MetricFamily]:
+        """Все метрики реестра и коллекторов"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        families: List[MetricFamily] = [
+            (metric.name, metric.kind, metric.documentation, metric.samples()) for metric in metrics
+        ]
+        for collector in collectors:
+            try:
+                families.extend(collector())
+            except Exception as e:
+                logger.warning(f"Ошибка коллектора метрик {collector}: {e}")
+        return families
+
+    def render_prometheus(self) -> str:
+        """Метрики в текстовом формате Prometheus (exposition format 0.0.4)"""
+        lines = []
+        for name, kind, documentation, samples in self.collect():
+            help_text = documentation.replace("\\", "\\\\").replace("\n", "\\n")
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample_name, labels, value in samples:
+                lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """HTTP-эндпоинт GET /metrics для сборщика Prometheus (фоновый поток)"""
+
+    def __init__(self, registry: MetricsRegistry, host: str = "127.0.0.1", port: int = 0):
+        self.registry = registry
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._httpd.server_address[:2]
+
+    def start(self) -> "MetricsServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Эндпоинт метрик: http://{self.address[0]}:{self.address[1]}/metrics")
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def _handler_class(self):
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+            def do_GET(self):
+                if self.path.split("?")[0].rstrip("/") != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+# Общий реестр процесса
+metrics = MetricsRegistry()
@@ -0,0 +1,228 @@
+"""
+Индекс названий досок, колонок и проектов для поиска с опечатками
+"""
+import re
+import logging
+import threading
+from collections import Counter, OrderedDict, defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Минимальная похожесть (коэффициент Дайса по триграммам) для названия из команды
+MIN_SCORE = 0.5
+# Для названия внутри свободного текста порог выше: окон слов много
+TEXT_MIN_SCORE = 0.75
+# Для записей (перенос задачи, ссылка к проекту) - только точное совпадение после нормализации
+WRITE_MIN_SCORE = 1.0
+# Лучшее совпадение должно отрываться от второго, иначе название неоднозначно
+AMBIGUITY_MARGIN = 0.1
+
+NON_WORD_PATTERN = re.compile(r"[^\w]+")
+# Предлоги и слова-типы в начале запроса: "в дизайн", "доска подготовки"
+FILLER_WORDS = frozenset({
+    "в", "во", "на", "к", "для", "из",
+    "доска", "доске", "доску", "доски",
+    "колонка", "колонке", "колонку", "колонки",
+    "проект", "проекта", "проекте", "проекту",
+})
+
+
+def normalize_name(text: str) -> str:
+    """Нижний регистр, ё -> е, знаки препинания -> пробел"""
+    text = NON_WORD_PATTERN.sub(" ", str(text).lower().replace("ё", "е")).replace("_", " ")
+    return " ".join(text.split())
+
+
+def normalize_query(text: str) -> str:
+    """normalize_name без предлогов и слов-типов в начале"""
+    tokens = normalize_name(text).split()
+    while len(tokens) > 1 and tokens[0] in FILLER_WORDS:
+        tokens.pop(0)
+    return " ".join(tokens)
+
+
+def trigrams(text: str) -> FrozenSet[str]:
+    """Триграммы строки с границами слов ("  д", " ди", ...)"""
+    padded = f"  {text} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+@dataclass(frozen=True)
+class NameEntry:
+    """Именованная сущность пространства"""
+    kind: str  # board | column | project
+    id: Any
+    name: str
+    board_id: Optional[int] = None  # для колонок
+
+
+@dataclass(frozen=True)
+class NameMatch:
+    entry: NameEntry
+    score: float
+
+
+class NameIndex:
+    """
+    Названия одного пространства: точное совпадение после нормализации
+    или ближайшее по триграммам (инвертированный список триграмм)
+    """
+
+    def __init__(self, entries: Iterable[NameEntry]):
+        self.entries = list(entries)
+        self._keys = [normalize_name(entry.name) for entry in self.entries]
+        self._grams = [trigrams(key) for key in self._keys]
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        for i, grams in enumerate(self._grams):
+            for gram in grams:
+                self._postings[gram].append(i)
+        # Самое длинное название в словах по типам - ширина окна для find_in_text
+        self._max_tokens: Dict[str, int] = {}
+        for entry, key in zip(self.entries, self._keys):
+            self._max_tokens[entry.kind] = max(self._max_tokens.get(entry.kind, 0), len(key.split()))
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def search(
+        self,
+        query: str,
+        kind: Optional[str] = None,
+        board_id: Optional[int] = None,
+        limit: int = 5,
+        min_score: float = MIN_SCORE
+    ) -> List[NameMatch]:
+        """Похожие названия, лучшие первыми"""
+        key = normalize_query(query)
+        if not key:
+            return []
+        # Точное совпадение - и с предлогом в начале названия ("В работе")
+        exact_keys = {key, normalize_name(query)}
+        grams = trigrams(key)
+        shared = Counter(i for gram in grams for i in self._postings.get(gram, ()))
+
+        matches = []
+        for i, count in shared.items():
+            entry = self.entries[i]
+            if kind is not None and entry.kind != kind:
+                continue
+            if board_id is not None and entry.board_id != board_id:
+                continue
+            if self._keys[i] in exact_keys:
+                score = 1.0
+            else:
+                # Неточное совпадение не достигает 1.0 даже при тех же триграммах
+                score = min(2 * count / (len(grams) + len(self._grams[i])), 0.999)
+            if score >= min_score:
+                matches.append(NameMatch(entry, round(score, 3)))
+        matches.sort(key=lambda match: (-match.score, match.entry.name))
+        return matches[:limit]
+
+    def resolve(
+        self,
+        query: str,
+        kind: str,
+        board_id: Optional[int] = None,
+        min_score: float = MIN_SCORE
+    ) -> Optional[NameMatch]:
+        """Единственное подходящее название или None (не найдено или неоднозначно)"""
+        matches = self.search(query, kind=kind, board_id=board_id, limit=2, min_score=min_score)
+        if not matches:
+            return None
+        if len(matches) > 1 and matches[0].score - matches[1].score < AMBIGUITY_MARGIN:
+            return None
+        return matches[0]
+
+    def find_in_text(self, text: str, kind: str, min_score: float = TEXT_MIN_SCORE) -> Optional[NameMatch]:
+        """Название, упомянутое в тексте: лучшее окно из 1..N подряд идущих слов"""
+        tokens = normalize_name(text).split()
+        width = self._max_tokens.get(kind, 0)
+        best: Optional[NameMatch] = None
+        for size in range(1, width + 1):
+            for start in range(len(tokens) - size + 1):
+                window = " ".join(tokens[start:start + size])
+                if len(window) < 3 or window in FILLER_WORDS:
+                    continue
+                match = self.resolve(window, kind, min_score=min_score)
+                if match is not None and (best is None or match.score > best.score):
+                    best = match
+        return best
+
+
+class NameIndexCache:
+    """
+    Индексы названий по пространствам
+
+    Репозитории досок, колонок и проектов сбрасывают индекс при записи.
+    Как и в TodoDayCache, индекс, построенный до сброса, в кэш не попадет.
+    """
+
+    def __init__(self, max_workspaces: int = 1000):
+        self.max_workspaces = max_workspaces
+        self._lock = threading.Lock()
+        self._indexes: "OrderedDict[int, NameIndex]" = OrderedDict()
+        self._versions: Dict[int, int] = {}
+        self._global_version = 0
+        self._hits = 0
+        self._misses = 0
+
+    def version(self, workspace_id: int) -> Tuple[int, int]:
+        """Текущая версия названий пространства (передается обратно в set)"""
+        with self._lock:
+            return (self._global_version, self._versions.get(workspace_id, 0))
+
+    def get(self, workspace_id: int) -> Optional[NameIndex]:
+        with self._lock:
+            index = self._indexes.get(workspace_id)
+            if index is None:
+                self._misses += 1
+                return None
+            self._indexes.move_to_end(workspace_id)
+            self._hits += 1
+            return index
+
+    def set(self, workspace_id: int, index: NameIndex, version: Tuple[int, int]) -> bool:
+        """Сохранить индекс, если названия не менялись с момента version"""
+        with self._lock:
+            if version != (self._global_version, self._versions.get(workspace_id, 0)):
+                logger.debug(f"Индекс названий workspace_id={workspace_id} устарел до записи в кэш")
+                return False
+            self._indexes[workspace_id] = index
+            self._indexes.move_to_end(workspace_id)
+            while len(self._indexes) > self.max_workspaces:
+                self._indexes.popitem(last=False)
+            return True
+
+    def invalidate(self, workspace_id: int) -> None:
+        """Сбросить индекс пространства (создана доска или проект)"""
+        with self._lock:
+            self._versions[workspace_id] = self._versions.get(workspace_id, 0) + 1
+            self._indexes.pop(workspace_id, None)
+
+    def invalidate_all(self) -> None:
+        """Сбросить все индексы (запись, для которой неизвестно пространство)"""
+        with self._lock:
+            self._global_version += 1
+            self._indexes.clear()
+
+    def clear(self) -> None:
+        """Очистить кэш и статистику"""
+        with self._lock:
+            self._indexes.clear()
+            self._versions.clear()
+            self._global_version = 0
+            self._hits = 0
+            self._misses = 0
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workspaces": len(self._indexes),
+                "cache_hits": self._hits,
+                "cache_misses": self._misses
+            }
+
+# Общий экземпляр для репозиториев и NameResolver
+name_index_cache = NameIndexCache()
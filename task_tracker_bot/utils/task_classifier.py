@@ -3,7 +3,7 @@
 """
 import re
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from repositories.project_repository import ProjectRepository
 
 logger = logging.getLogger(__name__)
@@ -72,4 +72,37 @@ class TaskClassifier:
         result["title"] = task_text.strip()
         logger.debug(f"Тип задачи: personal")
         return result
-
+    
+    def find_ambiguous(self, classifications: Dict[int, Dict[str, Any]], workspace_id: int) -> List[int]:
+        """
+        Строки, которые правила отнесли к личным без уверенности
+        
+        Неоднозначной считается личная задача, которая начинается с кода
+        несуществующего проекта или упоминает название проекта пространства.
+        
+        Args:
+            classifications: {индекс строки: результат classify_task}
+            workspace_id: ID пространства
+        
+        Returns:
+            Индексы неоднозначных строк
+        """
+        personal = {
+            index: classification for index, classification in classifications.items()
+            if classification.get("type") == "personal"
+        }
+        if not personal:
+            return []
+        
+        project_names = [
+            project.name.lower()
+            for project in self.project_repo.get_all_by_workspace(workspace_id)
+            if project.name and len(project.name) >= 3
+        ]
+        ambiguous = []
+        for index, classification in personal.items():
+            title = classification["title"]
+            has_code = any(re.match(pattern, title) for pattern in self.PROJECT_ID_PATTERNS)
+            if has_code or any(name in title.lower() for name in project_names):
+                ambiguous.append(index)
+        return ambiguous
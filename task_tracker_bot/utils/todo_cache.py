@@ -0,0 +1,116 @@
+"""
+Кэш отрисованных дней туду-листа по пользователям
+"""
+import time
+import logging
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, Optional, Tuple
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class TodoDayCache:
+    """Кэш готовых к отправке дней туду-листа: {user_id: {date: значение}}
+
+    Репозитории сбрасывают записи при изменении задач (write-through), поэтому
+    навигация по дням отдается из памяти. Каждый сброс увеличивает версию
+    пользователя: значение, посчитанное до сброса (например, фоновой
+    предзагрузкой), в кэш уже не попадет.
+    """
+
+    def __init__(self, ttl: Optional[int] = None, max_users: int = 1000):
+        self.ttl = ttl if ttl is not None else Config.TODO_CACHE_TTL
+        self.max_users = max_users
+        self._lock = threading.Lock()
+        # Порядок пользователей - LRU, самые старые вытесняются первыми
+        self._entries: "OrderedDict[int, Dict[date, Tuple[Any, float]]]" = OrderedDict()
+        self._versions: Dict[int, int] = {}
+        self._global_version = 0
+        self._hits = 0
+        self._misses = 0
+
+    def version(self, user_id: int) -> Tuple[int, int]:
+        """Текущая версия данных пользователя (передается обратно в set)"""
+        with self._lock:
+            return (self._global_version, self._versions.get(user_id, 0))
+
+    def get(self, user_id: int, day: date) -> Optional[Any]:
+        """Получить значение или None, если его нет или оно устарело"""
+        with self._lock:
+            user_entries = self._entries.get(user_id)
+            entry = user_entries.get(day) if user_entries else None
+            if entry is None or time.time() - entry[1] > self.ttl:
+                if entry is not None:
+                    del user_entries[day]
+                self._misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self._hits += 1
+            return entry[0]
+
+    def contains(self, user_id: int, day: date) -> bool:
+        """Есть ли свежее значение (без учета в статистике)"""
+        with self._lock:
+            user_entries = self._entries.get(user_id)
+            entry = user_entries.get(day) if user_entries else None
+            return entry is not None and time.time() - entry[1] <= self.ttl
+
+    def set(self, user_id: int, day: date, value: Any, version: Tuple[int, int]) -> bool:
+        """
+        Сохранить значение, если данные не менялись с момента version
+
+        Returns:
+            True если значение сохранено
+        """
+        with self._lock:
+            if version != (self._global_version, self._versions.get(user_id, 0)):
+                logger.debug(f"Пропуск записи в кэш туду-листа: данные user_id={user_id} изменились")
+                return False
+            self._entries.setdefault(user_id, {})[day] = (value, time.time())
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_users:
+                self._entries.popitem(last=False)
+            return True
+
+    def invalidate(self, user_id: int, day: Optional[date] = None) -> None:
+        """Сбросить день пользователя (или все его дни, если day не указан)"""
+        with self._lock:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+            if day is None:
+                self._entries.pop(user_id, None)
+            elif user_id in self._entries:
+                self._entries[user_id].pop(day, None)
+
+    def invalidate_all(self) -> None:
+        """Сбросить кэш всех пользователей (изменились рабочие задачи)"""
+        with self._lock:
+            self._global_version += 1
+            self._entries.clear()
+
+    def clear(self) -> None:
+        """Очистить кэш и статистику"""
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self._global_version = 0
+            self._hits = 0
+            self._misses = 0
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Получить статистику использования кэша"""
+        with self._lock:
+            total_requests = self._hits + self._misses
+            hit_ratio = (self._hits / total_requests * 100) if total_requests > 0 else 0
+            return {
+                "users": len(self._entries),
+                "cache_size": sum(len(days) for days in self._entries.values()),
+                "cache_hits": self._hits,
+                "cache_misses": self._misses,
+                "total_requests": total_requests,
+                "hit_ratio_percent": round(hit_ratio, 2)
+            }
+
+# Общий экземпляр для репозиториев и обработчиков
+todo_day_cache = TodoDayCache()
@@ -0,0 +1,139 @@
+"""
+Параллельная обработка обновлений Telegram с сохранением порядка внутри чата
+"""
+import time
+import logging
+from collections import deque
+from typing import Any, Awaitable, Deque, Dict, Optional, Tuple
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+from config import Config
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+UPDATES = metrics.counter(
+    "update_processor_updates_total",
+    "Обновления Telegram по способу обработки (direct/queued/unordered)",
+    ["path"]
+)
+QUEUE_WAIT = metrics.histogram(
+    "update_processor_queue_wait_seconds", "Ожидание обновления за предыдущими обновлениями своего чата"
+)
+
+
+class ChatSequentialUpdateProcessor(BaseUpdateProcessor):
+    """
+    Обновления разных чатов обрабатываются параллельно, одного чата - по очереди
+
+    ConversationHandler и флаги в context.user_data (waiting_workspace_name и
+    т.п.) рассчитаны на то, что следующее сообщение чата обрабатывается после
+    предыдущего. Первое обновление чата занимает слот и обрабатывает и его, и
+    все обновления этого чата, пришедшие за время обработки; их собственные
+    слоты сразу освобождаются. Поэтому max_concurrent_updates ограничивает
+    число одновременно обрабатываемых чатов, и поток сообщений из одного чата
+    не занимает слоты остальных. Обновления без чата и пользователя
+    обрабатываются без упорядочивания. Обработчики с block=False PTB
+    запускает отдельными задачами вне этой очереди, поэтому обработчики
+    бота (в том числе AI-запросов) регистрируются блокирующими.
+    """
+
+    def __init__(self, max_concurrent_updates: Optional[int] = None):
+        super().__init__(max_concurrent_updates or Config.UPDATE_MAX_CONCURRENCY)
+        # chat_id -> обновления, ждущие окончания текущего: (время постановки, корутина)
+        self._chats: Dict[int, Deque[Tuple[float, Awaitable[Any]]]] = {}
+        self._unordered = 0
+        self._max_depth = 0
+
+    @staticmethod
+    def chat_key(update: object) -> Optional[int]:
+        """Ключ упорядочивания: ID чата, для обновлений без чата - ID пользователя"""
+        if not isinstance(update, Update):
+            return None
+        if update.effective_chat is not None:
+            return update.effective_chat.id
+        if update.effective_user is not None:
+            return update.effective_user.id
+        return None
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        key = self.chat_key(update)
+        if key is None:
+            UPDATES.inc(path="unordered")
+            self._unordered += 1
+            try:
+                await self._run(coroutine)
+            finally:
+                self._unordered -= 1
+            return
+
+        pending = self._chats.get(key)
+        if pending is not None:
+            # Чат уже обрабатывается - обновление выполнит тот же обработчик после текущих
+            UPDATES.inc(path="queued")
+            pending.append((time.time(), coroutine))
+            self._max_depth = max(self._max_depth, len(pending))
+            return
+
+        UPDATES.inc(path="direct")
+        pending = self._chats[key] = deque()
+        try:
+            await self._run(coroutine)
+            while pending:
+                queued_at, next_coroutine = pending.popleft()
+                QUEUE_WAIT.observe(time.time() - queued_at)
+                await self._run(next_coroutine)
+        finally:
+            del self._chats[key]
+            # При отмене (остановка бота) оставшиеся обновления не выполняются
+            for _, skipped in pending:
+                close = getattr(skipped, "close", None)
+                if close is not None:
+                    close()
+            if pending:
+                logger.warning(f"Чат {key}: не обработано обновлений - {len(pending)}")
+
+    @staticmethod
+    async def _run(coroutine: Awaitable[Any]) -> None:
+        """Обработать обновление; ошибка не прерывает очередь чата"""
+        try:
+            await coroutine
+        except Exception as e:
+            logger.error(f"Ошибка обработки обновления: {e}", exc_info=True)
+
+    async def initialize(self) -> None:
+        """Ресурсов нет - очереди чатов создаются по мере поступления обновлений"""
+
+    async def shutdown(self) -> None:
+        """Application.stop дожидается задач обработки - очереди к этому моменту пусты"""
+
+    def get_stats(self) -> Dict[str, int]:
+        """Текущая загрузка: обрабатываемые чаты и обновления в очередях чатов"""
+        return {
+            "active_chats": len(self._chats),
+            "unordered": self._unordered,
+            "queued": sum(len(pending) for pending in self._chats.values()),
+            "max_chat_queue": self._max_depth,
+            "max_concurrent_updates": self.max_concurrent_updates
+        }
+
+
+# Обработчик обновлений бота (Application.builder().concurrent_updates)
+update_processor = ChatSequentialUpdateProcessor()
+
+
+def _collect_update_processor_metrics():
+    """Глубина очередей обработчика обновлений для реестра метрик"""
+    stats = update_processor.get_stats()
+    yield "update_processor_active_chats", "gauge", "Чаты, обновления которых сейчас обрабатываются", [
+        ("update_processor_active_chats", {}, stats["active_chats"])
+    ]
+    yield "update_processor_queued_updates", "gauge", "Обновления, ждущие в очередях своих чатов", [
+        ("update_processor_queued_updates", {}, stats["queued"])
+    ]
+    yield "update_processor_max_chat_queue", "gauge", "Наибольшая глубина очереди одного чата с запуска", [
+        ("update_processor_max_chat_queue", {}, stats["max_chat_queue"])
+    ]
+
+
+metrics.register_collector(_collect_update_processor_metrics)